@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark for `ugetcli` package - compression profiles.
+Reports time and size of .unitypackage (native writer) and .nupkg (native builder) for every compression profile,
+over synthetic Unity projects dominated by text assets (scripts, prefabs) and by binary assets (textures, audio).
+
+Usage: python benchmarks/bench_compression.py
+"""
+
+import os
+import random
+import timeit
+
+from ugetcli.compression import COMPRESSION_PROFILES
+from ugetcli.nupkg import NuPkgBuilder
+from ugetcli.unitypackagewriter import UnityPackageWriter
+from ugetcli.utils import temp_dir
+
+_NUSPEC = """<?xml version="1.0"?>
+<package xmlns="http://schemas.microsoft.com/packaging/2013/05/nuspec.xsd">
+  <metadata>
+    <id>MyProject</id>
+    <version>1.0.0</version>
+    <authors>Author</authors>
+    <description>Benchmark</description>
+  </metadata>
+  <files>
+    <file src="$unityPackagePath$" target="unity" />
+    <file src="Docs\\**" target="docs" />
+  </files>
+</package>
+"""
+
+
+def text_asset(rng, size):
+    lines = []
+    while sum(len(line) for line in lines) < size:
+        lines.append("  m_{0}: {{fileID: {1}, guid: {2:032x}, type: 3}}\n".format(
+            rng.choice(["Script", "Material", "Mesh", "GameObject"]), rng.randint(0, 10 ** 9), rng.getrandbits(128)))
+    return "".join(lines).encode("utf-8")[:size]
+
+
+def create_project(root_dir, text_count, binary_count, binary_size):
+    rng = random.Random(42)
+    package_root = os.path.join(root_dir, "UnityProject", "Assets", "MyProject")
+    for directory in ["Scripts", "Prefabs", "Textures"]:
+        os.makedirs(os.path.join(package_root, directory))
+    for i in range(text_count):
+        directory = "Prefabs" if i % 2 else "Scripts"
+        with open(os.path.join(package_root, directory, "Asset{0}.prefab".format(i)), "wb") as f:
+            f.write(text_asset(rng, 16 * 1024))
+    for i in range(binary_count):
+        with open(os.path.join(package_root, "Textures", "Texture{0}.png".format(i)), "wb") as f:
+            # Half noise, half flat color - roughly what real textures compress to
+            f.write(os.urandom(binary_size // 2) + b"\x80\x80\x80\xff" * (binary_size // 8))
+    os.makedirs(os.path.join(root_dir, "Docs"))
+    with open(os.path.join(root_dir, "Docs", "README.md"), "wb") as f:
+        f.write(text_asset(rng, 64 * 1024))
+    with open(os.path.join(root_dir, "MyProject.nuspec"), "w") as f:
+        f.write(_NUSPEC)
+    return package_root
+
+
+def bench(name, text_count, binary_count, binary_size):
+    print("{0}:".format(name))
+    with temp_dir() as root_dir:
+        package_root = create_project(root_dir, text_count, binary_count, binary_size)
+        output_dir = os.path.join(root_dir, "Output")
+        os.makedirs(output_dir)
+        UnityPackageWriter().export_unitypackage(package_root, os.path.join(output_dir, "warmup.unitypackage"))
+        os.remove(os.path.join(output_dir, "warmup.unitypackage"))  # Generates .meta files outside of measurements
+
+        for profile in COMPRESSION_PROFILES:
+            unitypackage_path = os.path.join(output_dir, "MyProject_1.0.0_Release.unitypackage")
+            start = timeit.default_timer()
+            UnityPackageWriter(compression=profile).export_unitypackage(package_root, unitypackage_path)
+            unitypackage_time = timeit.default_timer() - start
+
+            start = timeit.default_timer()
+            NuPkgBuilder(compression=profile).pack(os.path.join(root_dir, "MyProject.nuspec"), output_dir, "Release",
+                                                   unitypackage_path, package_root, "1.0.0")
+            nupkg_time = timeit.default_timer() - start
+
+            print("    {0:>8}: unitypackage {1:8.1f} ms {2:8.2f} MB   nupkg {3:8.1f} ms {4:8.2f} MB".format(
+                profile, unitypackage_time * 1000, os.path.getsize(unitypackage_path) / (1024.0 * 1024.0),
+                nupkg_time * 1000, os.path.getsize(os.path.join(output_dir, "MyProject.1.0.0.nupkg")) / (1024.0 * 1024.0)))
+
+
+def main():
+    bench("text-heavy project (2000 x 16 KB prefabs and scripts)", 2000, 10, 256 * 1024)
+    bench("art-heavy project (200 x 16 KB prefabs, 40 x 2 MB textures)", 200, 40, 2 * 1024 * 1024)
+
+
+if __name__ == "__main__":
+    main()
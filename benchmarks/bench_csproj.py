@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark for `ugetcli` package - `csproj` module.
+Compares parsing the whole .csproj for every query with the parse-once streaming model,
+over synthetic projects that list thousands of Compile items, and measures in-process evaluation of a repository.
+
+Usage: python benchmarks/bench_csproj.py
+"""
+
+import os
+import timeit
+import xml.etree.ElementTree as ET
+
+from ugetcli.csproj import CsProj
+from ugetcli.utils import temp_dir
+
+_NS = "{http://schemas.microsoft.com/developer/msbuild/2003}"
+_HEADER = """<?xml version="1.0" encoding="utf-8"?>
+<Project ToolsVersion="15.0" xmlns="http://schemas.microsoft.com/developer/msbuild/2003">
+  <PropertyGroup>
+    <AssemblyName>MyProject</AssemblyName>
+  </PropertyGroup>
+  <PropertyGroup Condition=" '$(Configuration)|$(Platform)' == 'Debug|AnyCPU' ">
+    <OutputPath>bin\\Debug\\</OutputPath>
+  </PropertyGroup>
+  <PropertyGroup Condition=" '$(Configuration)|$(Platform)' == 'Release|AnyCPU' ">
+    <OutputPath>bin\\Release\\</OutputPath>
+  </PropertyGroup>
+  <ItemGroup>
+"""
+_FOOTER = """  </ItemGroup>
+</Project>
+"""
+
+
+def write_csproj(path, item_count):
+    with open(path, "w") as f:
+        f.write(_HEADER)
+        for i in range(item_count):
+            f.write('    <Compile Include="Source\\Generated\\Class{0}.cs" />\n'.format(i))
+        f.write(_FOOTER)
+
+
+def query_full_parse(path):
+    """ Previous implementation - ET.parse for every query """
+    for _ in range(3):
+        root = ET.parse(path).getroot()
+        for property_group in root.findall(_NS + "PropertyGroup"):
+            property_group.find(_NS + "AssemblyName")
+            property_group.find(_NS + "OutputPath")
+
+
+def query_model(path):
+    csproj = CsProj(path)
+    csproj.get_assembly_name()
+    csproj.get_output_path("Release")
+    csproj.get_assembly_name()
+
+
+def bench_repository(tmp_root_dir, project_count):
+    """ Resolves output paths of many projects sharing Directory.Build.props """
+    with open(os.path.join(tmp_root_dir, "Directory.Build.props"), "w") as f:
+        f.write('<Project><PropertyGroup><BaseOutputPath>..\\Output\\</BaseOutputPath></PropertyGroup></Project>')
+    paths = []
+    for i in range(project_count):
+        project_dir = os.path.join(tmp_root_dir, "Project{0}".format(i))
+        os.makedirs(project_dir)
+        paths.append(os.path.join(project_dir, "Project{0}.csproj".format(i)))
+        write_csproj(paths[-1], 200)
+
+    start = timeit.default_timer()
+    for path in paths:
+        CsProj(path).get_output_path("Release", "x64")
+    elapsed = timeit.default_timer() - start
+    print("{0:>6} projects: output paths evaluated in-process in {1:.1f} ms".format(project_count, elapsed * 1000))
+
+
+def main():
+    with temp_dir() as tmp_root_dir:
+        bench_repository(tmp_root_dir, 200)
+    with temp_dir() as tmp_root_dir:
+        for item_count in (100, 5000, 50000):
+            path = os.path.join(tmp_root_dir, "Project{0}.csproj".format(item_count))
+            write_csproj(path, item_count)
+            full = min(timeit.repeat(lambda: query_full_parse(path), number=5, repeat=3)) / 5
+            model = min(timeit.repeat(lambda: query_model(path), number=5, repeat=3)) / 5
+            print("{0:>6} items: full parse {1:8.2f} ms   parse-once model {2:8.2f} ms   ({3:.0f}x)".format(
+                item_count, full * 1000, model * 1000, full / model))
+
+
+if __name__ == "__main__":
+    main()
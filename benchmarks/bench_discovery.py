@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark for `ugetcli` package - `discovery` module.
+Discovers projects in a monorepo-like tree (projects with source folders, bin/obj outputs and a Unity project
+Library) with os.walk, and with ProjectDiscovery without cache, with a cold cache and with a warm cache.
+
+Usage: python benchmarks/bench_discovery.py
+"""
+
+import os
+import timeit
+
+from ugetcli.discovery import ProjectDiscovery, DEFAULT_IGNORE_PATTERNS, DISCOVERED_EXTENSIONS
+from ugetcli.utils import temp_dir, create_empty_file
+
+PROJECT_COUNT = 80
+SOURCE_DIRECTORIES = 20
+FILES_PER_DIRECTORY = 25
+
+
+def create_tree(root_dir):
+    for project in range(PROJECT_COUNT):
+        project_dir = os.path.join(root_dir, "src", "Project{0}".format(project))
+        for directory in ["Source{0}".format(i) for i in range(SOURCE_DIRECTORIES)] + ["bin/Release", "obj"]:
+            path = os.path.join(project_dir, *directory.split("/"))
+            os.makedirs(path)
+            for i in range(FILES_PER_DIRECTORY):
+                create_empty_file(os.path.join(path, "File{0}.cs".format(i)))
+        create_empty_file(os.path.join(project_dir, "Project{0}.csproj".format(project)))
+        create_empty_file(os.path.join(project_dir, "Project{0}.nuspec".format(project)))
+    library_dir = os.path.join(root_dir, "UnityProject", "Library")
+    for i in range(500):
+        path = os.path.join(library_dir, "Artifacts", "{0:02x}".format(i))
+        os.makedirs(path)
+        for j in range(FILES_PER_DIRECTORY):
+            create_empty_file(os.path.join(path, "artifact{0}".format(j)))
+    create_empty_file(os.path.join(root_dir, "All.sln"))
+
+
+def walk(root_dir):
+    found = []
+    for dirpath, dirnames, filenames in os.walk(root_dir):
+        dirnames[:] = [name for name in dirnames if name not in DEFAULT_IGNORE_PATTERNS]
+        found += [filename for filename in filenames if os.path.splitext(filename)[1].lower() in DISCOVERED_EXTENSIONS]
+    return found
+
+
+def measure(label, method, repeat=5):
+    elapsed = min(timeit.repeat(method, number=1, repeat=repeat))
+    print("    {0:28} {1:8.1f} ms".format(label + ":", elapsed * 1000))
+
+
+def set_directory_mtimes(root_dir, mtime):
+    for dirpath, dirnames, filenames in os.walk(root_dir):
+        os.utime(dirpath, (mtime, mtime))
+
+
+def main():
+    with temp_dir() as tmp_root_dir:
+        root_dir = os.path.join(tmp_root_dir, "repo")
+        create_tree(root_dir)
+        set_directory_mtimes(root_dir, 1000)  # Listings of directories changed in the last seconds are not trusted
+        cache_dir = os.path.join(tmp_root_dir, "cache")
+        file_count = sum(len(filenames) for dirpath, dirnames, filenames in os.walk(root_dir))
+        print("discovery ({0} projects, {1} files):".format(PROJECT_COUNT, file_count))
+
+        measure("os.walk", lambda: walk(root_dir))
+        for jobs in (1, 4):
+            measure("no cache, {0} jobs".format(jobs),
+                    lambda: ProjectDiscovery(jobs, use_cache=False, cache_dir=cache_dir).discover(root_dir))
+        discovery = ProjectDiscovery(cache_dir=cache_dir)
+        measure("cold cache", lambda: (discovery.clear(), discovery.discover(root_dir)))
+        discovery.discover(root_dir)
+        measure("warm cache", lambda: discovery.discover(root_dir))
+        result = discovery.discover(root_dir)
+        print("    {0} projects, {1} nuspecs, {2} solutions; {3} directories, {4} listed".format(
+            len(result.projects), len(result.nuspecs), len(result.solutions), result.directories, result.listed))
+
+
+if __name__ == "__main__":
+    main()
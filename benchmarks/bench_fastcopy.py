@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark for `ugetcli` package - `fastcopy` module.
+Copies a large file (assembly staging, cache materialization) and splices many small ranges into one file
+(incremental .unitypackage members, raw .nupkg entries), with buffered copy and with fastcopy.
+Reports throughput of every copy method.
+
+Usage: python benchmarks/bench_fastcopy.py
+"""
+
+import os
+import shutil
+import timeit
+
+from ugetcli import fastcopy
+from ugetcli.utils import temp_dir
+
+
+def create_file(path, size):
+    with open(path, "wb") as f:
+        for offset in range(0, size, 1024 * 1024):
+            f.write(os.urandom(min(size - offset, 1024 * 1024)))
+
+
+def measure(label, size, method, dst):
+    if os.path.exists(dst):
+        os.remove(dst)  # Might be a hardlink to the source
+    start = timeit.default_timer()
+    method()
+    elapsed = timeit.default_timer() - start
+    print("    {0:24} {1:8.1f} ms, {2:8.1f} MB/s".format(label + ":", elapsed * 1000,
+                                                         size / (1024.0 * 1024.0) / elapsed))
+
+
+def copyfileobj(src, dst):
+    with open(src, "rb") as source, open(dst, "wb") as target:
+        shutil.copyfileobj(source, target, 1024 * 1024)
+
+
+def splice(src, dst, count, chunk_size, copy):
+    with open(src, "rb") as source, open(dst, "wb") as target:
+        for offset in range(0, count, chunk_size):
+            copy(source, target, min(chunk_size, count - offset))
+
+
+def buffered_copy(source, target, count):
+    target.write(source.read(count))
+
+
+def main():
+    size = 512 * 1024 * 1024
+    with temp_dir() as tmp_root_dir:
+        src = os.path.join(tmp_root_dir, "source.bin")
+        dst = os.path.join(tmp_root_dir, "target.bin")
+        create_file(src, size)
+
+        print("copy file ({0} MB):".format(size // (1024 * 1024)))
+        measure("shutil.copyfileobj", size, lambda: copyfileobj(src, dst), dst)
+        measure("shutil.copyfile", size, lambda: shutil.copyfile(src, dst), dst)
+        measure("fastcopy.copy_file", size, lambda: fastcopy.copy_file(src, dst), dst)
+        measure("fastcopy.copy_file(link)", size, lambda: fastcopy.copy_file(src, dst, link=True), dst)
+
+        print("splice 64 KB ranges ({0} MB):".format(size // (1024 * 1024)))
+        measure("buffered", size, lambda: splice(src, dst, size, 64 * 1024, buffered_copy), dst)
+        measure("fastcopy.copy_range", size, lambda: splice(src, dst, size, 64 * 1024, fastcopy.copy_range), dst)
+
+        print("fastcopy methods used:")
+        for line in fastcopy.stats.format():
+            print("    " + line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark for `ugetcli` package - incremental `unitypackagewriter` export.
+Rebuilds .unitypackage of a synthetic Unity project after a few assets changed, with a full export
+and with incremental export, which reuses compressed members of unchanged assets.
+
+Usage: python benchmarks/bench_incremental.py
+"""
+
+import os
+import timeit
+
+from ugetcli.buildcache import MemberCache
+from ugetcli.metadata import FileDigestCache
+from ugetcli.unitypackagewriter import UnityPackageWriter
+from ugetcli.utils import temp_dir
+
+
+def write_asset(path, size):
+    """ Writes hex text, which compresses about 2:1, like text assets and uncompressed textures """
+    with open(path, "wb") as f:
+        for offset in range(0, size, 1024 * 1024):
+            f.write(os.urandom(min(size - offset, 1024 * 1024) // 2).hex().encode("ascii"))
+
+
+def create_project(package_root, file_count, file_size):
+    paths = []
+    for i in range(file_count):
+        directory = os.path.join(package_root, "Folder{0}".format(i % 20))
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        paths.append(os.path.join(directory, "Asset{0}.bytes".format(i)))
+        write_asset(paths[-1], file_size)
+    return paths
+
+
+def export(package_root, output_path, cache_dir=None):
+    writer = UnityPackageWriter()
+    if cache_dir:
+        digest_cache = FileDigestCache(cache_dir)
+        writer.set_member_cache(MemberCache(cache_dir), digest_cache)
+    start = timeit.default_timer()
+    writer.export_unitypackage(package_root, output_path)
+    if cache_dir:
+        digest_cache.save()
+    return timeit.default_timer() - start
+
+
+def bench(name, file_count, file_size, changed_count):
+    with temp_dir() as tmp_root_dir:
+        package_root = os.path.join(tmp_root_dir, "Assets", "MyProject")
+        cache_dir = os.path.join(tmp_root_dir, "cache")
+        paths = create_project(package_root, file_count, file_size)
+        full_path = os.path.join(tmp_root_dir, "full.unitypackage")
+        incremental_path = os.path.join(tmp_root_dir, "incremental.unitypackage")
+
+        export(package_root, full_path)  # Generates .meta files
+        cold = export(package_root, incremental_path, cache_dir)
+        for path in paths[:changed_count]:
+            write_asset(path, file_size)
+        full = export(package_root, full_path)
+        incremental = export(package_root, incremental_path, cache_dir)
+
+        print("{0} ({1} files, {2:.0f} MB, {3} changed):".format(
+            name, file_count, file_count * file_size / (1024.0 * 1024.0), changed_count))
+        print("    full rebuild:        {0:8.1f} ms, {1:6.1f} MB output".format(
+            full * 1000, os.path.getsize(full_path) / (1024.0 * 1024.0)))
+        print("    incremental (cold):  {0:8.1f} ms".format(cold * 1000))
+        print("    incremental rebuild: {0:8.1f} ms, {1:6.1f} MB output".format(
+            incremental * 1000, os.path.getsize(incremental_path) / (1024.0 * 1024.0)))
+
+
+def main():
+    bench("many small assets", 2000, 16 * 1024, 5)
+    bench("few large assets", 20, 8 * 1024 * 1024, 2)
+
+
+if __name__ == "__main__":
+    main()
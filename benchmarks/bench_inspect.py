@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark for `ugetcli` package - `inspector` module.
+Compares listing an output directory of Unity Packages by extracting them with tarfile, by streaming them once
+with the inspector, and by reading the inspector index.
+
+Usage: python benchmarks/bench_inspect.py
+"""
+
+import os
+import timeit
+import tarfile
+
+from ugetcli.inspector import UnityPackageInspector
+from ugetcli.unitypackagewriter import UnityPackageWriter
+from ugetcli.utils import temp_dir
+
+
+def create_packages(tmp_root_dir, package_count, file_count, file_size):
+    package_root = os.path.join(tmp_root_dir, "Assets", "MyProject")
+    os.makedirs(package_root)
+    for i in range(file_count):
+        with open(os.path.join(package_root, "Asset{0}.bytes".format(i)), "wb") as f:
+            f.write(os.urandom(file_size))
+    output_dir = os.path.join(tmp_root_dir, "Output")
+    os.makedirs(output_dir)
+    paths = []
+    for i in range(package_count):
+        paths.append(os.path.join(output_dir, "MyProject{0}.unitypackage".format(i)))
+        UnityPackageWriter().export_unitypackage(package_root, paths[-1])
+    return paths
+
+
+def extract_all(paths, extract_dir):
+    for path in paths:
+        with tarfile.open(path, "r:gz") as tar:
+            tar.extractall(extract_dir)
+
+
+def main():
+    with temp_dir() as tmp_root_dir:
+        paths = create_packages(tmp_root_dir, 200, 50, 64 * 1024)
+        print("{0} packages, {1:.0f} MB".format(len(paths), sum(os.path.getsize(p) for p in paths) / 1048576.0))
+
+        start = timeit.default_timer()
+        extract_all(paths, os.path.join(tmp_root_dir, "Extracted"))
+        print("    extract with tarfile: {0:8.1f} ms".format((timeit.default_timer() - start) * 1000))
+
+        for jobs in (1, 4):
+            start = timeit.default_timer()
+            UnityPackageInspector(use_index=False).inspect_many(paths, jobs)
+            print("    inspect, {0} jobs:     {1:8.1f} ms".format(jobs, (timeit.default_timer() - start) * 1000))
+
+        cache_dir = os.path.join(tmp_root_dir, "cache")
+        UnityPackageInspector(cache_dir).inspect_many(paths)
+        start = timeit.default_timer()
+        UnityPackageInspector(cache_dir).inspect_many(paths)
+        print("    inspect, indexed:    {0:8.1f} ms".format((timeit.default_timer() - start) * 1000))
+
+
+if __name__ == "__main__":
+    main()
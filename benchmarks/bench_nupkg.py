@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark for `ugetcli` package - incremental `nupkg` pack.
+Re-packs .nupkg with a large embedded .unitypackage after a few documentation files changed, with a full pack
+and with incremental pack, which copies compressed data of unchanged files from the previous package.
+
+Usage: python benchmarks/bench_nupkg.py
+"""
+
+import os
+import gzip
+import timeit
+
+from ugetcli.nupkg import NuPkgBuilder
+from ugetcli.utils import temp_dir
+
+_NUSPEC = """<?xml version="1.0"?>
+<package xmlns="http://schemas.microsoft.com/packaging/2013/05/nuspec.xsd">
+  <metadata>
+    <id>MyProject</id>
+    <version>1.0.0</version>
+    <authors>Author</authors>
+    <description>Benchmark</description>
+  </metadata>
+  <files>
+    <file src="$unityPackagePath$" target="unity" />
+    <file src="Docs\\**" target="docs" />
+  </files>
+</package>
+"""
+
+
+def create_project(root_dir, unitypackage_size, doc_count):
+    with open(os.path.join(root_dir, "MyProject.nuspec"), "w") as f:
+        f.write(_NUSPEC)
+    unitypackage_path = os.path.join(root_dir, "MyProject.unitypackage")
+    with gzip.open(unitypackage_path, "wb", compresslevel=1) as f:
+        for offset in range(0, unitypackage_size, 1024 * 1024):
+            f.write(os.urandom(512 * 1024).hex().encode("ascii"))
+    os.makedirs(os.path.join(root_dir, "Docs"))
+    for i in range(doc_count):
+        write_doc(root_dir, i, "version 1")
+    return unitypackage_path
+
+
+def write_doc(root_dir, i, text):
+    with open(os.path.join(root_dir, "Docs", "Page{0}.md".format(i)), "w") as f:
+        f.write("# Page {0}\n{1}\n".format(i, text) * 200)
+
+
+def pack(root_dir, unitypackage_path, output_dir, version, incremental):
+    start = timeit.default_timer()
+    NuPkgBuilder(incremental=incremental).write_package(
+        os.path.join(root_dir, "MyProject.nuspec"), output_dir,
+        {"version": version, "unitypackagepath": unitypackage_path})
+    return timeit.default_timer() - start
+
+
+def main():
+    with temp_dir() as root_dir:
+        unitypackage_path = create_project(root_dir, 256 * 1024 * 1024, 200)
+        full_dir = os.path.join(root_dir, "Full")
+        incremental_dir = os.path.join(root_dir, "Incremental")
+        pack(root_dir, unitypackage_path, incremental_dir, "1.0.0", True)
+        for i in range(5):
+            write_doc(root_dir, i, "version 2")
+
+        full = pack(root_dir, unitypackage_path, full_dir, "1.0.1", False)
+        incremental = pack(root_dir, unitypackage_path, incremental_dir, "1.0.1", True)
+        print("re-pack ({0:.0f} MB .unitypackage, 200 docs, 5 changed):".format(
+            os.path.getsize(unitypackage_path) / (1024.0 * 1024.0)))
+        for label, elapsed, output_dir in (("full", full, full_dir), ("incremental", incremental, incremental_dir)):
+            print("    {0:12} {1:8.1f} ms, {2:6.1f} MB output".format(
+                label + ":", elapsed * 1000,
+                os.path.getsize(os.path.join(output_dir, "MyProject.1.0.1.nupkg")) / (1024.0 * 1024.0)))
+
+
+if __name__ == "__main__":
+    main()
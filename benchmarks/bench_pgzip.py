@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark for `ugetcli` package - `pgzip` module.
+Measures how parallel gzip compression of a large stream scales from 1 to 16 threads,
+compared with single-threaded gzip module.
+
+Usage: python benchmarks/bench_pgzip.py [size in MB]
+"""
+
+import os
+import sys
+import gzip
+import random
+import timeit
+
+from ugetcli.pgzip import ParallelGzipFile
+
+_CHUNK_SIZE = 64 * 1024
+
+
+def sample_data(size):
+    """ Mix of compressible text and incompressible binary blocks, similar to an art-heavy package """
+    rng = random.Random(42)
+    words = [bytes(bytearray(rng.randint(97, 122) for _ in range(rng.randint(2, 10)))) for _ in range(2000)]
+    text = bytearray()
+    while len(text) < 4 * 1024 * 1024:
+        text += rng.choice(words) + b" "
+    binary = os.urandom(4 * 1024 * 1024)
+    data = bytearray()
+    while len(data) < size:
+        data += text if len(data) // len(text) % 2 == 0 else binary
+    return bytes(data[:size])
+
+
+def compress(data, output_path, jobs):
+    with open(output_path, "wb") as f:
+        if jobs:
+            gz = ParallelGzipFile(f, jobs)
+        else:
+            gz = gzip.GzipFile(mode="wb", fileobj=f)
+        with gz:
+            for offset in range(0, len(data), _CHUNK_SIZE):
+                gz.write(data[offset:offset + _CHUNK_SIZE])
+
+
+def main():
+    size = int(sys.argv[1]) * 1024 * 1024 if len(sys.argv) > 1 else 128 * 1024 * 1024
+    data = sample_data(size)
+    output_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_pgzip.tmp")
+    print("{0} MB input, {1} CPUs".format(size // (1024 * 1024), os.cpu_count() if hasattr(os, "cpu_count") else "?"))
+    try:
+        baseline = None
+        for label, jobs in [("gzip module", 0)] + [("{0} threads".format(n), n) for n in (1, 2, 4, 8, 16)]:
+            start = timeit.default_timer()
+            compress(data, output_path, jobs)
+            elapsed = timeit.default_timer() - start
+            baseline = baseline or elapsed
+            print("{0:>12}: {1:8.1f} ms  {2:7.1f} MB/s  ratio {3:.3f}  speedup {4:.2f}x".format(
+                label, elapsed * 1000, size / elapsed / (1024 * 1024), os.path.getsize(output_path) / float(size),
+                baseline / elapsed))
+    finally:
+        if os.path.exists(output_path):
+            os.remove(output_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark for `ugetcli` package - `publish` pipeline.
+Measures startup of a uget process (paid once by uget publish instead of once per step), and publishes 8 synthetic
+projects - build and upload wait like msbuild and HTTP do, create and pack compress data with zlib - step by step,
+and through StagedPipeline, where steps of different projects overlap.
+
+Usage: python benchmarks/bench_publish.py
+"""
+
+import os
+import sys
+import time
+import zlib
+import timeit
+import subprocess
+
+from ugetcli.pipeline import StagedPipeline, Stage
+
+PROJECT_COUNT = 8
+DATA = os.urandom(1024 * 1024).hex().encode("ascii")
+
+
+def build(item):
+    time.sleep(0.05)
+    return item
+
+
+def compress(item):
+    zlib.compress(DATA, 6)
+    return item
+
+
+def upload(item):
+    time.sleep(0.08)
+    return item
+
+
+STAGES = [Stage("build", build, 1), Stage("create", compress, 1), Stage("pack", compress, 1), Stage("push", upload, 4)]
+
+
+def run_sequential(items):
+    for item in items:
+        for stage in STAGES:
+            stage.method(item)
+
+
+def measure(label, method, repeat=3):
+    elapsed = min(timeit.repeat(method, number=1, repeat=repeat))
+    print("    {0:28} {1:8.1f} ms".format(label + ":", elapsed * 1000))
+
+
+def main():
+    print("publish:")
+    measure("uget startup", lambda: subprocess.check_call([sys.executable, "-m", "ugetcli", "--version"],
+                                                          stdout=subprocess.DEVNULL))
+    items = ["Project{0}".format(i) for i in range(PROJECT_COUNT)]
+    measure("{0} projects, step by step".format(PROJECT_COUNT), lambda: run_sequential(items))
+    measure("{0} projects, pipeline".format(PROJECT_COUNT), lambda: StagedPipeline(STAGES).run(items))
+
+
+if __name__ == "__main__":
+    main()
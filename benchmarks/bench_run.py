@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark for `ugetcli` package - `solution` module scheduling.
+Runs a synthetic solution of 80 projects - a long chain of core libraries, feature projects and leaf packages with
+varied durations - where project work waits like an external msbuild process does. Compares running projects one by
+one with run_graph without duration history (every project weighs the same) and with durations of a previous run.
+
+Usage: python benchmarks/bench_run.py
+"""
+
+import time
+import random
+import timeit
+
+from ugetcli.solution import run_graph
+
+JOBS = 8
+SCALE = 0.01  # Seconds per unit of project work
+
+
+def create_graph():
+    """ Returns (graph, durations) """
+    random.seed(1)
+    graph = {}
+    durations = {}
+    chain = ["Core{0}".format(i) for i in range(8)]
+    for i, name in enumerate(chain):
+        graph[name] = chain[i - 1:i]
+        durations[name] = 4.0
+    for i in range(32):
+        name = "Feature{0}".format(i)
+        graph[name] = [chain[i % 4]]
+        durations[name] = random.choice([1.0, 2.0, 8.0])
+    for i in range(40):
+        name = "Package{0}".format(i)
+        graph[name] = ["Feature{0}".format(i % 32), chain[-1]] if i % 5 == 0 else ["Feature{0}".format(i % 32)]
+        durations[name] = random.choice([1.0, 1.0, 3.0])
+    return graph, durations
+
+
+def work(name):
+    time.sleep(create_graph()[1][name] * SCALE)
+
+
+def measure(label, method):
+    elapsed = min(timeit.repeat(method, number=1, repeat=3))
+    print("    {0:36} {1:8.1f} ms".format(label + ":", elapsed * 1000))
+
+
+def main():
+    graph, durations = create_graph()
+    total = sum(durations.values()) * SCALE
+    print("run ({0} projects, {1:.2f} s of work, {2} jobs):".format(len(graph), total, JOBS))
+    measure("one by one", lambda: run_graph(graph, work, 1))
+    measure("critical path, no history", lambda: run_graph(graph, work, JOBS))
+    measure("critical path, previous durations", lambda: run_graph(graph, work, JOBS, durations))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark for `ugetcli` package - cli startup.
+Measures wall time of importing the cli module and of running `uget --help` in a fresh interpreter.
+
+Usage: python benchmarks/bench_startup.py [repeat]
+"""
+
+import sys
+import subprocess
+import timeit
+
+_IMPORT_STATEMENT = "import ugetcli.cli"
+_HELP_STATEMENT = "import sys; sys.argv = ['uget', '--help']; from ugetcli.__main__ import main; main()"
+
+
+def measure(statement, repeat):
+    """Runs statement in a fresh interpreter `repeat` times
+    :param statement: Python statement to execute
+    :param repeat: Number of runs
+    :return: List of wall times in seconds
+    """
+    def run():
+        subprocess.call([sys.executable, "-c", statement], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return timeit.repeat(run, number=1, repeat=repeat)
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    baseline = measure("pass", repeat)
+    for name, statement in (("import ugetcli.cli", _IMPORT_STATEMENT), ("uget --help", _HELP_STATEMENT)):
+        times = measure(statement, repeat)
+        print("{0:<20} min {1:7.1f} ms   median {2:7.1f} ms   (interpreter baseline {3:.1f} ms)".format(
+            name, min(times) * 1000, sorted(times)[len(times) // 2] * 1000, min(baseline) * 1000))
+
+
+if __name__ == "__main__":
+    main()
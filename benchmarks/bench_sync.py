@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark for `ugetcli` package - `sync` module.
+Synchronizes a tree of 50k small files (a large Unity project) with the previous copy-everything approach
+and with DirectorySync: initial copy, no-op sync, sync after a few files changed, and a dry run.
+
+Usage: python benchmarks/bench_sync.py
+"""
+
+import os
+import shutil
+import timeit
+
+from ugetcli.sync import DirectorySync
+from ugetcli.utils import temp_dir
+
+FILE_COUNT = 50000
+DIRECTORY_COUNT = 500
+
+
+def create_tree(root_dir):
+    for i in range(FILE_COUNT):
+        directory = os.path.join(root_dir, "Folder{0}".format(i % 10), "Sub{0}".format(i % DIRECTORY_COUNT))
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        with open(os.path.join(directory, "Asset{0}.asset".format(i)), "wb") as f:
+            f.write(os.urandom(512 + i % 2048))
+
+
+def copy_everything(src_dir, dst_dir):
+    """ Previous behaviour of copy_replace_directory (with correct destination paths): delete and copy every file """
+    for dirpath, dirnames, filenames in os.walk(src_dir):
+        target_dir = os.path.join(dst_dir, os.path.relpath(dirpath, src_dir))
+        if not os.path.exists(target_dir):
+            os.makedirs(target_dir)
+        for filename in filenames:
+            target_file = os.path.join(target_dir, filename)
+            if os.path.exists(target_file):
+                os.remove(target_file)
+            shutil.copy(os.path.join(dirpath, filename), target_dir)
+
+
+def measure(label, method):
+    start = timeit.default_timer()
+    result = method()
+    elapsed = timeit.default_timer() - start
+    details = ""
+    if result is not None:
+        details = ", {0} actions, {1} unchanged".format(len(result.actions), result.unchanged)
+    print("    {0:28} {1:8.1f} ms{2}".format(label + ":", elapsed * 1000, details))
+
+
+def main():
+    with temp_dir() as tmp_root_dir:
+        src_dir = os.path.join(tmp_root_dir, "src")
+        create_tree(src_dir)
+        print("sync ({0} files in {1} directories):".format(FILE_COUNT, DIRECTORY_COUNT))
+
+        baseline_dir = os.path.join(tmp_root_dir, "baseline")
+        measure("copy everything (initial)", lambda: copy_everything(src_dir, baseline_dir))
+        measure("copy everything (again)", lambda: copy_everything(src_dir, baseline_dir))
+
+        dst_dir = os.path.join(tmp_root_dir, "dst")
+        for jobs in (1, 4):
+            shutil.rmtree(dst_dir, ignore_errors=True)
+            measure("sync initial, {0} jobs".format(jobs), lambda: DirectorySync(jobs).sync(src_dir, dst_dir))
+        measure("sync unchanged", lambda: DirectorySync().sync(src_dir, dst_dir))
+        for i in range(0, FILE_COUNT, FILE_COUNT // 20):
+            path = os.path.join(src_dir, "Folder{0}".format(i % 10), "Sub{0}".format(i % DIRECTORY_COUNT),
+                                "Asset{0}.asset".format(i))
+            with open(path, "ab") as f:
+                f.write(b"changed")
+        measure("sync dry run, 20 changed", lambda: DirectorySync(dry_run=True).sync(src_dir, dst_dir))
+        measure("sync 20 changed", lambda: DirectorySync().sync(src_dir, dst_dir))
+        measure("sync 20 changed, checksum", lambda: DirectorySync(checksum=True).sync(src_dir, dst_dir))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark for `ugetcli` package - `unitypackagewriter` module.
+Compares exporting .unitypackage with upackage (staging directories) and with the native streaming writer,
+over synthetic Unity projects with many small assets and with a few large ones.
+Reports wall time and peak Python heap usage.
+
+Usage: python benchmarks/bench_unitypackage.py
+"""
+
+import os
+import timeit
+import tracemalloc
+
+from ugetcli.unitypackage import UnityPackageRunner
+from ugetcli.unitypackagewriter import UnityPackageWriter
+from ugetcli.utils import temp_dir
+
+
+def create_project(package_root, file_count, file_size):
+    for i in range(file_count):
+        directory = os.path.join(package_root, "Folder{0}".format(i % 20))
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        with open(os.path.join(directory, "Asset{0}.bytes".format(i)), "wb") as f:
+            for offset in range(0, file_size, 1024 * 1024):
+                f.write(os.urandom(min(file_size - offset, 1024 * 1024)))
+
+
+def measure(exporter, package_root, output_path):
+    """ Times the export, then repeats it with tracemalloc to measure peak heap usage """
+    start = timeit.default_timer()
+    exporter.export_unitypackage(package_root, output_path)
+    elapsed = timeit.default_timer() - start
+
+    tracemalloc.start()
+    try:
+        exporter.export_unitypackage(package_root, output_path)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return elapsed, peak
+
+
+def bench(name, file_count, file_size):
+    with temp_dir() as tmp_root_dir:
+        package_root = os.path.join(tmp_root_dir, "Assets", "MyProject")
+        create_project(package_root, file_count, file_size)
+        total_size = file_count * file_size / (1024.0 * 1024.0)
+
+        results = []
+        for label, exporter in (("upackage", UnityPackageRunner()), ("native", UnityPackageWriter())):
+            output_path = os.path.join(tmp_root_dir, label + ".unitypackage")
+            try:
+                elapsed, peak = measure(exporter, package_root, output_path)
+            except Exception as e:  # upackage is an optional engine, report and carry on
+                results.append("{0}: unavailable ({1})".format(label, type(e).__name__))
+                continue
+            results.append("{0}: {1:8.1f} ms, peak heap {2:6.1f} MB, {3:6.1f} MB output".format(
+                label, elapsed * 1000, peak / (1024.0 * 1024.0),
+                os.path.getsize(output_path) / (1024.0 * 1024.0)))
+
+        print("{0} ({1} files, {2:.0f} MB):".format(name, file_count, total_size))
+        for result in results:
+            print("    " + result)
+
+
+def main():
+    bench("many small assets", 2000, 4 * 1024)
+    bench("few large assets", 2, 64 * 1024 * 1024)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+# -*- coding: utf-8 -*-
+
+"""Shared pytest configuration for `ugetcli` tests."""
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(tmpdir, monkeypatch):
+    """Keeps uget caches of every test in a temporary directory, away from the user cache"""
+    cache_dir = tmpdir.mkdir("uget_cache")
+    monkeypatch.setenv("UGET_CACHE_DIR", str(cache_dir))
+    return str(cache_dir)
@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Local stand-in NuGet feed used by tests.
+Implements V2 push endpoint and V3 service index, package publish, flat container and registration resources.
+Packages are kept in memory; every request and connection is recorded so tests can assert on protocol behaviour.
+"""
+import io
+import re
+import json
+import zipfile
+import threading
+import xml.etree.ElementTree as ET
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from socketserver import ThreadingMixIn
+
+
+class FeedServer(ThreadingMixIn, HTTPServer):
+    """
+    In-memory NuGet feed. Use as a context manager:
+
+        with FeedServer() as server:
+            server.v3_url  # http://127.0.0.1:<port>/v3/index.json
+    """
+    daemon_threads = True
+
+    def __init__(self, api_key=None, flat_container=True):
+        HTTPServer.__init__(self, ("127.0.0.1", 0), _FeedRequestHandler)
+        self.api_key = api_key
+        self.flat_container = flat_container
+        self.packages = {}  # (lowercase id, lowercase version) -> package bytes
+        self.requests = []  # (method, path)
+        self.connections = 0
+        self.fail_next = []  # Status codes returned (and consumed) before handling the next push
+        self.lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self):
+        return "http://127.0.0.1:{0}".format(self.server_address[1])
+
+    @property
+    def v2_url(self):
+        return self.url + "/api/v2/"
+
+    @property
+    def v3_url(self):
+        return self.url + "/v3/index.json"
+
+    def add_package(self, package_id, version, data=b""):
+        with self.lock:
+            self.packages[(package_id.lower(), version.lower())] = data
+
+    def get_service_index(self):
+        resources = [
+            {"@id": self.url + "/api/v2/package", "@type": "PackagePublish/2.0.0"},
+            {"@id": self.url + "/v3/registration/", "@type": "RegistrationsBaseUrl/3.6.0"},
+        ]
+        if self.flat_container:
+            resources.append({"@id": self.url + "/v3/flatcontainer/", "@type": "PackageBaseAddress/3.0.0"})
+        return {"version": "3.0.0", "resources": resources}
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever, kwargs={"poll_interval": 0.05})
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown()
+        self.server_close()
+        self._thread.join()
+
+
+class _FeedRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        BaseHTTPRequestHandler.setup(self)
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._record()
+        path = self.path.split("?")[0]
+        if path == "/v3/index.json":
+            return self._send_json(200, self.server.get_service_index())
+
+        match = re.match(r"^/v3/flatcontainer/([^/]+)/index.json$", path)
+        if match:
+            versions = self._get_versions(match.group(1))
+            return self._send_json(200, {"versions": versions}) if versions else self._send(404)
+
+        match = re.match(r"^/v3/registration/([^/]+)/([^/]+).json$", path)
+        if match:
+            package_key = (match.group(1).lower(), match.group(2).lower())
+            if package_key not in self.server.packages:
+                return self._send(404)
+            return self._send_json(200, {"listed": True, "catalogEntry": {"version": package_key[1]}})
+
+        match = re.match(r"^/api/v2/Packages\(Id='([^']+)',Version='([^']+)'\)$", path)
+        if match:
+            package_key = (match.group(1).lower(), match.group(2).lower())
+            return self._send(200 if package_key in self.server.packages else 404)
+        return self._send(404)
+
+    def do_PUT(self):
+        self._record()
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        with self.server.lock:
+            if self.server.fail_next:
+                return self._send(self.server.fail_next.pop(0))
+        if self.server.api_key and self.headers.get("X-NuGet-ApiKey") != self.server.api_key:
+            return self._send(403)
+
+        package = _parse_multipart(self.headers.get("Content-Type", ""), body)
+        if package is None:
+            return self._send(400)
+        try:
+            package_id, version = _read_package_identity(package)
+        except (zipfile.BadZipfile, KeyError, ET.ParseError):
+            return self._send(400)
+
+        with self.server.lock:
+            package_key = (package_id.lower(), version.lower())
+            if package_key in self.server.packages:
+                return self._send(409)
+            self.server.packages[package_key] = package
+        return self._send(201)
+
+    def _record(self):
+        with self.server.lock:
+            self.server.requests.append((self.command, self.path))
+
+    def _get_versions(self, package_id):
+        with self.server.lock:
+            return sorted(version for key, version in self.server.packages if key == package_id.lower())
+
+    def _send_json(self, status, data):
+        self._send(status, json.dumps(data).encode("utf-8"), "application/json")
+
+    def _send(self, status, body=b"", content_type="text/plain"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def _parse_multipart(content_type, body):
+    """ Returns content of the first part of multipart/form-data body """
+    match = re.search(r"boundary=([^;]+)", content_type)
+    if not match:
+        return None
+    delimiter = b"--" + match.group(1).strip('"').encode("utf-8")
+    parts = body.split(delimiter)
+    if len(parts) < 3:
+        return None
+    headers, separator, content = parts[1].partition(b"\r\n\r\n")
+    if not separator:
+        return None
+    return content[:-2] if content.endswith(b"\r\n") else content
+
+
+def _read_package_identity(package):
+    """ Reads package id and version from the .nuspec inside the package """
+    with zipfile.ZipFile(io.BytesIO(package)) as archive:
+        nuspec_name = next(name for name in archive.namelist() if name.endswith(".nuspec") and "/" not in name)
+        root = ET.fromstring(archive.read(nuspec_name))
+    values = {}
+    for element in root.iter():
+        name = element.tag.split("}")[-1]
+        if name in ("id", "version") and name not in values:
+            values[name] = element.text
+    return values["id"], values["version"]
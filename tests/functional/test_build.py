@@ -17,13 +17,14 @@ from ugetcli import cli
 class TestUGetCliBuild(unittest.TestCase):
     """Functional Tests for `ugetcli` package - build command."""
 
-    @patch('ugetcli.uget.MsBuildRunner')
-    @patch('ugetcli.uget.CsProj.get_csproj_at_path')
+    @patch('ugetcli.msbuild.MsBuildRunner')
+    @patch('ugetcli.csproj.CsProj.get_csproj_at_path')
     def test_cli_uget_build(
         self, csproj_get_csproj_at_path_mock, msbuild_runner_mock):
         """Test cli: uget build with path containing valid csproj"""
         csproj_get_csproj_at_path_mock.return_value = 'TestProject.csproj'
         msbuild_runner_instance = MagicMock()
+        msbuild_runner_instance.build.return_value = 0
         msbuild_runner_instance.valid_msbuild_executable.return_value = True
         msbuild_runner_mock.return_value = msbuild_runner_instance
         msbuild_runner_mock.locate_msbuild.return_value = 'msbuild'
@@ -35,13 +36,31 @@ class TestUGetCliBuild(unittest.TestCase):
         msbuild_runner_mock.assert_called_with('msbuild', False)
         msbuild_runner_instance.build.assert_called_with('TestProject.csproj', 'Release', False)
 
-    @patch('ugetcli.uget.MsBuildRunner')
-    @patch('ugetcli.uget.CsProj.get_csproj_at_path')
+    @patch('ugetcli.msbuild.MsBuildRunner')
+    @patch('ugetcli.csproj.CsProj.get_csproj_at_path')
+    def test_cli_uget_build_failed(
+        self, csproj_get_csproj_at_path_mock, msbuild_runner_mock):
+        """Test cli: uget build - exits with non-zero code when msbuild fails"""
+        csproj_get_csproj_at_path_mock.return_value = 'TestProject.csproj'
+        msbuild_runner_instance = MagicMock()
+        msbuild_runner_instance.build.return_value = 1
+        msbuild_runner_instance.valid_msbuild_executable.return_value = True
+        msbuild_runner_mock.return_value = msbuild_runner_instance
+        msbuild_runner_mock.locate_msbuild.return_value = 'msbuild'
+
+        runner = CliRunner()
+        result = runner.invoke(cli.ugetcli, ['build'], obj={})
+
+        assert result.exit_code == 1, result
+
+    @patch('ugetcli.msbuild.MsBuildRunner')
+    @patch('ugetcli.csproj.CsProj.get_csproj_at_path')
     def test_cli_uget_build_with_path_directory(
         self, csproj_get_csproj_at_path_mock, msbuild_runner_mock):
         """Test cli: uget build with path being a directory containing valid csproj"""
         csproj_get_csproj_at_path_mock.return_value = 'TestProject.csproj'
         msbuild_runner_instance = MagicMock()
+        msbuild_runner_instance.build.return_value = 0
         msbuild_runner_instance.valid_msbuild_executable.return_value = True
         msbuild_runner_mock.return_value = msbuild_runner_instance
 
@@ -54,13 +73,14 @@ class TestUGetCliBuild(unittest.TestCase):
         msbuild_runner_mock.assert_called_with('custom_msbuild_exe', False)
         msbuild_runner_instance.build.assert_called_with('TestProject.csproj', 'Release', False)
 
-    @patch('ugetcli.uget.MsBuildRunner')
-    @patch('ugetcli.uget.CsProj.get_csproj_at_path')
+    @patch('ugetcli.msbuild.MsBuildRunner')
+    @patch('ugetcli.csproj.CsProj.get_csproj_at_path')
     def test_cli_uget_build_with_configuration(
         self, csproj_get_csproj_at_path_mock, msbuild_runner_mock):
         """Test cli: uget build with --configuration"""
         csproj_get_csproj_at_path_mock.return_value = 'TestProject.csproj'
         msbuild_runner_instance = MagicMock()
+        msbuild_runner_instance.build.return_value = 0
         msbuild_runner_instance.valid_msbuild_executable.return_value = True
         msbuild_runner_mock.return_value = msbuild_runner_instance
 
@@ -71,13 +91,14 @@ class TestUGetCliBuild(unittest.TestCase):
         msbuild_runner_mock.assert_called_with('custom_msbuild_exe', False)
         msbuild_runner_instance.build.assert_called_with('TestProject.csproj', 'Debug', False)
 
-    @patch('ugetcli.uget.MsBuildRunner')
-    @patch('ugetcli.uget.CsProj.get_csproj_at_path')
+    @patch('ugetcli.msbuild.MsBuildRunner')
+    @patch('ugetcli.csproj.CsProj.get_csproj_at_path')
     def test_cli_uget_build_with_msbuild_executable(
         self, csproj_get_csproj_at_path_mock, msbuild_runner_mock):
         """Test cli: uget build with --msbuild-path"""
         csproj_get_csproj_at_path_mock.return_value = 'TestProject.csproj'
         msbuild_runner_instance = MagicMock()
+        msbuild_runner_instance.build.return_value = 0
         msbuild_runner_instance.valid_msbuild_executable.return_value = True
         msbuild_runner_mock.return_value = msbuild_runner_instance
 
@@ -88,13 +109,14 @@ class TestUGetCliBuild(unittest.TestCase):
         msbuild_runner_mock.assert_called_with('custom_msbuild_exe', False)
         msbuild_runner_instance.build.assert_called_with('TestProject.csproj', 'Release', False)
 
-    @patch('ugetcli.uget.MsBuildRunner')
-    @patch('ugetcli.uget.CsProj.get_csproj_at_path')
+    @patch('ugetcli.msbuild.MsBuildRunner')
+    @patch('ugetcli.csproj.CsProj.get_csproj_at_path')
     def test_cli_uget_build_with_custom_msbuild_env(
         self, csproj_get_csproj_at_path_mock, msbuild_runner_mock):
         """Test cli: uget build with MSBUILD_PATH in env"""
         csproj_get_csproj_at_path_mock.return_value = 'TestProject.csproj'
         msbuild_runner_instance = MagicMock()
+        msbuild_runner_instance.build.return_value = 0
         msbuild_runner_instance.valid_msbuild_executable.return_value = True
         msbuild_runner_mock.return_value = msbuild_runner_instance
 
@@ -105,13 +127,14 @@ class TestUGetCliBuild(unittest.TestCase):
         msbuild_runner_mock.assert_called_with('custom_msbuild_exe', False)
         msbuild_runner_instance.build.assert_called_with('TestProject.csproj', 'Release', False)
 
-    @patch('ugetcli.uget.MsBuildRunner')
-    @patch('ugetcli.uget.CsProj.get_csproj_at_path')
+    @patch('ugetcli.msbuild.MsBuildRunner')
+    @patch('ugetcli.csproj.CsProj.get_csproj_at_path')
     def test_cli_uget_build_with_rebuild(
         self, csproj_get_csproj_at_path_mock, msbuild_runner_mock):
         """Test cli: uget build with --rebuild"""
         csproj_get_csproj_at_path_mock.return_value = 'TestProject.csproj'
         msbuild_runner_instance = MagicMock()
+        msbuild_runner_instance.build.return_value = 0
         msbuild_runner_instance.valid_msbuild_executable.return_value = True
         msbuild_runner_mock.return_value = msbuild_runner_instance
 
@@ -122,13 +145,14 @@ class TestUGetCliBuild(unittest.TestCase):
         msbuild_runner_mock.assert_called_with('custom_msbuild_exe', False)
         msbuild_runner_instance.build.assert_called_with('TestProject.csproj', 'Release', True)
 
-    @patch('ugetcli.uget.MsBuildRunner')
-    @patch('ugetcli.uget.CsProj.get_csproj_at_path')
+    @patch('ugetcli.msbuild.MsBuildRunner')
+    @patch('ugetcli.csproj.CsProj.get_csproj_at_path')
     def test_cli_uget_build_with_config_json(
         self, csproj_get_csproj_at_path_mock, msbuild_runner_mock):
         """Test cli: uget build with options loaded via config json"""
         csproj_get_csproj_at_path_mock.return_value = 'TestProject.csproj'
         msbuild_runner_instance = MagicMock()
+        msbuild_runner_instance.build.return_value = 0
         msbuild_runner_instance.valid_msbuild_executable.return_value = True
         msbuild_runner_mock.return_value = msbuild_runner_instance
 
@@ -146,13 +170,14 @@ class TestUGetCliBuild(unittest.TestCase):
         msbuild_runner_mock.assert_called_with('msbuild_custom_exe', False)
         msbuild_runner_instance.build.assert_called_with('TestProject.csproj', 'Debug', True)
 
-    @patch('ugetcli.uget.MsBuildRunner')
-    @patch('ugetcli.uget.CsProj.get_csproj_at_path')
+    @patch('ugetcli.msbuild.MsBuildRunner')
+    @patch('ugetcli.csproj.CsProj.get_csproj_at_path')
     def test_cli_uget_build_with_config_file(
         self, csproj_get_csproj_at_path_mock, msbuild_runner_mock):
         """Test cli: uget build with options loaded via config file"""
         csproj_get_csproj_at_path_mock.return_value = 'TestProject.csproj'
         msbuild_runner_instance = MagicMock()
+        msbuild_runner_instance.build.return_value = 0
         msbuild_runner_instance.valid_msbuild_executable.return_value = True
         msbuild_runner_mock.return_value = msbuild_runner_instance
 
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Functional tests for `ugetcli` package - `cache` command.
+Tests functionality of the cli cache stats and cache prune commands.
+"""
+
+import os
+import unittest
+from click.testing import CliRunner
+
+from ugetcli import cli
+from ugetcli.buildcache import BuildCache
+from ugetcli.utils import temp_dir
+
+
+class TestUGetCliCache(unittest.TestCase):
+    """Functional Tests for `ugetcli` package - `cache` command."""
+
+    def _put_artifact(self, key, size):
+        with temp_dir() as tmp_root_dir:
+            artifact_path = os.path.join(tmp_root_dir, "MyProject.unitypackage")
+            with open(artifact_path, "wb") as f:
+                f.write(b"x" * size)
+            BuildCache().put(key, artifact_path)
+
+    def test_cli_uget_cache_stats(self):
+        """Test cli: uget cache stats"""
+        self._put_artifact("aa" * 32, 2048)
+        runner = CliRunner()
+        result = runner.invoke(cli.ugetcli, ['cache', 'stats'], obj={})
+        assert result.exit_code == 0, result
+        assert 'entries: 1' in result.output
+        assert 'size: 2.0 KB' in result.output
+        assert 'hits: 0, remote hits: 0, misses: 0' in result.output
+
+    def test_cli_uget_cache_prune(self):
+        """Test cli: uget cache prune --max-size"""
+        self._put_artifact("aa" * 32, 2048)
+        self._put_artifact("bb" * 32, 2048)
+        runner = CliRunner()
+        result = runner.invoke(cli.ugetcli, ['cache', 'prune', '--max-size', '3K'], obj={})
+        assert result.exit_code == 0, result
+        assert 'Removed 1 cache entries (2.0 KB)' in result.output
+        assert BuildCache().stats()["entries"] == 1
+
+        result = runner.invoke(cli.ugetcli, ['cache', 'prune'], obj={})
+        assert result.exit_code == 0, result
+        assert BuildCache().stats()["entries"] == 0
+
+    def test_cli_uget_cache_prune_invalid_size(self):
+        """Test cli: uget cache prune with invalid --max-size"""
+        runner = CliRunner()
+        result = runner.invoke(cli.ugetcli, ['cache', 'prune', '--max-size', 'lots'], obj={})
+        assert result.exit_code != 0
+        assert 'Invalid size' in result.output
@@ -19,8 +19,8 @@ from ugetcli.utils import create_empty_file
 class TestUGetCliCreate(unittest.TestCase):
     """Functional Tests for `ugetcli` package - `create` command."""
 
-    @patch('ugetcli.uget.CsProj')
-    @patch('ugetcli.uget.UnityPackageRunner')
+    @patch('ugetcli.csproj.CsProj')
+    @patch('ugetcli.unitypackage.UnityPackageRunner')
     def test_cli_uget_create(
         self, unitypackage_runner_mock, csproj_mock):
         """Test cli: uget create with default options"""
@@ -59,8 +59,8 @@ class TestUGetCliCreate(unittest.TestCase):
         unitypackage_runner_mock.assert_called_with(False)
         assert invocation_results[0], "did not invoke export_unitypackage_mock"
 
-    @patch('ugetcli.uget.CsProj')
-    @patch('ugetcli.uget.UnityPackageRunner')
+    @patch('ugetcli.csproj.CsProj')
+    @patch('ugetcli.unitypackage.UnityPackageRunner')
     def test_cli_uget_create_with_path_directory(
         self, unitypackage_runner_mock, csproj_mock):
         """Test cli: uget create with --path option when path is a directory"""
@@ -99,8 +99,8 @@ class TestUGetCliCreate(unittest.TestCase):
         csproj_mock.assert_called_with('custom/')
         assert invocation_results[0], "did not invoke export_unitypackage_mock"
 
-    @patch('ugetcli.uget.CsProj')
-    @patch('ugetcli.uget.UnityPackageRunner')
+    @patch('ugetcli.csproj.CsProj')
+    @patch('ugetcli.unitypackage.UnityPackageRunner')
     def test_cli_uget_create_with_path_file(
         self, unitypackage_runner_mock, csproj_mock):
         """Test cli: uget create with --path option when path is a .csproj file"""
@@ -139,8 +139,8 @@ class TestUGetCliCreate(unittest.TestCase):
         csproj_mock.assert_called_with('custom/MyProject.csproj')
         assert invocation_results[0], "did not invoke export_unitypackage_mock"
 
-    @patch('ugetcli.uget.CsProj')
-    @patch('ugetcli.uget.UnityPackageRunner')
+    @patch('ugetcli.csproj.CsProj')
+    @patch('ugetcli.unitypackage.UnityPackageRunner')
     def test_cli_uget_create_with_output_dir(
         self, unitypackage_runner_mock, csproj_mock):
         """Test cli: uget create with --output-dir option"""
@@ -178,8 +178,8 @@ class TestUGetCliCreate(unittest.TestCase):
         unitypackage_runner_mock.assert_called_with(False)
         assert invocation_results[0], "did not invoke export_unitypackage_mock"
 
-    @patch('ugetcli.uget.CsProj')
-    @patch('ugetcli.uget.UnityPackageRunner')
+    @patch('ugetcli.csproj.CsProj')
+    @patch('ugetcli.unitypackage.UnityPackageRunner')
     def test_cli_uget_create_with_configuration(
         self, unitypackage_runner_mock, csproj_mock):
         """Test cli: uget create with --configuration option"""
@@ -218,8 +218,8 @@ class TestUGetCliCreate(unittest.TestCase):
         unitypackage_runner_mock.assert_called_with(False)
         assert invocation_results[0], "did not invoke export_unitypackage_mock"
 
-    @patch('ugetcli.uget.CsProj')
-    @patch('ugetcli.uget.UnityPackageRunner')
+    @patch('ugetcli.csproj.CsProj')
+    @patch('ugetcli.unitypackage.UnityPackageRunner')
     def test_cli_uget_create_with_unity_project_path(
         self, unitypackage_runner_mock, csproj_mock):
         """Test cli: uget create with --unity-project-path"""
@@ -258,8 +258,8 @@ class TestUGetCliCreate(unittest.TestCase):
         unitypackage_runner_mock.assert_called_with(False)
         assert invocation_results[0], "did not invoke export_unitypackage_mock"
 
-    @patch('ugetcli.uget.CsProj')
-    @patch('ugetcli.uget.UnityPackageRunner')
+    @patch('ugetcli.csproj.CsProj')
+    @patch('ugetcli.unitypackage.UnityPackageRunner')
     def test_cli_uget_create_with_root_directory(
         self, unitypackage_runner_mock, csproj_mock):
         """Test cli: uget create with --root-dir"""
@@ -298,8 +298,8 @@ class TestUGetCliCreate(unittest.TestCase):
         unitypackage_runner_mock.assert_called_with(False)
         assert invocation_results[0], "did not invoke export_unitypackage_mock"
 
-    @patch('ugetcli.uget.CsProj')
-    @patch('ugetcli.uget.UnityPackageRunner')
+    @patch('ugetcli.csproj.CsProj')
+    @patch('ugetcli.unitypackage.UnityPackageRunner')
     def test_cli_uget_create_with_clean(
         self, unitypackage_runner_mock, csproj_mock):
         """Test cli: uget create with --clean"""
@@ -346,8 +346,8 @@ class TestUGetCliCreate(unittest.TestCase):
         unitypackage_runner_mock.assert_called_with(False)
         assert invocation_results[0], "did not invoke export_unitypackage_mock"
 
-    @patch('ugetcli.uget.CsProj')
-    @patch('ugetcli.uget.UnityPackageRunner')
+    @patch('ugetcli.csproj.CsProj')
+    @patch('ugetcli.unitypackage.UnityPackageRunner')
     def test_cli_uget_create_with_unity_username(
         self, unitypackage_runner_mock, csproj_mock):
         """Test cli: uget create with --unity-username"""
@@ -386,8 +386,8 @@ class TestUGetCliCreate(unittest.TestCase):
         unitypackage_runner_mock.assert_called_with(False)
         assert invocation_results[0], "did not invoke export_unitypackage_mock"
 
-    @patch('ugetcli.uget.CsProj')
-    @patch('ugetcli.uget.UnityPackageRunner')
+    @patch('ugetcli.csproj.CsProj')
+    @patch('ugetcli.unitypackage.UnityPackageRunner')
     def test_cli_uget_create_with_config_json(
         self, unitypackage_runner_mock, csproj_mock):
         """Test cli: uget create with options loaded via config json"""
@@ -438,3 +438,229 @@ class TestUGetCliCreate(unittest.TestCase):
         assert result.exit_code == 0, result
         unitypackage_runner_mock.assert_called_with(False)
         assert invocation_results[0], "did not invoke export_unitypackage_mock"
+
+    @patch('ugetcli.csproj.CsProj')
+    @patch('ugetcli.unitypackage.UnityPackageRunner')
+    @patch('ugetcli.unitypackagewriter.UnityPackageWriter')
+    def test_cli_uget_create_with_native_engine(
+        self, unitypackage_writer_mock, unitypackage_runner_mock, csproj_mock):
+        """Test cli: uget create --engine native"""
+
+        def export_unitypackage_mock(*args, **kwargs):
+            assert os.path.normpath('UnityProject/Assets/TestProject') in args[0]
+            assert os.path.normpath('Output/TestProject_1.0.0_Release.unitypackage') in args[1]
+            create_empty_file(args[1])
+            return 0
+
+        unitypackage_writer_instance = MagicMock()
+        unitypackage_writer_instance.export_unitypackage.side_effect = export_unitypackage_mock
+        unitypackage_writer_mock.return_value = unitypackage_writer_instance
+
+        csproj_instance = MagicMock()
+        csproj_instance.get_assembly_name.return_value = "TestProject"
+        csproj_instance.get_assembly_version.return_value = "1.0.0"
+        csproj_instance.get_output_path.return_value = "bin/Output/Debug"
+        csproj_instance.path = "TestProject.csproj"
+        csproj_mock.return_value = csproj_instance
+        csproj_mock.get_csproj_at_path.return_value = "TestProject.csproj"
+
+        runner = CliRunner(env={})
+        with runner.isolated_filesystem():
+            os.makedirs("bin/Output/Debug")
+            create_empty_file("bin/Output/Debug/TestProject.dll")
+            create_empty_file("bin/Output/Debug/TestProject.pdb")
+            result = runner.invoke(cli.ugetcli, ['create', '--engine', 'native'], obj={})
+
+        assert result.exit_code == 0, result
+        unitypackage_writer_mock.assert_called_with(False, 1, "default", False, True)
+        unitypackage_runner_mock.assert_not_called()
+        assert unitypackage_writer_instance.export_unitypackage.called
+
+    @patch('ugetcli.csproj.CsProj')
+    @patch('ugetcli.unitypackagewriter.UnityPackageWriter')
+    def test_cli_uget_create_restores_from_cache(
+        self, unitypackage_writer_mock, csproj_mock):
+        """Test cli: uget create restores .unitypackage from the build cache when nothing changed"""
+
+        def export_unitypackage_mock(*args, **kwargs):
+            with open(args[1], "w") as f:
+                f.write("package")
+            return 0
+
+        unitypackage_writer_instance = MagicMock()
+        unitypackage_writer_instance.export_unitypackage.side_effect = export_unitypackage_mock
+        unitypackage_writer_mock.return_value = unitypackage_writer_instance
+
+        csproj_instance = MagicMock()
+        csproj_instance.get_assembly_name.return_value = "TestProject"
+        csproj_instance.get_assembly_version.return_value = "1.0.0"
+        csproj_instance.get_output_path.return_value = "bin/Output/Debug"
+        csproj_instance.path = "TestProject.csproj"
+        csproj_mock.return_value = csproj_instance
+        csproj_mock.get_csproj_at_path.return_value = "TestProject.csproj"
+
+        runner = CliRunner(env={})
+        with runner.isolated_filesystem():
+            os.makedirs("bin/Output/Debug")
+            create_empty_file("bin/Output/Debug/TestProject.dll")
+            create_empty_file("bin/Output/Debug/TestProject.pdb")
+            result = runner.invoke(cli.ugetcli, ['create', '--engine', 'native'], obj={})
+            assert result.exit_code == 0, result
+            os.remove("Output/TestProject_1.0.0_Release.unitypackage")
+
+            result = runner.invoke(cli.ugetcli, ['create', '--engine', 'native'], obj={})
+            assert result.exit_code == 0, result
+            assert 'Restored Unitypackage from cache' in result.output
+            with open("Output/TestProject_1.0.0_Release.unitypackage") as f:
+                assert f.read() == "package"
+            assert unitypackage_writer_instance.export_unitypackage.call_count == 1
+
+            # Changed assembly invalidates cached package
+            with open("bin/Output/Debug/TestProject.dll", "w") as f:
+                f.write("assembly")
+            result = runner.invoke(cli.ugetcli, ['create', '--engine', 'native'], obj={})
+            assert result.exit_code == 0, result
+            assert unitypackage_writer_instance.export_unitypackage.call_count == 2
+
+            result = runner.invoke(cli.ugetcli, ['create', '--engine', 'native', '--no-cache'], obj={})
+            assert result.exit_code == 0, result
+            assert unitypackage_writer_instance.export_unitypackage.call_count == 3
+
+    @patch('ugetcli.csproj.CsProj')
+    @patch('ugetcli.unitypackagewriter.UnityPackageWriter')
+    def test_cli_uget_create_prefetches_before_copying_assembly(
+        self, unitypackage_writer_mock, csproj_mock):
+        """Test cli: uget create starts cache download before the assembly is copied into the Unity project"""
+        calls = []
+
+        def export_unitypackage_mock(*args, **kwargs):
+            with open(args[1], "w") as f:
+                f.write("package")
+            return 0
+
+        unitypackage_writer_instance = MagicMock()
+        unitypackage_writer_instance.export_unitypackage.side_effect = export_unitypackage_mock
+        unitypackage_writer_mock.return_value = unitypackage_writer_instance
+
+        csproj_instance = MagicMock()
+        csproj_instance.get_assembly_name.return_value = "TestProject"
+        csproj_instance.get_assembly_version.return_value = "1.0.0"
+        csproj_instance.get_output_path.return_value = "bin/Output/Debug"
+        csproj_instance.path = "TestProject.csproj"
+        csproj_mock.return_value = csproj_instance
+        csproj_mock.get_csproj_at_path.return_value = "TestProject.csproj"
+
+        runner = CliRunner(env={})
+        with runner.isolated_filesystem():
+            os.makedirs("bin/Output/Debug")
+            create_empty_file("bin/Output/Debug/TestProject.dll")
+            create_empty_file("bin/Output/Debug/TestProject.pdb")
+            with patch('ugetcli.buildcache.BuildCache.prefetch', side_effect=lambda key: calls.append("prefetch")), \
+                    patch('ugetcli.uget.UGetCli._copy_file_if_changed', side_effect=lambda *args: calls.append("copy")):
+                result = runner.invoke(cli.ugetcli, ['create', '--engine', 'native'], obj={})
+
+        assert result.exit_code == 0, result
+        assert calls == ["prefetch", "copy", "copy"]
+
+    @patch('ugetcli.csproj.CsProj')
+    @patch('ugetcli.unitypackagewriter.UnityPackageWriter')
+    def test_cli_uget_create_without_cache_keeps_cache_entry(
+        self, unitypackage_writer_mock, csproj_mock):
+        """Test cli: uget create --no-cache does not modify cached .unitypackage the output is linked to"""
+        contents = ["package", "rebuilt package"]
+
+        def export_unitypackage_mock(*args, **kwargs):
+            with open(args[1], "w") as f:
+                f.write(contents.pop(0))  # Written in place, like Unity does
+            return 0
+
+        unitypackage_writer_instance = MagicMock()
+        unitypackage_writer_instance.export_unitypackage.side_effect = export_unitypackage_mock
+        unitypackage_writer_mock.return_value = unitypackage_writer_instance
+
+        csproj_instance = MagicMock()
+        csproj_instance.get_assembly_name.return_value = "TestProject"
+        csproj_instance.get_assembly_version.return_value = "1.0.0"
+        csproj_instance.get_output_path.return_value = "bin/Output/Debug"
+        csproj_instance.path = "TestProject.csproj"
+        csproj_mock.return_value = csproj_instance
+        csproj_mock.get_csproj_at_path.return_value = "TestProject.csproj"
+
+        runner = CliRunner(env={})
+        with runner.isolated_filesystem():
+            os.makedirs("bin/Output/Debug")
+            create_empty_file("bin/Output/Debug/TestProject.dll")
+            create_empty_file("bin/Output/Debug/TestProject.pdb")
+            result = runner.invoke(cli.ugetcli, ['create', '--engine', 'native'], obj={})
+            assert result.exit_code == 0, result
+
+            result = runner.invoke(cli.ugetcli, ['create', '--engine', 'native', '--no-cache'], obj={})
+            assert result.exit_code == 0, result
+            with open("Output/TestProject_1.0.0_Release.unitypackage") as f:
+                assert f.read() == "rebuilt package"
+
+            os.remove("Output/TestProject_1.0.0_Release.unitypackage")
+            result = runner.invoke(cli.ugetcli, ['create', '--engine', 'native'], obj={})
+            assert result.exit_code == 0, result
+            assert 'Restored Unitypackage from cache' in result.output
+            with open("Output/TestProject_1.0.0_Release.unitypackage") as f:
+                assert f.read() == "package"
+
+    @patch('ugetcli.csproj.CsProj')
+    def test_cli_uget_create_with_overlay(self, csproj_mock):
+        """Test cli: uget create --engine native --overlay does not write into Unity project"""
+        csproj_instance = MagicMock()
+        csproj_instance.get_assembly_name.return_value = "TestProject"
+        csproj_instance.get_assembly_version.return_value = "1.0.0"
+        csproj_instance.get_output_path.return_value = "bin/Output/Debug"
+        csproj_instance.path = "TestProject.csproj"
+        csproj_mock.return_value = csproj_instance
+        csproj_mock.get_csproj_at_path.return_value = "TestProject.csproj"
+
+        runner = CliRunner(env={})
+        with runner.isolated_filesystem():
+            os.makedirs("bin/Output/Debug")
+            create_empty_file("bin/Output/Debug/TestProject.dll")
+            create_empty_file("bin/Output/Debug/TestProject.pdb")
+            result = runner.invoke(cli.ugetcli, ['create', '--engine', 'native', '--overlay',
+                                                 '--assembly-relative-dir', 'Plugins'], obj={})
+            assert result.exit_code == 0, result
+            assert os.path.isfile("Output/TestProject_1.0.0_Release.unitypackage")
+            assert not os.path.exists("UnityProject")
+
+            result = runner.invoke(cli.ugetcli, ['create', '--overlay'], obj={})
+            assert result.exit_code != 0
+            assert 'only supported by native engine' in result.output
+
+    @patch('ugetcli.csproj.CsProj')
+    def test_cli_uget_create_incremental(self, csproj_mock):
+        """Test cli: uget create --engine native --incremental reuses compressed members of unchanged assets"""
+        csproj_instance = MagicMock()
+        csproj_instance.get_assembly_name.return_value = "TestProject"
+        csproj_instance.get_assembly_version.return_value = "1.0.0"
+        csproj_instance.get_output_path.return_value = "bin/Output/Debug"
+        csproj_instance.path = "TestProject.csproj"
+        csproj_mock.return_value = csproj_instance
+        csproj_mock.get_csproj_at_path.return_value = "TestProject.csproj"
+
+        runner = CliRunner(env={})
+        with runner.isolated_filesystem():
+            os.makedirs("bin/Output/Debug")
+            create_empty_file("bin/Output/Debug/TestProject.dll")
+            create_empty_file("bin/Output/Debug/TestProject.pdb")
+            result = runner.invoke(cli.ugetcli, ['create', '--engine', 'native', '--incremental'], obj={})
+            assert result.exit_code == 0, result
+
+            with open("bin/Output/Debug/TestProject.dll", "w") as f:
+                f.write("assembly")
+            result = runner.invoke(cli.ugetcli, ['create', '--engine', 'native', '--incremental'], obj={})
+            assert result.exit_code == 0, result
+            assert os.path.isfile("Output/TestProject_1.0.0_Release.unitypackage")
+
+            result = runner.invoke(cli.ugetcli, ['cache', 'stats'], obj={})
+            assert 'incremental members: 4' in result.output
+            assert 'hits: 2, misses: 4' in result.output  # Root directory and pdb are reused
+
+            result = runner.invoke(cli.ugetcli, ['create', '--incremental'], obj={})
+            assert result.exit_code != 0
+            assert 'only supported by native engine' in result.output
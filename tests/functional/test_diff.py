@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Functional tests for `ugetcli` package - `diff` command.
+Tests functionality of the cli diff command with various options.
+"""
+
+import os
+import json
+import shutil
+import unittest
+from click.testing import CliRunner
+from mock import MagicMock, patch
+
+from ugetcli import cli
+from ugetcli.unitypackagewriter import UnityPackageWriter
+from tests.helpers import write_file
+
+_META = """fileFormatVersion: 2
+guid: 0123456789abcdef0123456789abcdef
+"""
+
+
+def create_unitypackages(output_dir):
+    """ Builds TestProject 1.0.0 and 1.1.0, where README.md is moved, dll is modified and Old.cs is replaced """
+    package_root = os.path.join("UnityProject", "Assets", "TestProject")
+    write_file(os.path.join(package_root, "README.md"), "readme")
+    write_file(os.path.join(package_root, "README.md.meta"), _META)
+    write_file(os.path.join(package_root, "TestProject.dll"), "assembly")
+    write_file(os.path.join(package_root, "Old.cs"), "class Old {}")
+    UnityPackageWriter().export_unitypackage(package_root, os.path.join(output_dir, "TestProject_1.0.0_Release.unitypackage"))
+
+    os.remove(os.path.join(package_root, "Old.cs"))
+    os.remove(os.path.join(package_root, "Old.cs.meta"))
+    write_file(os.path.join(package_root, "New.cs"), "class New {}")
+    write_file(os.path.join(package_root, "TestProject.dll"), "new assembly")
+    os.makedirs(os.path.join(package_root, "Docs"))
+    shutil.move(os.path.join(package_root, "README.md"), os.path.join(package_root, "Docs", "README.md"))
+    shutil.move(os.path.join(package_root, "README.md.meta"), os.path.join(package_root, "Docs", "README.md.meta"))
+    UnityPackageWriter().export_unitypackage(package_root, os.path.join(output_dir, "TestProject_1.1.0_Release.unitypackage"))
+
+
+class TestUGetCliDiff(unittest.TestCase):
+    """Functional Tests for `ugetcli` package - `diff` command."""
+
+    def test_cli_uget_diff(self):
+        """Test cli: uget diff with paths to packages"""
+        runner = CliRunner()
+        with runner.isolated_filesystem():
+            os.makedirs("Output")
+            create_unitypackages("Output")
+            result = runner.invoke(cli.ugetcli, ['diff', 'Output/TestProject_1.0.0_Release.unitypackage',
+                                                 'Output/TestProject_1.1.0_Release.unitypackage'], obj={})
+
+        assert result.exit_code == 0, result
+        assert result.output.splitlines()[2:] == [
+            "A            +0 Assets/TestProject/Docs",
+            "R            +0 Assets/TestProject/README.md -> Assets/TestProject/Docs/README.md",
+            "A           +12 Assets/TestProject/New.cs",
+            "D           -12 Assets/TestProject/Old.cs",
+            "M            +4 Assets/TestProject/TestProject.dll",
+            "2 added, 1 removed, 1 moved, 1 modified, size delta +4 bytes",
+        ]
+
+    @patch('ugetcli.csproj.CsProj')
+    def test_cli_uget_diff_versions(self, csproj_mock):
+        """Test cli: uget diff with package versions and --json"""
+        csproj_instance = MagicMock()
+        csproj_instance.get_assembly_name.return_value = "TestProject"
+        csproj_mock.return_value = csproj_instance
+
+        runner = CliRunner()
+        with runner.isolated_filesystem():
+            os.makedirs("Build")
+            create_unitypackages("Build")
+            result = runner.invoke(cli.ugetcli, ['diff', '1.0.0', '1.1.0', '-o', 'Build', '--json'], obj={})
+            missing_result = runner.invoke(cli.ugetcli, ['diff', '1.0.0', '2.0.0', '-o', 'Build'], obj={})
+
+        assert result.exit_code == 0, result
+        diff = json.loads(result.output)
+        assert diff["new"] == os.path.join("Build", "TestProject_1.1.0_Release.unitypackage")
+        assert sorted(change["status"] for change in diff["changes"]) == \
+            ["added", "added", "modified", "moved", "removed"]
+        assert missing_result.exit_code != 0
+        assert "TestProject_2.0.0_Release.unitypackage" in missing_result.output
@@ -0,0 +1,45 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Functional tests for `ugetcli` package - `discover` command.
+Tests functionality of the cli discover command with various options.
+"""
+
+import os
+import json
+import unittest
+from click.testing import CliRunner
+
+from ugetcli import cli
+from ugetcli.utils import create_empty_file
+
+
+class TestUGetCliDiscover(unittest.TestCase):
+    """Functional Tests for `ugetcli` package - `discover` command."""
+
+    def test_cli_uget_discover(self):
+        """Test cli: uget discover with and without --json"""
+        runner = CliRunner()
+        with runner.isolated_filesystem():
+            os.makedirs(os.path.join("src", "MyProject", "bin"))
+            create_empty_file("MySolution.sln")
+            create_empty_file(os.path.join("src", "MyProject", "MyProject.csproj"))
+            create_empty_file(os.path.join("src", "MyProject", "MyProject.nuspec"))
+            create_empty_file(os.path.join("src", "MyProject", "bin", "Copy.csproj"))
+
+            result = runner.invoke(cli.ugetcli, ['discover'], obj={})
+            assert result.exit_code == 0, result
+            assert result.output.splitlines() == [
+                "solution MySolution.sln",
+                "project  " + os.path.join("src", "MyProject", "MyProject.csproj"),
+                "nuspec   " + os.path.join("src", "MyProject", "MyProject.nuspec"),
+            ]
+
+            result = runner.invoke(cli.ugetcli, ['discover', 'src', '--json', '--no-cache'], obj={})
+            assert result.exit_code == 0, result
+            assert json.loads(result.output) == {
+                "projects": [os.path.abspath(os.path.join("src", "MyProject", "MyProject.csproj"))],
+                "nuspecs": [os.path.abspath(os.path.join("src", "MyProject", "MyProject.nuspec"))],
+                "solutions": [],
+            }
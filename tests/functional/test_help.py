@@ -8,6 +8,7 @@ Tests functionality of the cli help command with various options.
 
 import unittest
 from click.testing import CliRunner
+from mock import patch
 
 from ugetcli import cli
 
@@ -22,3 +23,22 @@ class TestUGetCliHelp(unittest.TestCase):
         assert result.exit_code == 0
         assert '--help' in result.output
         assert 'Show this message and exit.' in result.output
+
+    def test_cli_uget_version(self):
+        """Test cli: uget --version"""
+        runner = CliRunner()
+        result = runner.invoke(cli.ugetcli, ['--version'], obj={})
+        assert result.exit_code == 0
+        assert 'version' in result.output
+
+    @patch('ugetcli.nuget.NuGetRunner')
+    @patch('ugetcli.msbuild.MsBuildRunner')
+    def test_cli_uget_tools_refresh(self, msbuild_runner_mock, nuget_runner_mock):
+        """Test cli: uget tools --refresh"""
+        msbuild_runner_mock.locate_msbuild.return_value = "msbuild"
+        nuget_runner_mock.locate_nuget.return_value = "nuget"
+        runner = CliRunner()
+        result = runner.invoke(cli.ugetcli, ['tools', '--refresh'], obj={})
+        assert result.exit_code == 0, result
+        assert 'msbuild: msbuild' in result.output
+        assert 'nuget: nuget' in result.output
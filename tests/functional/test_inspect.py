@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Functional tests for `ugetcli` package - `inspect` command.
+Tests functionality of the cli inspect command with various options.
+"""
+
+import os
+import json
+import unittest
+from click.testing import CliRunner
+
+from ugetcli import cli
+from ugetcli.unitypackagewriter import UnityPackageWriter
+
+
+def create_unitypackage(unitypackage_path):
+    package_root = os.path.join("UnityProject", "Assets", "MyProject")
+    if not os.path.isdir(package_root):
+        os.makedirs(package_root)
+    with open(os.path.join(package_root, "MyProject.dll"), "wb") as f:
+        f.write(b"assembly")
+    UnityPackageWriter().export_unitypackage(package_root, unitypackage_path)
+
+
+class TestUGetCliInspect(unittest.TestCase):
+    """Functional Tests for `ugetcli` package - `inspect` command."""
+
+    def test_cli_uget_inspect(self):
+        """Test cli: uget inspect with default options, lists packages in Output directory"""
+        runner = CliRunner()
+        with runner.isolated_filesystem():
+            os.makedirs("Output")
+            create_unitypackage("Output/MyProject_1.0.0_Release.unitypackage")
+            create_unitypackage("Output/MyProject_1.0.0_Debug.unitypackage")
+            result = runner.invoke(cli.ugetcli, ['inspect'], obj={})
+
+        assert result.exit_code == 0, result
+        lines = result.output.splitlines()
+        assert lines[0] == os.path.join("Output", "MyProject_1.0.0_Debug.unitypackage") + \
+            " (2 assets, 1 files, 8 bytes)"
+        assert lines[1].endswith(" Assets/MyProject/")
+        assert lines[2].endswith(" Assets/MyProject/MyProject.dll")
+        assert len(lines) == 6
+
+    def test_cli_uget_inspect_json(self):
+        """Test cli: uget inspect --json with a glob pattern"""
+        runner = CliRunner()
+        with runner.isolated_filesystem():
+            create_unitypackage("MyProject.unitypackage")
+            result = runner.invoke(cli.ugetcli, ['inspect', '*.unitypackage', '--json', '--no-index'], obj={})
+
+        assert result.exit_code == 0, result
+        packages = json.loads(result.output)
+        assert [package["path"] for package in packages] == ["MyProject.unitypackage"]
+        assert [asset["pathname"] for asset in packages[0]["assets"]] == \
+            ["Assets/MyProject", "Assets/MyProject/MyProject.dll"]
+        assert packages[0]["assets"][1]["size"] == 8
+
+    def test_cli_uget_inspect_missing(self):
+        """Test cli: uget inspect with path that does not exist"""
+        runner = CliRunner()
+        with runner.isolated_filesystem():
+            result = runner.invoke(cli.ugetcli, ['inspect', 'Missing.unitypackage'], obj={})
+        assert result.exit_code != 0
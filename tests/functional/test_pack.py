@@ -18,12 +18,13 @@ from ugetcli.utils import create_empty_file
 
 class TestUGetCliPack(unittest.TestCase):
     """Tests for `ugetcli` package - pack command."""
-    @patch('ugetcli.uget.CsProj')
-    @patch('ugetcli.uget.NuGetRunner')
+    @patch('ugetcli.csproj.CsProj')
+    @patch('ugetcli.nuget.NuGetRunner')
     def test_cli_uget_pack_with_path_containing_csproj(
         self, nuget_runner_mock, csproj_mock):
         """Test cli: uget pack with path containing a csproj"""
         nuget_runner_instance = MagicMock()
+        nuget_runner_instance.pack.return_value = 0
         nuget_runner_mock.return_value = nuget_runner_instance
         nuget_runner_mock.locate_nuget.return_value = "nuget.exe"
 
@@ -44,12 +45,37 @@ class TestUGetCliPack(unittest.TestCase):
         nuget_runner_instance.pack.assert_called_with(
             ".", "Output", "Release", os.path.normpath("Output/TestProject_1.2.3_Release.unitypackage"), os.path.normpath("UnityProject/Assets/TestProject"), "1.2.3")
 
-    @patch('ugetcli.uget.NuSpec')
-    @patch('ugetcli.uget.NuGetRunner')
+    @patch('ugetcli.csproj.CsProj')
+    @patch('ugetcli.nuget.NuGetRunner')
+    def test_cli_uget_pack_failed(
+        self, nuget_runner_mock, csproj_mock):
+        """Test cli: uget pack - exits with non-zero code when NuGet pack fails"""
+        nuget_runner_instance = MagicMock()
+        nuget_runner_instance.pack.return_value = 1
+        nuget_runner_mock.return_value = nuget_runner_instance
+        nuget_runner_mock.locate_nuget.return_value = "nuget.exe"
+
+        csproj_instance = MagicMock()
+        csproj_instance.get_assembly_name.return_value = "TestProject"
+        csproj_instance.get_assembly_version.return_value = "1.2.3"
+        csproj_instance.get_output_path.return_value = "bin/Output/Release"
+        csproj_instance.path = "TestProject.csproj"
+        csproj_mock.return_value = csproj_instance
+        csproj_mock.get_csproj_at_path.return_value = "TestProject.csproj"
+
+        runner = CliRunner(env={"NUGET_PATH": None})
+        with runner.isolated_filesystem():
+            result = runner.invoke(cli.ugetcli, ['pack'], obj={})
+
+        assert result.exit_code == 1, result
+
+    @patch('ugetcli.nuspec.NuSpec')
+    @patch('ugetcli.nuget.NuGetRunner')
     def test_cli_uget_pack_with_path_containing_nuspec(
         self, nuget_runner_mock, nuspec_mock):
         """Test cli: uget pack with path containing a csproj"""
         nuget_runner_instance = MagicMock()
+        nuget_runner_instance.pack.return_value = 0
         nuget_runner_mock.return_value = nuget_runner_instance
         nuget_runner_mock.locate_nuget.return_value = "nuget.exe"
 
@@ -68,12 +94,13 @@ class TestUGetCliPack(unittest.TestCase):
         nuget_runner_instance.pack.assert_called_with(
             ".", "Output", "Release", os.path.normpath("Output/TestProject_1.2.3_Release.unitypackage"), os.path.normpath("UnityProject/Assets/TestProject"), "1.2.3")
 
-    @patch('ugetcli.uget.CsProj')
-    @patch('ugetcli.uget.NuGetRunner')
+    @patch('ugetcli.csproj.CsProj')
+    @patch('ugetcli.nuget.NuGetRunner')
     def test_cli_uget_pack_with_output_dir(
         self, nuget_runner_mock, csproj_mock):
         """Test cli: uget pack with output dir containing a csproj"""
         nuget_runner_instance = MagicMock()
+        nuget_runner_instance.pack.return_value = 0
         nuget_runner_mock.return_value = nuget_runner_instance
         nuget_runner_mock.locate_nuget.return_value = "nuget.exe"
 
@@ -92,12 +119,13 @@ class TestUGetCliPack(unittest.TestCase):
         nuget_runner_instance.pack.assert_called_with(
             ".", "MyOutput", "Release", os.path.normpath("MyOutput/TestProject_1.2.3_Release.unitypackage"), os.path.normpath("UnityProject/Assets/TestProject"), "1.2.3")
 
-    @patch('ugetcli.uget.CsProj')
-    @patch('ugetcli.uget.NuGetRunner')
+    @patch('ugetcli.csproj.CsProj')
+    @patch('ugetcli.nuget.NuGetRunner')
     def test_cli_uget_pack_with_nuget_path(
         self, nuget_runner_mock, csproj_mock):
         """Test cli: uget pack with --nuget-path"""
         nuget_runner_instance = MagicMock()
+        nuget_runner_instance.pack.return_value = 0
         nuget_runner_mock.return_value = nuget_runner_instance
         nuget_runner_mock.valid_nuget_executable.return_value = True
 
@@ -117,12 +145,13 @@ class TestUGetCliPack(unittest.TestCase):
             ".", "Output", "Release", os.path.normpath("Output/TestProject_1.2.3_Release.unitypackage"), os.path.normpath("UnityProject/Assets/TestProject"), "1.2.3")
         nuget_runner_mock.valid_nuget_executable.assert_called_with("custom_nuget.exe")
 
-    @patch('ugetcli.uget.CsProj')
-    @patch('ugetcli.uget.NuGetRunner')
+    @patch('ugetcli.csproj.CsProj')
+    @patch('ugetcli.nuget.NuGetRunner')
     def test_cli_uget_pack_with_nuget_path_env(
         self, nuget_runner_mock, csproj_mock):
         """Test cli: uget pack NUGET_PATH env variable"""
         nuget_runner_instance = MagicMock()
+        nuget_runner_instance.pack.return_value = 0
         nuget_runner_mock.return_value = nuget_runner_instance
         nuget_runner_mock.valid_nuget_executable.return_value = True
 
@@ -142,12 +171,13 @@ class TestUGetCliPack(unittest.TestCase):
             ".", "Output", "Release", os.path.normpath("Output/TestProject_1.2.3_Release.unitypackage"), os.path.normpath("UnityProject/Assets/TestProject"), "1.2.3")
         nuget_runner_mock.valid_nuget_executable.assert_called_with("custom_nuget.exe")
 
-    @patch('ugetcli.uget.CsProj')
-    @patch('ugetcli.uget.NuGetRunner')
+    @patch('ugetcli.csproj.CsProj')
+    @patch('ugetcli.nuget.NuGetRunner')
     def test_cli_uget_pack_with_unitypackage_path(
         self, nuget_runner_mock, csproj_mock):
         """Test cli: uget pack with --unitypackage-path"""
         nuget_runner_instance = MagicMock()
+        nuget_runner_instance.pack.return_value = 0
         nuget_runner_mock.return_value = nuget_runner_instance
         nuget_runner_mock.valid_nuget_executable.return_value = True
         nuget_runner_mock.locate_nuget.return_value = "nuget.exe"
@@ -168,12 +198,13 @@ class TestUGetCliPack(unittest.TestCase):
         nuget_runner_instance.pack.assert_called_with(
             ".", "Output", "Release", "MyUnityPackage.unitypackage", os.path.normpath("UnityProject/Assets/TestProject"), "1.2.3")
 
-    @patch('ugetcli.uget.CsProj')
-    @patch('ugetcli.uget.NuGetRunner')
+    @patch('ugetcli.csproj.CsProj')
+    @patch('ugetcli.nuget.NuGetRunner')
     def test_cli_uget_pack_with_configuration(
         self, nuget_runner_mock, csproj_mock):
         """Test cli: uget pack with --configuration"""
         nuget_runner_instance = MagicMock()
+        nuget_runner_instance.pack.return_value = 0
         nuget_runner_mock.return_value = nuget_runner_instance
         nuget_runner_mock.valid_nuget_executable.return_value = True
         nuget_runner_mock.locate_nuget.return_value = "nuget.exe"
@@ -193,12 +224,13 @@ class TestUGetCliPack(unittest.TestCase):
         nuget_runner_instance.pack.assert_called_with(
             ".", "Output", "Debug", os.path.normpath("Output/TestProject_1.2.3_Debug.unitypackage"), os.path.normpath("UnityProject/Assets/TestProject"), "1.2.3")
 
-    @patch('ugetcli.uget.CsProj')
-    @patch('ugetcli.uget.NuGetRunner')
+    @patch('ugetcli.csproj.CsProj')
+    @patch('ugetcli.nuget.NuGetRunner')
     def test_cli_uget_pack_with_config_json(
         self, nuget_runner_mock, csproj_mock):
         """Test cli: uget pack with --config json"""
         nuget_runner_instance = MagicMock()
+        nuget_runner_instance.pack.return_value = 0
         nuget_runner_mock.return_value = nuget_runner_instance
         nuget_runner_mock.valid_nuget_executable.return_value = True
         nuget_runner_mock.locate_nuget.return_value = "custom_nuget.exe"
@@ -227,12 +259,13 @@ class TestUGetCliPack(unittest.TestCase):
         nuget_runner_instance.pack.assert_called_with(
             ".", "CustomOutput", "Debug", "MyUnityPackage.unitypackage", os.path.normpath("UnityProject/Assets/TestProject"), "1.2.3")
 
-    @patch('ugetcli.uget.CsProj')
-    @patch('ugetcli.uget.NuGetRunner')
+    @patch('ugetcli.csproj.CsProj')
+    @patch('ugetcli.nuget.NuGetRunner')
     def test_cli_uget_pack_with_config_file(
         self, nuget_runner_mock, csproj_mock):
         """Test cli: uget pack with --config-path file"""
         nuget_runner_instance = MagicMock()
+        nuget_runner_instance.pack.return_value = 0
         nuget_runner_mock.return_value = nuget_runner_instance
         nuget_runner_mock.valid_nuget_executable.return_value = True
         nuget_runner_mock.locate_nuget.return_value = "custom_nuget.exe"
@@ -263,3 +296,76 @@ class TestUGetCliPack(unittest.TestCase):
         nuget_runner_mock.assert_called_with('custom_nuget.exe', False)
         nuget_runner_instance.pack.assert_called_with(
             ".", "CustomOutput", "Debug", "MyUnityPackage.unitypackage", os.path.normpath("UnityProject/Assets/TestProject"), "1.2.3")
+
+    @patch('ugetcli.nupkg.NuPkgBuilder')
+    @patch('ugetcli.csproj.CsProj')
+    @patch('ugetcli.nuget.NuGetRunner')
+    def test_cli_uget_pack_with_native_engine(
+        self, nuget_runner_mock, csproj_mock, nupkg_builder_mock):
+        """Test cli: uget pack --engine native does not use NuGet executable"""
+        nupkg_builder_instance = MagicMock()
+        nupkg_builder_instance.pack.return_value = 0
+        nupkg_builder_mock.return_value = nupkg_builder_instance
+
+        csproj_instance = MagicMock()
+        csproj_instance.get_assembly_name.return_value = "TestProject"
+        csproj_instance.get_assembly_version.return_value = "1.2.3"
+        csproj_mock.return_value = csproj_instance
+        csproj_mock.get_csproj_at_path.return_value = "TestProject.csproj"
+
+        runner = CliRunner(env={"NUGET_PATH": None})
+        with runner.isolated_filesystem():
+            result = runner.invoke(cli.ugetcli, ['pack', '--engine', 'native', '--compression', 'fast'], obj={})
+
+        assert result.exit_code == 0, result
+        nupkg_builder_mock.assert_called_with(False, "fast", False, False)
+        nuget_runner_mock.locate_nuget.assert_not_called()
+        nuget_runner_mock.assert_not_called()
+        nupkg_builder_instance.pack.assert_called_with(
+            ".", "Output", "Release", os.path.normpath("Output/TestProject_1.2.3_Release.unitypackage"),
+            os.path.normpath("UnityProject/Assets/TestProject"), "1.2.3")
+
+    def test_cli_uget_pack_with_nuget_keeps_cache_entry(self):
+        """Test cli: uget pack with NuGet engine does not modify cached .nupkg the output is linked to"""
+        nuspec = ('<?xml version="1.0"?><package><metadata><id>TestProject</id><version>1.2.3</version>'
+                  '<authors>Author</authors><description>Test</description></metadata></package>')
+
+        def pack_mock(*args):
+            with open(os.path.join("Output", "TestProject.1.2.3.nupkg"), "w") as f:
+                f.write("nuget package")  # Written in place, like NuGet does
+            return 0
+
+        runner = CliRunner(env={"NUGET_PATH": None})
+        with runner.isolated_filesystem():
+            with open("TestProject.nuspec", "w") as f:
+                f.write(nuspec)
+            result = runner.invoke(cli.ugetcli, ['pack', '--engine', 'native'], obj={})
+            assert result.exit_code == 0, result
+            with open("Output/TestProject.1.2.3.nupkg", "rb") as f:
+                native_package = f.read()
+
+            with patch('ugetcli.nuget.NuGetRunner') as nuget_runner_mock:
+                nuget_runner_mock.locate_nuget.return_value = "nuget.exe"
+                nuget_runner_mock.get_normalized_nuget_pack_version.side_effect = lambda version: version
+                nuget_runner_mock.return_value.pack.side_effect = pack_mock
+                result = runner.invoke(cli.ugetcli, ['pack'], obj={})
+            assert result.exit_code == 0, result
+
+            os.remove("Output/TestProject.1.2.3.nupkg")
+            result = runner.invoke(cli.ugetcli, ['pack', '--engine', 'native'], obj={})
+            assert result.exit_code == 0, result
+            assert "Restored package from cache" in result.output
+            with open("Output/TestProject.1.2.3.nupkg", "rb") as f:
+                assert f.read() == native_package
+
+    @patch('ugetcli.nuget.NuGetRunner')
+    def test_cli_uget_pack_deterministic_requires_native_engine(
+        self, nuget_runner_mock):
+        """Test cli: uget pack --deterministic fails with NuGet engine"""
+        runner = CliRunner(env={"NUGET_PATH": None})
+        with runner.isolated_filesystem():
+            result = runner.invoke(cli.ugetcli, ['pack', '--deterministic'], obj={})
+
+        assert result.exit_code != 0
+        assert "native engine" in result.output
+        nuget_runner_mock.assert_not_called()
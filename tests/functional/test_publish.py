@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Functional tests for `ugetcli` package - `publish` command.
+Tests functionality of the cli publish command with various options.
+"""
+
+import os
+import unittest
+from click.testing import CliRunner
+from mock import MagicMock, patch
+
+from ugetcli import cli
+from ugetcli.utils import create_empty_file
+
+
+class TestUGetCliPublish(unittest.TestCase):
+    """Functional Tests for `ugetcli` package - `publish` command."""
+
+    @patch('ugetcli.csproj.CsProj')
+    @patch('ugetcli.nuget.NuGetRunner')
+    @patch('ugetcli.unitypackage.UnityPackageRunner')
+    @patch('ugetcli.msbuild.MsBuildRunner')
+    def test_cli_uget_publish(self, msbuild_runner_mock, unitypackage_runner_mock, nuget_runner_mock, csproj_mock):
+        """Test cli: uget publish builds, creates, packs and pushes every project; failed project is not pushed"""
+        msbuild_runner_instance = MagicMock()
+        msbuild_runner_instance.build.return_value = 0
+        msbuild_runner_mock.return_value = msbuild_runner_instance
+        msbuild_runner_mock.locate_msbuild.return_value = 'msbuild'
+
+        unitypackage_runner_instance = MagicMock()
+        unitypackage_runner_instance.export_unitypackage.side_effect = lambda root, path: create_empty_file(path)
+        unitypackage_runner_mock.return_value = unitypackage_runner_instance
+
+        def pack(path, output_dir, configuration, unitypackage_path, export_root, version):
+            if path.endswith("Broken.csproj"):
+                return 1
+            create_empty_file(os.path.join(output_dir, "MyProject.1.0.0.nupkg"))
+            return 0
+
+        nuget_runner_instance = MagicMock()
+        nuget_runner_instance.pack.side_effect = pack
+        nuget_runner_instance.push.return_value = 0
+        nuget_runner_mock.return_value = nuget_runner_instance
+        nuget_runner_mock.locate_nuget.return_value = "nuget.exe"
+        nuget_runner_mock.get_normalized_nuget_pack_version.side_effect = lambda version: version
+
+        def create_csproj(path):
+            csproj_instance = MagicMock()
+            csproj_instance.get_assembly_name.return_value = os.path.splitext(os.path.basename(path))[0]
+            csproj_instance.get_assembly_version.return_value = "1.0.0"
+            csproj_instance.get_output_path.return_value = "bin/Release"
+            csproj_instance.path = path
+            return csproj_instance
+
+        csproj_mock.side_effect = create_csproj
+        csproj_mock.get_csproj_at_path.side_effect = lambda path: path
+
+        runner = CliRunner(env={"NUGET_PATH": None, "MSBUILD_PATH": None})
+        with runner.isolated_filesystem():
+            for name in ("MyProject", "Broken"):
+                os.makedirs(os.path.join(name, "bin", "Release"))
+                for filename in (name + ".csproj", "bin/Release/{0}.dll".format(name),
+                                 "bin/Release/{0}.pdb".format(name)):
+                    create_empty_file(os.path.join(name, filename))
+
+            result = runner.invoke(cli.ugetcli, ['publish', '-p', 'MyProject/MyProject.csproj',
+                                                 '-p', 'Broken/Broken.csproj', '--feed', 'http://feed'], obj={})
+
+            assert result.exit_code == 1, result
+            assert msbuild_runner_instance.build.call_count == 2
+            assert unitypackage_runner_instance.export_unitypackage.call_count == 2
+            nuget_runner_instance.push.assert_called_once_with(os.path.normpath("Output/MyProject.1.0.0.nupkg"),
+                                                               "http://feed", None)
+            # Project metadata is read once per project and shared by create, pack and push
+            assert sorted(call[0][0] for call in csproj_mock.call_args_list) == ["Broken/Broken.csproj",
+                                                                                 "MyProject/MyProject.csproj"]
+            lines = result.output.splitlines()
+            assert any(line.startswith("Published MyProject (build ") for line in lines), result.output
+            assert any(line.startswith("Failed to publish Broken: pack failed: pack failed with exit code 1 (")
+                       for line in lines), result.output
+            assert lines[-1].startswith("1 published, 1 failed in ")
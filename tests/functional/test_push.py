@@ -10,20 +10,22 @@ import unittest
 import os
 import json
 from click.testing import CliRunner
-from mock import MagicMock, patch
+from mock import MagicMock, patch, call
 
 from ugetcli import cli
+from ugetcli.feed import PushResult
 from ugetcli.utils import create_empty_file
 
 
 class TestUGetCliPush(unittest.TestCase):
     """Tests for `ugetcli` package - pack command."""
-    @patch('ugetcli.uget.CsProj')
-    @patch('ugetcli.uget.NuGetRunner')
+    @patch('ugetcli.csproj.CsProj')
+    @patch('ugetcli.nuget.NuGetRunner')
     def test_cli_uget_push(
         self, nuget_runner_mock, csproj_mock):
         """Test cli: uget pack with default values when path contains .csproj"""
         nuget_runner_instance = MagicMock()
+        nuget_runner_instance.push.return_value = 0
         nuget_runner_mock.return_value = nuget_runner_instance
         nuget_runner_mock.locate_nuget.return_value = "nuget.exe"
         nuget_runner_mock.get_normalized_nuget_pack_version.return_value = "1.2.3"
@@ -44,12 +46,13 @@ class TestUGetCliPush(unittest.TestCase):
         nuget_runner_mock.assert_called_with('nuget.exe', False)
         nuget_runner_instance.push.assert_called_with(os.path.normpath("Output/TestProject.1.2.3.nupkg"), None, None)
 
-    @patch('ugetcli.uget.CsProj')
-    @patch('ugetcli.uget.NuGetRunner')
+    @patch('ugetcli.csproj.CsProj')
+    @patch('ugetcli.nuget.NuGetRunner')
     def test_cli_uget_push_path_csproj(
         self, nuget_runner_mock, csproj_mock):
         """Test cli: uget pack with default values when path directly points to .csproj"""
         nuget_runner_instance = MagicMock()
+        nuget_runner_instance.push.return_value = 0
         nuget_runner_mock.return_value = nuget_runner_instance
         nuget_runner_mock.locate_nuget.return_value = "nuget.exe"
         nuget_runner_mock.get_normalized_nuget_pack_version.return_value = "1.2.3"
@@ -71,11 +74,12 @@ class TestUGetCliPush(unittest.TestCase):
         nuget_runner_instance.push.assert_called_with(os.path.normpath("Output/TestProject.1.2.3.nupkg"), None, None)
         csproj_mock.get_csproj_at_path.assert_called_with('TestProject.csproj')
 
-    @patch('ugetcli.uget.NuGetRunner')
+    @patch('ugetcli.nuget.NuGetRunner')
     def test_cli_uget_push_path_nupkg(
         self, nuget_runner_mock):
         """Test cli: uget pack with default values when path points to a .nupkg file"""
         nuget_runner_instance = MagicMock()
+        nuget_runner_instance.push.return_value = 0
         nuget_runner_mock.return_value = nuget_runner_instance
         nuget_runner_mock.locate_nuget.return_value = "nuget.exe"
 
@@ -88,12 +92,13 @@ class TestUGetCliPush(unittest.TestCase):
         nuget_runner_mock.assert_called_with('nuget.exe', False)
         nuget_runner_instance.push.assert_called_with(os.path.normpath("myproject.nupkg"), None, None)
 
-    @patch('ugetcli.uget.CsProj')
-    @patch('ugetcli.uget.NuGetRunner')
+    @patch('ugetcli.csproj.CsProj')
+    @patch('ugetcli.nuget.NuGetRunner')
     def test_cli_uget_push_path_csproj_with_output_dir(
         self, nuget_runner_mock, csproj_mock):
         """Test cli: uget pack with default values when path directly points to .csproj and --output-dir is set"""
         nuget_runner_instance = MagicMock()
+        nuget_runner_instance.push.return_value = 0
         nuget_runner_mock.return_value = nuget_runner_instance
         nuget_runner_mock.locate_nuget.return_value = "nuget.exe"
         nuget_runner_mock.get_normalized_nuget_pack_version.return_value = "1.2.3"
@@ -116,12 +121,13 @@ class TestUGetCliPush(unittest.TestCase):
         nuget_runner_instance.push.assert_called_with(os.path.normpath("MyOutput/TestProject.1.2.3.nupkg"), None, None)
         csproj_mock.get_csproj_at_path.assert_called_with('TestProject.csproj')
 
-    @patch('ugetcli.uget.CsProj')
-    @patch('ugetcli.uget.NuGetRunner')
+    @patch('ugetcli.csproj.CsProj')
+    @patch('ugetcli.nuget.NuGetRunner')
     def test_cli_uget_push_with_feed(
         self, nuget_runner_mock, csproj_mock):
         """Test cli: uget pack with --feed"""
         nuget_runner_instance = MagicMock()
+        nuget_runner_instance.push.return_value = 0
         nuget_runner_mock.return_value = nuget_runner_instance
         nuget_runner_mock.locate_nuget.return_value = "nuget.exe"
         nuget_runner_mock.get_normalized_nuget_pack_version.return_value = "1.2.3"
@@ -143,12 +149,13 @@ class TestUGetCliPush(unittest.TestCase):
         nuget_runner_instance.push.assert_called_with(
             os.path.normpath("Output/TestProject.1.2.3.nupkg"), 'http://test.com/feed', None)
 
-    @patch('ugetcli.uget.CsProj')
-    @patch('ugetcli.uget.NuGetRunner')
+    @patch('ugetcli.csproj.CsProj')
+    @patch('ugetcli.nuget.NuGetRunner')
     def test_cli_uget_push_with_nuget_path(
         self, nuget_runner_mock, csproj_mock):
         """Test cli: uget pack with --nuget-path"""
         nuget_runner_instance = MagicMock()
+        nuget_runner_instance.push.return_value = 0
         nuget_runner_mock.return_value = nuget_runner_instance
         nuget_runner_mock.locate_nuget.return_value = "custom_nuget.exe"
         nuget_runner_mock.get_normalized_nuget_pack_version.return_value = "1.2.3"
@@ -171,12 +178,13 @@ class TestUGetCliPush(unittest.TestCase):
         nuget_runner_instance.push.assert_called_with(
             os.path.normpath("Output/TestProject.1.2.3.nupkg"), None, None)
 
-    @patch('ugetcli.uget.CsProj')
-    @patch('ugetcli.uget.NuGetRunner')
+    @patch('ugetcli.csproj.CsProj')
+    @patch('ugetcli.nuget.NuGetRunner')
     def test_cli_uget_push_with_nuget_path(
         self, nuget_runner_mock, csproj_mock):
         """Test cli: uget pack with NUGET_PATH env variable set"""
         nuget_runner_instance = MagicMock()
+        nuget_runner_instance.push.return_value = 0
         nuget_runner_mock.return_value = nuget_runner_instance
         nuget_runner_mock.valid_nuget_executable.return_value = True
         nuget_runner_mock.get_normalized_nuget_pack_version.return_value = "1.2.3"
@@ -199,12 +207,13 @@ class TestUGetCliPush(unittest.TestCase):
         nuget_runner_instance.push.assert_called_with(
             os.path.normpath("Output/TestProject.1.2.3.nupkg"), None, None)
 
-    @patch('ugetcli.uget.CsProj')
-    @patch('ugetcli.uget.NuGetRunner')
+    @patch('ugetcli.csproj.CsProj')
+    @patch('ugetcli.nuget.NuGetRunner')
     def test_cli_uget_push_with_api_key(
         self, nuget_runner_mock, csproj_mock):
         """Test cli: uget pack with --api-key"""
         nuget_runner_instance = MagicMock()
+        nuget_runner_instance.push.return_value = 0
         nuget_runner_mock.return_value = nuget_runner_instance
         nuget_runner_mock.locate_nuget.return_value = "nuget.exe"
         nuget_runner_mock.get_normalized_nuget_pack_version.return_value = "1.2.3"
@@ -226,12 +235,13 @@ class TestUGetCliPush(unittest.TestCase):
         nuget_runner_instance.push.assert_called_with(
             os.path.normpath("Output/TestProject.1.2.3.nupkg"), None, "myapikey")
 
-    @patch('ugetcli.uget.CsProj')
-    @patch('ugetcli.uget.NuGetRunner')
+    @patch('ugetcli.csproj.CsProj')
+    @patch('ugetcli.nuget.NuGetRunner')
     def test_cli_uget_push_with_api_key_env(
         self, nuget_runner_mock, csproj_mock):
         """Test cli: uget pack with API_KEY env variable"""
         nuget_runner_instance = MagicMock()
+        nuget_runner_instance.push.return_value = 0
         nuget_runner_mock.return_value = nuget_runner_instance
         nuget_runner_mock.locate_nuget.return_value = "nuget.exe"
         nuget_runner_mock.get_normalized_nuget_pack_version.return_value = "1.2.3"
@@ -253,12 +263,13 @@ class TestUGetCliPush(unittest.TestCase):
         nuget_runner_instance.push.assert_called_with(
             os.path.normpath("Output/TestProject.1.2.3.nupkg"), None, "myapikey")
 
-    @patch('ugetcli.uget.CsProj')
-    @patch('ugetcli.uget.NuGetRunner')
+    @patch('ugetcli.csproj.CsProj')
+    @patch('ugetcli.nuget.NuGetRunner')
     def test_cli_uget_push_with_config_json(
         self, nuget_runner_mock, csproj_mock):
         """Test cli: uget pack with config json"""
         nuget_runner_instance = MagicMock()
+        nuget_runner_instance.push.return_value = 0
         nuget_runner_mock.return_value = nuget_runner_instance
         nuget_runner_mock.locate_nuget.return_value = "nuget.exe"
         nuget_runner_mock.get_normalized_nuget_pack_version.return_value = "1.2.3"
@@ -289,12 +300,13 @@ class TestUGetCliPush(unittest.TestCase):
 
 
 
-    @patch('ugetcli.uget.CsProj')
-    @patch('ugetcli.uget.NuGetRunner')
+    @patch('ugetcli.csproj.CsProj')
+    @patch('ugetcli.nuget.NuGetRunner')
     def test_cli_uget_push_with_config_file(
         self, nuget_runner_mock, csproj_mock):
         """Test cli: uget pack with config file"""
         nuget_runner_instance = MagicMock()
+        nuget_runner_instance.push.return_value = 0
         nuget_runner_mock.return_value = nuget_runner_instance
         nuget_runner_mock.locate_nuget.return_value = "nuget.exe"
         nuget_runner_mock.get_normalized_nuget_pack_version.return_value = "1.2.3"
@@ -325,4 +337,127 @@ class TestUGetCliPush(unittest.TestCase):
         nuget_runner_instance.push.assert_called_with(
             os.path.normpath("CustomOutput/TestProject.1.2.3.nupkg"), "http://test.com/nuget", "myapikey123")
 
+    @patch('ugetcli.feed.NuGetFeedClient')
+    @patch('ugetcli.nuget.NuGetRunner')
+    def test_cli_uget_push_with_native_engine(
+        self, nuget_runner_mock, feed_client_mock):
+        """Test cli: uget push --engine native - uploads package without NuGet executable"""
+        feed_client_instance = MagicMock()
+        feed_client_instance.push.return_value = PushResult("myproject.nupkg", 201, "Created", 1024, 0.5, 1)
+        feed_client_mock.return_value = feed_client_instance
 
+        runner = CliRunner(env={"NUGET_PATH": None, "NUGET_API_KEY": None})
+        with runner.isolated_filesystem():
+            create_empty_file("myproject.nupkg")
+            result = runner.invoke(cli.ugetcli, ['push', '--path', 'myproject.nupkg', '--feed', 'http://test.com/feed',
+                                                 '--api-key', 'mykey', '--engine', 'native'], obj={})
+
+        assert result.exit_code == 0, result
+        nuget_runner_mock.assert_not_called()
+        nuget_runner_mock.locate_nuget.assert_not_called()
+        feed_client_mock.assert_called_with('http://test.com/feed', 'mykey', False)
+        feed_client_instance.push.assert_called_with(os.path.normpath("myproject.nupkg"))
+
+    @patch('ugetcli.feed.NuGetFeedClient')
+    def test_cli_uget_push_with_native_engine_failed(
+        self, feed_client_mock):
+        """Test cli: uget push --engine native - exits with non-zero code when feed rejects package"""
+        feed_client_instance = MagicMock()
+        feed_client_instance.push.return_value = PushResult("myproject.nupkg", 500, "Internal Server Error", 1024,
+                                                            0.5, 1)
+        feed_client_mock.return_value = feed_client_instance
+
+        runner = CliRunner(env={"NUGET_PATH": None, "NUGET_API_KEY": None})
+        with runner.isolated_filesystem():
+            create_empty_file("myproject.nupkg")
+            result = runner.invoke(cli.ugetcli, ['push', '--path', 'myproject.nupkg', '--feed', 'http://test.com/feed',
+                                                 '--engine', 'native', '--retries', '0', '--no-check-existing'],
+                                   obj={})
+
+        assert result.exit_code == 1, result
+        assert "500 failed: Internal Server Error" in result.output
+        assert "0 pushed, 0 skipped, 1 failed" in result.output
+
+    @patch('ugetcli.nuget.NuGetRunner')
+    def test_cli_uget_push_failed(
+        self, nuget_runner_mock):
+        """Test cli: uget push - exits with non-zero code when NuGet push fails"""
+        nuget_runner_instance = MagicMock()
+        nuget_runner_instance.push.return_value = 1
+        nuget_runner_mock.return_value = nuget_runner_instance
+        nuget_runner_mock.locate_nuget.return_value = "nuget.exe"
+
+        runner = CliRunner(env={"NUGET_PATH": None, "NUGET_API_KEY": None})
+        with runner.isolated_filesystem():
+            create_empty_file("myproject.nupkg")
+            result = runner.invoke(cli.ugetcli, ['push', '--path', 'myproject.nupkg'], obj={})
+
+        assert result.exit_code == 1, result
+
+    def test_cli_uget_push_with_native_engine_without_feed(self):
+        """Test cli: uget push --engine native - fails when feed is not provided"""
+        runner = CliRunner(env={"NUGET_PATH": None, "NUGET_API_KEY": None})
+        with runner.isolated_filesystem():
+            create_empty_file("myproject.nupkg")
+            result = runner.invoke(cli.ugetcli, ['push', '--path', 'myproject.nupkg', '--engine', 'native'], obj={})
+
+        assert result.exit_code != 0
+
+    @patch('ugetcli.feed.NuGetFeedClient')
+    def test_cli_uget_push_with_native_engine_invalid_feed(
+        self, feed_client_mock):
+        """Test cli: uget push --engine native - fails when feed is not a valid URL"""
+        runner = CliRunner(env={"NUGET_PATH": None, "NUGET_API_KEY": None})
+        with runner.isolated_filesystem():
+            create_empty_file("myproject.nupkg")
+            result = runner.invoke(cli.ugetcli, ['push', '--path', 'myproject.nupkg', '--feed', 'invalid/feed',
+                                                 '--engine', 'native'], obj={})
+
+        assert result.exit_code != 0
+        assert "Invalid NuGet feed URL" in result.output
+        feed_client_mock.assert_not_called()
+
+    @patch('ugetcli.nuget.NuGetRunner')
+    def test_cli_uget_push_directory(
+        self, nuget_runner_mock):
+        """Test cli: uget push with directory containing multiple NuGet packages"""
+        nuget_runner_instance = MagicMock()
+        nuget_runner_instance.push.return_value = 0
+        nuget_runner_mock.return_value = nuget_runner_instance
+        nuget_runner_mock.locate_nuget.return_value = "nuget.exe"
+
+        runner = CliRunner(env={"NUGET_PATH": None, "NUGET_API_KEY": None})
+        with runner.isolated_filesystem():
+            os.mkdir("Output")
+            create_empty_file("Output/First.1.0.0.nupkg")
+            create_empty_file("Output/Second.1.0.0.nupkg")
+            create_empty_file("Output/Second_1.0.0_Release.unitypackage")
+            result = runner.invoke(cli.ugetcli, ['push', '--path', 'Output'], obj={})
+
+        assert result.exit_code == 0, result
+        assert nuget_runner_instance.push.call_args_list == [
+            call(os.path.join("Output", "First.1.0.0.nupkg"), None, None),
+            call(os.path.join("Output", "Second.1.0.0.nupkg"), None, None)]
+
+    @patch('ugetcli.feed.NuGetFeedClient')
+    def test_cli_uget_push_glob_with_native_engine(
+        self, feed_client_mock):
+        """Test cli: uget push --engine native with glob pattern - uploads every matching package"""
+        feed_client_instance = MagicMock()
+        feed_client_instance.push.side_effect = lambda path: PushResult(path, 201, "Created", 1024, 0.5, 1)
+        feed_client_mock.return_value = feed_client_instance
+
+        runner = CliRunner(env={"NUGET_PATH": None, "NUGET_API_KEY": None})
+        with runner.isolated_filesystem():
+            os.mkdir("Output")
+            create_empty_file("Output/First.1.0.0.nupkg")
+            create_empty_file("Output/Second.1.0.0.nupkg")
+            create_empty_file("Output/Other.1.0.0.nupkg")
+            result = runner.invoke(cli.ugetcli, ['push', '--path', 'Output/*.0.0.nupkg', '--feed',
+                                                 'http://test.com/feed', '--engine', 'native', '--jobs', '2'], obj={})
+
+        assert result.exit_code == 0, result
+        assert sorted(c[0][0] for c in feed_client_instance.push.call_args_list) == [
+            os.path.join("Output", "First.1.0.0.nupkg"), os.path.join("Output", "Other.1.0.0.nupkg"),
+            os.path.join("Output", "Second.1.0.0.nupkg")]
+        assert "3 pushed, 0 skipped, 0 failed" in result.output
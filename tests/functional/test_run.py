@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Functional tests for `ugetcli` package - `run` command.
+Tests functionality of the cli run command with various options.
+"""
+
+import os
+import unittest
+from click.testing import CliRunner
+from mock import MagicMock, patch
+
+from ugetcli import cli
+
+SOLUTION = u"""
+Microsoft Visual Studio Solution File, Format Version 12.00
+Project("{FAE04EC0-301F-11D3-BF4B-00C04F79EFBC}") = "Core", "Core\\\\Core.csproj", "{11111111-1111-1111-1111-111111111111}"
+EndProject
+Project("{FAE04EC0-301F-11D3-BF4B-00C04F79EFBC}") = "Ui", "Ui\\\\Ui.csproj", "{22222222-2222-2222-2222-222222222222}"
+EndProject
+Project("{FAE04EC0-301F-11D3-BF4B-00C04F79EFBC}") = "Game", "Game\\\\Game.csproj", "{33333333-3333-3333-3333-333333333333}"
+EndProject
+"""
+
+CSPROJ = """<Project Sdk="Microsoft.NET.Sdk">
+  <ItemGroup>
+    {0}
+  </ItemGroup>
+</Project>
+"""
+
+
+class TestUGetCliRun(unittest.TestCase):
+    """Functional Tests for `ugetcli` package - `run` command."""
+
+    @patch('ugetcli.msbuild.MsBuildRunner')
+    def test_cli_uget_run(self, msbuild_runner_mock):
+        """Test cli: uget run builds projects in dependency order and skips dependents of failed projects"""
+        built = []
+
+        def build(project_path, configuration, rebuild):
+            built.append(os.path.basename(project_path))
+            print("Building " + os.path.basename(project_path))
+            return 1 if project_path.endswith("Core.csproj") else 0
+
+        msbuild_runner_instance = MagicMock()
+        msbuild_runner_instance.build.side_effect = build
+        msbuild_runner_mock.return_value = msbuild_runner_instance
+        msbuild_runner_mock.locate_msbuild.return_value = 'msbuild'
+
+        runner = CliRunner()
+        with runner.isolated_filesystem():
+            for name, reference in (("Core", ""), ("Ui", '<ProjectReference Include="..\\Core\\Core.csproj" />'),
+                                    ("Game", "")):
+                os.makedirs(name)
+                with open(os.path.join(name, name + ".csproj"), "w") as f:
+                    f.write(CSPROJ.format(reference))
+            with open("Game.sln", "w") as f:
+                f.write(SOLUTION)
+
+            result = runner.invoke(cli.ugetcli, ['run', '--solution', 'Game.sln', '--steps', 'build', '-j', '1'],
+                                   obj={})
+            assert result.exit_code == 1, result
+            assert built == ["Core.csproj", "Game.csproj"]
+            assert result.output.splitlines()[:-1] == [
+                "Running build for 3 projects, 1 at a time",
+                "[1/3] failed  Core: build failed with exit code 1",
+                "    Building Core.csproj",
+                "[2/3] skipped Ui: Core.csproj failed",
+                result.output.splitlines()[4],
+            ]
+            assert result.output.splitlines()[4].startswith("[3/3] ok      Game (")
+            assert result.output.splitlines()[-1].startswith("1 succeeded, 1 failed, 1 skipped in ")
+            assert msbuild_runner_instance.build.call_args[0][1] == "Release"
+
+    def test_cli_uget_run_invalid_steps(self):
+        """Test cli: uget run with unknown steps"""
+        runner = CliRunner()
+        with runner.isolated_filesystem():
+            with open("Game.sln", "w") as f:
+                f.write(SOLUTION)
+            result = runner.invoke(cli.ugetcli, ['run', '--solution', 'Game.sln', '--steps', 'build,deploy'], obj={})
+            assert result.exit_code == 2, result
+            assert "Steps must be any of build, create, pack, push" in result.output
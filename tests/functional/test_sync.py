@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Functional tests for `ugetcli` package - `sync` command.
+Tests functionality of the cli sync command with various options.
+"""
+
+import os
+import unittest
+from click.testing import CliRunner
+
+from ugetcli import cli
+from tests.helpers import write_file
+
+
+class TestUGetCliSync(unittest.TestCase):
+    """Functional Tests for `ugetcli` package - `sync` command."""
+
+    def test_cli_uget_sync(self):
+        """Test cli: uget sync with --dry-run and --delete"""
+        runner = CliRunner()
+        with runner.isolated_filesystem():
+            write_file("Assets/MyProject/Editor/MyEditor.cs", "editor")
+            write_file("UnityProject/Assets/MyProject/Old.cs", "old")
+
+            result = runner.invoke(cli.ugetcli, ['sync', 'Assets', 'UnityProject/Assets', '--delete', '--dry-run'],
+                                   obj={})
+            assert result.exit_code == 0, result
+            lines = result.output.splitlines()
+            assert lines[:-1] == [
+                "delete MyProject/Old.cs",
+                "mkdir  MyProject/Editor",
+                "copy   MyProject/Editor/MyEditor.cs (6 bytes)",
+            ]
+            assert lines[-1].startswith("1 copied, 0 updated, 1 deleted, 1 directories created, 0 unchanged, 6 bytes")
+            assert not os.path.exists("UnityProject/Assets/MyProject/Editor")
+
+            result = runner.invoke(cli.ugetcli, ['sync', 'Assets', 'UnityProject/Assets', '--delete'], obj={})
+            assert result.exit_code == 0, result
+            assert os.path.isfile("UnityProject/Assets/MyProject/Editor/MyEditor.cs")
+            assert not os.path.exists("UnityProject/Assets/MyProject/Old.cs")
+
+            result = runner.invoke(cli.ugetcli, ['sync', 'Assets', 'UnityProject/Assets'], obj={})
+            assert result.exit_code == 0, result
+            assert "0 copied, 0 updated, 0 deleted, 0 directories created, 1 unchanged" in result.output
@@ -0,0 +1,33 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+File helpers shared by tests.
+"""
+import os
+
+
+def write_file(path, data, mtime=None):
+    """
+    Writes text or bytes to the file, creating its directory if needed
+    :param path: File path
+    :param data: File content, str or bytes
+    :param mtime: Optional modification time to set
+    """
+    directory = os.path.dirname(path)
+    if directory and not os.path.isdir(directory):
+        os.makedirs(directory)
+    with open(path, "wb" if isinstance(data, bytes) else "w") as f:
+        f.write(data)
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+def read_file(path):
+    """
+    Reads file content
+    :param path: File path
+    :return: File content, bytes
+    """
+    with open(path, "rb") as f:
+        return f.read()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Integration tests for `ugetcli` package - `buildcache` module.
+Tests functionality of the local content-addressed cache of .unitypackage files
+"""
+import unittest
+import os
+import time
+
+from ugetcli.utils import temp_dir
+from ugetcli.buildcache import BuildCache, parse_size, format_size
+from tests.helpers import write_file, read_file
+
+
+class TestUGetCliBuildCache(unittest.TestCase):
+    """Tests for `ugetcli` package - `buildcache` module"""
+
+    def test_compute_key(self):
+        """Test BuildCache.compute_key - key depends on input names, digests and options, but not on their order"""
+        inputs = [("./MyProject.dll", "a"), ("./MyProject.pdb", "b")]
+        key = BuildCache.compute_key(inputs, {"engine": "native"})
+        assert key == BuildCache.compute_key(list(reversed(inputs)), {"engine": "native"})
+        assert key != BuildCache.compute_key(inputs, {"engine": "upackage"})
+        assert key != BuildCache.compute_key([("./MyProject.dll", "c"), ("./MyProject.pdb", "b")], {"engine": "native"})
+        assert key != BuildCache.compute_key([("./Other.dll", "a"), ("./MyProject.pdb", "b")], {"engine": "native"})
+
+    def test_put_get(self):
+        """Test BuildCache.get - cached artifact is materialized into output path, hits and misses are counted"""
+        with temp_dir() as tmp_root_dir:
+            cache = BuildCache(os.path.join(tmp_root_dir, "cache"), max_size=0)
+            artifact_path = os.path.join(tmp_root_dir, "MyProject.unitypackage")
+            output_path = os.path.join(tmp_root_dir, "Output.unitypackage")
+            write_file(artifact_path, b"package")
+
+            assert not cache.get("ab" * 32, output_path)
+            cache.put("ab" * 32, artifact_path)
+            assert cache.get("ab" * 32, output_path)
+            assert read_file(output_path) == b"package"
+
+            stats = cache.stats()
+            assert stats["entries"] == 1
+            assert stats["size"] == len(b"package")
+            assert stats["hits"] == 1
+            assert stats["misses"] == 1
+
+    def test_prune_least_recently_used(self):
+        """Test BuildCache.prune - least recently used artifacts are evicted first"""
+        with temp_dir() as tmp_root_dir:
+            cache = BuildCache(os.path.join(tmp_root_dir, "cache"), max_size=0)
+            for key in ("aa" * 32, "bb" * 32, "cc" * 32):
+                artifact_path = os.path.join(tmp_root_dir, key + ".unitypackage")
+                write_file(artifact_path, b"x" * 100)
+                cache.put(key, artifact_path)
+            now = time.time()
+            os.utime(cache._get_artifact_path("aa" * 32), (now - 30, now - 30))
+            os.utime(cache._get_artifact_path("bb" * 32), (now - 20, now - 20))
+            os.utime(cache._get_artifact_path("cc" * 32), (now - 10, now - 10))
+            cache.get("aa" * 32, os.path.join(tmp_root_dir, "Output.unitypackage"))  # Most recently used now
+
+            assert cache.prune(200) == (1, 100)
+            assert os.path.isfile(cache._get_artifact_path("aa" * 32))
+            assert not os.path.isfile(cache._get_artifact_path("bb" * 32))
+            assert os.path.isfile(cache._get_artifact_path("cc" * 32))
+            assert cache.prune(0) == (2, 200)
+            assert cache.stats()["entries"] == 0
+
+    def test_put_prunes_to_max_size(self):
+        """Test BuildCache.put - cache is pruned to its size limit after storing an artifact"""
+        with temp_dir() as tmp_root_dir:
+            cache = BuildCache(os.path.join(tmp_root_dir, "cache"), max_size=150)
+            for key in ("aa" * 32, "bb" * 32):
+                write_file(os.path.join(tmp_root_dir, key + ".unitypackage"), b"x" * 100)
+            cache.put("aa" * 32, os.path.join(tmp_root_dir, "aa" * 32 + ".unitypackage"))
+            os.utime(cache._get_artifact_path("aa" * 32), (1000000000, 1000000000))
+            cache.put("bb" * 32, os.path.join(tmp_root_dir, "bb" * 32 + ".unitypackage"))
+            assert cache.stats()["entries"] == 1
+            assert os.path.isfile(cache._get_artifact_path("bb" * 32))
+
+    def test_parse_size(self):
+        """Test parse_size and format_size"""
+        assert parse_size("0") == 0
+        assert parse_size("512") == 512
+        assert parse_size("10K") == 10 * 1024
+        assert parse_size("1.5g") == int(1.5 * 1024 ** 3)
+        assert parse_size("500MB") == 500 * 1024 ** 2
+        self.assertRaises(ValueError, parse_size, "many")
+        assert format_size(512) == "512 B"
+        assert format_size(1536) == "1.5 KB"
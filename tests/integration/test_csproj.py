@@ -8,6 +8,8 @@ Tests functionality of the .csproj reader integration
 import unittest
 import os
 import shutil
+import xml.etree.ElementTree as ET
+from mock import patch
 
 from ugetcli.utils import create_empty_file, temp_dir
 from ugetcli.csproj import CsProj
@@ -71,3 +73,38 @@ class TestUGetCliCsproj(unittest.TestCase):
             shutil.copytree(get_fixture_dir(), csproj_root)
             csproj = CsProj(os.path.join(csproj_root, _TEST_CSPROJ))
             assert csproj.get_assembly_version() == "1.2.3"
+
+    def test_csproj_parses_file_once(self):
+        """Test CsProj - project file is parsed once for all queries"""
+        with temp_dir() as tmp_root_dir:
+            csproj_root = os.path.join(tmp_root_dir, "test")
+            shutil.copytree(get_fixture_dir(), csproj_root)
+            csproj = CsProj(os.path.join(csproj_root, _TEST_CSPROJ))
+            with patch('ugetcli.msbuildeval.ET.iterparse', side_effect=ET.iterparse) as iterparse_mock:
+                assert csproj.get_assembly_name() == "MyProject"
+                assert csproj.get_output_path("Debug") == "bin/Debug/"
+                assert csproj.get_output_path("Release") == "bin/Release/"
+                assert csproj.get_assembly_name() == "MyProject"
+                assert iterparse_mock.call_count == 1
+
+    def test_csproj_stops_reading_when_properties_found(self):
+        """Test CsProj - stops streaming the project file once requested properties are read"""
+        with temp_dir() as tmp_root_dir:
+            csproj_path = os.path.join(tmp_root_dir, _TEST_CSPROJ)
+            with open(csproj_path, "w") as f:
+                # Everything after the first PropertyGroup is malformed and must never be read
+                f.write('<Project xmlns="http://schemas.microsoft.com/developer/msbuild/2003">'
+                        '<PropertyGroup><AssemblyName>MyProject</AssemblyName></PropertyGroup>'
+                        '<ItemGroup><Compile Include="Class1.cs"></ItemGroup>')
+            csproj = CsProj(csproj_path)
+            assert csproj.get_assembly_name() == "MyProject"
+
+    def test_csproj_get_assembly_name_sdk_style(self):
+        """Test CsProj.get_assembly_name - supports projects without msbuild xml namespace"""
+        with temp_dir() as tmp_root_dir:
+            csproj_path = os.path.join(tmp_root_dir, _TEST_CSPROJ)
+            with open(csproj_path, "w") as f:
+                f.write('<Project Sdk="Microsoft.NET.Sdk"><PropertyGroup>'
+                        '<AssemblyName>MySdkProject</AssemblyName></PropertyGroup></Project>')
+            csproj = CsProj(csproj_path)
+            assert csproj.get_assembly_name() == "MySdkProject"
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Integration tests for `ugetcli` package - `discovery` module.
+Tests project discovery and directory listing cache
+"""
+import unittest
+import os
+
+from ugetcli.utils import temp_dir, create_empty_file
+from ugetcli.discovery import ProjectDiscovery
+
+
+def create_files(root_dir, relative_paths):
+    for relative_path in relative_paths:
+        path = os.path.join(root_dir, *relative_path.split("/"))
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        create_empty_file(path)
+
+
+def set_directory_mtimes(root_dir, mtime):
+    """ Moves directory modification times to the past, so cached listings are trusted """
+    for dirpath, dirnames, filenames in os.walk(root_dir):
+        os.utime(dirpath, (mtime, mtime))
+
+
+class TestUGetCliDiscovery(unittest.TestCase):
+    """Tests for `ugetcli` package - `discovery` module"""
+
+    def test_discovery_discover(self):
+        """Test ProjectDiscovery.discover finds projects, nuspecs and solutions and honours ignore patterns"""
+        with temp_dir() as tmp_root_dir:
+            root_dir = os.path.join(tmp_root_dir, "repo")
+            create_files(root_dir, [
+                "All.sln",
+                "src/Core/Core.csproj",
+                "src/Core/Core.nuspec",
+                "src/Core/Core.cs",
+                "src/Core/bin/Release/Generated.csproj",
+                "src/Core/obj/Core.csproj.nuget.g.props",
+                "src/Tools/Deep/Nested/Tools.CSPROJ",
+                "UnityProject/Library/PackageCache/Package.csproj",
+                "UnityProject/Assets/Plugins/Plugin.nuspec",
+                ".git/Hooks.csproj",
+                "vendor/Vendor.csproj",
+            ])
+
+            for jobs in (1, 4):
+                discovery = ProjectDiscovery(jobs, ignore_patterns=["bin", "obj", "Library", ".git", "vendor/"],
+                                             cache_dir=os.path.join(tmp_root_dir, "cache"), use_cache=False)
+                result = discovery.discover(root_dir)
+                assert result.projects == [
+                    os.path.join(root_dir, "src", "Core", "Core.csproj"),
+                    os.path.join(root_dir, "src", "Tools", "Deep", "Nested", "Tools.CSPROJ"),
+                ]
+                assert result.nuspecs == [
+                    os.path.join(root_dir, "UnityProject", "Assets", "Plugins", "Plugin.nuspec"),
+                    os.path.join(root_dir, "src", "Core", "Core.nuspec"),
+                ]
+                assert result.solutions == [os.path.join(root_dir, "All.sln")]
+                assert result.directories == result.listed == 9
+
+    def test_discovery_discover_cached(self):
+        """Test ProjectDiscovery.discover lists only directories that changed since the previous discovery"""
+        with temp_dir() as tmp_root_dir:
+            root_dir = os.path.join(tmp_root_dir, "repo")
+            cache_dir = os.path.join(tmp_root_dir, "cache")
+            create_files(root_dir, ["src/A/A.csproj", "src/B/B.csproj", "src/B/obj/Generated.csproj"])
+            set_directory_mtimes(root_dir, 1000)
+
+            result = ProjectDiscovery(cache_dir=cache_dir).discover(root_dir)
+            assert len(result.projects) == 2
+            assert result.listed == result.directories == 4
+
+            result = ProjectDiscovery(cache_dir=cache_dir).discover(root_dir)
+            assert len(result.projects) == 2
+            assert result.listed == 0
+
+            # Adding file changes modification time of its directory only
+            create_files(root_dir, ["src/B/B.nuspec"])
+            result = ProjectDiscovery(cache_dir=cache_dir).discover(root_dir)
+            assert result.nuspecs == [os.path.join(root_dir, "src", "B", "B.nuspec")]
+            assert result.listed == 1
+
+            # Directories that were ignored before are listed once ignore patterns change
+            set_directory_mtimes(root_dir, 1000)
+            result = ProjectDiscovery(cache_dir=cache_dir, ignore_patterns=[]).discover(root_dir)
+            assert result.projects[-1] == os.path.join(root_dir, "src", "B", "obj", "Generated.csproj")
+            assert result.listed == 2  # src/B (modification time changed) and src/B/obj
+
+            # Modification time too recent to be trusted
+            os.utime(os.path.join(root_dir, "src", "A"), None)
+            result = ProjectDiscovery(cache_dir=cache_dir).discover(root_dir)
+            assert result.listed == 1
+
+            ProjectDiscovery(cache_dir=cache_dir).clear()
+            result = ProjectDiscovery(cache_dir=cache_dir).discover(root_dir)
+            assert result.listed == result.directories
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Integration tests for `ugetcli` package - `fastcopy` module.
+Tests kernel file copies and their fallbacks
+"""
+import unittest
+import io
+import os
+import sys
+import stat
+import errno
+from mock import patch
+
+from ugetcli.utils import temp_dir
+from ugetcli import fastcopy
+from tests.helpers import write_file, read_file
+
+
+class TestUGetCliFastCopy(unittest.TestCase):
+    """Tests for `ugetcli` package - `fastcopy` module"""
+
+    def test_fastcopy_copy_file(self):
+        """Test fastcopy.copy_file - copies content and permission bits, replacing destination """
+        with temp_dir() as tmp_dir:
+            src = os.path.join(tmp_dir, "MyProject.dll")
+            dst = os.path.join(tmp_dir, "Assets", "MyProject.dll")
+            os.makedirs(os.path.dirname(dst))
+            data = os.urandom(3 * 1024 * 1024 + 7)
+            write_file(src, data)
+            os.chmod(src, 0o750)
+            write_file(dst, b"old assembly")
+
+            method = fastcopy.copy_file(src, dst)
+
+            assert method in (fastcopy.REFLINK, fastcopy.COPY_FILE_RANGE, fastcopy.SENDFILE, fastcopy.BUFFERED)
+            assert read_file(dst) == data
+            assert stat.S_IMODE(os.stat(dst).st_mode) == 0o750
+            assert os.listdir(os.path.dirname(dst)) == ["MyProject.dll"]
+
+    def test_fastcopy_copy_file_link(self):
+        """Test fastcopy.copy_file - hardlinks if requested, and never writes into hardlinked destination """
+        with temp_dir() as tmp_dir:
+            src = os.path.join(tmp_dir, "MyProject.unitypackage")
+            dst = os.path.join(tmp_dir, "Cached.unitypackage")
+            write_file(src, b"package")
+
+            assert fastcopy.copy_file(src, dst, link=True) == fastcopy.HARDLINK
+            assert os.path.samefile(src, dst)
+
+            other = os.path.join(tmp_dir, "Other.unitypackage")
+            write_file(other, b"other package")
+            fastcopy.copy_file(other, dst)
+            assert read_file(dst) == b"other package"
+            assert read_file(src) == b"package"
+
+    def test_fastcopy_copy_range(self):
+        """Test fastcopy.copy_range - copies from and to current positions of buffered files """
+        with temp_dir() as tmp_dir:
+            src = os.path.join(tmp_dir, "source")
+            dst = os.path.join(tmp_dir, "target")
+            data = os.urandom(2 * 1024 * 1024)
+            write_file(src, data)
+
+            with open(src, "rb") as source, open(dst, "wb") as target:
+                source.seek(100)
+                target.write(b"header")  # Still in the write buffer
+                fastcopy.copy_range(source, target, 1000)
+                target.write(b"footer")
+                assert source.tell() == 1100
+                with self.assertRaises(IOError):
+                    source.seek(len(data) - 10)
+                    fastcopy.copy_range(source, target, 20)
+
+            assert read_file(dst)[:1012] == b"header" + data[100:1100] + b"footer"
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "sendfile to a regular file is only supported on Linux")
+    def test_fastcopy_copy_range_sendfile(self):
+        """Test fastcopy.copy_range - falls back to sendfile if copy_file_range is not supported """
+        with temp_dir() as tmp_dir:
+            src = os.path.join(tmp_dir, "source")
+            dst = os.path.join(tmp_dir, "target")
+            write_file(src, b"0123456789")
+            with patch("os.copy_file_range", side_effect=OSError(errno.EXDEV, "cross-device"), create=True):
+                with open(src, "rb") as source, open(dst, "wb") as target:
+                    target.write(b"ab")
+                    assert fastcopy.copy_range(source, target, 10) == fastcopy.SENDFILE
+                    target.write(b"yz")
+            assert read_file(dst) == b"ab0123456789yz"
+
+    def test_fastcopy_copy_range_in_memory(self):
+        """Test fastcopy.copy_range - falls back to buffered copy for in-memory files """
+        source, target = io.BytesIO(b"0123456789"), io.BytesIO()
+        source.seek(2)
+        assert fastcopy.copy_range(source, target, 5) == fastcopy.BUFFERED
+        assert target.getvalue() == b"23456"
+
+    def test_fastcopy_stats(self):
+        """Test fastcopy.TransferStats - formats throughput per method """
+        stats = fastcopy.TransferStats()
+        stats.add(fastcopy.SENDFILE, 4 * 1024 * 1024, 2.0)
+        stats.add(fastcopy.SENDFILE, 4 * 1024 * 1024, 2.0)
+        assert stats.format() == ["sendfile: 8.0 MB in 4.000 s (2.0 MB/s)"]
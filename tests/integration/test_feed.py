@@ -0,0 +1,262 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Integration tests for `ugetcli` package - `feed` module.
+Tests functionality of the native NuGet feed client against local stand-in feed
+"""
+import unittest
+import os
+import socket
+import zipfile
+
+from ugetcli.utils import temp_dir
+from ugetcli.feed import NuGetFeedClient, ConnectionPool, push_packages, push_result_ok, format_push_summary, \
+    read_package_identity
+from tests.feed_server import FeedServer
+
+_NUSPEC = """<?xml version="1.0"?>
+<package xmlns="http://schemas.microsoft.com/packaging/2013/05/nuspec.xsd">
+  <metadata>
+    <id>{id}</id>
+    <version>{version}</version>
+  </metadata>
+</package>
+"""
+
+
+def create_nupkg(directory, package_id, version, payload_size=1024):
+    path = os.path.join(directory, "{0}.{1}.nupkg".format(package_id, version))
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr(package_id + ".nuspec", _NUSPEC.format(id=package_id, version=version))
+        archive.writestr("content/payload.bin", os.urandom(payload_size))
+    return path
+
+
+class TestUGetCliNuGetFeedClient(unittest.TestCase):
+    """Tests for `ugetcli` package - `feed` module"""
+
+    def test_feed_client_push_v2(self):
+        """Test NuGetFeedClient.push - uploads package to V2 feed """
+        with temp_dir() as tmp_dir, FeedServer(api_key="secret") as server:
+            nupkg_path = create_nupkg(tmp_dir, "MyPackage", "1.0.0", 512 * 1024)
+            client = NuGetFeedClient(server.v2_url, "secret", cache_dir=tmp_dir)
+            result = client.push(nupkg_path)
+            client.close()
+            with open(nupkg_path, "rb") as f:
+                nupkg = f.read()
+
+        assert result.status == 201
+        assert result.succeeded
+        assert result.bytes == len(nupkg)
+        assert result.throughput > 0
+        assert server.packages[("mypackage", "1.0.0")] == nupkg
+        assert server.requests == [("PUT", "/api/v2/")]
+
+    def test_feed_client_push_v2_host_only(self):
+        """Test NuGetFeedClient.get_push_url - feed URL without path pushes to V2 service endpoint """
+        client = NuGetFeedClient("https://nuget.example.com", cache_dir="unused")
+        assert client.get_push_url() == "https://nuget.example.com/api/v2/package/"
+        client = NuGetFeedClient("https://nuget.example.com/nuget/MyFeed", cache_dir="unused")
+        assert client.get_push_url() == "https://nuget.example.com/nuget/MyFeed/"
+
+    def test_feed_client_push_v3(self):
+        """Test NuGetFeedClient.push - discovers publish resource from V3 service index """
+        with temp_dir() as tmp_dir, FeedServer() as server:
+            nupkg_path = create_nupkg(tmp_dir, "MyPackage", "1.0.0")
+            client = NuGetFeedClient(server.v3_url, cache_dir=tmp_dir)
+            assert client.push(nupkg_path).status == 201
+            client.close()
+
+        assert server.requests == [("GET", "/v3/index.json"), ("PUT", "/api/v2/package")]
+
+    def test_feed_client_service_index_cached(self):
+        """Test NuGetFeedClient.get_service_index - service index is cached on disk """
+        with temp_dir() as tmp_dir, FeedServer() as server:
+            first = NuGetFeedClient(server.v3_url, cache_dir=tmp_dir)
+            second = NuGetFeedClient(server.v3_url, cache_dir=tmp_dir)
+            assert first.get_service_index() == second.get_service_index()
+            first.close()
+            second.close()
+
+        assert server.requests == [("GET", "/v3/index.json")]
+
+    def test_feed_client_push_reuses_connection(self):
+        """Test NuGetFeedClient.push - keeps connection alive across packages """
+        with temp_dir() as tmp_dir, FeedServer() as server:
+            pool = ConnectionPool()
+            client = NuGetFeedClient(server.v3_url, connection_pool=pool, cache_dir=tmp_dir)
+            for version in ["1.0.0", "1.0.1", "1.0.2"]:
+                assert client.push(create_nupkg(tmp_dir, "MyPackage", version)).status == 201
+            client.close()
+
+        assert len(server.packages) == 3
+        assert pool.connections_created == 1
+        assert server.connections == 1
+
+    def test_feed_client_push_conflict(self):
+        """Test NuGetFeedClient.push - returns feed response status when package already exists """
+        with temp_dir() as tmp_dir, FeedServer() as server:
+            server.add_package("MyPackage", "1.0.0")
+            client = NuGetFeedClient(server.v2_url, cache_dir=tmp_dir)
+            result = client.push(create_nupkg(tmp_dir, "MyPackage", "1.0.0"))
+            client.close()
+
+        assert result.status == 409
+        assert not result.succeeded
+
+    def test_feed_client_push_unauthorized(self):
+        """Test NuGetFeedClient.push - returns feed response status when api key is invalid """
+        with temp_dir() as tmp_dir, FeedServer(api_key="secret") as server:
+            client = NuGetFeedClient(server.v2_url, "wrong", cache_dir=tmp_dir)
+            result = client.push(create_nupkg(tmp_dir, "MyPackage", "1.0.0"))
+            client.close()
+
+        assert result.status == 403
+        assert not server.packages
+
+    def test_push_packages_concurrently(self):
+        """Test push_packages - uploads packages over a bounded number of connections """
+        with temp_dir() as tmp_dir, FeedServer() as server:
+            nupkg_paths = [create_nupkg(tmp_dir, "Package{0}".format(i), "1.0.0") for i in range(12)]
+            pool = ConnectionPool()
+            client = NuGetFeedClient(server.v3_url, connection_pool=pool, cache_dir=tmp_dir)
+            results = push_packages(client, nupkg_paths, jobs=3)
+            client.close()
+
+        assert [result.path for result in results] == nupkg_paths
+        assert all(result.succeeded for result in results)
+        assert len(server.packages) == 12
+        assert pool.connections_created <= 3
+
+    def test_push_packages_retries(self):
+        """Test push_packages - retries server errors with exponential backoff """
+        delays = []
+        with temp_dir() as tmp_dir, FeedServer() as server:
+            server.fail_next = [503, 500]
+            client = NuGetFeedClient(server.v2_url, cache_dir=tmp_dir)
+            results = push_packages(client, [create_nupkg(tmp_dir, "MyPackage", "1.0.0")], retries=3, backoff=0.5,
+                                    sleep=delays.append)
+            client.close()
+
+        assert results[0].succeeded
+        assert results[0].attempts == 3
+        assert delays == [0.5, 1.0]
+
+    def test_push_packages_retries_exhausted(self):
+        """Test push_packages - gives up after configured number of retries """
+        with temp_dir() as tmp_dir, FeedServer() as server:
+            server.fail_next = [503, 503, 503]
+            client = NuGetFeedClient(server.v2_url, cache_dir=tmp_dir)
+            results = push_packages(client, [create_nupkg(tmp_dir, "MyPackage", "1.0.0")], retries=2,
+                                    sleep=lambda delay: None)
+            client.close()
+
+        assert results[0].status == 503
+        assert results[0].attempts == 3
+        assert not server.packages
+
+    def test_push_packages_skip_duplicate(self):
+        """Test push_packages - duplicates are not retried and are reported as skipped """
+        with temp_dir() as tmp_dir, FeedServer() as server:
+            server.add_package("Existing", "1.0.0")
+            nupkg_paths = [create_nupkg(tmp_dir, "Existing", "1.0.0"), create_nupkg(tmp_dir, "New", "1.0.0")]
+            client = NuGetFeedClient(server.v2_url, cache_dir=tmp_dir)
+            results = push_packages(client, nupkg_paths, sleep=lambda delay: None)
+            client.close()
+
+        assert results[0].duplicate
+        assert results[0].attempts == 1
+        assert push_result_ok(results[0], skip_duplicate=True)
+        assert not push_result_ok(results[0], skip_duplicate=False)
+        summary = format_push_summary(results, 1.0, skip_duplicate=True)
+        assert "409 skipped" in summary[1]
+        assert summary[1].split()[-2] == "-"
+        assert "201 pushed" in summary[2]
+        assert summary[-1].startswith("1 pushed, 1 skipped, 0 failed")
+
+    def test_push_packages_feed_unreachable(self):
+        """Test format_push_summary - reports why upload failed and no speed for packages that were not pushed """
+        listener = socket.socket()
+        listener.bind(("127.0.0.1", 0))
+        port = listener.getsockname()[1]
+        listener.close()
+        with temp_dir() as tmp_dir:
+            client = NuGetFeedClient("http://127.0.0.1:{0}/api/v2".format(port), cache_dir=tmp_dir)
+            results = push_packages(client, [create_nupkg(tmp_dir, "MyPackage", "1.0.0")], retries=0)
+            client.close()
+
+        assert results[0].status == 0
+        assert results[0].reason
+        summary = format_push_summary(results, 1.0)
+        assert "failed: " + results[0].reason in summary[1]
+        assert "MB/s" not in summary[1]
+        assert summary[1].split()[-2:] == ["-", "1"]
+        assert summary[-1].startswith("0 pushed, 0 skipped, 1 failed")
+
+    def test_feed_client_package_exists_flat_container(self):
+        """Test NuGetFeedClient.package_exists - lists versions once per package id with flat container """
+        with temp_dir() as tmp_dir, FeedServer() as server:
+            server.add_package("MyPackage", "1.0.0")
+            server.add_package("MyPackage", "1.0.1")
+            client = NuGetFeedClient(server.v3_url, cache_dir=tmp_dir)
+            assert client.package_exists("MyPackage", "1.0.0")
+            assert client.package_exists("mypackage", "1.0.1")
+            assert not client.package_exists("MyPackage", "2.0.0")
+            assert client.package_exists("MyPackage", "1.0.0")
+            assert not client.package_exists("Other", "1.0.0")
+            client.close()
+
+        assert server.requests == [("GET", "/v3/index.json"), ("GET", "/v3/flatcontainer/mypackage/index.json"),
+                                   ("GET", "/v3/flatcontainer/other/index.json")]
+
+    def test_feed_client_package_exists_registration(self):
+        """Test NuGetFeedClient.package_exists - falls back to registration when flat container is not available """
+        with temp_dir() as tmp_dir, FeedServer(flat_container=False) as server:
+            server.add_package("MyPackage", "1.0.0")
+            client = NuGetFeedClient(server.v3_url, cache_dir=tmp_dir)
+            assert client.package_exists("MyPackage", "1.0.0")
+            assert not client.package_exists("MyPackage", "2.0.0")
+            client.close()
+
+        assert ("GET", "/v3/registration/mypackage/1.0.0.json") in server.requests
+
+    def test_feed_client_package_exists_v2(self):
+        """Test NuGetFeedClient.package_exists - queries V2 OData endpoint """
+        with temp_dir() as tmp_dir, FeedServer() as server:
+            server.add_package("MyPackage", "1.0.0")
+            client = NuGetFeedClient(server.v2_url, cache_dir=tmp_dir)
+            assert client.package_exists("MyPackage", "1.0.0")
+            assert not client.package_exists("MyPackage", "2.0.0")
+            client.close()
+
+        assert server.requests == [("GET", "/api/v2/Packages(Id='MyPackage',Version='1.0.0')"),
+                                   ("GET", "/api/v2/Packages(Id='MyPackage',Version='2.0.0')")]
+
+    def test_read_package_identity(self):
+        """Test read_package_identity - reads id and normalized version from package .nuspec """
+        with temp_dir() as tmp_dir:
+            assert read_package_identity(create_nupkg(tmp_dir, "MyPackage", "1.2.3.0")) == ("MyPackage", "1.2.3")
+
+    def test_push_packages_check_existing(self):
+        """Test push_packages - does not upload versions the feed already has """
+        with temp_dir() as tmp_dir, FeedServer() as server:
+            server.add_package("MyPackage", "1.0.0")
+            nupkg_paths = [create_nupkg(tmp_dir, "MyPackage", "1.0.0.0"), create_nupkg(tmp_dir, "MyPackage", "1.0.1"),
+                           create_nupkg(tmp_dir, "Other", "1.0.0")]
+            client = NuGetFeedClient(server.v3_url, cache_dir=tmp_dir)
+            results = push_packages(client, nupkg_paths, check_existing=True)
+            client.close()
+
+        assert results[0].duplicate
+        assert results[0].attempts == 0
+        assert results[1].succeeded
+        assert results[2].succeeded
+        assert [request for request in server.requests if request[0] == "PUT"] == [("PUT", "/api/v2/package")] * 2
+        assert sorted(request for request in server.requests if "flatcontainer" in request[1]) == [
+            ("GET", "/v3/flatcontainer/mypackage/index.json"), ("GET", "/v3/flatcontainer/other/index.json")]
+        assert results[0].existing
+        assert all(push_result_ok(result) for result in results)
+        summary = format_push_summary(results, 1.0)
+        assert "exists, skipped" in summary[1]
+        assert summary[-1].startswith("2 pushed, 1 skipped, 0 failed")
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Integration tests for `ugetcli` package - `inspector` module.
+Tests functionality of the streaming Unity Package inspector
+"""
+import unittest
+import os
+import io
+import gzip
+import tarfile
+import hashlib
+import shutil
+import click
+from mock import patch
+
+from ugetcli.utils import temp_dir
+from ugetcli.unitypackagewriter import UnityPackageWriter
+from ugetcli.inspector import UnityPackageInspector, read_unitypackage_assets
+from tests.helpers import write_file
+
+
+def create_unitypackage(tmp_dir, jobs=1):
+    package_root = os.path.join(tmp_dir, "Assets", "MyProject")
+    write_file(os.path.join(package_root, "MyProject.dll"), os.urandom(300 * 1024))
+    write_file(os.path.join(package_root, "Textures", "icon.png"), b"\x89PNG" * 1000)
+    unitypackage_path = os.path.join(tmp_dir, "MyProject.unitypackage")
+    UnityPackageWriter(jobs=jobs).export_unitypackage(package_root, unitypackage_path)
+    return unitypackage_path
+
+
+def guid(relative_path):
+    return hashlib.md5(relative_path.encode("utf-8")).hexdigest()
+
+
+class TestUGetCliUnityPackageInspector(unittest.TestCase):
+    """Tests for `ugetcli` package - `inspector` module"""
+
+    def test_read_unitypackage_assets(self):
+        """Test read_unitypackage_assets - lists pathname, guid, size and offsets of every asset """
+        with temp_dir() as tmp_dir:
+            for jobs in (1, 2):
+                unitypackage_path = create_unitypackage(tmp_dir, jobs)
+                with open(unitypackage_path, "rb") as f:
+                    assets = read_unitypackage_assets(f)
+
+                assert [(asset.guid, asset.pathname, asset.size) for asset in assets] == [
+                    (guid("./"), "Assets/MyProject", None),
+                    (guid(os.path.join("./", "MyProject.dll")), "Assets/MyProject/MyProject.dll", 300 * 1024),
+                    (guid(os.path.join("./", "Textures")), "Assets/MyProject/Textures", None),
+                    (guid(os.path.join("./", "Textures", "icon.png")), "Assets/MyProject/Textures/icon.png", 4000),
+                ]
+
+                # Offsets point at the asset content in the tar stream and in the compressed file
+                dll = assets[1]
+                with gzip.open(unitypackage_path) as f:
+                    tar_data = f.read()
+                with open(os.path.join(tmp_dir, "Assets", "MyProject", "MyProject.dll"), "rb") as f:
+                    assert tar_data[dll.offset:dll.offset + dll.size] == f.read()
+                file_size = os.path.getsize(unitypackage_path)
+                assert 0 < dll.compressed_offset < file_size
+                assert dll.compressed_size > 300 * 1024 * 0.9  # Random data does not compress
+                assert assets[3].compressed_offset >= dll.compressed_offset + dll.compressed_size
+
+    def test_read_unitypackage_assets_gzip_members(self):
+        """Test read_unitypackage_assets - archive split into multiple gzip members, with pax headers """
+        tar_buffer = io.BytesIO()
+        with tarfile.open(fileobj=tar_buffer, mode="w", format=tarfile.PAX_FORMAT) as tar:
+            for asset_guid, pathname, data in (("a" * 32, u"Assets/Ünïcode.txt", b"x" * 100000),
+                                               ("b" * 32, "Assets/" + "Long" * 40 + ".txt", b"y")):
+                for name, content in (("asset", data), ("pathname", pathname.encode("utf-8") + b"\n00")):
+                    info = tarfile.TarInfo(asset_guid + "/" + name)
+                    info.size = len(content)
+                    tar.addfile(info, io.BytesIO(content))
+        tar_data = tar_buffer.getvalue()
+        package = b"".join(gzip.compress(tar_data[i:i + 7000]) for i in range(0, len(tar_data), 7000))
+
+        assets = read_unitypackage_assets(io.BytesIO(package))
+        assert [(asset.pathname, asset.size) for asset in assets] == [
+            (u"Assets/Ünïcode.txt", 100000), ("Assets/" + "Long" * 40 + ".txt", 1)]
+        assert tar_data[assets[1].offset:assets[1].offset + 1] == b"y"
+
+    def test_inspector_index(self):
+        """Test UnityPackageInspector.inspect - result is read from the index for the same package content """
+        with temp_dir() as tmp_dir:
+            unitypackage_path = create_unitypackage(tmp_dir)
+            copy_path = os.path.join(tmp_dir, "Copy.unitypackage")
+            shutil.copyfile(unitypackage_path, copy_path)
+            cache_dir = os.path.join(tmp_dir, "cache")
+            assets = UnityPackageInspector(cache_dir).inspect(unitypackage_path)
+
+            with patch("ugetcli.inspector.read_unitypackage_assets") as read_mock:
+                assert UnityPackageInspector(cache_dir).inspect_many([unitypackage_path, copy_path]) == \
+                    [(unitypackage_path, assets), (copy_path, assets)]
+                read_mock.assert_not_called()
+            assert len(os.listdir(os.path.join(cache_dir, "inspect"))) == 1
+
+    def test_inspector_invalid_package(self):
+        """Test UnityPackageInspector.inspect - invalid archive is reported as usage error """
+        with temp_dir() as tmp_dir:
+            unitypackage_path = os.path.join(tmp_dir, "Broken.unitypackage")
+            write_file(unitypackage_path, b"not a package")
+            self.assertRaises(click.UsageError, UnityPackageInspector(use_index=False).inspect, unitypackage_path)
@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Integration tests for `ugetcli` package - `metadata` module.
+Tests functionality of the persistent project metadata index
+"""
+import unittest
+import os
+import shutil
+from mock import MagicMock, patch
+
+from ugetcli.utils import temp_dir
+from ugetcli.metadata import MetadataIndex, FileDigestCache
+from ugetcli.csproj import CsProj
+from ugetcli.nuspec import NuSpec
+from tests.helpers import write_file
+
+_CSPROJ_FIXTURE_DIR = "_fixtures/csproj/test_csproj/"
+_NUSPEC_FIXTURE_DIR = "_fixtures/nuspec/test_nuspec/"
+
+
+def get_fixture_dir(fixture_dir):
+    return os.path.normpath(os.path.join(os.path.dirname(os.path.realpath(__file__)), fixture_dir))
+
+
+class TestUGetCliMetadataIndex(unittest.TestCase):
+    """Tests for `ugetcli` package - `metadata` module"""
+
+    def test_metadata_index_reused_across_instances(self):
+        """Test MetadataIndex.get - value is computed once and reused by another process"""
+        with temp_dir() as tmp_root_dir:
+            input_path = os.path.join(tmp_root_dir, "Project.csproj")
+            write_file(input_path, "<Project/>")
+            compute = MagicMock(return_value="MyProject")
+            cache_dir = os.path.join(tmp_root_dir, "cache")
+            assert MetadataIndex(cache_dir).get([input_path], "assembly_name", compute) == "MyProject"
+            assert MetadataIndex(cache_dir).get([input_path], "assembly_name", compute) == "MyProject"
+            compute.assert_called_once()
+
+    def test_metadata_index_merges_concurrent_saves(self):
+        """Test MetadataIndex.get - entries recorded by concurrent processes are all kept"""
+        with temp_dir() as tmp_root_dir:
+            first_path = os.path.join(tmp_root_dir, "First.csproj")
+            second_path = os.path.join(tmp_root_dir, "Second.csproj")
+            write_file(first_path, "<Project/>")
+            write_file(second_path, "<Project/>")
+            cache_dir = os.path.join(tmp_root_dir, "cache")
+            first_index, second_index = MetadataIndex(cache_dir), MetadataIndex(cache_dir)
+            first_index.get([first_path], "assembly_name", lambda: "First")
+            second_index.get([second_path], "assembly_name", lambda: "Second")  # Loaded before first one saved
+            first_index.get([first_path], "version", lambda: "1.0.0")
+
+            compute = MagicMock()
+            index = MetadataIndex(cache_dir)
+            assert index.get([first_path], "assembly_name", compute) == "First"
+            assert index.get([first_path], "version", compute) == "1.0.0"
+            assert index.get([second_path], "assembly_name", compute) == "Second"
+            compute.assert_not_called()
+
+    def test_metadata_index_invalidated_when_input_changes_within_same_mtime(self):
+        """Test MetadataIndex.get - same size and modification time, but different content invalidates entry"""
+        with temp_dir() as tmp_root_dir:
+            input_path = os.path.join(tmp_root_dir, "AssemblyInfo.cs")
+            write_file(input_path, "1.0.0")
+            stat = os.stat(input_path)
+            index = MetadataIndex(os.path.join(tmp_root_dir, "cache"))
+            assert index.get([input_path], "version", lambda: "1.0.0") == "1.0.0"
+            write_file(input_path, "1.0.1")
+            os.utime(input_path, (stat.st_atime, stat.st_mtime))
+            assert MetadataIndex(index.cache_dir).get([input_path], "version", lambda: "1.0.1") == "1.0.1"
+
+    def test_metadata_index_invalidated_when_input_created(self):
+        """Test MetadataIndex.get - entry is invalidated when previously missing input file is created"""
+        with temp_dir() as tmp_root_dir:
+            input_path = os.path.join(tmp_root_dir, "Project.csproj")
+            missing_path = os.path.join(tmp_root_dir, "AssemblyInfo.cs")
+            write_file(input_path, "<Project/>")
+            index = MetadataIndex(os.path.join(tmp_root_dir, "cache"))
+            assert index.get([input_path, missing_path], "version", lambda: None) is None
+            write_file(missing_path, "1.0.0")
+            assert index.get([input_path, missing_path], "version", lambda: "1.0.0") == "1.0.0"
+
+    def test_csproj_with_metadata_index(self):
+        """Test CsProj - metadata is served from index and refreshed when AssemblyInfo.cs changes"""
+        with temp_dir() as tmp_root_dir:
+            csproj_root = os.path.join(tmp_root_dir, "test")
+            shutil.copytree(get_fixture_dir(_CSPROJ_FIXTURE_DIR), csproj_root)
+            cache_dir = os.path.join(tmp_root_dir, "cache")
+
+            csproj = CsProj(csproj_root)
+            csproj.set_metadata_index(MetadataIndex(cache_dir))
+            assert csproj.get_assembly_name() == "MyProject"
+            assert csproj.get_assembly_version() == "1.2.3"
+            assert csproj.get_output_path("Release") == "bin/Release/"
+
+            write_file(os.path.join(csproj_root, "Properties", "AssemblyInfo.cs"),
+                       '[assembly: AssemblyVersion("2.0.0")]')
+            csproj = CsProj(csproj_root)
+            csproj.set_metadata_index(MetadataIndex(cache_dir))
+            assert csproj.get_assembly_version() == "2.0.0"
+            assert csproj.get_assembly_name() == "MyProject"
+
+    def test_nuspec_with_metadata_index(self):
+        """Test NuSpec - metadata is served from index"""
+        with temp_dir() as tmp_root_dir:
+            nuspec_root = os.path.join(tmp_root_dir, "test")
+            shutil.copytree(get_fixture_dir(_NUSPEC_FIXTURE_DIR), nuspec_root)
+            cache_dir = os.path.join(tmp_root_dir, "cache")
+            for _ in range(2):
+                nuspec = NuSpec(nuspec_root)
+                nuspec.set_metadata_index(MetadataIndex(cache_dir))
+                assert nuspec.get_package_id() == "MyProject"
+                assert nuspec.get_package_version() == "1.0.0"
+
+    def test_file_digest_cache_reused_across_instances(self):
+        """Test FileDigestCache.get_digest - digest of unchanged file is not recomputed"""
+        with temp_dir() as tmp_root_dir:
+            input_path = os.path.join(tmp_root_dir, "MyProject.dll")
+            write_file(input_path, "assembly")
+            os.utime(input_path, (1000000000, 1000000000))
+            cache = FileDigestCache(os.path.join(tmp_root_dir, "cache"))
+            digest = cache.get_digest(input_path)
+            cache.save()
+            with patch("ugetcli.metadata._hash_file") as hash_file_mock:
+                assert FileDigestCache(cache.cache_dir).get_digest(input_path) == digest
+                hash_file_mock.assert_not_called()
+
+    def test_file_digest_cache_merges_concurrent_saves(self):
+        """Test FileDigestCache.save - digests recorded by concurrent processes are all kept"""
+        with temp_dir() as tmp_root_dir:
+            cache_dir = os.path.join(tmp_root_dir, "cache")
+            caches = [FileDigestCache(cache_dir), FileDigestCache(cache_dir)]
+            paths = [os.path.join(tmp_root_dir, name) for name in ("First.dll", "Second.dll")]
+            for cache, path in zip(caches, paths):
+                write_file(path, path)
+                os.utime(path, (1000000000, 1000000000))
+                cache.get_digest(path)
+            for cache in caches:
+                cache.save()
+
+            with patch("ugetcli.metadata._hash_file") as hash_file_mock:
+                cache = FileDigestCache(cache_dir)
+                assert [cache.get_digest(path) for path in paths] == [caches[0].get_digest(paths[0]),
+                                                                      caches[1].get_digest(paths[1])]
+                hash_file_mock.assert_not_called()
+
+    def test_file_digest_cache_invalidated_when_file_changes(self):
+        """Test FileDigestCache.get_digest - digest is recomputed when file size or modification time changes"""
+        with temp_dir() as tmp_root_dir:
+            input_path = os.path.join(tmp_root_dir, "MyProject.dll")
+            write_file(input_path, "assembly")
+            os.utime(input_path, (1000000000, 1000000000))
+            cache = FileDigestCache(os.path.join(tmp_root_dir, "cache"))
+            digest = cache.get_digest(input_path)
+            write_file(input_path, "assembly 2")
+            assert cache.get_digest(input_path) != digest
+            assert cache.get_digest(os.path.join(tmp_root_dir, "Missing.dll")) is None
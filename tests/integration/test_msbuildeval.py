@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Integration tests for `ugetcli` package - `msbuildeval` module.
+Tests functionality of the in-process MSBuild property evaluator
+"""
+import unittest
+import os
+from mock import patch
+
+from ugetcli.utils import temp_dir
+from ugetcli.msbuildeval import ProjectEvaluator
+from ugetcli.metadata import MetadataIndex
+from ugetcli.csproj import CsProj
+from tests.helpers import write_file
+
+_LEGACY_CSPROJ = """<?xml version="1.0" encoding="utf-8"?>
+<Project ToolsVersion="15.0" xmlns="http://schemas.microsoft.com/developer/msbuild/2003">
+  <PropertyGroup>
+    <Configuration Condition=" '$(Configuration)' == '' ">Debug</Configuration>
+    <Platform Condition=" '$(Platform)' == '' ">AnyCPU</Platform>
+    <AssemblyName>MyProject</AssemblyName>
+  </PropertyGroup>
+  <PropertyGroup Condition=" '$(Configuration)|$(Platform)' == 'Debug|AnyCPU' ">
+    <OutputPath>bin\\Debug\\</OutputPath>
+  </PropertyGroup>
+  <PropertyGroup Condition=" '$(Configuration)|$(Platform)' == 'Release|x64' ">
+    <OutputPath>bin\\x64\\Release\\</OutputPath>
+  </PropertyGroup>
+  <Import Project="$(MSBuildToolsPath)\\Microsoft.CSharp.targets" />
+</Project>
+"""
+
+_SDK_CSPROJ = """<Project Sdk="Microsoft.NET.Sdk">
+  <PropertyGroup>
+    <TargetFramework>netstandard2.0</TargetFramework>
+  </PropertyGroup>
+</Project>
+"""
+
+
+class TestUGetCliMsBuildEval(unittest.TestCase):
+    """Tests for `ugetcli` package - `msbuildeval` module"""
+
+    def setUp(self):
+        ProjectEvaluator.clear_cache()
+
+    def test_evaluate_condition(self):
+        """Test ProjectEvaluator.evaluate_condition - supported expressions """
+        with temp_dir() as tmp_root_dir:
+            project_path = os.path.join(tmp_root_dir, "MyProject.csproj")
+            write_file(project_path, "<Project/>")
+            evaluator = ProjectEvaluator(project_path, {"Configuration": "Release", "Platform": "x64"})
+            evaluator.evaluate()
+            assert evaluator.evaluate_condition("'$(Configuration)|$(Platform)' == 'release|X64'")
+            assert evaluator.evaluate_condition(" '$(Undefined)' == '' ")
+            assert evaluator.evaluate_condition("'$(Configuration)' != 'Debug' and !('$(Platform)' == 'AnyCPU')")
+            assert evaluator.evaluate_condition("'$(Configuration)' == 'Debug' or '$(Platform)' == 'x64'")
+            assert evaluator.evaluate_condition("Exists('MyProject.csproj')")
+            assert not evaluator.evaluate_condition("Exists('$(MSBuildProjectDirectory)/Missing.props')")
+            assert evaluator.evaluate_condition("HasTrailingSlash('bin\\')")
+            assert evaluator.evaluate_condition("'15.0' >= '4'")
+            assert evaluator.evaluate_condition("true")
+            assert not evaluator.evaluate_condition("'unbalanced' == (")
+
+    def test_get_output_path_for_platform(self):
+        """Test CsProj.get_output_path - evaluates conditions for non AnyCPU platforms """
+        with temp_dir() as tmp_root_dir:
+            project_path = os.path.join(tmp_root_dir, "MyProject.csproj")
+            write_file(project_path, _LEGACY_CSPROJ)
+            csproj = CsProj(project_path)
+            assert csproj.get_output_path("Debug") == "bin/Debug/"
+            assert csproj.get_output_path("Release", "x64") == "bin/x64/Release/"
+            assert csproj.get_output_path("Release") is None
+
+    def test_get_output_path_from_directory_build_props(self):
+        """Test CsProj.get_output_path - properties from Directory.Build.props and its imports are evaluated """
+        with temp_dir() as tmp_root_dir:
+            write_file(os.path.join(tmp_root_dir, "Directory.Build.props"),
+                       '<Project><Import Project="build/Common.props" /></Project>')
+            write_file(os.path.join(tmp_root_dir, "build", "Common.props"),
+                       '<Project><PropertyGroup><RepoRoot>$(MSBuildThisFileDirectory)..\\</RepoRoot>'
+                       '<BaseOutputPath>..\\..\\Output\\</BaseOutputPath></PropertyGroup></Project>')
+            project_path = os.path.join(tmp_root_dir, "src", "MyProject", "MyProject.csproj")
+            write_file(project_path, '<Project><PropertyGroup>'
+                                     '<OutputPath>$(BaseOutputPath)$(Configuration)\\</OutputPath>'
+                                     '</PropertyGroup></Project>')
+            csproj = CsProj(project_path)
+            assert csproj.get_output_path("Release") == "../../Output/Release/"
+            assert csproj.get_assembly_name() == "MyProject"
+            assert csproj.evaluate("Release").get_property("RepoRoot").startswith(os.path.join(tmp_root_dir, "build"))
+
+    def test_get_output_path_sdk_style(self):
+        """Test CsProj.get_output_path - SDK-style project default output path """
+        with temp_dir() as tmp_root_dir:
+            project_path = os.path.join(tmp_root_dir, "MySdkProject.csproj")
+            write_file(project_path, _SDK_CSPROJ)
+            csproj = CsProj(project_path)
+            assert csproj.get_output_path("Release") == "bin/Release/netstandard2.0/"
+            assert csproj.get_output_path("Release", "x64") == "bin/x64/Release/netstandard2.0/"
+            assert csproj.get_assembly_name() == "MySdkProject"
+
+    def test_imported_files_are_parsed_once(self):
+        """Test ProjectEvaluator - imported files are cached across projects """
+        with temp_dir() as tmp_root_dir:
+            write_file(os.path.join(tmp_root_dir, "Directory.Build.props"),
+                       '<Project><PropertyGroup><OutputPath>bin\\Shared\\</OutputPath></PropertyGroup></Project>')
+            project_paths = []
+            for name in ("A", "B", "C"):
+                project_path = os.path.join(tmp_root_dir, name, name + ".csproj")
+                write_file(project_path, "<Project/>")
+                project_paths.append(project_path)
+
+            with patch.object(ProjectEvaluator, '_parse', side_effect=ProjectEvaluator._parse) as parse_mock:
+                for project_path in project_paths:
+                    assert CsProj(project_path).get_output_path("Release") == "bin/Shared/"
+                assert parse_mock.call_count == 1
+
+    def test_metadata_index_invalidated_when_imported_file_changes(self):
+        """Test CsProj - indexed output path is refreshed when Directory.Build.props changes """
+        with temp_dir() as tmp_root_dir:
+            props_path = os.path.join(tmp_root_dir, "Directory.Build.props")
+            project_path = os.path.join(tmp_root_dir, "src", "MyProject.csproj")
+            write_file(project_path, "<Project/>")
+            cache_dir = os.path.join(tmp_root_dir, "cache")
+
+            csproj = CsProj(project_path)
+            csproj.set_metadata_index(MetadataIndex(cache_dir))
+            assert csproj.get_output_path("Release") is None
+
+            write_file(props_path, '<Project><PropertyGroup><OutputPath>bin\\</OutputPath></PropertyGroup></Project>')
+            csproj = CsProj(project_path)
+            csproj.set_metadata_index(MetadataIndex(cache_dir))
+            assert csproj.get_output_path("Release") == "bin/"
@@ -0,0 +1,281 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Integration tests for `ugetcli` package - `nupkg` module.
+Tests functionality of the native NuGet package writer
+"""
+import unittest
+import io
+import os
+import zlib
+import hashlib
+import zipfile
+import xml.etree.ElementTree as ET
+import click
+from mock import patch
+
+from ugetcli.utils import temp_dir
+from ugetcli.nupkg import NuPkgBuilder
+from ugetcli.buildcache import BuildCache
+from ugetcli.metadata import FileDigestCache
+from tests.helpers import write_file
+
+_FIXTURE_DIR = "_fixtures/nupkg/test_nupkg/"
+# Packed from create_project() output by NuGet pack targets of .NET SDK, see Pack.csproj next to it
+_NUGET_PACKAGE = "MyProject.1.0.0.nupkg"
+
+_NUSPEC = """<?xml version="1.0"?>
+<package xmlns="http://schemas.microsoft.com/packaging/2013/05/nuspec.xsd">
+  <metadata>
+    <id>MyProject</id>
+    <version>$version$</version>
+    <authors>Author</authors>
+    <description>Built with $configuration$ configuration</description>
+    <tags>unity uget</tags>
+  </metadata>
+  <files>
+    <file src="$unityPackagePath$" target="unity" />
+    <file src="Docs\\**\\*.md" target="docs" exclude="**\\Draft*.md" />
+  </files>
+</package>
+"""
+
+
+def get_fixture_dir():
+    return os.path.normpath(os.path.join(os.path.dirname(os.path.realpath(__file__)), _FIXTURE_DIR))
+
+
+def read_package(nupkg_path):
+    """ Reads parts of the package that do not depend on the tool that packed it """
+    def local_names(element):
+        return dict((child.tag.rpartition("}")[2], (child.text or "").strip()) for child in element)
+
+    with zipfile.ZipFile(nupkg_path) as package:
+        names = package.namelist()
+        files = dict((name, package.read(name)) for name in names
+                     if not name.endswith((".psmdcp", ".rels", ".nuspec", "[Content_Types].xml")))
+        content_types = set((element.attrib.get("Extension"), element.attrib["ContentType"])
+                            for element in ET.fromstring(package.read("[Content_Types].xml")))
+        relationships = set((element.attrib["Type"], element.attrib["Target"].rpartition("/")[2].rpartition(".")[2])
+                            for element in ET.fromstring(package.read("_rels/.rels")))
+        metadata = local_names(ET.fromstring(package.read("MyProject.nuspec"))[0])
+        core_properties = local_names(ET.fromstring(package.read(
+            [name for name in names if name.endswith(".psmdcp")][0])))
+    return {"files": files, "content_types": content_types, "relationships": relationships, "metadata": metadata,
+            "core_properties": core_properties}
+
+
+def create_project(root_dir):
+    write_file(os.path.join(root_dir, "MyProject.nuspec"), _NUSPEC)
+    write_file(os.path.join(root_dir, "Output", "MyProject_1.0.0.0_Release.unitypackage"), "unitypackage")
+    write_file(os.path.join(root_dir, "Docs", "README.md"), "readme")
+    write_file(os.path.join(root_dir, "Docs", "Api", "Reference.md"), "reference")
+    write_file(os.path.join(root_dir, "Docs", "Api", "Draft Notes.md"), "draft")
+
+
+class TestUGetCliNuPkgBuilder(unittest.TestCase):
+    """Tests for `ugetcli` package - `nupkg` module"""
+
+    def test_nupkg_builder_pack(self):
+        """Test NuPkgBuilder.pack - writes OPC package with replaced tokens """
+        with temp_dir() as tmp_root_dir:
+            create_project(tmp_root_dir)
+            unitypackage_path = os.path.join(tmp_root_dir, "Output", "MyProject_1.0.0.0_Release.unitypackage")
+            output_dir = os.path.join(tmp_root_dir, "Output")
+            assert NuPkgBuilder().pack(os.path.join(tmp_root_dir, "MyProject.nuspec"), output_dir, "Release",
+                                       unitypackage_path, "UnityProject/Assets/MyProject", "1.0.0.0") == 0
+
+            nupkg_path = os.path.join(output_dir, "MyProject.1.0.0.nupkg")  # Version is normalized like nuget does
+            with zipfile.ZipFile(nupkg_path) as package:
+                names = package.namelist()
+                assert names[0] == "_rels/.rels"
+                assert "MyProject.nuspec" in names
+                assert "unity/MyProject_1.0.0.0_Release.unitypackage" in names
+                assert "docs/README.md" in names
+                assert "docs/Api/Reference.md" in names
+                assert "docs/Api/Draft%20Notes.md" not in names
+                assert "[Content_Types].xml" in names
+                assert package.read("unity/MyProject_1.0.0.0_Release.unitypackage") == b"unitypackage"
+
+                nuspec = ET.fromstring(package.read("MyProject.nuspec"))
+                namespace = "{http://schemas.microsoft.com/packaging/2013/05/nuspec.xsd}"
+                assert nuspec.find(namespace + "metadata/" + namespace + "version").text == "1.0.0"
+                assert nuspec.find(namespace + "metadata/" + namespace + "description").text == \
+                    "Built with Release configuration"
+                assert nuspec.find(namespace + "files") is None
+
+                relationships = ET.fromstring(package.read("_rels/.rels"))
+                targets = [relationship.attrib["Target"].lstrip("/") for relationship in relationships]
+                assert all(target in names for target in targets)
+
+                content_types = package.read("[Content_Types].xml").decode("utf-8")
+                for extension in ("rels", "psmdcp", "nuspec", "unitypackage", "md"):
+                    assert 'Extension="{0}"'.format(extension) in content_types
+
+                core_properties = [name for name in names if name.endswith(".psmdcp")]
+                assert len(core_properties) == 1
+                assert b"<dc:identifier>MyProject</dc:identifier>" in package.read(core_properties[0])
+
+    def test_nupkg_builder_pack_deterministic(self):
+        """Test NuPkgBuilder.pack - deterministic builds of the same inputs are byte-identical """
+        digests = []
+        for build in range(2):
+            with temp_dir() as tmp_root_dir:
+                create_project(tmp_root_dir)
+                readme_path = os.path.join(tmp_root_dir, "Docs", "README.md")
+                os.utime(readme_path, (build * 100000, build * 100000))
+                unitypackage_path = os.path.join(tmp_root_dir, "Output", "MyProject_1.0.0.0_Release.unitypackage")
+                output_dir = os.path.join(tmp_root_dir, "Output")
+                NuPkgBuilder(deterministic=True).pack(os.path.join(tmp_root_dir, "MyProject.nuspec"), output_dir,
+                                                      "Release", unitypackage_path, "UnityProject/Assets/MyProject",
+                                                      "1.0.0.0")
+                with open(os.path.join(output_dir, "MyProject.1.0.0.nupkg"), "rb") as f:
+                    digests.append(hashlib.sha256(f.read()).hexdigest())
+                with zipfile.ZipFile(os.path.join(output_dir, "MyProject.1.0.0.nupkg")) as package:
+                    assert package.read("docs/README.md") == b"readme"
+                    assert all(info.date_time == (1980, 1, 1, 0, 0, 0) for info in package.infolist())
+
+        assert digests[0] == digests[1]
+
+    def test_nupkg_builder_pack_store(self):
+        """Test NuPkgBuilder.pack - store compression profile writes uncompressed entries """
+        with temp_dir() as tmp_root_dir:
+            create_project(tmp_root_dir)
+            unitypackage_path = os.path.join(tmp_root_dir, "Output", "MyProject_1.0.0.0_Release.unitypackage")
+            output_dir = os.path.join(tmp_root_dir, "Output")
+            assert NuPkgBuilder(compression="store").pack(os.path.join(tmp_root_dir, "MyProject.nuspec"), output_dir,
+                                                          "Release", unitypackage_path, "UnityProject/Assets/MyProject",
+                                                          "1.0.0.0") == 0
+
+            with zipfile.ZipFile(os.path.join(output_dir, "MyProject.1.0.0.nupkg")) as package:
+                assert all(info.compress_type == zipfile.ZIP_STORED for info in package.infolist())
+                assert package.read("docs/README.md") == b"readme"
+
+    def test_nupkg_builder_pack_build_cache(self):
+        """Test NuPkgBuilder.pack - package is restored from build cache until a packed file changes """
+        with temp_dir() as tmp_root_dir:
+            create_project(tmp_root_dir)
+            unitypackage_path = os.path.join(tmp_root_dir, "Output", "MyProject_1.0.0.0_Release.unitypackage")
+            output_dir = os.path.join(tmp_root_dir, "Output")
+            nupkg_path = os.path.join(output_dir, "MyProject.1.0.0.nupkg")
+            cache_dir = os.path.join(tmp_root_dir, "cache")
+
+            def pack():
+                builder = NuPkgBuilder()
+                builder.set_build_cache(BuildCache(cache_dir), FileDigestCache(cache_dir))
+                with patch.object(NuPkgBuilder, "_write_file", wraps=builder._write_file) as write_file_mock:
+                    builder.pack(os.path.join(tmp_root_dir, "MyProject.nuspec"), output_dir, "Release",
+                                 unitypackage_path, "UnityProject/Assets/MyProject", "1.0.0.0")
+                return write_file_mock.called
+
+            assert pack()
+            os.remove(nupkg_path)
+            assert not pack()
+            with zipfile.ZipFile(nupkg_path) as package:
+                assert package.read("docs/README.md") == b"readme"
+
+            write_file(os.path.join(tmp_root_dir, "Docs", "README.md"), "new readme")
+            assert pack()
+            with zipfile.ZipFile(nupkg_path) as package:
+                assert package.read("docs/README.md") == b"new readme"
+            assert BuildCache(cache_dir).stats()["hits"] == 1
+
+    def test_nupkg_builder_pack_incremental(self):
+        """Test NuPkgBuilder.pack - unchanged files are copied from the previous package, .unitypackage is stored """
+        with temp_dir() as tmp_root_dir:
+            create_project(tmp_root_dir)
+            unitypackage_path = os.path.join(tmp_root_dir, "Output", "MyProject_1.0.0.0_Release.unitypackage")
+            write_file(unitypackage_path, "unitypackage" * 1000)
+            nuspec_path = os.path.join(tmp_root_dir, "MyProject.nuspec")
+            output_dir = os.path.join(tmp_root_dir, "Output")
+            full_dir = os.path.join(tmp_root_dir, "FullOutput")
+
+            def pack(version, incremental, package_dir):
+                builder = NuPkgBuilder(deterministic=True, incremental=incremental)
+                with patch.object(NuPkgBuilder, "_write_file", wraps=builder._write_file) as write_file_mock:
+                    builder.pack(nuspec_path, package_dir, "Release", unitypackage_path,
+                                 "UnityProject/Assets/MyProject", version)
+                with open(os.path.join(package_dir, "MyProject.{0}.nupkg".format(version)), "rb") as f:
+                    digest = hashlib.sha256(f.read()).hexdigest()
+                return sorted(call[0][2] for call in write_file_mock.call_args_list), digest
+
+            assert pack("1.0.0", True, output_dir)[0] == ["docs/Api/Reference.md", "docs/README.md",
+                                                          "unity/MyProject_1.0.0.0_Release.unitypackage"]
+            write_file(os.path.join(tmp_root_dir, "Docs", "README.md"), "new readme")
+            written, digest = pack("1.0.1", True, output_dir)
+            assert written == ["docs/README.md"]
+            assert digest == pack("1.0.1", False, full_dir)[1]  # Same bytes as a full pack
+
+            with zipfile.ZipFile(os.path.join(output_dir, "MyProject.1.0.1.nupkg")) as package:
+                assert package.testzip() is None
+                assert package.read("docs/README.md") == b"new readme"
+                assert package.read("docs/Api/Reference.md") == b"reference"
+                assert package.getinfo("unity/MyProject_1.0.0.0_Release.unitypackage").compress_type == \
+                    zipfile.ZIP_STORED
+                assert package.getinfo("docs/Api/Reference.md").compress_type == zipfile.ZIP_DEFLATED
+
+    def test_nupkg_builder_pack_incremental_without_zipfile_internals(self):
+        """Test NuPkgBuilder.pack - unchanged files are compressed again if zipfile internals are not available """
+        with temp_dir() as tmp_root_dir:
+            create_project(tmp_root_dir)
+            nuspec_path = os.path.join(tmp_root_dir, "MyProject.nuspec")
+            unitypackage_path = os.path.join("Output", "MyProject_1.0.0.0_Release.unitypackage")
+            output_dir = os.path.join(tmp_root_dir, "Output")
+            full_dir = os.path.join(tmp_root_dir, "FullOutput")
+            NuPkgBuilder(deterministic=True, incremental=True).pack(nuspec_path, output_dir, "Release",
+                                                                    unitypackage_path, "", "1.0.0")
+
+            with patch.object(zipfile, "_FH_EXTRA_FIELD_LENGTH"), \
+                    patch("ugetcli.nupkg._write_raw_entry") as write_raw_entry_mock:
+                del zipfile._FH_EXTRA_FIELD_LENGTH  # Restored by patch.object
+                NuPkgBuilder(deterministic=True, incremental=True).pack(nuspec_path, output_dir, "Release",
+                                                                        unitypackage_path, "", "1.0.1")
+            NuPkgBuilder(deterministic=True).pack(nuspec_path, full_dir, "Release", unitypackage_path, "", "1.0.1")
+
+            write_raw_entry_mock.assert_not_called()
+            with open(os.path.join(output_dir, "MyProject.1.0.1.nupkg"), "rb") as f, \
+                    open(os.path.join(full_dir, "MyProject.1.0.1.nupkg"), "rb") as full:
+                assert f.read() == full.read()  # Same bytes as a full pack
+
+    def test_nupkg_builder_deterministic_zip_info_compression_level(self):
+        """Test NuPkgBuilder._get_deterministic_zip_info - entry is compressed with the package compression level """
+        data = " ".join(str(i * i % 9973) for i in range(20000)).encode("utf-8")
+        with zipfile.ZipFile(io.BytesIO(), "w", zipfile.ZIP_DEFLATED, compresslevel=1) as package:
+            package.writestr("default.txt", data)
+            with package.open(NuPkgBuilder._get_deterministic_zip_info(package, "deterministic.txt"), "w") as f:
+                f.write(data)
+            assert package.getinfo("deterministic.txt").compress_size == package.getinfo("default.txt").compress_size
+            assert package.getinfo("deterministic.txt").compress_size > len(zlib.compress(data, 6))
+
+    def test_nupkg_builder_missing_token(self):
+        """Test NuPkgBuilder.replace_tokens - raises when token has no value """
+        with self.assertRaises(click.UsageError):
+            NuPkgBuilder.replace_tokens("<id>$unknown$</id>", {"version": "1.0.0"})
+
+    def test_nupkg_builder_missing_file(self):
+        """Test NuPkgBuilder.pack - raises when file does not exist """
+        with temp_dir() as tmp_root_dir:
+            create_project(tmp_root_dir)
+            with self.assertRaises(click.UsageError):
+                NuPkgBuilder().pack(os.path.join(tmp_root_dir, "MyProject.nuspec"), tmp_root_dir, "Release",
+                                    "Missing.unitypackage", "UnityProject/Assets/MyProject", "1.0.0")
+
+    def test_nupkg_builder_matches_nuget_output(self):
+        """Test NuPkgBuilder.pack - package has the same parts, content types and manifest as nuget pack output """
+        with temp_dir() as tmp_root_dir:
+            create_project(tmp_root_dir)
+            nuspec_path = os.path.join(tmp_root_dir, "MyProject.nuspec")
+            unitypackage_path = os.path.join("Output", "MyProject_1.0.0.0_Release.unitypackage")
+            native_dir = os.path.join(tmp_root_dir, "NativeOutput")
+            NuPkgBuilder().pack(nuspec_path, native_dir, "Release", unitypackage_path, "", "1.0.0.0")
+
+            native = read_package(os.path.join(native_dir, "MyProject.1.0.0.nupkg"))
+            nuget = read_package(os.path.join(get_fixture_dir(), _NUGET_PACKAGE))
+            assert native["files"] == nuget["files"]
+            assert native["content_types"] == nuget["content_types"]
+            assert native["relationships"] == nuget["relationships"]
+            # nuget adds default values of optional elements, i.e. requireLicenseAcceptance
+            assert native["metadata"] == dict((tag, nuget["metadata"][tag]) for tag in native["metadata"])
+            del native["core_properties"]["lastModifiedBy"], nuget["core_properties"]["lastModifiedBy"]
+            assert native["core_properties"] == nuget["core_properties"]
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Integration tests for `ugetcli` package - `remotecache` module.
+Tests functionality of the remote artifact cache against the reference cache server
+"""
+import unittest
+import os
+
+from ugetcli.utils import temp_dir
+from ugetcli.buildcache import BuildCache
+from ugetcli.remotecache import RemoteCache
+from ugetcli.cacheserver import CacheServer
+from tests.helpers import write_file, read_file
+
+_KEY = "ab" * 32
+
+
+class TestUGetCliRemoteCache(unittest.TestCase):
+    """Tests for `ugetcli` package - `remotecache` module"""
+
+    def test_remote_cache_upload_download(self):
+        """Test RemoteCache - uploaded artifact is downloaded by key, unknown key is a miss"""
+        with temp_dir() as tmp_root_dir:
+            artifact_path = os.path.join(tmp_root_dir, "MyProject.unitypackage")
+            output_path = os.path.join(tmp_root_dir, "Output.unitypackage")
+            data = os.urandom(1024 * 1024)
+            write_file(artifact_path, data)
+            with CacheServer(os.path.join(tmp_root_dir, "server")) as server:
+                remote = RemoteCache(server.url)
+                assert not remote.download(_KEY, output_path)
+                assert not os.path.exists(output_path)
+                remote.upload_async(_KEY, artifact_path)
+                assert remote.wait() == 0
+                assert remote.download_async(_KEY, output_path).result()
+                remote.close()
+                assert read_file(output_path) == data
+                assert [(method, status) for method, path, status in server.requests] == \
+                    [("GET", 404), ("PUT", 201), ("GET", 200)]
+            # No leftover temporary files
+            assert sorted(os.listdir(tmp_root_dir)) == ["MyProject.unitypackage", "Output.unitypackage", "server"]
+
+    def test_remote_cache_token(self):
+        """Test RemoteCache - requests without valid token are rejected and treated as misses"""
+        with temp_dir() as tmp_root_dir:
+            artifact_path = os.path.join(tmp_root_dir, "MyProject.unitypackage")
+            write_file(artifact_path, b"package")
+            with CacheServer(os.path.join(tmp_root_dir, "server"), token="secret") as server:
+                remote = RemoteCache(server.url, token="wrong")
+                remote.upload_async(_KEY, artifact_path)
+                assert remote.wait() == 1
+                remote.close()
+                remote = RemoteCache(server.url, token="secret")
+                remote.upload_async(_KEY, artifact_path)
+                assert remote.wait() == 0
+                assert remote.download(_KEY, os.path.join(tmp_root_dir, "Output.unitypackage"))
+                remote.close()
+
+    def test_remote_cache_unreachable(self):
+        """Test RemoteCache - unreachable server is a miss, not an error"""
+        with temp_dir() as tmp_root_dir:
+            with CacheServer(os.path.join(tmp_root_dir, "server")) as server:
+                url = server.url
+            remote = RemoteCache(url)
+            assert not remote.download(_KEY, os.path.join(tmp_root_dir, "Output.unitypackage"))
+            remote.close()
+
+    def test_build_cache_shared_through_remote(self):
+        """Test BuildCache - artifact built on one machine is restored on another through remote cache"""
+        with temp_dir() as tmp_root_dir:
+            artifact_path = os.path.join(tmp_root_dir, "MyProject.unitypackage")
+            output_path = os.path.join(tmp_root_dir, "Output.unitypackage")
+            write_file(artifact_path, b"package")
+            with CacheServer(os.path.join(tmp_root_dir, "server")) as server:
+                first_agent = BuildCache(os.path.join(tmp_root_dir, "agent1"), 0, RemoteCache(server.url))
+                assert not first_agent.get(_KEY, output_path)
+                first_agent.put(_KEY, artifact_path)
+                first_agent.close()
+
+                second_agent = BuildCache(os.path.join(tmp_root_dir, "agent2"), 0, RemoteCache(server.url))
+                second_agent.prefetch(_KEY)
+                assert second_agent.get(_KEY, output_path)
+                assert second_agent.get(_KEY, output_path)  # Now cached locally
+                second_agent.close()
+
+                assert read_file(output_path) == b"package"
+                stats = second_agent.stats()
+                assert (stats["entries"], stats["hits"], stats["remote_hits"], stats["misses"]) == (1, 1, 1, 0)
+                assert [method for method, path, status in server.requests] == ["GET", "PUT", "GET"]
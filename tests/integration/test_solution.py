@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Integration tests for `ugetcli` package - `solution` module.
+Tests solution parsing, project dependency graph and dependency ordered execution
+"""
+import unittest
+import os
+import time
+
+from ugetcli.utils import temp_dir
+from ugetcli.solution import parse_solution, get_dependency_graph, get_critical_path_priorities, run_graph, \
+    OK, FAILED, SKIPPED
+
+SOLUTION_TEMPLATE = u"""﻿
+Microsoft Visual Studio Solution File, Format Version 12.00
+# Visual Studio 15
+Project("{{FAE04EC0-301F-11D3-BF4B-00C04F79EFBC}}") = "Core", "Core\\Core.csproj", \
+"{{11111111-1111-1111-1111-111111111111}}"
+EndProject
+Project("{{FAE04EC0-301F-11D3-BF4B-00C04F79EFBC}}") = "Ui", "Ui\\Ui.csproj", "{{22222222-2222-2222-2222-222222222222}}"
+EndProject
+Project("{{2150E333-8FDC-42A3-9474-1A3956D46DE8}}") = "Tools", "Tools", "{{33333333-3333-3333-3333-333333333333}}"
+EndProject
+Project("{{9A19103F-16F7-4668-BE54-9A1E7A4F7556}}") = "Game", "Game\\Game.csproj", \
+"{{44444444-4444-4444-4444-444444444444}}"
+\tProjectSection(ProjectDependencies) = postProject
+\t\t{{{ui_guid}}} = {{{ui_guid}}}
+\tEndProjectSection
+EndProject
+Project("{{FAE04EC0-301F-11D3-BF4B-00C04F79EFBC}}") = "Standalone", "Standalone\\Standalone.csproj", \
+"{{55555555-5555-5555-5555-555555555555}}"
+EndProject
+Global
+EndGlobal
+"""
+
+CSPROJ_TEMPLATE = """<?xml version="1.0" encoding="utf-8"?>
+<Project ToolsVersion="15.0" xmlns="http://schemas.microsoft.com/developer/msbuild/2003">
+  <ItemGroup>
+{references}
+  </ItemGroup>
+</Project>
+"""
+
+
+def create_solution(root_dir, references, ui_guid="22222222-2222-2222-2222-222222222222"):
+    """ Creates solution with Core, Ui, Game and Standalone projects; references {project: [referenced projects]} """
+    for name in ("Core", "Ui", "Game", "Standalone"):
+        os.makedirs(os.path.join(root_dir, name))
+        items = ['    <ProjectReference Include="..\\{0}\\{0}.csproj" />'.format(reference)
+                 for reference in references.get(name, [])]
+        with open(os.path.join(root_dir, name, name + ".csproj"), "w") as f:
+            f.write(CSPROJ_TEMPLATE.format(references="\n".join(items)))
+    solution_path = os.path.join(root_dir, "Game.sln")
+    with open(solution_path, "wb") as f:
+        f.write(SOLUTION_TEMPLATE.format(ui_guid=ui_guid).encode("utf-8"))
+    return solution_path
+
+
+def run_project(path):
+    """ Picklable project work used with worker processes; fails projects named Ui """
+    time.sleep(0.05)
+    if os.path.basename(path) == "Ui.csproj":
+        raise RuntimeError("build failed with exit code 1")
+
+
+class TestUGetCliSolution(unittest.TestCase):
+    """Tests for `ugetcli` package - `solution` module"""
+
+    def test_solution_get_dependency_graph(self):
+        """Test get_dependency_graph reads project references and solution build dependencies"""
+        with temp_dir() as root_dir:
+            solution_path = create_solution(root_dir, {"Ui": ["Core"], "Game": ["Core", "External"]})
+            projects = parse_solution(solution_path)
+            # Solution folders are not projects; SDK-style projects have a different type guid
+            assert [project.name for project in projects] == ["Core", "Ui", "Game", "Standalone"]
+
+            core, ui, game, standalone = [os.path.join(root_dir, name, name + ".csproj")
+                                          for name in ("Core", "Ui", "Game", "Standalone")]
+            # References to projects outside of the solution are ignored
+            graph = get_dependency_graph(solution_path)
+            assert graph == {core: [], ui: [core], game: [core, ui], standalone: []}
+            assert get_critical_path_priorities(graph, {core: 5.0}) == {core: 7.0, ui: 2.0, game: 1.0,
+                                                                        standalone: 1.0}
+
+    def test_solution_get_dependency_graph_cycle(self):
+        """Test get_dependency_graph raises ValueError on cyclic project references"""
+        with temp_dir() as root_dir:
+            solution_path = create_solution(root_dir, {"Ui": ["Core"], "Core": ["Ui"]})
+            with self.assertRaises(ValueError):
+                get_dependency_graph(solution_path)
+
+    def test_solution_run_graph(self):
+        """Test run_graph runs dependencies first, critical path first, and skips dependents of failed projects"""
+        graph = {
+            "Core": [],
+            "Ui": ["Core"],
+            "Game": ["Ui"],
+            "Editor": ["Game", "Core"],
+            "Standalone": [],
+            "Tests": ["Core", "Standalone"],
+        }
+        started = []
+
+        def run(path):
+            started.append(path)
+            if path == "Ui":
+                raise RuntimeError("build failed with exit code 1")
+
+        reported = []
+        results = run_graph(graph, run, 1, {"Standalone": 10.0}, reported.append)
+        assert results == reported
+        assert started == ["Standalone", "Core", "Ui", "Tests"]
+        assert [(result.path, result.status, result.message) for result in results if result.status != OK] == [
+            ("Ui", FAILED, "build failed with exit code 1"),
+            ("Game", SKIPPED, "Ui failed"),
+            ("Editor", SKIPPED, "Game skipped"),
+        ]
+
+    def test_solution_run_graph_processes(self):
+        """Test run_graph runs projects in worker processes"""
+        graph = {"Core": [], "Ui": ["Core"], "Game": ["Ui"], "Standalone": [], "Tests": ["Standalone"]}
+        graph = dict((os.path.join("src", name + ".csproj"), [os.path.join("src", dependency + ".csproj")
+                                                              for dependency in dependencies])
+                     for name, dependencies in graph.items())
+        results = run_graph(graph, run_project, 2)
+        statuses = dict((os.path.basename(result.path), result.status) for result in results)
+        assert statuses == {"Core.csproj": OK, "Ui.csproj": FAILED, "Game.csproj": SKIPPED, "Standalone.csproj": OK,
+                            "Tests.csproj": OK}
+        completed = [os.path.basename(result.path) for result in results]
+        assert completed.index("Core.csproj") < completed.index("Ui.csproj") < completed.index("Game.csproj")
+        assert completed.index("Standalone.csproj") < completed.index("Tests.csproj")
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Integration tests for `ugetcli` package - `sync` module.
+Tests incremental directory synchronization
+"""
+import unittest
+import os
+from mock import patch
+
+from ugetcli.utils import temp_dir
+from ugetcli.sync import DirectorySync, COPY, UPDATE, MKDIR, DELETE
+from ugetcli import fastcopy
+from tests.helpers import write_file, read_file
+
+
+def create_tree(root_dir):
+    write_file(os.path.join(root_dir, "MyProject.dll"), "assembly", 1000)
+    write_file(os.path.join(root_dir, "Editor", "MyEditor.cs"), "editor", 1000)
+    write_file(os.path.join(root_dir, "Editor", "Icons", "icon.png"), "icon", 1000)
+
+
+class TestUGetCliSync(unittest.TestCase):
+    """Tests for `ugetcli` package - `sync` module"""
+
+    def test_sync_copies_tree(self):
+        """Test DirectorySync.sync - copies nested directories, keeping structure and modification times """
+        with temp_dir() as tmp_dir:
+            src_dir, dst_dir = os.path.join(tmp_dir, "src"), os.path.join(tmp_dir, "dst")
+            create_tree(src_dir)
+
+            result = DirectorySync(jobs=4).sync(src_dir, dst_dir)
+
+            assert sorted((action.action, action.relative_path) for action in result.actions) == [
+                (COPY, "Editor/Icons/icon.png"), (COPY, "Editor/MyEditor.cs"), (COPY, "MyProject.dll"),
+                (MKDIR, "Editor"), (MKDIR, "Editor/Icons")]
+            assert read_file(os.path.join(dst_dir, "Editor", "Icons", "icon.png")) == b"icon"
+            assert os.path.getmtime(os.path.join(dst_dir, "Editor", "MyEditor.cs")) == 1000
+
+    @unittest.skipUnless(hasattr(os, "symlink") and os.name != "nt", "Symbolic links are not available")
+    def test_sync_symlink_cycle(self):
+        """Test DirectorySync.sync - follows links to directories, but not links to a directory they are in """
+        with temp_dir() as tmp_dir:
+            src_dir, dst_dir = os.path.join(tmp_dir, "src"), os.path.join(tmp_dir, "dst")
+            create_tree(src_dir)
+            write_file(os.path.join(tmp_dir, "shared", "Shared.cs"), "shared", 1000)
+            os.symlink(os.path.join(tmp_dir, "shared"), os.path.join(src_dir, "Shared"))
+            os.symlink(src_dir, os.path.join(src_dir, "Editor", "Loop"))
+            os.symlink(os.path.join(src_dir, "Editor"), os.path.join(src_dir, "Editor", "Icons", "Parent"))
+
+            result = DirectorySync().sync(src_dir, dst_dir)
+
+            assert sorted((action.action, action.relative_path) for action in result.actions) == [
+                (COPY, "Editor/Icons/icon.png"), (COPY, "Editor/MyEditor.cs"), (COPY, "MyProject.dll"),
+                (COPY, "Shared/Shared.cs"), (MKDIR, "Editor"), (MKDIR, "Editor/Icons"), (MKDIR, "Shared")]
+
+    def test_sync_copies_only_changed_files(self):
+        """Test DirectorySync.sync - unchanged files are not copied again """
+        with temp_dir() as tmp_dir:
+            src_dir, dst_dir = os.path.join(tmp_dir, "src"), os.path.join(tmp_dir, "dst")
+            create_tree(src_dir)
+            DirectorySync().sync(src_dir, dst_dir)
+            write_file(os.path.join(src_dir, "Editor", "MyEditor.cs"), "editor v2", 2000)
+
+            with patch.object(fastcopy, "copy_file", wraps=fastcopy.copy_file) as copy_file_mock:
+                result = DirectorySync().sync(src_dir, dst_dir)
+
+            assert result.actions == [(UPDATE, "Editor/MyEditor.cs", 9)]
+            assert result.unchanged == 2
+            assert copy_file_mock.call_count == 1
+            assert read_file(os.path.join(dst_dir, "Editor", "MyEditor.cs")) == b"editor v2"
+
+    def test_sync_checksum(self):
+        """Test DirectorySync.sync - checksum comparison skips files that were only touched """
+        with temp_dir() as tmp_dir:
+            src_dir, dst_dir = os.path.join(tmp_dir, "src"), os.path.join(tmp_dir, "dst")
+            create_tree(src_dir)
+            DirectorySync().sync(src_dir, dst_dir)
+            os.utime(os.path.join(src_dir, "MyProject.dll"), (3000, 3000))
+            write_file(os.path.join(src_dir, "Editor", "MyEditor.cs"), "EDITOR", 1000)  # Same size and mtime
+
+            assert DirectorySync().sync(src_dir, dst_dir).actions == [(UPDATE, "MyProject.dll", 8)]
+            os.utime(os.path.join(src_dir, "MyProject.dll"), (4000, 4000))
+            result = DirectorySync(checksum=True).sync(src_dir, dst_dir)
+            assert result.actions == []
+            assert os.path.getmtime(os.path.join(dst_dir, "MyProject.dll")) == 4000  # Touched, not copied
+
+    def test_sync_delete_and_dry_run(self):
+        """Test DirectorySync.sync - extraneous files are deleted only with delete flag, dry run changes nothing """
+        with temp_dir() as tmp_dir:
+            src_dir, dst_dir = os.path.join(tmp_dir, "src"), os.path.join(tmp_dir, "dst")
+            create_tree(src_dir)
+            DirectorySync().sync(src_dir, dst_dir)
+            write_file(os.path.join(dst_dir, "Old.dll"), "old")
+            write_file(os.path.join(dst_dir, "Editor", "Old", "Old.cs"), "old")
+            write_file(os.path.join(dst_dir, "Editor", "Old", "Older.cs"), "old")
+
+            assert DirectorySync().sync(src_dir, dst_dir).actions == []
+            result = DirectorySync(delete=True, dry_run=True).sync(src_dir, dst_dir)
+            assert result.actions == [(DELETE, "Old.dll", 0), (DELETE, "Editor/Old", 0)]
+            assert os.path.isfile(os.path.join(dst_dir, "Old.dll"))
+
+            DirectorySync(delete=True).sync(src_dir, dst_dir)
+            assert sorted(os.listdir(dst_dir)) == ["Editor", "MyProject.dll"]
+            assert sorted(os.listdir(os.path.join(dst_dir, "Editor"))) == ["Icons", "MyEditor.cs"]
+
+    def test_sync_type_conflict(self):
+        """Test DirectorySync.sync - file replaced with directory and directory replaced with file """
+        with temp_dir() as tmp_dir:
+            src_dir, dst_dir = os.path.join(tmp_dir, "src"), os.path.join(tmp_dir, "dst")
+            write_file(os.path.join(src_dir, "Plugins", "MyProject.dll"), "assembly")
+            write_file(os.path.join(src_dir, "Editor"), "editor")
+            write_file(os.path.join(dst_dir, "Plugins"), "plugins")
+            write_file(os.path.join(dst_dir, "Editor", "MyEditor.cs"), "editor")
+
+            DirectorySync().sync(src_dir, dst_dir)
+
+            assert read_file(os.path.join(dst_dir, "Plugins", "MyProject.dll")) == b"assembly"
+            assert read_file(os.path.join(dst_dir, "Editor")) == b"editor"
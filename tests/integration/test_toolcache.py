@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Integration tests for `ugetcli` package - `toolcache` module.
+Tests functionality of the persistent tool discovery cache
+"""
+import unittest
+import os
+import time
+from mock import MagicMock, patch
+
+from ugetcli.utils import create_empty_file, temp_dir
+from ugetcli.toolcache import ToolCache, probe_candidates
+from ugetcli.msbuild import MsBuildRunner
+
+
+class TestUGetCliToolCache(unittest.TestCase):
+    """Tests for `ugetcli` package - `toolcache` module"""
+
+    def test_tool_cache_locate_probes_once(self):
+        """Test ToolCache.locate - second lookup does not probe candidates"""
+        with temp_dir() as tmp_root_dir:
+            msbuild_path = os.path.join(tmp_root_dir, "msbuild.exe")
+            create_empty_file(msbuild_path)
+            tool_cache = ToolCache(os.path.join(tmp_root_dir, "cache"))
+            probe = MagicMock(return_value=msbuild_path)
+            assert tool_cache.locate("msbuild", [msbuild_path], probe) == msbuild_path
+            assert tool_cache.locate("msbuild", [msbuild_path], probe) == msbuild_path
+            probe.assert_called_once_with([msbuild_path])
+
+    def test_tool_cache_invalidated_when_executable_changes(self):
+        """Test ToolCache.locate - entry is invalidated when executable modification time changes"""
+        with temp_dir() as tmp_root_dir:
+            msbuild_path = os.path.join(tmp_root_dir, "msbuild.exe")
+            create_empty_file(msbuild_path)
+            tool_cache = ToolCache(os.path.join(tmp_root_dir, "cache"))
+            probe = MagicMock(return_value=msbuild_path)
+            tool_cache.locate("msbuild", [msbuild_path], probe)
+            mtime = time.time() + 10
+            os.utime(msbuild_path, (mtime, mtime))
+            tool_cache.locate("msbuild", [msbuild_path], probe)
+            assert probe.call_count == 2
+
+    def test_tool_cache_invalidated_when_path_changes(self):
+        """Test ToolCache.locate - entry is invalidated when PATH changes"""
+        with temp_dir() as tmp_root_dir:
+            msbuild_path = os.path.join(tmp_root_dir, "msbuild.exe")
+            create_empty_file(msbuild_path)
+            tool_cache = ToolCache(os.path.join(tmp_root_dir, "cache"))
+            probe = MagicMock(return_value=msbuild_path)
+            with patch.dict(os.environ, {"PATH": "a"}):
+                tool_cache.locate("msbuild", [msbuild_path], probe)
+            with patch.dict(os.environ, {"PATH": "b"}):
+                tool_cache.locate("msbuild", [msbuild_path], probe)
+            assert probe.call_count == 2
+
+    def test_tool_cache_does_not_store_missing_executable(self):
+        """Test ToolCache.locate - results that do not exist on disk are not cached"""
+        with temp_dir() as tmp_root_dir:
+            tool_cache = ToolCache(os.path.join(tmp_root_dir, "cache"))
+            probe = MagicMock(return_value="missing_msbuild.exe")
+            tool_cache.locate("msbuild", ["missing_msbuild.exe"], probe)
+            tool_cache.locate("msbuild", ["missing_msbuild.exe"], probe)
+            assert probe.call_count == 2
+
+    def test_tool_cache_clear(self):
+        """Test ToolCache.clear - removes cached entries"""
+        with temp_dir() as tmp_root_dir:
+            msbuild_path = os.path.join(tmp_root_dir, "msbuild.exe")
+            create_empty_file(msbuild_path)
+            tool_cache = ToolCache(os.path.join(tmp_root_dir, "cache"))
+            tool_cache.store("msbuild", [msbuild_path], msbuild_path)
+            assert tool_cache.lookup("msbuild", [msbuild_path]) == msbuild_path
+            tool_cache.clear()
+            assert tool_cache.lookup("msbuild", [msbuild_path]) is None
+
+    def test_probe_candidates_preserves_preference_order(self):
+        """Test probe_candidates - returns first valid candidate in order of preference"""
+        valid = {"b": True, "c": True}
+        assert probe_candidates(["a", "b", "c"], lambda candidate: valid.get(candidate, False)) == "b"
+        assert probe_candidates(["a"], lambda candidate: False) is None
+
+    @patch('ugetcli.msbuild.sys')
+    @patch('ugetcli.msbuild.call')
+    def test_msbuild_runner_locate_msbuild_with_tool_cache(self, mock_call, mock_sys):
+        """Test MsBuildRunner.locate_msbuild - uses tool cache """
+        mock_sys.configure_mock(platform='darwin')
+        tool_cache = MagicMock()
+        tool_cache.locate.return_value = "/usr/bin/msbuild"
+        assert MsBuildRunner.locate_msbuild(tool_cache) == "/usr/bin/msbuild"
+        tool_cache.locate.assert_called_once()
+        mock_call.assert_not_called()
@@ -0,0 +1,250 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Integration tests for `ugetcli` package - `unitypackagewriter` module.
+Tests functionality of the native Unity Package writer
+"""
+import unittest
+import os
+import gzip
+import hashlib
+import tarfile
+import click
+from mock import patch
+
+from ugetcli.utils import temp_dir
+from ugetcli.unitypackagewriter import UnityPackageWriter
+from ugetcli.buildcache import MemberCache
+from ugetcli.metadata import FileDigestCache
+from ugetcli.inspector import UnityPackageInspector
+from tests.helpers import write_file
+
+_EXISTING_META = """fileFormatVersion: 2
+guid: 0123456789abcdef0123456789abcdef
+PluginImporter:
+  isPreloaded: 0
+"""
+
+
+def read_members(unitypackage_path):
+    with tarfile.open(unitypackage_path, "r:gz") as tar:
+        return dict((member.name, tar.extractfile(member).read() if member.isfile() else None)
+                    for member in tar.getmembers())
+
+
+class TestUGetCliUnityPackageWriter(unittest.TestCase):
+    """Tests for `ugetcli` package - `unitypackagewriter` module"""
+
+    def test_unitypackage_writer_export(self):
+        """Test UnityPackageWriter.export_unitypackage - writes guid/asset, asset.meta and pathname members """
+        with temp_dir() as tmp_dir:
+            package_root = os.path.join(tmp_dir, "Assets", "MyProject")
+            write_file(os.path.join(package_root, "MyProject.dll"), b"assembly")
+            write_file(os.path.join(package_root, "MyProject.dll.meta"), _EXISTING_META.encode("utf-8"))
+            write_file(os.path.join(package_root, "Textures", "icon.png"), b"\x89PNG" * 1000)
+            unitypackage_path = os.path.join(tmp_dir, "MyProject.unitypackage")
+
+            UnityPackageWriter().export_unitypackage(package_root, unitypackage_path)
+
+            members = read_members(unitypackage_path)
+            assert os.path.isfile(package_root + ".meta")
+            assert os.path.isfile(os.path.join(package_root, "Textures", "icon.png.meta"))
+            with gzip.open(unitypackage_path) as f:
+                f.read(1)
+            with open(unitypackage_path, "rb") as f:
+                assert b"archtemp.tar\x00" in f.read(64)
+
+        root_guid = hashlib.md5(b"./").hexdigest()
+        textures_guid = hashlib.md5(os.path.join("./", "Textures").encode("utf-8")).hexdigest()
+        icon_guid = hashlib.md5(os.path.join("./", "Textures", "icon.png").encode("utf-8")).hexdigest()
+        dll_guid = "0123456789abcdef0123456789abcdef"
+
+        assert members[root_guid + "/pathname"] == b"Assets/MyProject"
+        assert root_guid + "/asset" not in members
+        assert members[dll_guid + "/asset"] == b"assembly"
+        assert members[dll_guid + "/asset.meta"] == _EXISTING_META.encode("utf-8")
+        assert members[dll_guid + "/pathname"] == b"Assets/MyProject/MyProject.dll"
+        assert members[textures_guid + "/pathname"] == b"Assets/MyProject/Textures"
+        assert members[icon_guid + "/asset"] == b"\x89PNG" * 1000
+        assert members[icon_guid + "/pathname"] == b"Assets/MyProject/Textures/icon.png"
+        assert ("guid: " + icon_guid).encode("utf-8") in members[icon_guid + "/asset.meta"]
+        assert len(members) == 4 * 3 + 2  # Directory entry and 3 members per asset, directories have no asset
+
+    def test_unitypackage_writer_export_parallel(self):
+        """Test UnityPackageWriter.export_unitypackage - parallel compression produces the same archive content """
+        with temp_dir() as tmp_dir:
+            package_root = os.path.join(tmp_dir, "Assets", "MyProject")
+            for i in range(20):
+                write_file(os.path.join(package_root, "Asset{0}.bytes".format(i)), os.urandom(1024) * 200)
+            single_path = os.path.join(tmp_dir, "Single.unitypackage")
+            parallel_path = os.path.join(tmp_dir, "Parallel.unitypackage")
+
+            UnityPackageWriter().export_unitypackage(package_root, single_path)  # Generates .meta files
+            UnityPackageWriter().export_unitypackage(package_root, single_path)
+            UnityPackageWriter(jobs=4).export_unitypackage(package_root, parallel_path)
+
+            assert read_members(parallel_path) == read_members(single_path)
+            with gzip.open(parallel_path) as parallel, gzip.open(single_path) as single:
+                assert parallel.read() == single.read()
+
+    def test_unitypackage_writer_export_compression(self):
+        """Test UnityPackageWriter.export_unitypackage - compression profiles trade size for speed """
+        with temp_dir() as tmp_dir:
+            package_root = os.path.join(tmp_dir, "Assets", "MyProject")
+            write_file(os.path.join(package_root, "Text.txt"), b"compressible asset " * 10000)
+            sizes = {}
+            for profile in ["store", "fast", "max"]:
+                unitypackage_path = os.path.join(tmp_dir, profile + ".unitypackage")
+                UnityPackageWriter(compression=profile).export_unitypackage(package_root, unitypackage_path)
+                assert read_members(unitypackage_path) == read_members(os.path.join(tmp_dir, "store.unitypackage"))
+                sizes[profile] = os.path.getsize(unitypackage_path)
+
+        assert sizes["store"] > len(b"compressible asset " * 10000)
+        assert sizes["store"] > sizes["fast"] >= sizes["max"]
+
+    def test_unitypackage_writer_export_deterministic(self):
+        """Test UnityPackageWriter.export_unitypackage - deterministic builds of the same inputs are byte-identical """
+        digests = []
+        for jobs in [1, 1, 4, 4]:
+            with temp_dir() as tmp_dir:
+                package_root = os.path.join(tmp_dir, "Assets", "MyProject")
+                write_file(os.path.join(package_root, "MyProject.dll"), b"assembly" * 1000)
+                write_file(os.path.join(package_root, "Textures", "icon.png"), b"\x89PNG" * 1000)
+                os.utime(os.path.join(package_root, "MyProject.dll"), (len(digests) * 1000, len(digests) * 1000))
+                unitypackage_path = os.path.join(tmp_dir, "MyProject.unitypackage")
+
+                UnityPackageWriter(jobs=jobs, deterministic=True).export_unitypackage(package_root, unitypackage_path)
+                with open(unitypackage_path, "rb") as f:
+                    digests.append(hashlib.sha256(f.read()).hexdigest())
+
+        assert digests[0] == digests[1]
+        assert digests[2] == digests[3]
+
+    def test_unitypackage_writer_export_incremental(self):
+        """Test UnityPackageWriter.export_unitypackage - incremental export reuses members of unchanged assets """
+        for jobs in [1, 4]:
+            with temp_dir() as tmp_dir:
+                package_root = os.path.join(tmp_dir, "Assets", "MyProject")
+                for i in range(10):
+                    write_file(os.path.join(package_root, "Asset{0}.bytes".format(i)), os.urandom(1024) * 20)
+                full_path = os.path.join(tmp_dir, "Full.unitypackage")
+                incremental_path = os.path.join(tmp_dir, "Incremental.unitypackage")
+                cache_dir = os.path.join(tmp_dir, "cache")
+
+                def export_incremental():
+                    member_cache = MemberCache(cache_dir)
+                    writer = UnityPackageWriter(jobs=jobs)
+                    writer.set_member_cache(member_cache, FileDigestCache(cache_dir))
+                    writer.export_unitypackage(package_root, incremental_path)
+                    return member_cache.stats()
+
+                stats = export_incremental()
+                assert (stats["hits"], stats["misses"]) == (0, 11)
+                UnityPackageWriter().export_unitypackage(package_root, full_path)
+                assert read_members(incremental_path) == read_members(full_path)
+
+                # Modification time is not part of the member, i.e. after a fresh checkout
+                for i in range(10):
+                    os.utime(os.path.join(package_root, "Asset{0}.bytes".format(i)), (1000, 1000))
+                os.utime(package_root, (1000, 1000))
+                stats = export_incremental()
+                assert (stats["hits"], stats["misses"]) == (11, 11)
+
+                # Only the changed asset is compressed again
+                write_file(os.path.join(package_root, "Asset3.bytes"), b"changed")
+                stats = export_incremental()
+                assert (stats["hits"], stats["misses"]) == (21, 12)
+                UnityPackageWriter().export_unitypackage(package_root, full_path)
+                assert read_members(incremental_path) == read_members(full_path)
+                assert len(UnityPackageInspector(use_index=False).inspect(incremental_path)) == 11
+
+    def test_unitypackage_writer_export_overlay(self):
+        """Test UnityPackageWriter.export_unitypackage - overlay files are exported without touching the project """
+        with temp_dir() as tmp_dir:
+            package_root = os.path.join(tmp_dir, "Assets", "MyProject")
+            write_file(os.path.join(package_root, "Textures", "icon.png"), b"\x89PNG" * 1000)
+            write_file(os.path.join(package_root, "Plugins", "MyProject.dll"), b"stale assembly")
+            write_file(os.path.join(tmp_dir, "bin", "MyProject.dll"), b"assembly")
+            write_file(os.path.join(tmp_dir, "bin", "MyProject.pdb"), b"symbols")
+            overlay = {"Plugins/MyProject.dll": os.path.join(tmp_dir, "bin", "MyProject.dll"),
+                       "Plugins/Editor/MyProject.pdb": os.path.join(tmp_dir, "bin", "MyProject.pdb")}
+            unitypackage_path = os.path.join(tmp_dir, "MyProject.unitypackage")
+            project_files = sorted(os.path.join(dirpath, name) for dirpath, dirnames, filenames in os.walk(tmp_dir)
+                                   for name in dirnames + filenames)
+
+            UnityPackageWriter(write_meta=False).export_unitypackage(package_root, unitypackage_path, overlay)
+
+            members = read_members(unitypackage_path)
+            assert sorted(os.path.join(dirpath, name) for dirpath, dirnames, filenames in os.walk(tmp_dir)
+                          for name in dirnames + filenames if name != "MyProject.unitypackage") == project_files
+
+        dll_guid = hashlib.md5(os.path.join("./", "Plugins", "MyProject.dll").encode("utf-8")).hexdigest()
+        editor_guid = hashlib.md5(os.path.join("./", "Plugins", "Editor").encode("utf-8")).hexdigest()
+        pdb_guid = hashlib.md5(os.path.join("./", "Plugins", "Editor", "MyProject.pdb").encode("utf-8")).hexdigest()
+        assert members[dll_guid + "/asset"] == b"assembly"
+        assert members[dll_guid + "/pathname"] == b"Assets/MyProject/Plugins/MyProject.dll"
+        assert ("guid: " + dll_guid).encode("utf-8") in members[dll_guid + "/asset.meta"]
+        assert members[editor_guid + "/pathname"] == b"Assets/MyProject/Plugins/Editor"
+        assert members[pdb_guid + "/asset"] == b"symbols"
+        assert len(members) == 7 * 3 + 3  # 4 directories and 3 files; stale dll is replaced by overlay
+
+    def test_unitypackage_writer_export_overlay_generated_meta_stable(self):
+        """Test UnityPackageWriter.export_unitypackage - generated .meta files don't change between exports """
+        with temp_dir() as tmp_dir:
+            package_root = os.path.join(tmp_dir, "Assets", "MyProject")
+            write_file(os.path.join(package_root, "Textures", "icon.png"), b"\x89PNG" * 1000)
+            write_file(os.path.join(tmp_dir, "bin", "MyProject.dll"), b"assembly")
+            overlay = {"Plugins/MyProject.dll": os.path.join(tmp_dir, "bin", "MyProject.dll")}
+            unitypackage_path = os.path.join(tmp_dir, "MyProject.unitypackage")
+
+            exports = []
+            for now in (1000000000, 2000000000):
+                with patch("ugetcli.unitypackagewriter.time.time", return_value=now):
+                    UnityPackageWriter(write_meta=False).export_unitypackage(package_root, unitypackage_path, overlay)
+                exports.append(read_members(unitypackage_path))
+
+        assert exports[0] == exports[1]
+
+    def test_unitypackage_writer_export_overlay_matches_copy(self):
+        """Test UnityPackageWriter.export_unitypackage - overlay export is identical to exporting copied files """
+        digests = []
+        for use_overlay in (False, True):
+            with temp_dir() as tmp_dir:
+                package_root = os.path.join(tmp_dir, "Assets", "MyProject")
+                write_file(os.path.join(package_root, "README.md"), b"readme")
+                write_file(os.path.join(tmp_dir, "bin", "MyProject.dll"), b"assembly")
+                if use_overlay:
+                    overlay = {"Plugins/MyProject.dll": os.path.join(tmp_dir, "bin", "MyProject.dll")}
+                else:
+                    overlay = None
+                    write_file(os.path.join(package_root, "Plugins", "MyProject.dll"), b"assembly")
+                unitypackage_path = os.path.join(tmp_dir, "MyProject.unitypackage")
+                UnityPackageWriter(deterministic=True, write_meta=not use_overlay).export_unitypackage(
+                    package_root, unitypackage_path, overlay)
+                with open(unitypackage_path, "rb") as f:
+                    digests.append(hashlib.sha256(f.read()).hexdigest())
+        assert digests[0] == digests[1]
+
+    def test_unitypackage_writer_export_invalid_meta(self):
+        """Test UnityPackageWriter.export_unitypackage - fails on .meta file without guid """
+        with temp_dir() as tmp_dir:
+            package_root = os.path.join(tmp_dir, "Assets", "MyProject")
+            write_file(os.path.join(package_root, "MyProject.dll"), b"assembly")
+            write_file(os.path.join(package_root, "MyProject.dll.meta"), b"fileFormatVersion: 2\n")
+            unitypackage_path = os.path.join(tmp_dir, "MyProject.unitypackage")
+
+            with self.assertRaises(click.UsageError):
+                UnityPackageWriter().export_unitypackage(package_root, unitypackage_path)
+            assert not os.path.exists(unitypackage_path)
+            assert not os.path.exists(unitypackage_path + ".tmp")
+
+    def test_unitypackage_writer_guid_matches_upackage(self):
+        """Test UnityPackageWriter.generate_meta - uses the same deterministic guid as upackage """
+        try:
+            from upackage.upackage import UPackage
+        except ImportError:
+            self.skipTest("upackage is not installed")
+        relative_path = os.path.join("./", "Textures", "icon.png")
+        assert UnityPackageWriter.get_deterministic_guid(relative_path) == \
+            UPackage._get_deterministic_guid(relative_path)
@@ -0,0 +1,29 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Unit tests for `ugetcli` package - `compression` module.
+"""
+import unittest
+import zipfile
+
+from ugetcli.compression import get_gzip_level, get_zip_compression
+
+
+class TestUGetCliCompression(unittest.TestCase):
+    """Tests for `ugetcli` package - `compression` module"""
+
+    def test_get_gzip_level(self):
+        """Test get_gzip_level - maps profiles onto gzip levels """
+        assert [get_gzip_level(profile) for profile in ["store", "fast", "default", "max"]] == [0, 1, 6, 9]
+
+    def test_get_zip_compression(self):
+        """Test get_zip_compression - store profile stores zip entries """
+        assert get_zip_compression("store") == (zipfile.ZIP_STORED, None)
+        assert get_zip_compression("fast") == (zipfile.ZIP_DEFLATED, 1)
+        assert get_zip_compression("max") == (zipfile.ZIP_DEFLATED, 9)
+
+    def test_unknown_profile(self):
+        """Test get_gzip_level - fails on unknown profile """
+        with self.assertRaises(ValueError):
+            get_gzip_level("ultra")
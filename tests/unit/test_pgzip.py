@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Unit tests for `ugetcli` package - `pgzip` module.
+Tests that parallel compression produces a single valid gzip stream
+"""
+import io
+import gzip
+import random
+import zlib
+import unittest
+
+from ugetcli.pgzip import ParallelGzipFile
+
+
+def compress(data, jobs, chunk_size=10240, **kwargs):
+    output = io.BytesIO()
+    with ParallelGzipFile(output, jobs, **kwargs) as gz:
+        for offset in range(0, len(data), chunk_size):
+            gz.write(data[offset:offset + chunk_size])
+    return output.getvalue()
+
+
+def sample_data(size):
+    """ Compressible data with some variety, similar to text assets """
+    rng = random.Random(42)
+    words = [bytes(bytearray(rng.randint(97, 122) for _ in range(rng.randint(2, 10)))) for _ in range(2000)]
+    data = bytearray()
+    while len(data) < size:
+        data += rng.choice(words) + b" "
+    return bytes(data[:size])
+
+
+class TestUGetCliParallelGzipFile(unittest.TestCase):
+    """Tests for `ugetcli` package - `pgzip` module"""
+
+    def test_parallel_gzip_roundtrip(self):
+        """Test ParallelGzipFile - output is a single gzip member that decompresses to the input """
+        data = sample_data(3 * 1024 * 1024 + 123)
+        compressed = compress(data, 4, block_size=64 * 1024)
+
+        assert gzip.GzipFile(fileobj=io.BytesIO(compressed)).read() == data
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        assert decompressor.decompress(compressed) == data
+        assert decompressor.eof
+        assert decompressor.unused_data == b""
+
+    def test_parallel_gzip_dictionary(self):
+        """Test ParallelGzipFile - blocks are primed with the previous block, ratio is close to single-threaded """
+        data = sample_data(2 * 1024 * 1024)
+        parallel = compress(data, 4, block_size=64 * 1024)
+        single = gzip.compress(data)
+        assert len(parallel) < len(single) * 1.05
+
+    def test_parallel_gzip_empty(self):
+        """Test ParallelGzipFile - empty input produces a valid empty gzip stream """
+        assert gzip.GzipFile(fileobj=io.BytesIO(compress(b"", 2))).read() == b""
+
+    def test_parallel_gzip_header(self):
+        """Test ParallelGzipFile - stores file name and modification time in gzip header """
+        compressed = compress(b"data", 2, filename="archtemp.tar", mtime=1234567890)
+        with gzip.GzipFile(fileobj=io.BytesIO(compressed)) as f:
+            assert f.read() == b"data"
+            assert f.mtime == 1234567890
+        assert compressed[10:23] == b"archtemp.tar\x00"
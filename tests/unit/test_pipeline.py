@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Unit tests for `ugetcli` package - `pipeline` module.
+Tests staged pipeline ordering, overlap and failure isolation
+"""
+import time
+import threading
+import unittest
+
+from ugetcli.pipeline import StagedPipeline, Stage
+
+
+class TestUGetCliPipeline(unittest.TestCase):
+    """Tests for `ugetcli` package - `pipeline` module"""
+
+    def test_pipeline_run(self):
+        """Test StagedPipeline.run - stages of different items overlap, failed item does not reach later stages"""
+        events = []
+        lock = threading.Lock()
+
+        def record(stage, item):
+            with lock:
+                events.append((stage, item))
+
+        def compress(item):
+            record("compress", item)
+            if item == "B":
+                raise RuntimeError("compression failed")
+            return item.lower()
+
+        def upload(value):
+            record("upload start", value)
+            time.sleep(0.1)
+            record("upload end", value)
+            return value + ".nupkg"
+
+        reported = []
+        pipeline = StagedPipeline([Stage("compress", compress, 1), Stage("upload", upload, 2)])
+        results = pipeline.run(["A", "B", "C"], reported.append)
+
+        assert [result.item for result in results] == ["A", "B", "C"]
+        assert sorted(result.item for result in reported) == ["A", "B", "C"]
+        assert [result.value for result in results] == ["a.nupkg", None, "c.nupkg"]
+        assert str(results[1].error) == "compression failed"
+        assert results[1].failed_stage == "compress"
+        assert list(results[0].seconds) == ["compress", "upload"]
+        assert list(results[1].seconds) == ["compress"]
+        # C is compressed while A uploads
+        assert events.index(("compress", "C")) < events.index(("upload end", "a"))
+        assert ("upload start", "b") not in events
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Unit tests for `ugetcli` package - cli startup budget.
+Fails when importing the cli starts pulling in heavy subsystems or exceeds the import time budget,
+or when a command imports subsystems it does not use.
+"""
+import os
+import sys
+import json
+import tarfile
+import unittest
+import subprocess
+
+from ugetcli.utils import temp_dir
+
+# Generous upper bound for `import ugetcli.cli` in a fresh interpreter; override with UGET_STARTUP_BUDGET_MS
+_STARTUP_BUDGET_MS = float(os.environ.get("UGET_STARTUP_BUDGET_MS", 500))
+
+# Modules that must only be imported by the commands that need them
+_LAZY_MODULES = ["pkg_resources", "upackage", "yaml", "ugetcli.uget", "ugetcli.unitypackage"]
+
+_PROBE = """
+import sys, json, time
+start = time.time()
+import ugetcli.cli
+elapsed = (time.time() - start) * 1000
+print(json.dumps({"elapsed": elapsed, "modules": sorted(sys.modules)}))
+"""
+
+# Runs the command given as arguments and writes imported modules to the file at the first argument
+_COMMAND_PROBE = """
+import sys, json
+import ugetcli.cli
+try:
+    ugetcli.cli.ugetcli(sys.argv[2:], obj={}, standalone_mode=False)
+finally:
+    with open(sys.argv[1], "w") as f:
+        json.dump(sorted(sys.modules), f)
+"""
+
+# Native engines and subsystems that are only imported by the commands that use them
+_SUBSYSTEM_MODULES = ["ugetcli.nupkg", "ugetcli.feed", "ugetcli.unitypackagewriter", "ugetcli.inspector",
+                      "ugetcli.unitypackagediff", "ugetcli.sync", "ugetcli.discovery", "ugetcli.solution",
+                      "ugetcli.pipeline", "ugetcli.remotecache", "ugetcli.buildcache", "ugetcli.metadata",
+                      "multiprocessing"]
+
+# Tool runners and project readers, only imported by commands that build, package or push projects
+_PROJECT_MODULES = ["ugetcli.msbuild", "ugetcli.nuget", "ugetcli.unitypackage", "ugetcli.nuspec", "ugetcli.csproj"]
+
+# Command and subsystem modules it's expected to import
+_COMMAND_MODULES = [
+    (["discover", "."], ["ugetcli.discovery"]),
+    (["sync", "Source", "Destination"], ["ugetcli.sync", "ugetcli.metadata"]),
+    (["cache", "stats"], ["ugetcli.buildcache"]),
+    (["inspect", "Package.unitypackage"], ["ugetcli.inspector", "ugetcli.metadata"]),
+]
+
+
+def _probe_startup():
+    output = subprocess.check_output([sys.executable, "-c", _PROBE])
+    return json.loads(output.decode("utf-8"))
+
+
+def _probe_command(args):
+    with temp_dir() as tmp_root_dir:
+        os.mkdir(os.path.join(tmp_root_dir, "Source"))
+        with tarfile.open(os.path.join(tmp_root_dir, "Package.unitypackage"), "w:gz"):
+            pass
+        modules_path = os.path.join(tmp_root_dir, "modules.json")
+        with open(os.devnull, "w") as devnull:
+            subprocess.check_call([sys.executable, "-c", _COMMAND_PROBE, modules_path] + args, cwd=tmp_root_dir,
+                                  stdout=devnull)
+        with open(modules_path) as f:
+            return json.load(f)
+
+
+class TestUGetCliStartup(unittest.TestCase):
+    """Tests for `ugetcli` package - cli startup"""
+
+    def test_cli_import_does_not_load_subsystems(self):
+        """Test cli import does not load heavy subsystems"""
+        modules = _probe_startup()["modules"]
+        for module in _LAZY_MODULES:
+            assert module not in modules, module + " is imported eagerly by ugetcli.cli"
+
+    def test_cli_import_within_budget(self):
+        """Test cli import time stays within the startup budget"""
+        elapsed = min(_probe_startup()["elapsed"] for _ in range(3))
+        assert elapsed < _STARTUP_BUDGET_MS, "ugetcli.cli import took {0:.1f} ms, budget is {1:.1f} ms".format(
+            elapsed, _STARTUP_BUDGET_MS)
+
+    def test_commands_load_only_subsystems_they_use(self):
+        """Test every command imports only the subsystems it uses"""
+        for args, used_modules in _COMMAND_MODULES:
+            modules = _probe_command(args)
+            for module in _SUBSYSTEM_MODULES + _PROJECT_MODULES:
+                if module in used_modules:
+                    assert module in modules, "uget {0} did not import {1}".format(" ".join(args), module)
+                else:
+                    assert module not in modules, "uget {0} imported {1}".format(" ".join(args), module)
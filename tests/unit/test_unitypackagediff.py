@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Unit tests for `ugetcli` package - `unitypackagediff` module.
+Tests classification of asset changes between two Unity Packages
+"""
+
+import unittest
+
+from ugetcli.inspector import UnityPackageAsset
+from ugetcli.unitypackagediff import diff_assets, format_changes, AssetChange
+
+
+def asset(guid, pathname, size, digest, meta_digest="meta"):
+    return UnityPackageAsset(guid, pathname, size, 0, 0, 0, digest, meta_digest)
+
+
+class TestUGetCliUnityPackageDiff(unittest.TestCase):
+    """Tests for `ugetcli` package - `unitypackagediff` module"""
+
+    def test_diff_assets(self):
+        """Test diff_assets - added, removed, moved, modified and unchanged assets"""
+        old_assets = [asset("1", "Assets/A/Same.cs", 10, "s"),
+                      asset("2", "Assets/A/Old.cs", 20, "o"),
+                      asset("3", "Assets/A/Moved.cs", 30, "m"),
+                      asset("4", "Assets/A/Plugin.dll", 40, "p"),
+                      asset("5", "Assets/A/Settings.asset", 50, "x", "meta")]
+        new_assets = [asset("1", "Assets/A/Same.cs", 10, "s"),
+                      asset("3", "Assets/A/Sub/Moved.cs", 35, "m2"),
+                      asset("4", "Assets/A/Plugin.dll", 42, "p2"),
+                      asset("5", "Assets/A/Settings.asset", 50, "x", "meta2"),
+                      asset("6", "Assets/A/New.cs", 60, "n")]
+        assert diff_assets(old_assets, new_assets) == [
+            AssetChange("added", "6", None, "Assets/A/New.cs", 60, True),
+            AssetChange("removed", "2", "Assets/A/Old.cs", None, -20, True),
+            AssetChange("modified", "4", "Assets/A/Plugin.dll", "Assets/A/Plugin.dll", 2, True),
+            AssetChange("modified", "5", "Assets/A/Settings.asset", "Assets/A/Settings.asset", 0, True),
+            AssetChange("moved", "3", "Assets/A/Moved.cs", "Assets/A/Sub/Moved.cs", 5, True),
+        ]
+
+    def test_format_changes(self):
+        """Test format_changes - one line per change and summary"""
+        lines = format_changes([AssetChange("added", "6", None, "Assets/A/New.cs", 60, True),
+                                AssetChange("moved", "3", "Assets/A/B.cs", "Assets/A/C.cs", 0, False)])
+        assert lines == ["A           +60 Assets/A/New.cs",
+                         "R            +0 Assets/A/B.cs -> Assets/A/C.cs",
+                         "1 added, 0 removed, 1 moved, 0 modified, size delta +60 bytes"]
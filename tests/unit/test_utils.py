@@ -7,8 +7,10 @@ Tests functionality of the utils helper module
 """
 import unittest
 import os
+from concurrent.futures import ThreadPoolExecutor
 
-from ugetcli.utils import temp_dir, validate_url, copy_replace_directory
+from ugetcli.utils import temp_dir, validate_url, copy_replace_directory, scan_directory, join_relative_path, \
+    update_json_file, load_json_file
 
 
 class TestUGetCliUtils(unittest.TestCase):
@@ -56,4 +58,52 @@ class TestUGetCliUtils(unittest.TestCase):
                 old_text = f.read()
                 assert old_text == "New Text", "Wrong file was replaced."
 
+    def test_utils_copy_replace_directory_nested(self):
+        """Test utils.copy_replace_directory keeps subdirectory structure """
+        with temp_dir() as tmp_dir_path:
+            src_dir_path = os.path.join(tmp_dir_path, "src")
+            dst_dir_path = os.path.join(tmp_dir_path, "dst")
+            os.makedirs(os.path.join(src_dir_path, "Editor", "Icons"))
+            with open(os.path.join(src_dir_path, "Editor", "Icons", "icon.png"), "w") as f:
+                f.write("icon")
+
+            copy_replace_directory(src_dir_path, dst_dir_path)
+
+            assert os.path.isfile(os.path.join(dst_dir_path, "Editor", "Icons", "icon.png"))
+            assert not os.path.exists(os.path.join(dst_dir_path, "icon.png"))
+
+    @unittest.skipUnless(hasattr(os, "symlink") and os.name != "nt", "Symbolic links are not available")
+    def test_utils_scan_directory(self):
+        """Test utils.scan_directory lists files and subdirectories, following symbolic links only if asked to """
+        with temp_dir() as tmp_dir_path:
+            os.makedirs(os.path.join(tmp_dir_path, "Editor"))
+            with open(os.path.join(tmp_dir_path, "README.md"), "w") as f:
+                f.write("readme")
+            os.symlink(os.path.join(tmp_dir_path, "Editor"), os.path.join(tmp_dir_path, "Link"))
+
+            files, subdirectories = scan_directory(tmp_dir_path)
+            assert sorted(entry.name for entry in files) == ["README.md"]
+            assert sorted(entry.name for entry in subdirectories) == ["Editor", "Link"]
+
+            files, subdirectories = scan_directory(tmp_dir_path, follow_symlinks=False)
+            assert sorted(entry.name for entry in files) == ["Link", "README.md"]
+            assert sorted(entry.name for entry in subdirectories) == ["Editor"]
+
+    def test_utils_join_relative_path(self):
+        """Test utils.join_relative_path """
+        assert join_relative_path("root", "") == "root"
+        assert join_relative_path("root", "Editor/icon.png") == os.path.join("root", "Editor", "icon.png")
+
+    def test_utils_update_json_file_concurrently(self):
+        """Test utils.update_json_file - concurrent updates are applied one after another, none is lost """
+        with temp_dir() as tmp_dir_path:
+            path = os.path.join(tmp_dir_path, "cache", "counters.json")
+
+            def increment(name):
+                for _ in range(20):
+                    update_json_file(path, lambda counters: counters.update({name: counters.get(name, 0) + 1}), {})
+
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                list(executor.map(increment, ["a", "b", "c", "d"]))
 
+            assert load_json_file(path) == {"a": 20, "b": 20, "c": 20, "d": 20}
@@ -4,4 +4,4 @@
 
 __author__ = """Leonid Umanskiy"""
 __email__ = 'leonid.umanskiy@aofl.com'
-__version__ = '0.1.0'
+__version__ = '0.4.2'
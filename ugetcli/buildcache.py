@@ -0,0 +1,287 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from ugetcli import utils
+from ugetcli import fastcopy
+
+"""
+Helper module that provides local content-addressed cache of build artifacts (.unitypackage)
+"""
+
+# Bump when the layout of cached artifacts or the way keys are computed changes
+_KEY_VERSION = 1
+_SIZE_SUFFIXES = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}
+
+
+class BuildCache:
+    """
+    Content-addressed artifact cache.
+    Artifacts are stored under the key computed from digests of every input file and build options,
+    and are materialized into the output directory by hardlink, or copy if hardlink is not possible.
+    Modification time of a cached artifact is its last use time, least recently used artifacts are evicted first.
+    Optional remote cache is queried on local misses and receives every stored artifact in background.
+    """
+    ARTIFACTS_DIRNAME = "artifacts"
+    STATS_FILENAME = "artifacts.json"
+    MAX_SIZE_ENV = "UGET_CACHE_MAX_SIZE"
+    DEFAULT_MAX_SIZE = 5 * 1024 ** 3
+
+    def __init__(self, cache_dir=None, max_size=None, remote=None):
+        """
+        :param cache_dir: Cache directory; uget cache directory if not provided
+        :param max_size: Size limit in bytes; read from UGET_CACHE_MAX_SIZE if not provided, 0 disables the limit
+        :param remote: Optional RemoteCache shared with other machines
+        """
+        self.cache_dir = cache_dir or utils.get_cache_dir()
+        self.artifacts_dir = os.path.join(self.cache_dir, self.ARTIFACTS_DIRNAME)
+        self.stats_path = os.path.join(self.cache_dir, self.STATS_FILENAME)
+        if max_size is None:
+            max_size = parse_size(os.environ.get(self.MAX_SIZE_ENV) or str(self.DEFAULT_MAX_SIZE))
+        self.max_size = max_size
+        self.remote = remote
+        self._downloads = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def compute_key(inputs, options):
+        """
+        Computes cache key
+        :param inputs: List of tuples (name, content digest) - name is the path of the input inside the artifact
+        :param options: Dictionary of build options that affect the artifact
+        :return: sha256 hex digest
+        """
+        key = hashlib.sha256()
+        key.update(json.dumps([_KEY_VERSION, sorted(options.items())]).encode("utf-8"))
+        for name, digest in sorted(inputs):
+            key.update("\n{0}\0{1}".format(name, digest).encode("utf-8"))
+        return key.hexdigest()
+
+    def prefetch(self, key):
+        """
+        Starts downloading artifact from remote cache in background, unless it's cached locally.
+        Following get() with the same key waits for the download instead of starting a new one.
+        :param key: Cache key
+        """
+        artifact_path = self._get_artifact_path(key)
+        if self.remote is None or os.path.isfile(artifact_path):
+            return
+        with self._lock:
+            if key not in self._downloads:
+                self._makedirs(os.path.dirname(artifact_path))
+                self._downloads[key] = self.remote.download_async(key, artifact_path)
+
+    def get(self, key, output_path):
+        """
+        Materializes cached artifact, downloading it from remote cache on a local miss
+        :param key: Cache key
+        :param output_path: Path the artifact is materialized to
+        :return: True if artifact was found in cache, otherwise False
+        """
+        artifact_path = self._get_artifact_path(key)
+        with self._lock:
+            # Prefetched download might have completed already; it's still a remote hit
+            download = self._downloads.pop(key, None)
+        if download is None and self.remote is not None and not os.path.isfile(artifact_path):
+            self.prefetch(key)
+            with self._lock:
+                download = self._downloads.pop(key, None)
+        remote_hit = download is not None and download.result()
+        found = remote_hit or os.path.isfile(artifact_path)
+        if found:
+            try:
+                fastcopy.copy_file(artifact_path, output_path, link=True)
+                os.utime(artifact_path, None)  # Mark as recently used
+            except (IOError, OSError):
+                found = False  # Evicted concurrently
+        self._record("remote_hits" if remote_hit and found else "hits" if found else "misses")
+        if remote_hit and self.max_size:
+            self.prune(self.max_size)
+        return found
+
+    def put(self, key, path):
+        """
+        Stores artifact in cache, evicting least recently used artifacts if cache exceeds its size limit.
+        Upload to remote cache is started in background.
+        :param key: Cache key
+        :param path: Path to the artifact
+        """
+        artifact_path = self._get_artifact_path(key)
+        self._makedirs(os.path.dirname(artifact_path))
+        fastcopy.copy_file(path, artifact_path, link=True)
+        os.utime(artifact_path, None)
+        if self.remote is not None:
+            self.remote.upload_async(key, artifact_path)
+        if self.max_size:
+            self.prune(self.max_size)
+
+    def close(self):
+        """ Waits for background transfers to finish """
+        if self.remote is not None:
+            self.remote.close()
+
+    def stats(self):
+        """
+        Returns cache statistics
+        :return: Dictionary - path, entries, size, max_size, hits, remote_hits, misses
+        """
+        artifacts = self._list_artifacts()
+        counters = utils.load_json_file(self.stats_path, {})
+        return {
+            "path": self.artifacts_dir,
+            "entries": len(artifacts),
+            "size": sum(size for path, size, last_used in artifacts),
+            "max_size": self.max_size,
+            "hits": counters.get("hits", 0),
+            "remote_hits": counters.get("remote_hits", 0),
+            "misses": counters.get("misses", 0),
+        }
+
+    def prune(self, max_size):
+        """
+        Evicts least recently used artifacts until cache size is within the limit
+        :param max_size: Size limit in bytes
+        :return: Tuple (number of evicted artifacts, evicted bytes)
+        """
+        artifacts = sorted(self._list_artifacts(), key=lambda artifact: artifact[2])
+        total_size = sum(size for path, size, last_used in artifacts)
+        removed_count = removed_size = 0
+        for path, size, last_used in artifacts:
+            if total_size <= max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total_size -= size
+            removed_count += 1
+            removed_size += size
+        return removed_count, removed_size
+
+    def _get_artifact_path(self, key):
+        return os.path.join(self.artifacts_dir, key[:2], key)
+
+    def _list_artifacts(self):
+        """ Returns list of tuples (path, size, last use time) """
+        artifacts = []
+        if not os.path.isdir(self.artifacts_dir):
+            return artifacts
+        for prefix in os.listdir(self.artifacts_dir):
+            prefix_dir = os.path.join(self.artifacts_dir, prefix)
+            if not os.path.isdir(prefix_dir):
+                continue
+            for name in os.listdir(prefix_dir):
+                if name.endswith((".tmp", ".download")):
+                    continue  # Artifact being written
+                path = os.path.join(prefix_dir, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                artifacts.append((path, stat.st_size, stat.st_mtime))
+        return artifacts
+
+    @staticmethod
+    def _makedirs(path):
+        try:
+            os.makedirs(path)
+        except OSError:
+            if not os.path.isdir(path):
+                raise
+
+    def _record(self, name, count=1):
+        with self._lock:
+            counters = utils.load_json_file(self.stats_path, {})
+            counters[name] = counters.get(name, 0) + count
+            counters["last_used"] = time.time()
+            utils.save_json_file(self.stats_path, counters)
+
+
+class MemberCache(BuildCache):
+    """
+    Cache of compressed gzip members of .unitypackage assets, used by incremental export.
+    Members are stored under the key computed from asset content and tar headers, so unchanged assets are spliced
+    into the new package without being compressed again. Shares location and size limit with the build cache.
+    """
+    ARTIFACTS_DIRNAME = "members"
+    STATS_FILENAME = "members.json"
+
+    def __init__(self, cache_dir=None, max_size=None):
+        """
+        :param cache_dir: Cache directory; uget cache directory if not provided
+        :param max_size: Size limit in bytes; read from UGET_CACHE_MAX_SIZE if not provided, 0 disables the limit
+        """
+        BuildCache.__init__(self, cache_dir, max_size)
+        self._counters = {"hits": 0, "misses": 0}
+
+    def lookup(self, key):
+        """
+        Looks up cached member; safe to call from multiple threads
+        :param key: Cache key
+        :return: Path to the member, or None if it's not cached
+        """
+        member_path = self._get_artifact_path(key)
+        try:
+            os.utime(member_path, None)  # Mark as recently used
+            found = True
+        except OSError:
+            found = False
+        with self._lock:
+            self._counters["hits" if found else "misses"] += 1
+        return member_path if found else None
+
+    def store(self, key, write):
+        """
+        Stores member; it's written to a temporary file first, so readers never see a partial member
+        :param key: Cache key
+        :param write: Method called with writable binary file object
+        :return: Path to the member
+        """
+        member_path = self._get_artifact_path(key)
+        self._makedirs(os.path.dirname(member_path))
+        tmp_path = "{0}.{1}.{2}.tmp".format(member_path, os.getpid(), threading.current_thread().ident)
+        try:
+            with open(tmp_path, "wb") as f:
+                write(f)
+            utils.replace_file(tmp_path, member_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return member_path
+
+    def flush(self):
+        """ Saves hit and miss counters and evicts least recently used members if cache exceeds its size limit """
+        with self._lock:
+            counters, self._counters = self._counters, {"hits": 0, "misses": 0}
+        for name, count in counters.items():
+            if count:
+                self._record(name, count)
+        if self.max_size:
+            self.prune(self.max_size)
+
+
+def parse_size(text):
+    """
+    Parses human readable size
+    :param text: Size in bytes, optionally with K, M, G or T suffix (i.e. 500M)
+    :return: Size in bytes
+    """
+    text = text.strip().upper()
+    if text.endswith("B"):
+        text = text[:-1]
+    suffix = text[-1:] if text[-1:] in _SIZE_SUFFIXES else ""
+    number = text[:len(text) - len(suffix)]
+    try:
+        return int(float(number) * _SIZE_SUFFIXES[suffix])
+    except ValueError:
+        raise ValueError("Invalid size: " + text)
+
+
+def format_size(size):
+    """ Formats size in bytes as human readable text """
+    for suffix in ["B", "KB", "MB", "GB"]:
+        if size < 1024:
+            return "{0:.1f} {1}".format(size, suffix) if suffix != "B" else "{0} B".format(size)
+        size /= 1024.0
+    return "{0:.1f} TB".format(size)
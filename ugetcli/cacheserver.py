@@ -0,0 +1,135 @@
+import os
+import re
+import shutil
+import tempfile
+import threading
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from socketserver import ThreadingMixIn
+from ugetcli import utils
+
+"""
+Helper module that provides reference remote cache server - stores artifacts uploaded with PUT in a directory
+"""
+
+_CHUNK_SIZE = 256 * 1024
+_KEY_REGEX = re.compile(r"^/([0-9a-fA-F]{16,128})$")
+
+
+class CacheServer(ThreadingMixIn, HTTPServer):
+    """
+    Minimal remote cache server, speaks the protocol of RemoteCache:
+    GET /<key> returns artifact or 404, PUT /<key> stores it (written to a temporary file first, then moved in place).
+    Can be used as a context manager, which serves requests on a background thread:
+
+        with CacheServer(storage_dir) as server:
+            server.url  # http://127.0.0.1:<port>/
+    """
+    daemon_threads = True
+
+    def __init__(self, storage_dir, host="127.0.0.1", port=0, token=None):
+        """
+        :param storage_dir: Directory artifacts are stored in
+        :param host: Interface to listen on
+        :param port: Port to listen on, 0 picks a free port
+        :param token: If set, requests must provide it as bearer Authorization header
+        """
+        HTTPServer.__init__(self, (host, port), _CacheRequestHandler)
+        self.storage_dir = storage_dir
+        self.token = token
+        self.requests = []  # (method, path, status)
+        self.lock = threading.Lock()
+        self._thread = None
+        if not os.path.isdir(storage_dir):
+            os.makedirs(storage_dir)
+
+    @property
+    def url(self):
+        return "http://{0}:{1}/".format(self.server_address[0], self.server_address[1])
+
+    def get_path(self, key):
+        return os.path.join(self.storage_dir, key.lower())
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever, kwargs={"poll_interval": 0.05})
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown()
+        self.server_close()
+        self._thread.join()
+
+
+class _CacheRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        key = self._get_key()
+        if key is None:
+            return
+        path = self.server.get_path(key)
+        try:
+            f = open(path, "rb")
+        except (IOError, OSError):
+            return self._send(404)
+        with f:
+            self._record(200)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/octet-stream")
+            self.send_header("Content-Length", str(os.fstat(f.fileno()).st_size))
+            self.end_headers()
+            if hasattr(self.connection, "sendfile"):
+                self.connection.sendfile(f)  # Kernel copy where supported, falls back to send()
+            else:
+                shutil.copyfileobj(f, self.wfile, _CHUNK_SIZE)
+
+    def do_PUT(self):
+        key = self._get_key()
+        if key is None:
+            return
+        remaining = int(self.headers.get("Content-Length", 0))
+        fd, tmp_path = tempfile.mkstemp(dir=self.server.storage_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                while remaining > 0:
+                    chunk = self.rfile.read(min(remaining, _CHUNK_SIZE))
+                    if not chunk:
+                        break
+                    f.write(chunk)
+                    remaining -= len(chunk)
+            if remaining > 0:
+                return self._send(400)
+            utils.replace_file(tmp_path, self.server.get_path(key))
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return self._send(201)
+
+    def _get_key(self):
+        """ Validates request and returns the artifact key, or sends error response and returns None """
+        if self.server.token and self.headers.get("Authorization") != "Bearer " + self.server.token:
+            self._send(401)
+            return None
+        match = _KEY_REGEX.match(self.path.split("?")[0])
+        if not match:
+            self._send(404)
+            return None
+        return match.group(1)
+
+    def _record(self, status):
+        with self.server.lock:
+            self.server.requests.append((self.command, self.path, status))
+
+    def _send(self, status):
+        self._record(status)
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        if self.command == "PUT" and status >= 400:
+            # Request body might not have been read, connection can't be reused
+            self.send_header("Connection", "close")
+            self.close_connection = True
+        self.end_headers()
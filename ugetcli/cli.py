@@ -1,8 +1,49 @@
 import os
 import json
 import click
-import pkg_resources
-from ugetcli.uget import UGetCli
+
+# Subsystems (msbuild, nuget, upackage, pkg_resources) are imported lazily inside the commands that need them,
+# so that every uget invocation only pays for what it actually uses.
+
+
+def _get_version():
+    """Resolves installed ugetcli distribution version
+    :return: Version string
+    """
+    try:
+        from importlib.metadata import version, PackageNotFoundError  # python 3.8+
+    except ImportError:
+        import pkg_resources
+        try:
+            return pkg_resources.get_distribution("ugetcli").version
+        except pkg_resources.DistributionNotFound:
+            from ugetcli import __version__
+            return __version__
+    try:
+        return version("ugetcli")
+    except PackageNotFoundError:
+        from ugetcli import __version__
+        return __version__
+
+
+def _print_version(ctx, param, value):
+    """Click callback for --version; resolves version only when the option is actually passed"""
+    if not value or ctx.resilient_parsing:
+        return
+    click.echo("{0}, version {1}".format(ctx.find_root().info_name, _get_version()))
+    ctx.exit()
+
+
+def _create_uget(debug, quiet):
+    """Imports and creates UGetCli instance"""
+    from ugetcli.uget import UGetCli
+    return UGetCli(debug, quiet)
+
+
+def _exit(ctx, exit_code):
+    """Exits with the exit code returned by UGetCli method; Click discards values returned by commands"""
+    if exit_code:
+        ctx.exit(exit_code)
 
 
 # Helper method for a command and pre-load value from the config file
@@ -46,7 +87,8 @@ def _create_command_class(config_option_key, config_path_option_key):
 
 # uGet Command Group
 @click.group()
-@click.version_option(version=pkg_resources.get_distribution("ugetcli").version)
+@click.option('--version', is_flag=True, expose_value=False, is_eager=True, callback=_print_version,
+              help="Show the version and exit.")
 def ugetcli():
     pass
 
@@ -68,8 +110,8 @@ def ugetcli():
 @click.option('-q', '--quiet', is_flag=True, help="Does not prompt for user input and hides extra info messages.")
 @click.pass_context
 def build(ctx, path, configuration, msbuild_path, rebuild, config, config_path, debug, quiet):
-    uget = UGetCli(debug, quiet)
-    return uget.build(path, configuration, msbuild_path, rebuild)
+    uget = _create_uget(debug, quiet)
+    _exit(ctx, uget.build(path, configuration, msbuild_path, rebuild))
 
 
 @ugetcli.command('create', cls=_create_command_class('config', 'config_path'),
@@ -93,11 +135,33 @@ def build(ctx, path, configuration, msbuild_path, rebuild, config, config_path,
 @click.option('--config-path', type=str, help="Config json.")
 @click.option('-d', '--debug', is_flag=True, help="Enable verbose debug.")
 @click.option('-q', '--quiet', is_flag=True, help="Does not prompt for user input and hides extra info messages.")
+@click.option('-e', '--engine', type=click.Choice(['upackage', 'native']), default='upackage',
+              help="Export engine: 'upackage' exports with upackage, 'native' streams assets into .unitypackage "
+                   "in-process.")
+@click.option('-j', '--jobs', type=click.IntRange(1, None), default=1,
+              help="Number of threads used to compress .unitypackage. Used only with native engine.")
+@click.option('--compression', type=click.Choice(['store', 'fast', 'default', 'max']), default='default',
+              help="Compression profile: 'store' does not compress, 'fast' trades size for speed, 'max' trades speed "
+                   "for size. Used only with native engine.")
+@click.option('--deterministic', is_flag=True,
+              help="If set, the same inputs produce byte-identical output: entries are sorted, timestamps and ownership "
+                   "are normalized (to SOURCE_DATE_EPOCH if set). Used only with native engine.")
+@click.option('--cache/--no-cache', default=True,
+              help="Restore .unitypackage from the local build cache if assembly, assets and options did not change.")
+@click.option('--cache-url', type=str, default=None, envvar='UGET_REMOTE_CACHE_URL',
+              help="URL of the remote cache shared with other machines, queried on local cache misses.")
+@click.option('--overlay', is_flag=True,
+              help="If set, assembly is exported straight from the project output directory and missing .meta files "
+                   "are generated in memory, so nothing is written to the Unity project. Used only with native engine.")
+@click.option('--incremental', is_flag=True,
+              help="If set, every asset is compressed separately and cached, so only changed assets are compressed "
+                   "again on the next export. Used only with native engine.")
 @click.pass_context
 def create(ctx, path, output_dir, configuration, unity_project_path, root_dir, assembly_relative_dir, clean, config, config_path, debug,
-           quiet):
-    uget = UGetCli(debug, quiet)
-    return uget.create(path, output_dir, configuration, unity_project_path, root_dir, assembly_relative_dir, clean)
+           quiet, engine, jobs, compression, deterministic, cache, cache_url, overlay, incremental):
+    uget = _create_uget(debug, quiet)
+    _exit(ctx, uget.create(path, output_dir, configuration, unity_project_path, root_dir, assembly_relative_dir, clean,
+                           engine, jobs, compression, deterministic, cache, cache_url, overlay, incremental))
 
 
 @ugetcli.command('pack', cls=_create_command_class('config', 'config_path'),
@@ -121,16 +185,36 @@ def create(ctx, path, output_dir, configuration, unity_project_path, root_dir, a
 @click.option('-r', '--root-dir', type=click.Path(), default=None,
               help="Root directory inside the Unity Project into which assembly is copied. Used to export .unitypackage"
                    "If not provided, project name is used.")
+@click.option('-e', '--engine', type=click.Choice(['nuget', 'native']), default='nuget',
+              help="Pack engine: 'nuget' runs NuGet executable, 'native' writes .nupkg in-process from .nuspec.")
+@click.option('--compression', type=click.Choice(['store', 'fast', 'default', 'max']), default='default',
+              help="Compression profile: 'store' does not compress, 'fast' trades size for speed, 'max' trades speed "
+                   "for size. Used only with native engine.")
+@click.option('--deterministic', is_flag=True,
+              help="If set, the same inputs produce byte-identical output: entries are sorted, timestamps and ownership "
+                   "are normalized (to SOURCE_DATE_EPOCH if set). Used only with native engine.")
+@click.option('--cache/--no-cache', default=True,
+              help="Restore .nupkg from the local build cache if .nuspec and packed files did not change. "
+                   "Used only with native engine.")
+@click.option('--cache-url', type=str, default=None, envvar='UGET_REMOTE_CACHE_URL',
+              help="URL of the remote cache shared with other machines, queried on local cache misses. "
+                   "Used only with native engine.")
+@click.option('--incremental', is_flag=True,
+              help="If set, compressed data of files that did not change is copied from the previous package with "
+                   "the same id in the output directory instead of being compressed again. Used only with native engine.")
 @click.pass_context
-def pack(ctx, path, output_dir, nuget_path, unitypackage_path, configuration, config, config_path, debug, quiet, unity_project_path, root_dir):
-    uget = UGetCli(debug, quiet)
-    return uget.pack(path, output_dir, nuget_path, unitypackage_path, configuration, unity_project_path, root_dir)
+def pack(ctx, path, output_dir, nuget_path, unitypackage_path, configuration, config, config_path, debug, quiet, unity_project_path, root_dir,
+         engine, compression, deterministic, cache, cache_url, incremental):
+    uget = _create_uget(debug, quiet)
+    _exit(ctx, uget.pack(path, output_dir, nuget_path, unitypackage_path, configuration, unity_project_path, root_dir,
+                         engine, compression, deterministic, cache, cache_url, incremental))
 
 
 @ugetcli.command('push', cls=_create_command_class('config', 'config_path'),
                  help='Push uGet Package (.nupkg) to the NuGet feed.')
 @click.option('-p', '--path', type=click.Path(), default='.',
-              help='Path to NuGet Package (.nupkg) or Visual Studio project.')
+              help='Path to NuGet Package (.nupkg), Visual Studio project, glob pattern matching NuGet Packages '
+                   'or a directory containing them.')
 @click.option('-o', '--output-dir', type=click.Path(), default='Output',
               help='Provides directory in which Nuget Package is being looked for. '
                    'Used only if path is a .csproj or a directory that contains one (optional).')
@@ -144,7 +228,231 @@ def pack(ctx, path, output_dir, nuget_path, unitypackage_path, configuration, co
 @click.option('--config-path', type=str, help="Config json.")
 @click.option('-d', '--debug', is_flag=True, help="Enable verbose debug.")
 @click.option('-q', '--quiet', is_flag=True, help="Does not prompt for user input and hides extra info messages.")
+@click.option('-e', '--engine', type=click.Choice(['nuget', 'native']), default='nuget',
+              help="Push engine: 'nuget' runs NuGet executable, 'native' uploads package over HTTP in-process.")
+@click.option('-j', '--jobs', type=click.IntRange(1, None), default=4,
+              help="Maximum number of concurrent uploads. Used only with native engine.")
+@click.option('--retries', type=click.IntRange(0, None), default=3,
+              help="Number of times a failed upload is retried, with exponential backoff. Used only with native engine.")
+@click.option('--skip-duplicate', is_flag=True,
+              help="If set, packages that already exist on the feed (409 Conflict) are skipped instead of failing. "
+                   "Used only with native engine.")
+@click.option('--check-existing/--no-check-existing', default=True,
+              help="Query the feed before uploading and do not upload package versions it already has. "
+                   "Used only with native engine.")
+@click.pass_context
+def push(ctx, path, output_dir, feed, nuget_path, api_key, config, config_path, debug, quiet, engine, jobs, retries,
+         skip_duplicate, check_existing):
+    uget = _create_uget(debug, quiet)
+    _exit(ctx, uget.push(path, output_dir, feed, nuget_path, api_key, engine, jobs, retries, skip_duplicate,
+                         check_existing))
+
+
+@ugetcli.command('publish', cls=_create_command_class('config', 'config_path'),
+                 help='Builds project, creates Unity Package, packs and pushes NuGet package in one process. '
+                      'Steps of different projects overlap.')
+@click.option('-p', '--path', type=click.Path(), multiple=True, default=["."],
+              help="Path to Visual Studio project (.csproj). Can be provided multiple times.")
+@click.option('-o', '--output-dir', type=click.Path(), default='Output',
+              help='Output directory of .unitypackage and .nupkg files.')
+@click.option('-c', '--configuration', type=click.Choice(['Debug', 'Release']), default='Release',
+              help='Build configuration.')
+@click.option('-t', '--unity-project-path', type=click.Path(), default="UnityProject",
+              help='Path to the Unity project used to build .unitypackage. Project can contain optional assets.')
+@click.option('-r', '--root-dir', type=click.Path(), default=None,
+              help="Root directory inside the Unity Project into which assembly is copied. Used to export .unitypackage"
+                   "If not provided, project name is used.")
+@click.option('--assembly-relative-dir', type=click.Path(), default=".",
+              help="Relative directory from $unity-project-path/$root-dir to export assemblies.")
+@click.option('--clean', is_flag=True,
+              help="If set, cleans other .unitypackage files with the same configuration at the output location.")
+@click.option('--rebuild', is_flag=True, default=False, help="If set, cleans projects before rebuilding.")
+@click.option('-m', '--msbuild-path', type=click.Path(), default=None, envvar='MSBUILD_PATH',
+              help="Path to msbuild executable.")
+@click.option('-n', '--nuget-path', type=click.Path(), default=None, envvar='NUGET_PATH',
+              help='Path to NuGet executable.')
+@click.option('-f', '--feed', type=str, default=None, help='NuGet Feed URL. If not provided, packages are not pushed.')
+@click.option('-a', '--api-key', type=str, default=None, envvar='NUGET_API_KEY', help='NuGet Api Key.')
+@click.option('--native', is_flag=True,
+              help="If set, packages are created, packed and pushed in-process with native engines.")
+@click.option('-j', '--jobs', type=click.IntRange(1, None), default=4, help="Maximum number of concurrent uploads.")
+@click.option('--config', type=click.Path(), help="Config json.")
+@click.option('--config-path', type=str, help="Config json.")
+@click.option('-d', '--debug', is_flag=True, help="Enable verbose debug.")
+@click.option('-q', '--quiet', is_flag=True, help="Does not prompt for user input and hides extra info messages.")
+@click.pass_context
+def publish(ctx, path, output_dir, configuration, unity_project_path, root_dir, assembly_relative_dir, clean, rebuild,
+            msbuild_path, nuget_path, feed, api_key, native, jobs, config, config_path, debug, quiet):
+    uget = _create_uget(debug, quiet)
+    paths = path if isinstance(path, (list, tuple)) else [path]  # Config file might provide a single path
+    _exit(ctx, uget.publish(paths, output_dir, configuration, unity_project_path, root_dir, assembly_relative_dir,
+                            clean, msbuild_path, nuget_path, feed, api_key, native, jobs, rebuild))
+
+
+@ugetcli.command('run', cls=_create_command_class('config', 'config_path'),
+                 help='Runs build, create, pack and push for every project of a Visual Studio solution (.sln), '
+                      'in dependency order, several projects at a time.')
+@click.option('-s', '--solution', type=click.Path(exists=True, dir_okay=False), required=True,
+              help="Path to Visual Studio solution (.sln).")
+@click.option('--steps', type=str, default='build,create,pack,push',
+              help="Comma separated steps run for every project: build, create, pack, push.")
+@click.option('-j', '--jobs', type=click.IntRange(1, None), default=None,
+              help="Number of projects run concurrently, in separate processes. Defaults to number of CPUs.")
+@click.option('-c', '--configuration', type=click.Choice(['Debug', 'Release']), default='Release',
+              help='Build configuration.')
+@click.option('-o', '--output-dir', type=click.Path(), default='Output',
+              help='Output directory of .unitypackage and .nupkg files, relative to each project directory.')
+@click.option('-t', '--unity-project-path', type=click.Path(), default="UnityProject",
+              help='Path to the Unity project used to build .unitypackage, relative to each project directory.')
+@click.option('-m', '--msbuild-path', type=click.Path(), default=None, envvar='MSBUILD_PATH',
+              help="Path to msbuild executable.")
+@click.option('-n', '--nuget-path', type=click.Path(), default=None, envvar='NUGET_PATH',
+              help='Path to NuGet executable.')
+@click.option('-f', '--feed', type=str, default=None, help='NuGet Feed URL. If not provided, push is skipped.')
+@click.option('-a', '--api-key', type=str, default=None, envvar='NUGET_API_KEY', help='NuGet Api Key.')
+@click.option('--native', is_flag=True,
+              help="If set, packages are created, packed and pushed in-process with native engines.")
+@click.option('--config', type=click.Path(), help="Config json.")
+@click.option('--config-path', type=str, help="Config json.")
+@click.option('-d', '--debug', is_flag=True, help="Enable verbose debug.")
+@click.option('-q', '--quiet', is_flag=True, help="Does not prompt for user input and hides extra info messages.")
+@click.pass_context
+def run(ctx, solution, steps, jobs, configuration, output_dir, unity_project_path, msbuild_path, nuget_path, feed,
+        api_key, native, config, config_path, debug, quiet):
+    uget = _create_uget(debug, quiet)
+    steps = [step.strip() for step in steps.split(',') if step.strip()]
+    _exit(ctx, uget.run(solution, steps, jobs, configuration, output_dir, unity_project_path, msbuild_path,
+                        nuget_path, feed, api_key, native))
+
+
+@ugetcli.command('tools', help='Locates msbuild and NuGet executables used by uget.')
+@click.option('--refresh', is_flag=True, default=False,
+              help="If set, discards cached tool discovery results and probes tools again.")
+@click.option('-d', '--debug', is_flag=True, help="Enable verbose debug.")
+@click.option('-q', '--quiet', is_flag=True, help="Does not prompt for user input and hides extra info messages.")
+@click.pass_context
+def tools(ctx, refresh, debug, quiet):
+    uget = _create_uget(debug, quiet)
+    return uget.tools(refresh)
+
+
+@ugetcli.command('inspect', help='Lists assets of Unity Packages (.unitypackage) without extracting them.')
+@click.argument('paths', nargs=-1, type=click.Path())
+@click.option('-j', '--jobs', type=click.IntRange(1, None), default=4,
+              help="Number of packages inspected concurrently.")
+@click.option('--json', 'as_json', is_flag=True, help="If set, prints result as json.")
+@click.option('--index/--no-index', default=True,
+              help="Cache results in an index keyed by package content hash, so unchanged packages are not read again.")
+@click.option('-d', '--debug', is_flag=True, help="Enable verbose debug.")
+@click.option('-q', '--quiet', is_flag=True, help="Does not prompt for user input and hides extra info messages.")
+@click.pass_context
+def inspect(ctx, paths, jobs, as_json, index, debug, quiet):
+    uget = _create_uget(debug, quiet)
+    return uget.inspect(paths or ('Output',), jobs, as_json, index)
+
+
+@ugetcli.command('diff', help='Compares assets of two Unity Packages (.unitypackage): added, removed, moved '
+                              '(same guid, new pathname) and modified assets, with size deltas.')
+@click.argument('old', type=str)
+@click.argument('new', type=str)
+@click.option('-p', '--path', type=click.Path(), default=".",
+              help="Path to Visual Studio project (.csproj). Used to name packages provided by version.")
+@click.option('-o', '--output-dir', type=click.Path(), default='Output',
+              help='Directory packages provided by version are located in.')
+@click.option('-c', '--configuration', type=click.Choice(['Debug', 'Release']), default='Release',
+              help='Configuration of packages provided by version.')
+@click.option('--json', 'as_json', is_flag=True, help="If set, prints result as json.")
+@click.option('--index/--no-index', default=True,
+              help="Cache package listings in an index keyed by package content hash.")
+@click.option('-d', '--debug', is_flag=True, help="Enable verbose debug.")
+@click.option('-q', '--quiet', is_flag=True, help="Does not prompt for user input and hides extra info messages.")
+@click.pass_context
+def diff(ctx, old, new, path, output_dir, configuration, as_json, index, debug, quiet):
+    uget = _create_uget(debug, quiet)
+    return uget.diff(old, new, path, output_dir, configuration, as_json, index)
+
+
+@ugetcli.command('sync', help='Synchronizes directory with another one (i.e. assets into a Unity project), copying '
+                              'only files that changed.')
+@click.argument('src', type=click.Path(exists=True, file_okay=False))
+@click.argument('dst', type=click.Path(file_okay=False))
+@click.option('-j', '--jobs', type=click.IntRange(1, None), default=4, help="Number of files copied concurrently.")
+@click.option('--checksum', is_flag=True,
+              help="If set, files of the same size with different modification time are compared by content hash.")
+@click.option('--delete', is_flag=True, help="If set, files that don't exist in source are removed from destination.")
+@click.option('-n', '--dry-run', is_flag=True, help="If set, only prints what would be done.")
+@click.option('-d', '--debug', is_flag=True, help="Enable verbose debug.")
+@click.option('-q', '--quiet', is_flag=True, help="Does not prompt for user input and hides extra info messages.")
+@click.pass_context
+def sync(ctx, src, dst, jobs, checksum, delete, dry_run, debug, quiet):
+    uget = _create_uget(debug, quiet)
+    return uget.sync(src, dst, jobs, checksum, delete, dry_run)
+
+
+@ugetcli.command('discover', help='Lists Visual Studio projects (.csproj), NuGet specifications (.nuspec) and '
+                                  'solutions (.sln) in a directory tree.')
+@click.argument('root', type=click.Path(exists=True, file_okay=False), default='.')
+@click.option('-j', '--jobs', type=click.IntRange(1, None), default=4,
+              help="Number of top level directories walked concurrently.")
+@click.option('--json', 'as_json', is_flag=True, help="If set, prints result as json.")
+@click.option('--cache/--no-cache', 'use_cache', default=True,
+              help="Cache directory listings, so only directories that changed are listed again.")
+@click.option('-d', '--debug', is_flag=True, help="Enable verbose debug.")
+@click.option('-q', '--quiet', is_flag=True, help="Does not prompt for user input and hides extra info messages.")
+@click.pass_context
+def discover(ctx, root, jobs, as_json, use_cache, debug, quiet):
+    uget = _create_uget(debug, quiet)
+    return uget.discover(root, jobs, as_json, use_cache)
+
+
+@ugetcli.group('cache', help='Manages local build cache of Unity Packages (.unitypackage).')
+def cache():
+    pass
+
+
+@cache.command('serve', help='Runs reference remote cache server that stores artifacts in a directory.')
+@click.option('--host', type=str, default='127.0.0.1', help="Interface to listen on.")
+@click.option('--port', type=click.IntRange(0, 65535), default=8080, help="Port to listen on.")
+@click.option('--storage-dir', type=click.Path(file_okay=False), default='uget-cache',
+              help="Directory artifacts are stored in.")
+@click.option('--token', type=str, default=None, envvar='UGET_REMOTE_CACHE_TOKEN',
+              help="If provided, clients must send it as bearer token.")
+def cache_serve(host, port, storage_dir, token):
+    from ugetcli.cacheserver import CacheServer
+    server = CacheServer(storage_dir, host, port, token)
+    click.secho("Serving remote cache at {0} from {1}".format(server.url, os.path.abspath(storage_dir)))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+@cache.command('stats', help='Shows build cache location, size and hit rate.')
+@click.option('-d', '--debug', is_flag=True, help="Enable verbose debug.")
+@click.option('-q', '--quiet', is_flag=True, help="Does not prompt for user input and hides extra info messages.")
+@click.pass_context
+def cache_stats(ctx, debug, quiet):
+    uget = _create_uget(debug, quiet)
+    return uget.cache_stats()
+
+
+def _parse_size(ctx, param, value):
+    """Click callback that parses size with optional K, M or G suffix"""
+    from ugetcli.buildcache import parse_size
+    try:
+        return parse_size(value)
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+
+
+@cache.command('prune', help='Evicts least recently used Unity Packages until build cache fits the size limit.')
+@click.option('-s', '--max-size', type=str, default='0', callback=_parse_size,
+              help="Size limit, with optional K, M or G suffix (i.e. 500M). Default: 0, removes everything.")
+@click.option('-d', '--debug', is_flag=True, help="Enable verbose debug.")
+@click.option('-q', '--quiet', is_flag=True, help="Does not prompt for user input and hides extra info messages.")
 @click.pass_context
-def push(ctx, path, output_dir, feed, nuget_path, api_key, config, config_path, debug, quiet):
-    uget = UGetCli(debug, quiet)
-    return uget.push(path, output_dir, feed, nuget_path, api_key)
+def cache_prune(ctx, max_size, debug, quiet):
+    uget = _create_uget(debug, quiet)
+    return uget.cache_prune(max_size)
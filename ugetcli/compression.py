@@ -0,0 +1,42 @@
+import zipfile
+
+"""
+Helper module that maps compression profiles onto gzip and zip settings
+"""
+
+STORE = "store"
+FAST = "fast"
+DEFAULT = "default"
+MAX = "max"
+COMPRESSION_PROFILES = [STORE, FAST, DEFAULT, MAX]
+
+# Deflate level of every profile; default is zlib default level, also used by nuget pack
+_PROFILE_LEVELS = {STORE: 0, FAST: 1, DEFAULT: 6, MAX: 9}
+
+
+def get_gzip_level(profile):
+    """
+    Returns gzip compression level for the profile
+    :param profile: Compression profile - store, fast, default or max
+    :return: Compression level, 0-9
+    """
+    return _get_profile_level(profile)
+
+
+def get_zip_compression(profile):
+    """
+    Returns zip compression method and level for the profile
+    :param profile: Compression profile - store, fast, default or max
+    :return: Tuple (zipfile compression method, compression level)
+    """
+    level = _get_profile_level(profile)
+    if level == 0:
+        return zipfile.ZIP_STORED, None
+    return zipfile.ZIP_DEFLATED, level
+
+
+def _get_profile_level(profile):
+    if profile not in _PROFILE_LEVELS:
+        raise ValueError("Unknown compression profile {0}, expected one of: {1}".format(
+            profile, ", ".join(COMPRESSION_PROFILES)))
+    return _PROFILE_LEVELS[profile]
@@ -1,10 +1,11 @@
 import os
 import re
-import xml.etree.ElementTree as ET
 from ugetcli import utils
+from ugetcli.msbuildeval import ProjectEvaluator, PropertyGroupNode, iter_project_nodes, get_parent_directories, \
+    DIRECTORY_BUILD_PROPS
 
 """
-Helper module that provides access to NuGet methods
+Helper module that provides access to Visual C# Project methods
 """
 
 
@@ -12,10 +13,6 @@ class CsProj:
     """
     Facade class that provides access to access Visual C# Project information
     """
-    xml_namespace = "{http://schemas.microsoft.com/developer/msbuild/2003}"
-    xml_element_property_group = xml_namespace+"PropertyGroup"
-    xml_element_assembly_name = xml_namespace+"AssemblyName"
-    xml_element_output_path = xml_namespace+"OutputPath"
 
     def __init__(self, path, debug=False):
         self.path = CsProj.get_csproj_at_path(path)
@@ -23,47 +20,138 @@ class CsProj:
             raise IOError("Failed to locate .csproj at path: " + path)
 
         self.debug = debug
+        self._project_nodes = None
+        self._evaluators = {}
+        self._memo = {}
+        self._metadata_index = None
+
+    def set_metadata_index(self, metadata_index):
+        """
+        Enables persistent metadata index, so project properties are only read when project files change
+        :param metadata_index: MetadataIndex instance
+        """
+        self._metadata_index = metadata_index
+
+    def get_input_paths(self):
+        """
+        Returns list of files project metadata is derived from, including every location
+        Directory.Build.props could be imported from. Files imported by the project are tracked by the metadata index.
+        """
+        directories = get_parent_directories(os.path.dirname(self.path))
+        directory_build_props = [os.path.join(directory, DIRECTORY_BUILD_PROPS) for directory in directories]
+        return [self.path, self._get_assembly_info_path()] + directory_build_props
 
     def get_assembly_name(self):
-        tree = ET.parse(self.path)
-        root = tree.getroot()
+        return self._memoize("assembly_name", self._read_assembly_name)
 
-        for property_group in root.findall(self.xml_element_property_group):
-            assembly_name = property_group.find(self.xml_element_assembly_name)
-            if assembly_name is not None:
-                return assembly_name.text
-        return None
+    def get_output_path(self, configuration, platform=None):
+        """
+        Returns output path of the project for the configuration, evaluating conditions, imports
+        and Directory.Build.props in-process
+        :param configuration: Build configuration (Debug/Release)
+        :param platform: Build platform; if not provided, project default is used (usually AnyCPU)
+        :return: Output path relative to the project directory, using "/" as separator
+        """
+        return self._memoize("output_path|{0}|{1}".format(configuration, platform or ""),
+                             lambda: self._read_output_path(configuration, platform))
 
-    def get_output_path(self,  configuration):
-        tree = ET.parse(self.path)
-        root = tree.getroot()
+    def get_project_nodes(self):
+        """
+        Returns lazily parsed model of the project - sequence of top level nodes (see msbuildeval.iter_project_nodes).
+        .csproj file is parsed once and only as far as queries require.
+        """
+        if self._project_nodes is None:
+            self._project_nodes = _LazySequence(iter_project_nodes(self.path))
+        return self._project_nodes
+
+    def evaluate(self, configuration=None, platform=None):
+        """
+        Returns evaluator of the project properties for the configuration and platform
+        :param configuration: Build configuration; if not provided, project default is used
+        :param platform: Build platform; if not provided, project default is used
+        :return: ProjectEvaluator
+        """
+        key = (configuration, platform)
+        if key not in self._evaluators:
+            global_properties = {"Configuration": configuration, "Platform": platform}
+            self._evaluators[key] = ProjectEvaluator(self.path, global_properties, self.get_project_nodes())
+        return self._evaluators[key]
 
-        condition = "'$(Configuration)|$(Platform)' == '{0}|AnyCPU'".format(configuration)
+    def _read_assembly_name(self):
+        # Fast path: first unconditional literal AssemblyName, read without streaming the rest of the project
+        for node in self.get_project_nodes():
+            if not isinstance(node, PropertyGroupNode):
+                continue
+            for name, condition, value in node.properties:
+                if name != "AssemblyName":
+                    continue
+                if node.condition or condition or "$(" in value:
+                    return self.evaluate().get_property("AssemblyName")
+                return value.strip()
+        return self.evaluate().get_property("AssemblyName")
 
-        for property_group in root.findall(self.xml_element_property_group):
-            output_path = property_group.find(self.xml_element_output_path)
-            if output_path is not None and property_group.attrib["Condition"].strip() == condition:
-                # Convert to linux-style path to preserve compatibility between OS
-                return output_path.text.replace("\\", "/")
-        return None
+    def _read_output_path(self, configuration, platform):
+        output_path = self.evaluate(configuration, platform).get_property("OutputPath")
+        if not output_path:
+            return None
+        # Convert to linux-style path to preserve compatibility between OS
+        return output_path.replace("\\", "/")
+
+    def _get_imported_paths(self):
+        """ Returns files imported by evaluated configurations """
+        imported_paths = []
+        for evaluator in self._evaluators.values():
+            imported_paths += [path for path in evaluator.imported_paths if path not in imported_paths]
+        return imported_paths
+
+    def _memoize(self, key, method):
+        if key not in self._memo:
+            if self._metadata_index is not None:
+                self._memo[key] = self._metadata_index.get(self.get_input_paths(), key, method,
+                                                           self._get_imported_paths)
+            else:
+                self._memo[key] = method()
+        return self._memo[key]
+
+    def _get_assembly_info_path(self):
+        return os.path.join(os.path.dirname(self.path), 'Properties', 'AssemblyInfo.cs')
 
     def get_assembly_version(self):
         """ Extracts assembly version from AssemblyInfo.cs """
-        csproj_dir = os.path.dirname(self.path)
-        assembly_info_path = os.path.join(csproj_dir, 'Properties', 'AssemblyInfo.cs')
+        return self._memoize("assembly_version", self._read_assembly_version)
+
+    def _read_assembly_version(self):
+        assembly_info_path = self._get_assembly_info_path()
         if not os.path.isfile(assembly_info_path):
             return None
 
         with open(assembly_info_path, 'r') as assembly_info:
             text = assembly_info.read()
 
-        matches = re.findall('\[assembly: AssemblyVersion\("([\d.]+)"\)\]', text)
+        matches = re.findall(r'\[assembly: AssemblyVersion\("([\d.]+)"\)\]', text)
         if len(matches) == 0:
             raise ValueError("Failed to extract AssemblyVersion from {0}".format(assembly_info_path))
         else:
             version = matches[0]
             return version
 
+    def get_assembly_attributes(self):
+        """
+        Extracts string assembly attributes (i.e. AssemblyCompany, AssemblyDescription) from AssemblyInfo.cs
+        :return: Dictionary of attribute name to value
+        """
+        return self._memoize("assembly_attributes", self._read_assembly_attributes)
+
+    def _read_assembly_attributes(self):
+        assembly_info_path = self._get_assembly_info_path()
+        if not os.path.isfile(assembly_info_path):
+            return {}
+
+        with open(assembly_info_path, 'r') as assembly_info:
+            text = assembly_info.read()
+
+        return dict(re.findall(r'\[assembly:\s*(\w+)\("((?:[^"\\]|\\.)*)"\)\]', text))
+
     @staticmethod
     def get_csproj_at_path(path):
         """
@@ -81,3 +169,29 @@ class CsProj:
         If path is a csproj file, returns true, otherwise returns False
         """
         return os.path.isfile(path) and path.endswith('.csproj')
+
+
+class _LazySequence:
+    """
+    Memoizing wrapper around an iterator - items are pulled from the iterator only when iteration reaches them,
+    and are reused by every later iteration.
+    """
+    def __init__(self, iterator):
+        self._iterator = iterator
+        self._items = []
+
+    def __iter__(self):
+        index = 0
+        while True:
+            if index < len(self._items):
+                yield self._items[index]
+            elif self._iterator is None:
+                return
+            else:
+                try:
+                    self._items.append(next(self._iterator))
+                except StopIteration:
+                    self._iterator = None
+                    return
+                continue
+            index += 1
@@ -0,0 +1,155 @@
+import os
+import time
+import fnmatch
+import collections
+from ugetcli import utils
+
+"""
+Helper module that discovers Visual Studio projects (.csproj), NuGet specifications (.nuspec) and solutions (.sln)
+in a directory tree
+"""
+
+CSPROJ_EXTENSION = ".csproj"
+NUSPEC_EXTENSION = ".nuspec"
+SLN_EXTENSION = ".sln"
+DISCOVERED_EXTENSIONS = (CSPROJ_EXTENSION, NUSPEC_EXTENSION, SLN_EXTENSION)
+
+# Build outputs, Unity generated directories and IDE/version control metadata
+DEFAULT_IGNORE_PATTERNS = ("bin", "obj", "Library", "Temp", ".git", ".vs")
+
+# Directory modification times are only trusted if they are older than the entry by this margin (nanoseconds).
+# Otherwise the directory might have been changed again within filesystem timestamp granularity, and is listed.
+_RACY_MTIME_WINDOW_NS = 2 * 10 ** 9
+
+DiscoveryResult = collections.namedtuple("DiscoveryResult", [
+    "projects",       # Sorted absolute paths of .csproj files
+    "nuspecs",        # Sorted absolute paths of .nuspec files
+    "solutions",      # Sorted absolute paths of .sln files
+    "directories",    # Number of directories visited
+    "listed",         # Number of directories listed; others were unchanged since previous discovery
+])
+
+_Walk = collections.namedtuple("_Walk", ["entries", "listed"])
+
+
+class ProjectDiscovery:
+    """
+    Walks directory tree and finds every .csproj, .nuspec and .sln file.
+    Top level directories are walked concurrently. For every directory, discovered files and subdirectory names are
+    cached on disk with directory modification time, which changes whenever an entry is added, removed or renamed.
+    Unchanged directories are not listed again, so rediscovering a tree costs one stat call per directory.
+    """
+    CACHE_FILENAME = "discovery.json"
+
+    def __init__(self, jobs=4, ignore_patterns=DEFAULT_IGNORE_PATTERNS, use_cache=True, cache_dir=None):
+        """
+        :param jobs: Number of top level directories walked concurrently
+        :param ignore_patterns: Glob patterns of directories that are not walked. Patterns that contain "/" are matched
+               against directory path relative to the root, other patterns against directory name.
+        :param use_cache: If set, directory listings are cached on disk
+        :param cache_dir: Directory cache is stored in; uget cache directory if not provided
+        """
+        self.jobs = jobs
+        self.ignore_patterns = list(ignore_patterns)
+        self.use_cache = use_cache
+        self.cache_dir = cache_dir or utils.get_cache_dir()
+        self.path = os.path.join(self.cache_dir, self.CACHE_FILENAME)
+
+    def discover(self, root_dir):
+        """
+        Finds projects, NuGet specifications and solutions in the directory tree
+        :param root_dir: Root directory
+        :return: DiscoveryResult
+        """
+        if not os.path.isdir(root_dir):
+            raise IOError("Directory not found: {0}".format(root_dir))
+        root_dir = os.path.abspath(root_dir)
+        cache = utils.load_json_file(self.path, {}) if self.use_cache else {}
+        cached_entries = cache.get(root_dir) or {}
+
+        root_walk = self._walk(root_dir, [""], cached_entries, recursive=False)
+        subdirectories = self._get_subdirectories("", root_walk.entries[""])
+        walks = [root_walk]
+        if self.jobs > 1 and len(subdirectories) > 1:
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers=min(self.jobs, len(subdirectories))) as executor:
+                walks += list(executor.map(lambda relative_dir: self._walk(root_dir, [relative_dir], cached_entries),
+                                           subdirectories))
+        elif subdirectories:
+            walks.append(self._walk(root_dir, subdirectories, cached_entries))
+
+        entries = {}
+        for walk in walks:
+            entries.update(walk.entries)
+        listed = sum(walk.listed for walk in walks)
+        if self.use_cache and (listed or len(entries) != len(cached_entries)):
+            cache[root_dir] = entries
+            utils.save_json_file(self.path, cache)
+
+        found = collections.defaultdict(list)
+        for relative_dir, entry in entries.items():
+            for filename in entry[1]:
+                found[os.path.splitext(filename)[1].lower()].append(
+                    os.path.join(utils.join_relative_path(root_dir, relative_dir), filename))
+        return DiscoveryResult(sorted(found[CSPROJ_EXTENSION]), sorted(found[NUSPEC_EXTENSION]),
+                               sorted(found[SLN_EXTENSION]), len(entries), listed)
+
+    def clear(self):
+        """ Removes all cached directory listings """
+        if os.path.isfile(self.path):
+            os.remove(self.path)
+
+    def is_ignored(self, relative_dir):
+        """
+        Returns True if directory is excluded by ignore patterns
+        :param relative_dir: Directory path relative to the root, with "/" separators
+        """
+        name = relative_dir.rpartition("/")[2]
+        for pattern in self.ignore_patterns:
+            if fnmatch.fnmatch(relative_dir if "/" in pattern else name, pattern.strip("/")):
+                return True
+        return False
+
+    def _walk(self, root_dir, relative_dirs, cached_entries, recursive=True):
+        """
+        Walks directories, reusing cached entries of unchanged directories
+        :return: _Walk - number of listed directories, and entries
+                 {relative directory: [mtime_ns, discovered file names, subdirectory names, recorded_at]}
+        """
+        entries = {}
+        listed = 0
+        pending = list(relative_dirs)
+        while pending:
+            relative_dir = pending.pop()
+            path = utils.join_relative_path(root_dir, relative_dir)
+            try:
+                mtime_ns = os.stat(path).st_mtime_ns
+            except OSError:
+                continue  # Removed while walking
+            entry = cached_entries.get(relative_dir)
+            if entry is None or entry[0] != mtime_ns or mtime_ns >= entry[3] - _RACY_MTIME_WINDOW_NS:
+                recorded_at = time.time_ns()
+                files, subdirectories = _list_directory(path)
+                entry = [mtime_ns, files, subdirectories, recorded_at]
+                listed += 1
+            entries[relative_dir] = entry
+            if recursive:
+                pending += self._get_subdirectories(relative_dir, entry)
+        return _Walk(entries, listed)
+
+    def _get_subdirectories(self, relative_dir, entry):
+        subdirectories = [relative_dir + "/" + name if relative_dir else name for name in entry[2]]
+        return [subdirectory for subdirectory in subdirectories if not self.is_ignored(subdirectory)]
+
+
+def _list_directory(path):
+    """
+    Lists directory, without following symbolic links to directories
+    :return: Tuple (sorted names of discovered files, sorted names of subdirectories)
+    """
+    try:
+        files, subdirectories = utils.scan_directory(path, follow_symlinks=False)
+    except OSError:
+        return [], []  # Removed or not readable
+    return (sorted(entry.name for entry in files if os.path.splitext(entry.name)[1].lower() in DISCOVERED_EXTENSIONS),
+            sorted(entry.name for entry in subdirectories))
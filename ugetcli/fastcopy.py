@@ -0,0 +1,197 @@
+import io
+import os
+import sys
+import time
+import errno
+import shutil
+import threading
+import collections
+from ugetcli import utils
+
+"""
+Helper module that copies file content in the kernel where the platform allows it
+"""
+
+REFLINK = "reflink"
+HARDLINK = "hardlink"
+COPY_FILE_RANGE = "copy_file_range"
+SENDFILE = "sendfile"
+BUFFERED = "buffered"
+
+_FICLONE = 0x40049409  # Linux ioctl that clones file extents (btrfs, xfs, overlayfs over them)
+_CHUNK_SIZE = 1024 * 1024
+_MAX_RANGE = 1024 * 1024 * 1024  # Upper bound of a single copy_file_range/sendfile call
+# Errors that mean the method is not supported for these files, rather than a failed copy
+_UNSUPPORTED_ERRNOS = set(getattr(errno, name) for name in
+                          ["ENOSYS", "EXDEV", "EINVAL", "EOPNOTSUPP", "ENOTSUP", "ENOTSOCK", "EBADF", "ENOTTY",
+                           "EPERM", "ETXTBSY"] if hasattr(errno, name))
+
+
+class TransferStats:
+    """
+    Thread-safe counters of copied bytes and time spent copying, per copy method
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.bytes = collections.Counter()
+            self.seconds = collections.Counter()
+
+    def add(self, method, size, elapsed):
+        with self._lock:
+            self.bytes[method] += size
+            self.seconds[method] += elapsed
+
+    def format(self):
+        """
+        Formats statistics as text
+        :return: List of lines, one per copy method
+        """
+        with self._lock:
+            lines = []
+            for method in sorted(self.bytes):
+                size, elapsed = self.bytes[method], self.seconds[method]
+                lines.append("{0}: {1:.1f} MB in {2:.3f} s ({3:.1f} MB/s)".format(
+                    method, size / (1024.0 * 1024.0), elapsed,
+                    size / (1024.0 * 1024.0) / elapsed if elapsed > 0 else 0))
+            return lines
+
+
+# Process-wide statistics of every copy made through this module
+stats = TransferStats()
+
+
+def copy_file(src, dst, link=False):
+    """
+    Copies file content and permission bits, replacing destination.
+    Content is written to a temporary file first, so hardlinks of the destination are never modified in place.
+    Tries reflink, then copy_file_range and sendfile, and falls back to buffered copy.
+    :param src: Source path
+    :param dst: Destination path
+    :param link: If set, destination is hardlinked to the source where possible. Only safe if neither file
+           is modified in place afterwards.
+    :return: Copy method used
+    """
+    start = time.time()
+    tmp_path = "{0}.{1}.{2}.tmp".format(dst, os.getpid(), threading.current_thread().ident)
+    try:
+        method = None
+        if link:
+            try:
+                os.link(src, tmp_path)
+                method = HARDLINK
+            except (AttributeError, OSError):
+                pass
+        if method is None:
+            with open(src, "rb") as source, open(tmp_path, "wb") as target:
+                method = _reflink(source, target) or copy_range(source, target, os.fstat(source.fileno()).st_size,
+                                                                record=False)
+            shutil.copymode(src, tmp_path)
+        utils.replace_file(tmp_path, dst)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    stats.add(method, os.path.getsize(dst), time.time() - start)
+    return method
+
+
+def copy_range(src_file, dst_file, count, record=True):
+    """
+    Copies count bytes from the current position of src_file to the current position of dst_file,
+    and advances both positions. Uses copy_file_range or sendfile if both are regular files.
+    :param src_file: Readable binary file object
+    :param dst_file: Writable binary file object
+    :param count: Number of bytes to copy
+    :param record: If set, the copy is added to transfer statistics
+    :return: Copy method used
+    :raises IOError: If src_file ends before count bytes were copied
+    """
+    start = time.time()
+    method = None
+    src_fd = dst_fd = None
+    try:
+        dst_file.flush()
+        src_fd, dst_fd = src_file.fileno(), dst_file.fileno()
+    except (AttributeError, io.UnsupportedOperation):
+        pass  # In-memory file
+
+    if src_fd is not None and dst_fd is not None and count > 0:
+        src_position, dst_position = src_file.tell(), dst_file.tell()
+        copied = 0
+        for name, method_copy in ((COPY_FILE_RANGE, _copy_file_range), (SENDFILE, _sendfile)):
+            copied = method_copy(src_fd, dst_fd, src_position, dst_position, count)
+            if copied is not None:
+                method = name
+                break
+        if method is not None:
+            # Buffered file objects don't know the file descriptors moved; positions are set explicitly
+            src_file.seek(src_position + copied)
+            dst_file.seek(dst_position + copied)
+            if copied < count:
+                raise IOError("Unexpected end of file, {0} of {1} bytes copied".format(copied, count))
+
+    if method is None:
+        method = BUFFERED
+        remaining = count
+        while remaining > 0:
+            chunk = src_file.read(min(remaining, _CHUNK_SIZE))
+            if not chunk:
+                raise IOError("Unexpected end of file, {0} of {1} bytes copied".format(count - remaining, count))
+            dst_file.write(chunk)
+            remaining -= len(chunk)
+    if record:
+        stats.add(method, count, time.time() - start)
+    return method
+
+
+def _reflink(source, target):
+    """ Clones source extents into the empty target file; returns REFLINK on success, otherwise None """
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        import fcntl
+        fcntl.ioctl(target.fileno(), _FICLONE, source.fileno())
+        return REFLINK
+    except (ImportError, IOError, OSError):
+        return None
+
+
+def _copy_file_range(src_fd, dst_fd, src_position, dst_position, count):
+    """ Copies with os.copy_file_range (Linux, python 3.8+); returns number of copied bytes, or None if unsupported """
+    if not hasattr(os, "copy_file_range"):
+        return None
+    copied = 0
+    while copied < count:
+        try:
+            n = os.copy_file_range(src_fd, dst_fd, min(count - copied, _MAX_RANGE),
+                                   src_position + copied, dst_position + copied)
+        except OSError as e:
+            if copied == 0 and e.errno in _UNSUPPORTED_ERRNOS:
+                return None
+            raise
+        if n == 0:
+            break  # End of source file
+        copied += n
+    return copied
+
+
+def _sendfile(src_fd, dst_fd, src_position, dst_position, count):
+    """ Copies with os.sendfile, which accepts regular file as output on Linux; returns None if unsupported """
+    if not hasattr(os, "sendfile") or not sys.platform.startswith("linux"):
+        return None
+    os.lseek(dst_fd, dst_position, os.SEEK_SET)
+    copied = 0
+    while copied < count:
+        try:
+            n = os.sendfile(dst_fd, src_fd, src_position + copied, min(count - copied, _MAX_RANGE))
+        except OSError as e:
+            if copied == 0 and e.errno in _UNSUPPORTED_ERRNOS:
+                return None
+            raise
+        if n == 0:
+            break
+        copied += n
+    return copied
@@ -0,0 +1,477 @@
+import os
+import time
+import json
+import uuid
+import zipfile
+import threading
+import collections
+import xml.etree.ElementTree as ET
+from http.client import HTTPConnection, HTTPSConnection, HTTPException
+from urllib.parse import urlsplit, urljoin, quote
+import click
+from ugetcli import utils
+from ugetcli.nuget import NuGetRunner
+
+"""
+Helper module that provides NuGet feed HTTP client - pushes packages without running NuGet executable
+"""
+
+_CHUNK_SIZE = 256 * 1024
+_USER_AGENT = "ugetcli"
+_PUBLISH_RESOURCE_TYPE = "PackagePublish/2.0.0"
+_PACKAGE_BASE_ADDRESS_RESOURCE_TYPE = "PackageBaseAddress/3.0.0"
+_REGISTRATIONS_RESOURCE_TYPE = "RegistrationsBaseUrl"
+_V2_SERVICE_ENDPOINT = "api/v2/package/"
+
+
+# Responses that are worth retrying: timeouts, throttling and server errors
+_RETRY_STATUSES = (408, 429, 500, 502, 503, 504)
+_CONFLICT_STATUS = 409
+
+
+class PushResult(collections.namedtuple("PushResult", ["path", "status", "reason", "bytes", "seconds", "attempts"])):
+    """ Result of a single package upload. Status is 0 if feed could not be reached. """
+
+    @property
+    def succeeded(self):
+        return 200 <= self.status < 300
+
+    @property
+    def duplicate(self):
+        return self.status == _CONFLICT_STATUS
+
+    @property
+    def existing(self):
+        """ Package was not uploaded, because the feed already had this version before the push """
+        return self.duplicate and self.attempts == 0
+
+    @property
+    def throughput(self):
+        """ Upload speed, bytes per second """
+        return self.bytes / self.seconds if self.seconds > 0 else 0.0
+
+
+class FeedError(Exception):
+    """ Raised when NuGet feed can't be reached or returns an unexpected response """
+    pass
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of keep-alive HTTP connections, keyed by scheme, host and port.
+    Connections are returned to the pool after the response is fully read and reused for the next request.
+    """
+    def __init__(self, timeout=300):
+        self.timeout = timeout
+        self._idle = {}
+        self._lock = threading.Lock()
+        self.connections_created = 0
+
+    def request(self, method, url, headers=None, body=None, body_length=None, response_file=None):
+        """
+        Sends request over a pooled connection
+        :param method: HTTP method
+        :param url: Absolute URL
+        :param headers: Dictionary of headers
+        :param body: Bytes, or a method that returns an iterable of byte chunks (body_length must be provided)
+        :param body_length: Length of the streamed body
+        :param response_file: Optional writable file object; successful (2xx) response body is streamed into it
+        :return: Tuple (status, reason, response body bytes - empty if streamed into response_file)
+        """
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.hostname, parts.port)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+
+        for attempt in range(2):
+            connection, reused = self._acquire(key)
+            try:
+                status, reason, data, keep_alive = self._send(connection, method, path, parts.netloc, headers, body,
+                                                              body_length, response_file)
+            except (HTTPException, IOError, OSError):
+                connection.close()
+                if reused and attempt == 0:
+                    continue  # Idle keep-alive connection was closed by the server, retry on a new connection
+                raise
+            if keep_alive:
+                self._release(key, connection)
+            else:
+                connection.close()
+            return status, reason, data
+
+    def close(self):
+        """ Closes all idle connections """
+        with self._lock:
+            for connections in self._idle.values():
+                for connection in connections:
+                    connection.close()
+            self._idle = {}
+
+    def _acquire(self, key):
+        with self._lock:
+            connections = self._idle.get(key)
+            if connections:
+                return connections.pop(), True
+            self.connections_created += 1
+        scheme, host, port = key
+        connection_class = HTTPSConnection if scheme == "https" else HTTPConnection
+        return connection_class(host, port, timeout=self.timeout), False
+
+    def _release(self, key, connection):
+        with self._lock:
+            self._idle.setdefault(key, []).append(connection)
+
+    @staticmethod
+    def _send(connection, method, path, host, headers, body, body_length, response_file=None):
+        connection.putrequest(method, path, skip_host=True, skip_accept_encoding=True)
+        connection.putheader("Host", host)
+        connection.putheader("User-Agent", _USER_AGENT)
+        connection.putheader("Connection", "keep-alive")
+        for name, value in (headers or {}).items():
+            connection.putheader(name, value)
+        if body is None:
+            body = b""
+        if isinstance(body, bytes):
+            connection.putheader("Content-Length", str(len(body)))
+            connection.endheaders()
+            if body:
+                connection.send(body)
+        else:
+            connection.putheader("Content-Length", str(body_length))
+            connection.endheaders()
+            for chunk in body():
+                connection.send(chunk)
+
+        response = connection.getresponse()
+        if response_file is not None and 200 <= response.status < 300:
+            for chunk in iter(lambda: response.read(_CHUNK_SIZE), b""):
+                response_file.write(chunk)
+            data = b""
+        else:
+            data = response.read()
+        keep_alive = not response.will_close
+        return response.status, response.reason, data, keep_alive
+
+
+class NuGetFeedClient:
+    """
+    NuGet feed client that speaks V2 and V3 push protocol.
+    Packages are streamed from disk as multipart/form-data, connections are kept alive across packages,
+    and V3 service index is cached on disk.
+    """
+    SERVICE_INDEX_CACHE_FILENAME = "feeds.json"
+    SERVICE_INDEX_TTL = 3600  # Seconds
+
+    def __init__(self, feed_url, api_key=None, debug=False, connection_pool=None, cache_dir=None):
+        self.feed_url = feed_url
+        self.api_key = api_key
+        self.debug = debug
+        self.connection_pool = connection_pool or ConnectionPool()
+        self.cache_dir = cache_dir or utils.get_cache_dir()
+        self._service_index = None
+        self._versions = {}  # Lowercase package id -> set of lowercase versions, or None if feed can't list them
+        self._exists = {}  # (lowercase package id, lowercase version) -> True if feed has the package
+        self._lock = threading.Lock()
+
+    def is_v3(self):
+        """ Returns True if feed URL points to V3 service index """
+        return urlsplit(self.feed_url).path.endswith("/index.json")
+
+    def get_service_index(self):
+        """
+        Returns V3 service index resources, using on-disk cache
+        :return: List of resources (dictionaries with @id and @type)
+        """
+        with self._lock:
+            if self._service_index is None:
+                self._service_index = self._load_service_index()
+        return self._service_index
+
+    def get_resource_url(self, resource_type):
+        """
+        Returns URL of V3 resource by its type (i.e. PackagePublish/2.0.0)
+        :param resource_type: Resource type; matched exactly, or by prefix when version is omitted
+        :return: Resource URL or None
+        """
+        for resource in self.get_service_index():
+            types = resource.get("@type")
+            types = types if isinstance(types, list) else [types]
+            if any(t == resource_type or t.split("/")[0] == resource_type for t in types if t):
+                return resource.get("@id")
+        return None
+
+    def get_push_url(self):
+        """ Returns URL packages are pushed to """
+        if self.is_v3():
+            push_url = self.get_resource_url(_PUBLISH_RESOURCE_TYPE)
+            if not push_url:
+                raise FeedError("Feed does not provide {0} resource: {1}".format(_PUBLISH_RESOURCE_TYPE,
+                                                                                 self.feed_url))
+            return push_url
+
+        # Same as NuGet client: if feed URL has no path, push to the V2 service endpoint, otherwise to feed URL
+        base_url = self.feed_url if self.feed_url.endswith("/") else self.feed_url + "/"
+        if not urlsplit(base_url).path.strip("/"):
+            return urljoin(base_url, _V2_SERVICE_ENDPOINT)
+        return base_url
+
+    def get_package_versions(self, package_id):
+        """
+        Returns versions of the package published on the feed, using V3 flat container resource.
+        Results are cached for the lifetime of the client.
+        :param package_id: Package id
+        :return: Set of lowercase normalized versions, or None if feed does not support listing versions
+        """
+        package_id = package_id.lower()
+        with self._lock:
+            if package_id in self._versions:
+                return self._versions[package_id]
+
+        versions = None
+        base_url = self.get_resource_url(_PACKAGE_BASE_ADDRESS_RESOURCE_TYPE) if self.is_v3() else None
+        if base_url:
+            url = _join_url(base_url, quote(package_id), "index.json")
+            status, reason, data = self.connection_pool.request("GET", url, {"Accept": "application/json"})
+            if status == 200:
+                try:
+                    versions = set(v.lower() for v in json.loads(data.decode("utf-8")).get("versions", []))
+                except ValueError:
+                    versions = None
+            elif status == 404:
+                versions = set()  # Package was never published
+
+        with self._lock:
+            self._versions[package_id] = versions
+        return versions
+
+    def package_exists(self, package_id, version):
+        """
+        Checks if the feed already has the package version.
+        Uses V3 flat container, V3 registration or V2 OData endpoint, whichever is available.
+        Results are cached for the lifetime of the client.
+        :param package_id: Package id
+        :param version: Normalized package version
+        :return: True if package version exists, False if it does not or feed can't tell
+        """
+        key = (package_id.lower(), version.lower())
+        with self._lock:
+            if key in self._exists:
+                return self._exists[key]
+
+        versions = self.get_package_versions(package_id)
+        if versions is not None:
+            exists = key[1] in versions
+        else:
+            if self.is_v3():
+                registrations_url = self.get_resource_url(_REGISTRATIONS_RESOURCE_TYPE)
+                url = None
+                if registrations_url:
+                    url = _join_url(registrations_url, quote(key[0]), quote(key[1]) + ".json")
+            else:
+                url = urljoin(self.feed_url if self.feed_url.endswith("/") else self.feed_url + "/",
+                              "Packages(Id='{0}',Version='{1}')".format(quote(package_id), quote(version)))
+            exists = False
+            if url:
+                status, reason, data = self.connection_pool.request("GET", url)
+                exists = status == 200
+
+        with self._lock:
+            self._exists[key] = exists
+        return exists
+
+    def push(self, nupkg_path):
+        """
+        Uploads package to the feed
+        :param nupkg_path: Path to the .nupkg
+        :return: PushResult
+        """
+        boundary = uuid.uuid4().hex
+        preamble = ("--{0}\r\n"
+                    "Content-Disposition: form-data; name=\"package\"; filename=\"package.nupkg\"\r\n"
+                    "Content-Type: application/octet-stream\r\n\r\n").format(boundary).encode("utf-8")
+        epilogue = "\r\n--{0}--\r\n".format(boundary).encode("utf-8")
+        file_size = os.path.getsize(nupkg_path)
+
+        def stream_body():
+            yield preamble
+            with open(nupkg_path, "rb") as f:
+                for chunk in iter(lambda: f.read(_CHUNK_SIZE), b""):
+                    yield chunk
+            yield epilogue
+
+        headers = {"Content-Type": "multipart/form-data; boundary=" + boundary}
+        if self.api_key:
+            headers["X-NuGet-ApiKey"] = self.api_key
+
+        push_url = self.get_push_url()
+        if self.debug:
+            click.secho("PUT {0} ({1} bytes)".format(push_url, file_size))
+        start = time.time()
+        status, reason, data = self.connection_pool.request("PUT", push_url, headers, stream_body,
+                                                            len(preamble) + file_size + len(epilogue))
+        return PushResult(nupkg_path, status, reason, file_size, time.time() - start, 1)
+
+    def close(self):
+        self.connection_pool.close()
+
+    def _load_service_index(self):
+        cache_path = os.path.join(self.cache_dir, self.SERVICE_INDEX_CACHE_FILENAME)
+        cache = utils.load_json_file(cache_path, {})
+        entry = cache.get(self.feed_url)
+        if entry is not None and time.time() - entry.get("fetched_at", 0) < self.SERVICE_INDEX_TTL:
+            return entry["resources"]
+
+        status, reason, data = self.connection_pool.request("GET", self.feed_url, {"Accept": "application/json"})
+        if status != 200:
+            raise FeedError("Failed to fetch service index {0}: {1} {2}".format(self.feed_url, status, reason))
+        try:
+            resources = json.loads(data.decode("utf-8")).get("resources", [])
+        except ValueError:
+            raise FeedError("Invalid service index: " + self.feed_url)
+
+        cache = utils.load_json_file(cache_path, {})
+        cache[self.feed_url] = {"fetched_at": time.time(), "resources": resources}
+        utils.save_json_file(cache_path, cache)
+        return resources
+
+
+def read_package_identity(nupkg_path):
+    """
+    Reads package id and version from the .nuspec inside the package
+    :param nupkg_path: Path to the .nupkg
+    :return: Tuple (package id, normalized version)
+    """
+    with zipfile.ZipFile(nupkg_path) as archive:
+        nuspec_name = next(name for name in archive.namelist() if name.endswith(".nuspec") and "/" not in name)
+        with archive.open(nuspec_name) as f:
+            root = ET.parse(f).getroot()
+    values = {}
+    for element in root.iter():
+        name = element.tag.split("}")[-1]
+        if name in ("id", "version") and name not in values:
+            values[name] = (element.text or "").strip()
+    return values["id"], NuGetRunner.get_normalized_nuget_pack_version(values["version"])
+
+
+def find_existing_packages(client, nupkg_paths, jobs=4):
+    """
+    Checks which packages are already published on the feed.
+    Lookups run concurrently, one per package id where feed can list versions.
+    :param client: NuGetFeedClient
+    :param nupkg_paths: List of paths to .nupkg files
+    :param jobs: Maximum number of concurrent lookups
+    :return: Set of paths of packages that exist on the feed
+    """
+    packages = {}  # Lowercase package id -> list of (path, version)
+    for nupkg_path in nupkg_paths:
+        try:
+            package_id, version = read_package_identity(nupkg_path)
+        except (zipfile.BadZipfile, StopIteration, KeyError, ET.ParseError, IOError, OSError, click.UsageError):
+            continue  # Not a valid package, let the feed reject it
+        packages.setdefault(package_id.lower(), []).append((nupkg_path, version))
+
+    def lookup(package_id):
+        try:
+            return [path for path, version in packages[package_id] if client.package_exists(package_id, version)]
+        except (FeedError, HTTPException, IOError, OSError):
+            return []  # Lookup is an optimization, upload anyway
+
+    package_ids = sorted(packages)
+    if jobs <= 1 or len(package_ids) <= 1:
+        return set(path for package_id in package_ids for path in lookup(package_id))
+
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=min(len(package_ids), jobs)) as executor:
+        return set(path for paths in executor.map(lookup, package_ids) for path in paths)
+
+
+def push_packages(client, nupkg_paths, jobs=4, retries=3, backoff=1.0, sleep=time.sleep, check_existing=False):
+    """
+    Uploads packages concurrently, retrying failed uploads with exponential backoff
+    :param client: NuGetFeedClient
+    :param nupkg_paths: List of paths to .nupkg files
+    :param jobs: Maximum number of concurrent uploads
+    :param retries: Number of times a failed upload is retried
+    :param backoff: Delay before the first retry in seconds; doubled on every next retry
+    :param sleep: Method used to wait between retries
+    :param check_existing: If set, packages that already exist on the feed are not uploaded, and are reported
+           as existing duplicates with 0 attempts
+    :return: List of PushResult, in the same order as nupkg_paths
+    """
+    existing = find_existing_packages(client, nupkg_paths, jobs) if check_existing else set()
+
+    def push_with_retries(nupkg_path):
+        if nupkg_path in existing:
+            return PushResult(nupkg_path, _CONFLICT_STATUS, "Already exists", os.path.getsize(nupkg_path), 0.0, 0)
+        for attempt in range(retries + 1):
+            if attempt:
+                sleep(backoff * 2 ** (attempt - 1))
+            try:
+                result = client.push(nupkg_path)._replace(attempts=attempt + 1)
+            except (FeedError, HTTPException, IOError, OSError) as e:
+                result = PushResult(nupkg_path, 0, str(e), os.path.getsize(nupkg_path), 0.0, attempt + 1)
+                if isinstance(e, FeedError) or not os.path.isfile(nupkg_path):
+                    return result
+            if result.status != 0 and result.status not in _RETRY_STATUSES:
+                return result
+        return result
+
+    if jobs <= 1 or len(nupkg_paths) <= 1:
+        return [push_with_retries(nupkg_path) for nupkg_path in nupkg_paths]
+
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=min(len(nupkg_paths), jobs)) as executor:
+        return list(executor.map(push_with_retries, nupkg_paths))
+
+
+def format_push_summary(results, seconds, skip_duplicate=False):
+    """
+    Formats summary table of package uploads
+    :param results: List of PushResult
+    :param seconds: Total time spent uploading packages
+    :param skip_duplicate: If set, packages rejected as duplicates are reported as skipped; packages found on the feed
+           before uploading are always skipped
+    :return: List of lines
+    """
+    statuses = [_get_push_status(result, skip_duplicate) for result in results]
+    name_width = max([len("Package")] + [len(os.path.basename(result.path)) for result in results])
+    status_width = max([16] + [len(status) for status in statuses])
+    row_format = "{0:<" + str(name_width) + "}  {1:<" + str(status_width) + "}  {2:>10}  {3:>9}  {4:>10}  {5:>8}"
+    lines = [row_format.format("Package", "Status", "Size", "Time", "Speed", "Attempts")]
+    for result, status in zip(results, statuses):
+        speed = "{0:.2f} MB/s".format(result.throughput / (1024.0 * 1024.0)) if result.succeeded else "-"
+        lines.append(row_format.format(
+            os.path.basename(result.path), status, "{0:.1f} KB".format(result.bytes / 1024.0),
+            "{0:.0f} ms".format(result.seconds * 1000), speed, result.attempts))
+
+    uploaded = [result for result in results if result.succeeded]
+    failed = [result for result in results if not push_result_ok(result, skip_duplicate)]
+    total_bytes = sum(result.bytes for result in uploaded)
+    lines.append("{0} pushed, {1} skipped, {2} failed - {3:.1f} KB in {4:.2f} s ({5:.2f} MB/s)".format(
+        len(uploaded), len(results) - len(uploaded) - len(failed), len(failed),
+        total_bytes / 1024.0, seconds, total_bytes / seconds / (1024.0 * 1024.0) if seconds > 0 else 0.0))
+    return lines
+
+
+def push_result_ok(result, skip_duplicate=False):
+    """ Returns True if package was uploaded, already existed on the feed, or was skipped as a duplicate """
+    return result.succeeded or result.existing or (skip_duplicate and result.duplicate)
+
+
+def _get_push_status(result, skip_duplicate):
+    if result.succeeded:
+        status = "pushed"
+    elif result.existing or (skip_duplicate and result.duplicate):
+        status = "skipped"
+    elif result.reason:
+        status = "failed: " + result.reason
+    else:
+        status = "failed"
+    if not result.attempts:
+        return "exists, " + status  # Upload was skipped after checking the feed
+    return "{0} {1}".format(result.status, status) if result.status else status
+
+
+def _join_url(base_url, *parts):
+    return base_url.rstrip("/") + "/" + "/".join(parts)
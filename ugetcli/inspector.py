@@ -0,0 +1,281 @@
+import os
+import zlib
+import hashlib
+import collections
+import click
+from ugetcli import utils
+from ugetcli.metadata import FileDigestCache
+
+"""
+Helper module that lists Unity Package (.unitypackage) content in a single streaming pass, without extracting it
+"""
+
+_CHUNK_SIZE = 256 * 1024
+_BLOCK_SIZE = 512
+# Bump when the layout of index files changes
+_INDEX_VERSION = 2
+
+UnityPackageAsset = collections.namedtuple("UnityPackageAsset", [
+    "guid",               # Asset guid
+    "pathname",           # Path of the asset inside the Unity project
+    "size",               # Size of the asset content; None for directories
+    "offset",             # Offset of the asset content in the uncompressed tar stream; None for directories
+    "compressed_offset",  # Offset in the .unitypackage where compressed asset content starts; None for directories
+    "compressed_size",    # Number of compressed bytes asset content spans; None for directories
+    "digest",             # sha1 of the asset content; None for directories
+    "meta_digest",        # sha1 of the .meta file content
+])
+
+
+class UnityPackageInspector:
+    """
+    Lists assets of .unitypackage files.
+    Archive is decompressed once as a stream and tar headers are parsed directly, so positions of every asset
+    in both uncompressed and compressed stream are known, and nothing is written to disk.
+    Asset content is hashed while it streams through, in chunks, so memory use does not depend on asset size.
+    Results are stored in an index keyed by the package content hash, so inspecting the same package again
+    (even if it was copied or renamed) only reads the index.
+    """
+    INDEX_DIRNAME = "inspect"
+
+    def __init__(self, cache_dir=None, use_index=True, digest_cache=None):
+        """
+        :param cache_dir: Cache directory the index is stored in; uget cache directory if not provided
+        :param use_index: If set, results are read from and written to the index
+        :param digest_cache: Optional FileDigestCache shared with other components
+        """
+        self.cache_dir = cache_dir or utils.get_cache_dir()
+        self.index_dir = os.path.join(self.cache_dir, self.INDEX_DIRNAME)
+        self.use_index = use_index
+        self.digest_cache = digest_cache or FileDigestCache(self.cache_dir)
+
+    def inspect(self, unitypackage_path):
+        """
+        Lists assets of the .unitypackage
+        :param unitypackage_path: Path to the .unitypackage
+        :return: List of UnityPackageAsset, in archive order
+        """
+        index_path = None
+        if self.use_index:
+            index_path = os.path.join(self.index_dir, self.digest_cache.get_digest(unitypackage_path) + ".json")
+            index = utils.load_json_file(index_path)
+            if index and index.get("version") == _INDEX_VERSION:
+                return [UnityPackageAsset(*asset) for asset in index["assets"]]
+
+        try:
+            with open(unitypackage_path, "rb") as f:
+                assets = read_unitypackage_assets(f)
+        except zlib.error as e:
+            raise click.UsageError("Failed to read Unity Package {0}: {1}".format(unitypackage_path, e))
+        if index_path:
+            utils.save_json_file(index_path, {"version": _INDEX_VERSION, "assets": [list(asset) for asset in assets]})
+        return assets
+
+    def inspect_many(self, unitypackage_paths, jobs=4):
+        """
+        Lists assets of multiple .unitypackage files concurrently; zlib releases GIL while decompressing
+        :param unitypackage_paths: List of paths
+        :param jobs: Number of threads
+        :return: List of tuples (path, list of UnityPackageAsset), in the same order as paths
+        """
+        if jobs <= 1 or len(unitypackage_paths) <= 1:
+            results = [(path, self.inspect(path)) for path in unitypackage_paths]
+        else:
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers=jobs) as executor:
+                results = list(zip(unitypackage_paths, executor.map(self.inspect, unitypackage_paths)))
+        self.digest_cache.save()
+        return results
+
+
+def read_unitypackage_assets(fileobj):
+    """
+    Reads assets from .unitypackage stream
+    :param fileobj: Readable binary file object positioned at the start of .unitypackage
+    :return: List of UnityPackageAsset, in archive order
+    """
+    reader = _GzipStreamReader(fileobj)
+    assets = collections.OrderedDict()  # guid -> dictionary of asset fields
+    for name, size in _iter_tar_members(reader):
+        guid, _, member = name.strip("/").partition("/")
+        if not guid:
+            continue
+        asset = assets.setdefault(guid, {"guid": guid, "pathname": None, "size": None, "offset": None,
+                                         "compressed_offset": None, "compressed_size": None, "digest": None,
+                                         "meta_digest": None})
+        if member == "pathname":
+            # Unity writes pathname followed by an optional line with a hash
+            asset["pathname"] = reader.read(size).decode("utf-8", "replace").split("\n")[0].strip()
+        elif member == "asset":
+            asset["size"] = size
+            asset["offset"] = reader.position
+            asset["compressed_offset"] = reader.compressed_position
+            digest = hashlib.sha1()
+            reader.skip(size, digest.update)
+            asset["digest"] = digest.hexdigest()
+            asset["compressed_size"] = reader.compressed_position - asset["compressed_offset"]
+        elif member == "asset.meta":
+            asset["meta_digest"] = hashlib.sha1(reader.read(size)).hexdigest()
+        else:
+            reader.skip(size)
+        reader.skip(-size % _BLOCK_SIZE)
+    return [UnityPackageAsset(**asset) for asset in assets.values() if asset["pathname"] is not None]
+
+
+def _iter_tar_members(reader):
+    """
+    Parses tar headers (ustar, pax and GNU long names) and yields (name, size) of every regular file.
+    Caller must read or skip the member content before the next iteration.
+    """
+    pax_headers = {}
+    long_name = None
+    while True:
+        header = reader.read(_BLOCK_SIZE)
+        if len(header) < _BLOCK_SIZE or header.count(b"\0") == _BLOCK_SIZE:
+            return
+        size = _parse_number(header[124:136])
+        type_flag = header[156:157]
+        if type_flag in (b"x", b"g", b"L"):
+            data = reader.read(size)
+            reader.skip(-size % _BLOCK_SIZE)
+            if type_flag == b"x":
+                pax_headers = _parse_pax_headers(data)
+            elif type_flag == b"L":
+                long_name = data.rstrip(b"\0").decode("utf-8", "replace")
+            continue
+
+        name = _parse_string(header[0:100])
+        if header[257:262] == b"ustar":
+            prefix = _parse_string(header[345:500])
+            if prefix:
+                name = prefix + "/" + name
+        name = pax_headers.get("path", long_name or name)
+        size = int(pax_headers.get("size", size))
+        pax_headers = {}
+        long_name = None
+
+        if type_flag in (b"0", b"\0", b"7"):
+            yield name, size
+        else:
+            reader.skip(size + -size % _BLOCK_SIZE)
+
+
+def _parse_string(data):
+    return data.split(b"\0", 1)[0].decode("utf-8", "replace")
+
+
+def _parse_number(data):
+    """ Parses tar number field - octal, or base-256 for large values """
+    if data and ord(data[0:1]) & 0x80:
+        value = 0
+        for byte in bytearray(data[1:]):
+            value = (value << 8) + byte
+        return value
+    data = data.split(b"\0", 1)[0].strip()
+    return int(data, 8) if data else 0
+
+
+def _parse_pax_headers(data):
+    """ Parses "<length> <key>=<value>\\n" records """
+    headers = {}
+    while data:
+        length, _, rest = data.partition(b" ")
+        if not length.isdigit():
+            break
+        record = data[len(length) + 1:int(length)].rstrip(b"\n")
+        key, _, value = record.partition(b"=")
+        headers[key.decode("utf-8", "replace")] = value.decode("utf-8", "replace")
+        data = data[int(length):]
+    return headers
+
+
+class _GzipStreamReader:
+    """
+    Reads decompressed content of a gzip stream (which might consist of multiple members),
+    keeping track of the position in both decompressed and compressed stream.
+    """
+    def __init__(self, fileobj):
+        self.fileobj = fileobj
+        self.position = 0
+        self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        self._input = b""
+        self._input_offset = 0
+        self._member_start = True
+
+    @property
+    def compressed_position(self):
+        """ Offset of the first compressed byte that was not decompressed yet """
+        return self._input_offset
+
+    def read(self, size):
+        """ Reads up to size bytes; less only at the end of the stream """
+        chunks = []
+        while size > 0:
+            data = self._decompress(size)
+            if data is None:
+                break
+            chunks.append(data)
+            size -= len(data)
+        return b"".join(chunks)
+
+    def skip(self, size, callback=None):
+        """
+        Skips size bytes without keeping them in memory
+        :param callback: Optional method called with every chunk of skipped data (i.e. to hash it)
+        """
+        while size > 0:
+            data = self._decompress(min(size, _CHUNK_SIZE))
+            if data is None:
+                break
+            if callback is not None:
+                callback(data)
+            size -= len(data)
+
+    def _decompress(self, max_length):
+        """ Decompresses at most max_length bytes; returns None at the end of the stream """
+        while True:
+            if not self._input:
+                self._input = self.fileobj.read(_CHUNK_SIZE)
+                if not self._input:
+                    # Decompressor might still hold output that did not fit into the previous read
+                    data = b"" if self._member_start else self._decompressor.decompress(b"", max_length)
+                    self.position += len(data)
+                    return data or None
+            if self._member_start and self.position and not self._input.strip(b"\0"):
+                # Zero padding after the last gzip member
+                self._input_offset += len(self._input)
+                self._input = b""
+                continue
+            data = self._decompressor.decompress(self._input, max_length)
+            if self._decompressor.eof:
+                # End of gzip member; the next one (if any) starts with the unused data
+                remaining = self._decompressor.unused_data
+                self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+                self._member_start = True
+            else:
+                remaining = self._decompressor.unconsumed_tail
+                self._member_start = False
+            self._input_offset += len(self._input) - len(remaining)
+            self._input = remaining
+            if data:
+                self.position += len(data)
+                return data
+
+
+def format_assets(unitypackage_path, assets):
+    """
+    Formats inspection result as text
+    :param unitypackage_path: Path to the .unitypackage
+    :param assets: List of UnityPackageAsset
+    :return: List of lines
+    """
+    files = [asset for asset in assets if asset.size is not None]
+    lines = ["{0} ({1} assets, {2} files, {3} bytes)".format(unitypackage_path, len(assets), len(files),
+                                                             sum(asset.size for asset in files))]
+    for asset in assets:
+        if asset.size is None:
+            lines.append("  {0} {1:>12} {2:>12} {3}/".format(asset.guid, "-", "-", asset.pathname))
+        else:
+            lines.append("  {0} {1:>12} {2:>12} {3}".format(asset.guid, asset.size, asset.compressed_offset,
+                                                            asset.pathname))
+    return lines
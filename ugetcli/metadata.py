@@ -0,0 +1,193 @@
+import os
+import time
+import hashlib
+import threading
+from ugetcli import utils
+
+"""
+Helper module that provides persistent index of project metadata (assembly name, version, output path, package id)
+"""
+
+# File modification times are only trusted if they are older than the entry by this margin (nanoseconds).
+# Otherwise file might have been changed again within filesystem timestamp granularity, and content hash is checked.
+_RACY_MTIME_WINDOW_NS = 2 * 10 ** 9
+
+
+class MetadataIndex:
+    """
+    On-disk index of metadata derived from project files.
+    Each entry is keyed by the absolute path of the project file, and is valid as long as every input file
+    (i.e. .csproj and AssemblyInfo.cs) has the same size, modification time and content hash as when it was recorded.
+    Can be shared by threads and processes; entries recorded by concurrent processes are merged on save.
+    """
+    CACHE_FILENAME = "metadata.json"
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir or utils.get_cache_dir()
+        self.path = os.path.join(self.cache_dir, self.CACHE_FILENAME)
+        self._entries = None
+        self._dirty_keys = set()
+        self._lock = threading.RLock()
+
+    def get(self, input_paths, key, compute, get_dependencies=None):
+        """
+        Returns indexed metadata value, or computes and indexes it
+        :param input_paths: List of files the value is derived from. First path identifies the entry.
+        :param key: Name of the metadata value
+        :param compute: Method that computes the value from input files
+        :param get_dependencies: Optional method that returns additional files discovered while computing the value
+               (i.e. imported files); they are tracked by the entry the same way as input files
+        :return: Metadata value
+        """
+        if not input_paths or not os.path.isfile(input_paths[0]):
+            return compute()
+        with self._lock:
+            return self._get(input_paths, key, compute, get_dependencies)
+
+    def clear(self):
+        """ Removes all indexed entries """
+        with self._lock:
+            self._entries = {}
+            self._dirty_keys = set()
+            if os.path.isfile(self.path):
+                os.remove(self.path)
+
+    def _get(self, input_paths, key, compute, get_dependencies):
+        entries = self._load()
+        entry_key = os.path.abspath(input_paths[0])
+        entry = entries.get(entry_key)
+        if entry is not None and self._entry_valid(entry, input_paths):
+            if key in entry["values"]:
+                return entry["values"][key]
+        else:
+            entry = self._create_entry(input_paths)
+            entries[entry_key] = entry
+
+        value = compute()
+        entry["values"][key] = value
+        if get_dependencies is not None:
+            recorded_paths = [recorded_input[0] for recorded_input in entry["inputs"]]
+            for path in get_dependencies():
+                if os.path.abspath(path) not in recorded_paths:
+                    entry["inputs"].append([os.path.abspath(path), _stat_file(path), _hash_file(path)])
+        self._dirty_keys.add(entry_key)
+        self._save()
+        return value
+
+    def _load(self):
+        if self._entries is None:
+            self._entries = utils.load_json_file(self.path, {})
+        return self._entries
+
+    def _save(self):
+        """ Writes entries recorded by this process into the index on disk, keeping entries of other processes """
+        dirty_entries = dict((key, self._entries[key]) for key in self._dirty_keys)
+        self._entries = utils.update_json_file(self.path, lambda entries: entries.update(dirty_entries), {})
+        self._dirty_keys = set()
+
+    @staticmethod
+    def _create_entry(input_paths):
+        inputs = []
+        for path in input_paths:
+            inputs.append([os.path.abspath(path), _stat_file(path), _hash_file(path)])
+        return {"recorded_at": _time_ns(), "inputs": inputs, "values": {}}
+
+    @staticmethod
+    def _entry_valid(entry, input_paths):
+        """ Checks if every input file is unchanged since the entry was recorded """
+        recorded_inputs = entry["inputs"]
+        recorded_paths = [recorded_path for recorded_path, stat, digest in recorded_inputs]
+        if recorded_paths[:len(input_paths)] != [os.path.abspath(path) for path in input_paths]:
+            return False  # Remaining recorded inputs are dependencies discovered while computing values
+
+        for recorded_input in recorded_inputs:
+            path, recorded_stat, recorded_digest = recorded_input
+            stat = _stat_file(path)
+            if stat is None or recorded_stat is None:
+                if stat != recorded_stat:
+                    return False
+                continue
+            if stat == recorded_stat and stat[1] < entry["recorded_at"] - _RACY_MTIME_WINDOW_NS:
+                continue
+            # Modification time changed or is too recent to be trusted, compare content
+            if _hash_file(path) != recorded_digest:
+                return False
+            recorded_input[1] = stat
+        return True
+
+
+def _time_ns():
+    return int(time.time() * 10 ** 9)
+
+
+def _stat_file(path):
+    """ Returns [size, mtime in nanoseconds] or None if file does not exist """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_size, getattr(stat, "st_mtime_ns", int(stat.st_mtime * 10 ** 9))]
+
+
+def _hash_file(path):
+    """ Returns sha1 hex digest of the file content or None if file does not exist """
+    if not os.path.isfile(path):
+        return None
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class FileDigestCache:
+    """
+    On-disk cache of file content digests, keyed by absolute path.
+    Digest is reused while file size and modification time match, unless modification time is too recent to be trusted.
+    Digests recorded by concurrent processes are merged on save.
+    """
+    CACHE_FILENAME = "digests.json"
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir or utils.get_cache_dir()
+        self.path = os.path.join(self.cache_dir, self.CACHE_FILENAME)
+        self._entries = None
+        self._dirty_paths = set()
+        self._lock = threading.Lock()
+
+    def get_digest(self, path):
+        """
+        Returns sha1 hex digest of the file content
+        :param path: Path to the file
+        :return: Digest, or None if file does not exist
+        """
+        path = os.path.abspath(path)
+        stat = _stat_file(path)
+        if stat is None:
+            return None
+        with self._lock:
+            entry = self._load().get(path)
+        if entry is not None:
+            recorded_stat, digest, recorded_at = entry
+            if recorded_stat == stat and stat[1] < recorded_at - _RACY_MTIME_WINDOW_NS:
+                return digest
+
+        recorded_at = _time_ns()
+        digest = _hash_file(path)
+        with self._lock:
+            self._entries[path] = [stat, digest, recorded_at]
+            self._dirty_paths.add(path)
+        return digest
+
+    def save(self):
+        """ Writes new digests to disk """
+        with self._lock:
+            if self._dirty_paths:
+                dirty_entries = dict((path, self._entries[path]) for path in self._dirty_paths)
+                self._entries = utils.update_json_file(self.path, lambda entries: entries.update(dirty_entries), {})
+                self._dirty_paths = set()
+
+    def _load(self):
+        if self._entries is None:
+            self._entries = utils.load_json_file(self.path, {})
+        return self._entries
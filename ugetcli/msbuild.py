@@ -3,6 +3,7 @@ import sys
 import glob
 import click
 from ugetcli.utils import escape_exe_path
+from ugetcli.toolcache import probe_candidates
 from subprocess import call, Popen
 
 """
@@ -40,10 +41,23 @@ class MsBuildRunner:
         return process.wait()
 
     @staticmethod
-    def locate_msbuild():
+    def locate_msbuild(tool_cache=None):
         """
         Attempts to find msbuild executable in the local filesystem
+        :param tool_cache: Optional ToolCache used to skip probing when candidates did not change
         """
+        candidates = MsBuildRunner.get_msbuild_candidates()
+        if tool_cache is not None:
+            return tool_cache.locate("msbuild", candidates, MsBuildRunner._probe_msbuild_candidates)
+        return MsBuildRunner._probe_msbuild_candidates(candidates)
+
+    @staticmethod
+    def get_msbuild_candidates():
+        """
+        Returns list of possible msbuild executable locations, in order of preference
+        """
+        candidates = []
+
         # By default, Mono install on Windows might not have 3.5 target installed and mono msbuild would fail.
         # Attempt to find Visual Studio installation first, then fall back to msbuild from PATH
         if sys.platform == 'win32':
@@ -65,13 +79,15 @@ class MsBuildRunner:
                 locations = glob.glob(pattern)
 
                 # Sort alphabetically and reverse to pick up latest versions
-                for location in sorted(locations, reverse=True):
-                    if MsBuildRunner.valid_msbuild_executable(location):
-                        return location
-        if MsBuildRunner.valid_msbuild_executable("msbuild"):  # Try default in PATH
-            return "msbuild"
+                candidates += sorted(locations, reverse=True)
+
+        candidates.append("msbuild")  # Try default in PATH
+        return candidates
 
-        return None
+    @staticmethod
+    def _probe_msbuild_candidates(candidates):
+        """ Probes all candidates in parallel and returns the most preferred valid one """
+        return probe_candidates(candidates, MsBuildRunner.valid_msbuild_executable)
 
     @staticmethod
     def valid_msbuild_executable(msbuild_path):
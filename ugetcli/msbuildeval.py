@@ -0,0 +1,446 @@
+import os
+import re
+import glob
+import collections
+import xml.etree.ElementTree as ET
+
+"""
+Helper module that evaluates MSBuild project properties in-process, without running msbuild.
+Supports $(Property) references, Condition expressions, Import / ImportGroup chains,
+implicit Directory.Build.props import and default output paths of SDK-style projects.
+Property functions ($([System.IO.Path]::Combine(...))), items, Choose/When and environment variables are not evaluated.
+"""
+
+ProjectNode = collections.namedtuple("ProjectNode", ["sdk"])
+PropertyGroupNode = collections.namedtuple("PropertyGroupNode", ["condition", "properties"])
+ImportNode = collections.namedtuple("ImportNode", ["condition", "project"])
+ImportGroupNode = collections.namedtuple("ImportGroupNode", ["condition", "imports"])
+
+DIRECTORY_BUILD_PROPS = "Directory.Build.props"
+
+
+def iter_project_nodes(path):
+    """
+    Streams top level nodes of MSBuild project file: ProjectNode, PropertyGroupNode, ImportNode and ImportGroupNode.
+    Elements are discarded as soon as they are read, so memory use does not depend on the number of items.
+    :param path: Path to the project file
+    """
+    depth = 0
+    root = None
+    with open(path, "rb") as f:  # Closed as soon as the stream is exhausted or discarded
+        for event, element in ET.iterparse(f, events=("start", "end")):
+            if event == "start":
+                if root is None:
+                    root = element
+                    yield ProjectNode(element.attrib.get("Sdk"))
+                depth += 1
+                continue
+
+            depth -= 1
+            if depth != 1:
+                continue
+
+            name = local_name(element.tag)
+            if name == "PropertyGroup":
+                properties = [(local_name(child.tag), child.attrib.get("Condition", ""), child.text or "")
+                              for child in element]
+                yield PropertyGroupNode(element.attrib.get("Condition", ""), properties)
+            elif name == "Import":
+                yield ImportNode(element.attrib.get("Condition", ""), element.attrib.get("Project", ""))
+            elif name == "ImportGroup":
+                imports = [ImportNode(child.attrib.get("Condition", ""), child.attrib.get("Project", ""))
+                           for child in element if local_name(child.tag) == "Import"]
+                yield ImportGroupNode(element.attrib.get("Condition", ""), imports)
+            root.clear()  # Discard processed top level elements
+
+
+def local_name(tag):
+    """ Strips xml namespace from element tag, so that both legacy and SDK style projects are supported """
+    return tag.rsplit("}", 1)[-1]
+
+
+class ProjectEvaluator:
+    """
+    Evaluates properties of a single MSBuild project.
+    Parsed imported files are cached across evaluator instances, so evaluating many projects that share
+    Directory.Build.props or other imports parses each shared file once.
+    """
+    _import_cache = {}  # Absolute path -> ((size, mtime), nodes)
+
+    def __init__(self, project_path, global_properties=None, project_nodes=None):
+        """
+        :param project_path: Path to the project file
+        :param global_properties: Global properties (i.e. Configuration, Platform); can't be overridden by project
+        :param project_nodes: Already parsed project nodes; if not provided, project file is parsed
+        """
+        self.project_path = os.path.abspath(project_path)
+        self.global_properties = dict((k, v) for k, v in (global_properties or {}).items() if v is not None)
+        self.project_nodes = project_nodes
+        self.imported_paths = []
+        self._properties = None
+
+    def evaluate(self):
+        """
+        Evaluates project properties
+        :return: Dictionary of property name (lower case) to value
+        """
+        if self._properties is not None:
+            return self._properties
+
+        self._properties = {}
+        self._global_keys = set()
+        for name, value in self.global_properties.items():
+            self._properties[name.lower()] = value
+            self._global_keys.add(name.lower())
+
+        project_dir = os.path.dirname(self.project_path)
+        project_file = os.path.basename(self.project_path)
+        self._set_reserved("MSBuildProjectFullPath", self.project_path)
+        self._set_reserved("MSBuildProjectDirectory", project_dir)
+        self._set_reserved("MSBuildProjectFile", project_file)
+        self._set_reserved("MSBuildProjectName", os.path.splitext(project_file)[0])
+        self._set_reserved("MSBuildProjectExtension", os.path.splitext(project_file)[1])
+
+        nodes = self.project_nodes if self.project_nodes is not None else self._parse(self.project_path)
+        nodes = iter(nodes)
+        project_node = next(nodes, None)
+        sdk = project_node.sdk if isinstance(project_node, ProjectNode) else None
+
+        # Microsoft.Common.props (imported by every SDK and legacy project) imports the nearest Directory.Build.props
+        if self._get("ImportDirectoryBuildProps").lower() != "false":
+            directory_build_props = self._get_file_above(project_dir, DIRECTORY_BUILD_PROPS)
+            if directory_build_props:
+                self._set_default("DirectoryBuildPropsPath", directory_build_props)
+                self._import_file(directory_build_props)
+
+        if sdk:
+            self._apply_sdk_props()
+
+        self._evaluate_nodes(nodes, self.project_path)
+
+        if sdk:
+            self._apply_sdk_targets()
+        self._set_default("AssemblyName", self._get("MSBuildProjectName"))
+
+        return self._properties
+
+    def get_property(self, name):
+        """
+        Returns evaluated property value
+        :param name: Property name (case insensitive)
+        :return: Property value or None if property is not defined
+        """
+        return self.evaluate().get(name.lower())
+
+    def expand(self, text, this_file=None):
+        """
+        Expands $(Property) references
+        :param text: Text to expand
+        :param this_file: Path of the file being evaluated, used for MSBuildThisFile* properties
+        :return: Expanded text; undefined properties expand to an empty string
+        """
+        if not text or "$(" not in text:
+            return text
+
+        def replace(match):
+            name = match.group(1).lower()
+            if this_file is not None and name.startswith("msbuildthisfile"):
+                return _this_file_property(name, this_file)
+            return self._properties.get(name, "")
+        return _PROPERTY_REFERENCE_REGEX.sub(replace, text)
+
+    def evaluate_condition(self, condition, this_file=None):
+        """
+        Evaluates MSBuild condition expression
+        :param condition: Condition expression; empty condition is true
+        :param this_file: Path of the file being evaluated
+        :return: True or False; malformed conditions evaluate to False
+        """
+        if not condition or not condition.strip():
+            return True
+        try:
+            return _ConditionParser(condition, lambda text: self.expand(text, this_file),
+                                    os.path.dirname(this_file or self.project_path)).parse()
+        except ValueError:
+            return False
+
+    def _evaluate_nodes(self, nodes, this_file):
+        for node in nodes:
+            if isinstance(node, PropertyGroupNode):
+                if not self.evaluate_condition(node.condition, this_file):
+                    continue
+                for name, condition, value in node.properties:
+                    if self.evaluate_condition(condition, this_file):
+                        self._set(name, self.expand(value, this_file).strip())
+            elif isinstance(node, ImportNode):
+                self._evaluate_import(node, this_file)
+            elif isinstance(node, ImportGroupNode):
+                if self.evaluate_condition(node.condition, this_file):
+                    for import_node in node.imports:
+                        self._evaluate_import(import_node, this_file)
+
+    def _evaluate_import(self, import_node, this_file):
+        if not self.evaluate_condition(import_node.condition, this_file):
+            return
+        project = self.expand(import_node.project, this_file).strip().replace("\\", "/")
+        if not project:
+            return
+        project = os.path.join(os.path.dirname(this_file), project)
+        paths = sorted(glob.glob(project)) if "*" in project or "?" in project else [project]
+        for path in paths:
+            if os.path.isfile(path):  # Imports that can't be resolved (i.e. msbuild toolset files) are skipped
+                self._import_file(os.path.normpath(path))
+
+    def _import_file(self, path):
+        if path in self.imported_paths:
+            return  # msbuild ignores duplicate and circular imports
+        self.imported_paths.append(path)
+        nodes = ProjectEvaluator._get_import_nodes(path)
+        self._evaluate_nodes(nodes, path)
+
+    def _apply_sdk_props(self):
+        """ Defaults of Microsoft.NET.Sdk props that affect metadata """
+        self._set_default("Configuration", "Debug")
+        self._set_default("Platform", "AnyCPU")
+        self._set_default("BaseOutputPath", "bin\\")
+
+    def _apply_sdk_targets(self):
+        """ Defaults of Microsoft.NET.Sdk targets that affect metadata """
+        if not self._get("OutputPath"):
+            if self._get("Platform").lower() == "anycpu":
+                self._set("OutputPath", self.expand("$(BaseOutputPath)$(Configuration)\\"))
+            else:
+                self._set("OutputPath", self.expand("$(BaseOutputPath)$(Platform)\\$(Configuration)\\"))
+        output_path = self._get("OutputPath")
+        if output_path and not output_path.endswith(("\\", "/")):
+            output_path += "\\"
+        target_framework = self._get("TargetFramework")
+        if target_framework and self._get("AppendTargetFrameworkToOutputPath").lower() != "false":
+            output_path += target_framework + "\\"
+        self._set("OutputPath", output_path)
+
+    def _get(self, name):
+        return self._properties.get(name.lower(), "")
+
+    def _set(self, name, value):
+        key = name.lower()
+        if key not in self._global_keys:  # Global properties can't be overridden by the project
+            self._properties[key] = value
+
+    def _set_default(self, name, value):
+        if not self._get(name):
+            self._set(name, value)
+
+    def _set_reserved(self, name, value):
+        self._properties[name.lower()] = value
+        self._global_keys.add(name.lower())
+
+    @staticmethod
+    def _parse(path):
+        return list(iter_project_nodes(path))
+
+    @staticmethod
+    def _get_import_nodes(path):
+        """ Returns parsed nodes of imported file, reusing the cache while file is unchanged """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return []
+        fingerprint = (stat.st_size, stat.st_mtime)
+        cached = ProjectEvaluator._import_cache.get(path)
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1]
+        try:
+            nodes = ProjectEvaluator._parse(path)
+        except ET.ParseError:
+            nodes = []
+        ProjectEvaluator._import_cache[path] = (fingerprint, nodes)
+        return nodes
+
+    @staticmethod
+    def _get_file_above(directory, file_name):
+        """ Finds file in the directory or the nearest parent directory, like GetPathOfFileAbove """
+        for candidate_dir in get_parent_directories(directory):
+            candidate = os.path.join(candidate_dir, file_name)
+            if os.path.isfile(candidate):
+                return candidate
+        return None
+
+    @staticmethod
+    def clear_cache():
+        """ Clears cached imported files """
+        ProjectEvaluator._import_cache.clear()
+
+
+def get_parent_directories(directory):
+    """
+    Returns directory and all of its parent directories, nearest first
+    :param directory: Directory path
+    """
+    directory = os.path.abspath(directory)
+    directories = [directory]
+    while os.path.dirname(directory) != directory:
+        directory = os.path.dirname(directory)
+        directories.append(directory)
+    return directories
+
+
+_PROPERTY_REFERENCE_REGEX = re.compile(r"\$\(\s*([A-Za-z_][\w.-]*)\s*\)")
+
+
+def _this_file_property(name, this_file):
+    """ Returns value of reserved MSBuildThisFile* property for the file being evaluated """
+    directory = os.path.dirname(this_file)
+    values = {
+        "msbuildthisfile": os.path.basename(this_file),
+        "msbuildthisfilefullpath": this_file,
+        "msbuildthisfiledirectory": directory + os.sep,
+        "msbuildthisfilename": os.path.splitext(os.path.basename(this_file))[0],
+        "msbuildthisfileextension": os.path.splitext(this_file)[1],
+    }
+    return values.get(name, "")
+
+
+_CONDITION_TOKEN_REGEX = re.compile(r"""
+    \s*(?:
+        (?P<string>'[^']*')
+      | (?P<operator>==|!=|<=|>=|<|>|!|\(|\)|,)
+      | (?P<word>(?:\$\([^)]*\)|[^\s'=!<>(),])+)
+    )""", re.VERBOSE)
+
+_TRUE_VALUES = ("true", "on", "yes")
+_FALSE_VALUES = ("false", "off", "no")
+
+
+class _ConditionParser:
+    """
+    Recursive descent parser of MSBuild condition expressions:
+    or/and/!, parentheses, ==, !=, <, >, <=, >=, Exists() and HasTrailingSlash().
+    String comparison is case insensitive, like in msbuild.
+    """
+    def __init__(self, condition, expand, base_dir):
+        self.tokens = self._tokenize(condition)
+        self.position = 0
+        self.expand = expand
+        self.base_dir = base_dir
+
+    def parse(self):
+        result = self._parse_or()
+        if self.position != len(self.tokens):
+            raise ValueError("Unexpected token in condition")
+        return result
+
+    def _parse_or(self):
+        result = self._parse_and()
+        while self._accept_word("or"):
+            right = self._parse_and()
+            result = result or right
+        return result
+
+    def _parse_and(self):
+        result = self._parse_unary()
+        while self._accept_word("and"):
+            right = self._parse_unary()
+            result = result and right
+        return result
+
+    def _parse_unary(self):
+        if self._accept("operator", "!"):
+            return not self._parse_unary()
+        return self._parse_comparison()
+
+    def _parse_comparison(self):
+        if self._accept("operator", "("):
+            result = self._parse_or()
+            self._expect("operator", ")")
+            return result
+
+        token = self._peek()
+        if token is not None and token[0] == "word" and token[1].lower() in ("exists", "hastrailingslash"):
+            self.position += 1
+            return self._parse_function(token[1].lower())
+
+        left = self._parse_operand()
+        token = self._peek()
+        if token is not None and token[0] == "operator" and token[1] in ("==", "!=", "<", ">", "<=", ">="):
+            self.position += 1
+            right = self._parse_operand()
+            return self._compare(left, token[1], right)
+        return self._to_bool(left)
+
+    def _parse_function(self, name):
+        self._expect("operator", "(")
+        argument = self._parse_operand()
+        self._expect("operator", ")")
+        if name == "exists":
+            path = argument.strip().replace("\\", "/")
+            return bool(path) and os.path.exists(os.path.join(self.base_dir, path))
+        return argument.endswith(("\\", "/"))
+
+    def _parse_operand(self):
+        token = self._peek()
+        if token is None or token[0] == "operator":
+            raise ValueError("Expected operand in condition")
+        self.position += 1
+        if token[0] == "string":
+            return self.expand(token[1][1:-1])
+        return self.expand(token[1])
+
+    def _compare(self, left, operator, right):
+        try:
+            left_number, right_number = float(left), float(right)
+        except ValueError:
+            left_number = right_number = None
+        if operator in ("==", "!="):
+            if left_number is not None:
+                equal = left_number == right_number
+            else:
+                equal = left.lower() == right.lower()
+            return equal if operator == "==" else not equal
+        if left_number is None:
+            raise ValueError("Relational operators require numbers")
+        return {"<": left_number < right_number, ">": left_number > right_number,
+                "<=": left_number <= right_number, ">=": left_number >= right_number}[operator]
+
+    @staticmethod
+    def _to_bool(value):
+        if value.lower() in _TRUE_VALUES:
+            return True
+        if value.lower() in _FALSE_VALUES:
+            return False
+        raise ValueError("Expected boolean value in condition")
+
+    def _peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def _accept(self, kind, value):
+        token = self._peek()
+        if token is not None and token[0] == kind and token[1] == value:
+            self.position += 1
+            return True
+        return False
+
+    def _accept_word(self, word):
+        token = self._peek()
+        if token is not None and token[0] == "word" and token[1].lower() == word:
+            self.position += 1
+            return True
+        return False
+
+    def _expect(self, kind, value):
+        if not self._accept(kind, value):
+            raise ValueError("Expected {0} in condition".format(value))
+
+    @staticmethod
+    def _tokenize(condition):
+        tokens = []
+        position = 0
+        condition = condition.rstrip()
+        while position < len(condition):
+            match = _CONDITION_TOKEN_REGEX.match(condition, position)
+            if match is None or match.end() == position:
+                raise ValueError("Invalid condition: " + condition)
+            kind = match.lastgroup
+            tokens.append((kind, match.group(kind)))
+            position = match.end()
+        return tokens
@@ -2,6 +2,7 @@ import os
 from subprocess import call, Popen
 import click
 from ugetcli.utils import escape_exe_path
+from ugetcli.toolcache import probe_candidates
 
 """
 Helper module that provides access to NuGet methods
@@ -49,13 +50,20 @@ class NuGetRunner:
         return process.wait()
 
     @staticmethod
-    def locate_nuget():
+    def locate_nuget(tool_cache=None):
         """
         Attempts to find NuGet executable in the local filesystem
+        :param tool_cache: Optional ToolCache used to skip probing when candidates did not change
         """
-        if NuGetRunner.valid_nuget_executable("nuget"):
-            return "nuget"
-        return None
+        candidates = ["nuget"]
+        if tool_cache is not None:
+            return tool_cache.locate("nuget", candidates, NuGetRunner._probe_nuget_candidates)
+        return NuGetRunner._probe_nuget_candidates(candidates)
+
+    @staticmethod
+    def _probe_nuget_candidates(candidates):
+        """ Probes all candidates in parallel and returns the most preferred valid one """
+        return probe_candidates(candidates, NuGetRunner.valid_nuget_executable)
 
     @staticmethod
     def valid_nuget_executable(nuget_path):
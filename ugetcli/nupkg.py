@@ -0,0 +1,504 @@
+import os
+import re
+import time
+import glob
+import zlib
+import shutil
+import struct
+import fnmatch
+import hashlib
+import zipfile
+import xml.etree.ElementTree as ET
+from xml.sax.saxutils import escape
+from urllib.parse import quote
+import click
+from ugetcli import utils
+from ugetcli import fastcopy
+from ugetcli.csproj import CsProj
+from ugetcli.nuspec import NuSpec
+from ugetcli.nuget import NuGetRunner
+from ugetcli.compression import get_zip_compression
+from ugetcli.buildcache import BuildCache
+
+"""
+Helper module that packs NuGet packages (.nupkg) in-process, without running NuGet executable
+"""
+
+_CONTENT_TYPE = "application/octet"
+_RELATIONSHIPS_CONTENT_TYPE = "application/vnd.openxmlformats-package.relationships+xml"
+_CORE_PROPERTIES_CONTENT_TYPE = "application/vnd.openxmlformats-package.core-properties+xml"
+_MANIFEST_RELATIONSHIP_TYPE = "http://schemas.microsoft.com/packaging/2010/07/manifest"
+_CORE_PROPERTIES_RELATIONSHIP_TYPE = \
+    "http://schemas.openxmlformats.org/package/2006/relationships/metadata/core-properties"
+
+_TOKEN_REGEX = re.compile(r"\$(\w+)\$")
+
+# Files nuget never packs when <files> element is omitted
+_DEFAULT_EXCLUDES = ["*.nupkg", "*.nuspec", ".*", "*/.*"]
+
+# Payloads that are already compressed; deflating them again costs time and saves nothing
+_STORED_EXTENSIONS = set([".unitypackage", ".nupkg", ".zip", ".gz", ".tgz", ".7z", ".png", ".jpg", ".jpeg", ".gif",
+                          ".mp3", ".ogg", ".mp4", ".webm", ".unity3d"])
+# Deflate option bits of general purpose flag, kept when entry is copied raw
+_ZIP_DEFLATE_OPTION_BITS = 0x06
+# zipfile internals _write_raw_entry relies on; without them unchanged files are compressed again
+_RAW_ENTRY_MODULE_ATTRIBUTES = ("structFileHeader", "sizeFileHeader", "_FH_FILENAME_LENGTH", "_FH_EXTRA_FIELD_LENGTH")
+_RAW_ENTRY_PACKAGE_ATTRIBUTES = ("_lock", "_writecheck", "_didModify", "start_dir", "fp", "filelist", "NameToInfo")
+_CHUNK_SIZE = 1024 * 1024
+
+
+class NuPkgBuilder:
+    """
+    Pure python NuGet package writer.
+    Writes Open Packaging Conventions zip - .nuspec, package files, _rels/.rels, core properties (.psmdcp)
+    and [Content_Types].xml - in a single streaming pass, filling $token$ replacements the same way
+    as nuget pack -Properties does.
+    """
+    def __init__(self, debug=False, compression="default", deterministic=False, incremental=False):
+        """
+        :param debug: Enables verbose output
+        :param compression: Compression profile - store, fast, default or max
+        :param deterministic: If set, entry timestamps and attributes are normalized, so the same inputs produce
+               byte-identical package
+        :param incremental: If set, compressed data of files that did not change since the previous package
+               with the same id (in the output directory) is copied from it instead of being compressed again
+        """
+        self.debug = debug
+        self.compression = compression
+        self.deterministic = deterministic
+        self.incremental = incremental
+        self.build_cache = None
+        self.digest_cache = None
+
+    def set_build_cache(self, build_cache, digest_cache):
+        """
+        Enables restoring .nupkg from the build cache when .nuspec and every packed file did not change
+        :param build_cache: BuildCache
+        :param digest_cache: FileDigestCache used to hash packed files
+        """
+        self.build_cache = build_cache
+        self.digest_cache = digest_cache
+
+    def pack(self, path, output_dir, configuration, unitypackage_path, unitypackage_export_root, version):
+        """
+        Packs NuGet package. Has the same signature as NuGetRunner.pack.
+        :param path: Path to the .csproj or .nuspec, or a directory containing either
+        :param output_dir: Output directory
+        :param configuration: Build configuration - Debug/Release
+        :param unitypackage_path: Path to the .unitypackage, available as $unityPackagePath$ token
+        :param unitypackage_export_root: Unity package export root, available as $unityPackageExportRoot$ token
+        :param version: Package version
+        :return: 0 on success
+        """
+        nuspec_path, properties = self._get_nuspec_and_properties(path)
+        properties.update({
+            "version": version,
+            "configuration": configuration,
+            "unitypackagepath": unitypackage_path,
+            "unitypackageexportroot": unitypackage_export_root,
+        })
+        nupkg_path = self.write_package(nuspec_path, output_dir, properties)
+        click.secho("Successfully created package '{0}'.".format(nupkg_path))
+        return 0
+
+    def write_package(self, nuspec_path, output_dir, properties):
+        """
+        Writes .nupkg from .nuspec file
+        :param nuspec_path: Path to the .nuspec file
+        :param output_dir: Output directory
+        :param properties: Token replacement values (case insensitive)
+        :return: Path to the written .nupkg
+        """
+        with open(nuspec_path, "rb") as f:
+            nuspec_text = f.read().decode("utf-8-sig")
+        nuspec_text = self.replace_tokens(nuspec_text, properties, nuspec_path)
+
+        root = ET.fromstring(nuspec_text.encode("utf-8"))
+        namespace = root.tag[:root.tag.index("}") + 1] if root.tag.startswith("{") else ""
+        metadata = root.find(namespace + "metadata")
+        if metadata is None:
+            raise click.UsageError("Invalid .nuspec file, metadata element is missing: " + nuspec_path)
+
+        package_id = self._get_text(metadata, namespace + "id")
+        version = self._get_text(metadata, namespace + "version")
+        if "version" in properties:
+            version = properties["version"]
+        if not package_id or not version:
+            raise click.UsageError("Package id and version are required: " + nuspec_path)
+        original_version = version  # Core properties keep the version as provided, like nuget does
+        version = NuGetRunner.get_normalized_nuget_pack_version(version)
+        version_element = metadata.find(namespace + "version")
+        if version_element is None:
+            version_element = ET.SubElement(metadata, namespace + "version")
+        version_element.text = version
+
+        files_element = root.find(namespace + "files")
+        files = self._resolve_files(os.path.dirname(os.path.abspath(nuspec_path)), files_element, namespace)
+        if files_element is not None:
+            root.remove(files_element)
+
+        if not os.path.isdir(output_dir):
+            os.makedirs(output_dir)
+        nupkg_path = os.path.join(output_dir, "{0}.{1}.nupkg".format(package_id, version))
+        core_properties_name = "package/services/metadata/core-properties/{0}.psmdcp".format(
+            hashlib.md5("{0}.{1}".format(package_id, version).encode("utf-8")).hexdigest())
+        nuspec_name = package_id + ".nuspec"
+        nuspec_data = self._serialize_nuspec(root, namespace)
+
+        cache_key = self._get_cache_key(nuspec_name, nuspec_data, files) if self.build_cache else None
+        if cache_key and self.build_cache.get(cache_key, nupkg_path):
+            click.secho("Restored package from cache: {0}".format(nupkg_path))
+            return nupkg_path
+
+        previous_path = self._locate_previous_package(output_dir, package_id, nupkg_path) \
+            if self.incremental else None
+        previous = self._open_previous_package(previous_path) if previous_path else None
+        reused_count = 0
+        tmp_path = nupkg_path + ".tmp"
+        try:
+            compression, compresslevel = get_zip_compression(self.compression)
+            with zipfile.ZipFile(tmp_path, "w", compression, compresslevel=compresslevel) as package:
+                self._write_bytes(package, "_rels/.rels", self._get_relationships(nuspec_name, core_properties_name))
+                self._write_bytes(package, nuspec_name, nuspec_data)
+                for src, target in files:
+                    if previous is not None and self._copy_unchanged_file(package, previous, src,
+                                                                          self._get_part_name(target)):
+                        reused_count += 1
+                        continue
+                    if self.debug:
+                        click.secho("Adding file '{0}' as '{1}'".format(src, target))
+                    self._write_file(package, src, self._get_part_name(target))
+                self._write_bytes(package, core_properties_name,
+                                  self._get_core_properties(metadata, namespace, original_version))
+                self._write_bytes(package, "[Content_Types].xml",
+                                  self._get_content_types([target for src, target in files]))
+            if previous is not None:
+                previous.close()  # Previous package might be replaced
+            utils.replace_file(tmp_path, nupkg_path)
+        finally:
+            if previous is not None:
+                previous.close()
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        if previous is not None:
+            click.secho("Reused {0} of {1} files from {2}".format(reused_count, len(files), previous_path))
+        if cache_key:
+            self.build_cache.put(cache_key, nupkg_path)
+        return nupkg_path
+
+    @staticmethod
+    def _locate_previous_package(output_dir, package_id, nupkg_path):
+        """
+        Finds the previous package with the same id - the package being written, or the most recent other version
+        :return: Path to the package, or None if there's none
+        """
+        if os.path.isfile(nupkg_path):
+            return nupkg_path
+        version_regex = re.compile(re.escape(package_id) + r"\.\d+(\.\d+)*(-[0-9A-Za-z.-]+)?\.nupkg$", re.IGNORECASE)
+        candidates = [os.path.join(output_dir, name) for name in os.listdir(output_dir) if version_regex.match(name)]
+        if not candidates:
+            return None
+        return max(candidates, key=os.path.getmtime)
+
+    @staticmethod
+    def _open_previous_package(previous_path):
+        """ Opens the previous package; it's ignored if it can't be read """
+        try:
+            return zipfile.ZipFile(previous_path)
+        except (zipfile.BadZipfile, IOError, OSError) as e:
+            click.secho("Ignoring previous package {0}: {1}".format(previous_path, e), fg="yellow")
+            return None
+
+    def _copy_unchanged_file(self, package, previous, src, name):
+        """
+        Copies compressed data of the entry from the previous package if file content did not change
+        and the entry is compressed the same way.
+        :return: True if entry was copied
+        """
+        if not _can_write_raw_entry(package):
+            return False
+        try:
+            previous_info = previous.getinfo(name)
+        except KeyError:
+            return False
+        if previous_info.flag_bits & 0x01 or previous_info.compress_type != self._get_compress_type(package, name) \
+                or previous_info.file_size != os.path.getsize(src):
+            return False
+        crc = 0
+        with open(src, "rb") as f:
+            for chunk in iter(lambda: f.read(_CHUNK_SIZE), b""):
+                crc = zlib.crc32(chunk, crc)
+        if crc & 0xffffffff != previous_info.CRC:
+            return False
+
+        if self.debug:
+            click.secho("Reusing file '{0}' as '{1}'".format(src, name))
+        if self.deterministic:
+            info = self._get_deterministic_zip_info(package, name)
+        else:
+            info = zipfile.ZipInfo.from_file(src, name)
+        info.compress_type = previous_info.compress_type
+        info.flag_bits = previous_info.flag_bits & _ZIP_DEFLATE_OPTION_BITS
+        info.CRC = previous_info.CRC
+        info.file_size = previous_info.file_size
+        info.compress_size = previous_info.compress_size
+        if not info.external_attr:
+            info.external_attr = 0o600 << 16  # Same default as ZipFile.open
+        _write_raw_entry(package, info, previous.filename, previous_info)
+        return True
+
+    @staticmethod
+    def _get_compress_type(package, name):
+        if os.path.splitext(name)[1].lower() in _STORED_EXTENSIONS:
+            return zipfile.ZIP_STORED
+        return package.compression
+
+    def _get_cache_key(self, nuspec_name, nuspec_data, files):
+        """ Build cache key of the .nupkg - .nuspec after token replacement, content of every file and options """
+        inputs = [(nuspec_name, hashlib.sha1(nuspec_data).hexdigest())]
+        inputs += [(target, self.digest_cache.get_digest(src)) for src, target in files]
+        return BuildCache.compute_key(inputs, {"format": "nupkg", "compression": self.compression,
+                                               "deterministic": self.deterministic})
+
+    @staticmethod
+    def replace_tokens(text, properties, nuspec_path=""):
+        """
+        Replaces $token$ values
+        :param text: .nuspec text
+        :param properties: Token values (case insensitive)
+        :param nuspec_path: Path used in error messages
+        :return: Text with tokens replaced
+        """
+        properties = dict((k.lower(), v) for k, v in properties.items())
+
+        def replace(match):
+            token = match.group(1).lower()
+            if token not in properties or properties[token] is None:
+                raise click.UsageError("The replacement token '{0}' has no value. {1}"
+                                       .format(match.group(1), nuspec_path))
+            return escape(str(properties[token]))
+        return _TOKEN_REGEX.sub(replace, text)
+
+    @staticmethod
+    def _get_nuspec_and_properties(path):
+        """ Finds .nuspec to pack and token values derived from the project """
+        properties = {}
+        csproj_path = CsProj.get_csproj_at_path(path)
+        if csproj_path is not None:
+            # Same as nuget: .nuspec with the same name as the project, next to the project
+            nuspec_path = os.path.splitext(csproj_path)[0] + ".nuspec"
+            if not os.path.isfile(nuspec_path):
+                nuspec_path = NuSpec.get_nuspec_at_path(os.path.dirname(os.path.abspath(csproj_path)))
+            csproj = CsProj(csproj_path)
+            attributes = csproj.get_assembly_attributes()
+            properties.update({
+                "id": csproj.get_assembly_name(),
+                "author": attributes.get("AssemblyCompany"),
+                "description": attributes.get("AssemblyDescription"),
+                "title": attributes.get("AssemblyTitle"),
+                "copyright": attributes.get("AssemblyCopyright"),
+            })
+        else:
+            nuspec_path = NuSpec.get_nuspec_at_path(path)
+
+        if not nuspec_path:
+            raise click.UsageError("Native pack engine requires a .nuspec file: " + path)
+        return nuspec_path, properties
+
+    @staticmethod
+    def _resolve_files(base_dir, files_element, namespace):
+        """
+        Resolves <file src="" target="" exclude=""/> elements
+        :return: List of tuples (source path, target path inside the package), sorted by target
+        """
+        if files_element is None:
+            file_specs = [("**", "", ";".join(_DEFAULT_EXCLUDES))]
+        else:
+            file_specs = [(element.attrib.get("src", ""), element.attrib.get("target", ""),
+                           element.attrib.get("exclude", "")) for element in files_element.findall(namespace + "file")]
+
+        files = {}
+        for src, target, exclude in file_specs:
+            src = src.replace("\\", "/")
+            target = target.replace("\\", "/").strip("/") if target else ""
+            excludes = [pattern.strip().replace("\\", "/") for pattern in exclude.split(";") if pattern.strip()]
+
+            if not any(wildcard in src for wildcard in "*?"):
+                src_path = os.path.normpath(os.path.join(base_dir, src))
+                if not os.path.isfile(src_path):
+                    raise click.UsageError("File '{0}' was not found.".format(src_path))
+                files[NuPkgBuilder._get_single_file_target(src_path, target)] = src_path
+                continue
+
+            # Files matched by wildcards keep their path relative to the part of src before the first wildcard
+            wildcard_root = src[:min(src.index(wildcard) for wildcard in "*?" if wildcard in src)]
+            wildcard_root = os.path.join(base_dir, wildcard_root[:wildcard_root.rfind("/") + 1])
+            for src_path in glob.glob(os.path.join(base_dir, src), recursive=True):
+                if not os.path.isfile(src_path):
+                    continue
+                relative_path = os.path.relpath(src_path, wildcard_root).replace(os.sep, "/")
+                base_relative_path = os.path.relpath(src_path, base_dir).replace(os.sep, "/")
+                if any(fnmatch.fnmatch(base_relative_path, pattern) or fnmatch.fnmatch(relative_path, pattern)
+                       for pattern in excludes):
+                    continue
+                files["/".join(part for part in (target, relative_path) if part)] = os.path.normpath(src_path)
+
+        return sorted(((src_path, target) for target, src_path in files.items()), key=lambda item: item[1])
+
+    @staticmethod
+    def _get_single_file_target(src_path, target):
+        """ Target is a file name if it has the same extension as the source, otherwise it is a folder """
+        file_name = os.path.basename(src_path)
+        if not target:
+            return file_name
+        if os.path.splitext(target)[1].lower() == os.path.splitext(file_name)[1].lower():
+            return target
+        return target + "/" + file_name
+
+    @staticmethod
+    def _get_part_name(target):
+        """ Escapes package part name the same way as NuGet (Uri escaping) """
+        return quote(target, safe="/!$&'()*+,;=:@~-._")
+
+    @staticmethod
+    def _get_text(element, tag):
+        child = element.find(tag)
+        return child.text.strip() if child is not None and child.text else None
+
+    @staticmethod
+    def _serialize_nuspec(root, namespace):
+        if namespace:
+            ET.register_namespace("", namespace[1:-1])
+        body = ET.tostring(root, encoding="utf-8")
+        if body.startswith(b"<?xml"):
+            body = body.split(b"?>", 1)[1].lstrip()
+        return b'<?xml version="1.0" encoding="utf-8"?>\n' + body
+
+    @staticmethod
+    def _get_relationships(nuspec_name, core_properties_name):
+        relationships = [(_MANIFEST_RELATIONSHIP_TYPE, "/" + nuspec_name),
+                         (_CORE_PROPERTIES_RELATIONSHIP_TYPE, "/" + core_properties_name)]
+        lines = ['<?xml version="1.0" encoding="utf-8"?>',
+                 '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">']
+        for relationship_type, target in relationships:
+            relationship_id = "R" + hashlib.md5(target.encode("utf-8")).hexdigest()[:16].upper()
+            lines.append('  <Relationship Type="{0}" Target="{1}" Id="{2}" />'.format(
+                relationship_type, escape(target), relationship_id))
+        lines.append('</Relationships>')
+        return "\n".join(lines)
+
+    def _write_bytes(self, package, name, data):
+        if self.deterministic:
+            package.writestr(self._get_deterministic_zip_info(package, name), data)
+        else:
+            package.writestr(name, data)
+
+    def _write_file(self, package, src, name):
+        compress_type = self._get_compress_type(package, name)
+        if not self.deterministic:
+            package.write(src, name, compress_type)
+            return
+        info = self._get_deterministic_zip_info(package, name)
+        info.compress_type = compress_type
+        info.file_size = os.path.getsize(src)
+        with open(src, "rb") as source, package.open(info, "w") as target:
+            shutil.copyfileobj(source, target, _CHUNK_SIZE)
+
+    @staticmethod
+    def _get_deterministic_zip_info(package, name):
+        """ Zip entry with fixed timestamp and attributes, independent of build time and platform """
+        info = zipfile.ZipInfo(name, time.gmtime(utils.get_source_date_epoch())[:6])
+        info.compress_type = package.compression
+        _set_compress_level(info, package.compresslevel)  # ZipFile.write/writestr(name) copy level the same way
+        info.create_system = 0
+        info.external_attr = 0
+        return info
+
+    @staticmethod
+    def _get_core_properties(metadata, namespace, version):
+        values = [("dc:creator", NuPkgBuilder._get_text(metadata, namespace + "authors")),
+                  ("dc:description", NuPkgBuilder._get_text(metadata, namespace + "description")),
+                  ("dc:identifier", NuPkgBuilder._get_text(metadata, namespace + "id")),
+                  ("version", version),
+                  ("keywords", NuPkgBuilder._get_text(metadata, namespace + "tags")),
+                  ("lastModifiedBy", "ugetcli")]
+        lines = ['<?xml version="1.0" encoding="utf-8"?>',
+                 '<coreProperties xmlns:dc="http://purl.org/dc/elements/1.1/" '
+                 'xmlns:dcterms="http://purl.org/dc/terms/" '
+                 'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" '
+                 'xmlns="http://schemas.openxmlformats.org/package/2006/metadata/core-properties">']
+        for tag, value in values:
+            if value:
+                lines.append("  <{0}>{1}</{0}>".format(tag, escape(value)))
+        lines.append("</coreProperties>")
+        return "\n".join(lines)
+
+    @staticmethod
+    def _get_content_types(targets):
+        extensions = set(["nuspec"])
+        overrides = []
+        for target in targets:
+            extension = os.path.splitext(target)[1][1:].lower()
+            if extension:
+                extensions.add(extension)
+            else:
+                overrides.append("/" + NuPkgBuilder._get_part_name(target))
+        lines = ['<?xml version="1.0" encoding="utf-8"?>',
+                 '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">',
+                 '  <Default Extension="rels" ContentType="{0}" />'.format(_RELATIONSHIPS_CONTENT_TYPE),
+                 '  <Default Extension="psmdcp" ContentType="{0}" />'.format(_CORE_PROPERTIES_CONTENT_TYPE)]
+        for extension in sorted(extensions - set(["rels", "psmdcp"])):
+            lines.append('  <Default Extension="{0}" ContentType="{1}" />'.format(escape(extension), _CONTENT_TYPE))
+        for part_name in overrides:
+            lines.append('  <Override PartName="{0}" ContentType="{1}" />'.format(escape(part_name), _CONTENT_TYPE))
+        lines.append('</Types>')
+        return "\n".join(lines)
+
+
+def _set_compress_level(info, compresslevel):
+    """
+    Sets compression level ZipFile uses when the entry is written through ZipFile.open.
+    zipfile has no public API for it; the ZipInfo attribute was renamed in python 3.13.
+    """
+    if hasattr(zipfile.ZipInfo, "compress_level"):
+        info.compress_level = compresslevel
+    else:
+        info._compresslevel = compresslevel
+
+
+def _can_write_raw_entry(package):
+    """
+    Returns True if zipfile internals _write_raw_entry relies on are available
+    :param package: ZipFile open for writing
+    """
+    return all(hasattr(zipfile, name) for name in _RAW_ENTRY_MODULE_ATTRIBUTES) and \
+        all(hasattr(package, name) for name in _RAW_ENTRY_PACKAGE_ATTRIBUTES)
+
+
+def _write_raw_entry(package, info, source_path, source_info):
+    """
+    Appends entry to the package being written, copying its compressed data from another zip as is.
+    zipfile has no public API for it; this does what ZipFile.write of python 3.7+ does, minus compression.
+    Check _can_write_raw_entry first.
+    Compressed data is copied in the kernel where possible.
+    :param package: ZipFile open for writing
+    :param info: ZipInfo of the new entry, with CRC, sizes and compression method set
+    :param source_path: Path to the zip compressed data is copied from
+    :param source_info: ZipInfo of the entry in the source zip
+    """
+    with open(source_path, "rb") as source:
+        source.seek(source_info.header_offset)
+        header = struct.unpack(zipfile.structFileHeader, source.read(zipfile.sizeFileHeader))
+        source.seek(header[zipfile._FH_FILENAME_LENGTH] + header[zipfile._FH_EXTRA_FIELD_LENGTH], os.SEEK_CUR)
+
+        zip64 = info.file_size > zipfile.ZIP64_LIMIT or info.compress_size > zipfile.ZIP64_LIMIT
+        with package._lock:
+            package._writecheck(info)
+            package._didModify = True
+            package.fp.seek(package.start_dir)
+            info.header_offset = package.fp.tell()
+            package.fp.write(info.FileHeader(zip64))
+            fastcopy.copy_range(source, package.fp, source_info.compress_size)
+            package.start_dir = package.fp.tell()
+            package.filelist.append(info)
+            package.NameToInfo[info.filename] = info
@@ -16,10 +16,29 @@ class NuSpec:
         if not self.path:
             raise IOError("Failed to locate .nuspec file at path " + path)
         self.debug = debug
+        self._tree = None
+        self._memo = {}
+        self._metadata_index = None
+
+    def set_metadata_index(self, metadata_index):
+        """
+        Enables persistent metadata index, so package properties are only read when .nuspec changes
+        :param metadata_index: MetadataIndex instance
+        """
+        self._metadata_index = metadata_index
+
+    def get_input_paths(self):
+        """ Returns list of files package metadata is derived from """
+        return [self.path]
 
     def get_package_id(self):
-        tree = ET.parse(self.path)
-        metadata = tree.find('metadata')
+        return self._memoize("package_id", self._read_package_id)
+
+    def get_package_version(self):
+        return self._memoize("package_version", self._read_package_version)
+
+    def _read_package_id(self):
+        metadata = self._get_tree().find('metadata')
         if not metadata:
             return None
         package_id = metadata.find('id')
@@ -30,9 +49,8 @@ class NuSpec:
 
         return package_id.text
 
-    def get_package_version(self):
-        tree = ET.parse(self.path)
-        metadata = tree.find('metadata')
+    def _read_package_version(self):
+        metadata = self._get_tree().find('metadata')
 
         if not metadata:
             return None
@@ -44,6 +62,19 @@ class NuSpec:
 
         return version.text
 
+    def _get_tree(self):
+        if self._tree is None:
+            self._tree = ET.parse(self.path)
+        return self._tree
+
+    def _memoize(self, key, method):
+        if key not in self._memo:
+            if self._metadata_index is not None:
+                self._memo[key] = self._metadata_index.get(self.get_input_paths(), key, method)
+            else:
+                self._memo[key] = method()
+        return self._memo[key]
+
     @staticmethod
     def get_nuspec_at_path(path):
         """
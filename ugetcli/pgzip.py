@@ -0,0 +1,112 @@
+import time
+import zlib
+import struct
+import collections
+
+"""
+Helper module that provides parallel gzip compression
+"""
+
+_GZIP_MAGIC = b"\x1f\x8b"
+_GZIP_FNAME = 0x08
+_GZIP_OS_UNKNOWN = 255
+_WINDOW_SIZE = 32 * 1024
+DEFAULT_BLOCK_SIZE = 256 * 1024
+
+
+class ParallelGzipFile:
+    """
+    Write-only gzip file object that compresses blocks of input on a thread pool, the same way pigz does.
+    Every block is compressed as raw deflate primed with the last 32K of the previous block and ends with a sync flush,
+    so concatenated blocks form a single valid deflate stream inside a single gzip member.
+    Number of blocks in flight is bounded, so memory use does not depend on the amount of data written.
+    """
+    def __init__(self, fileobj, jobs, compresslevel=9, filename="", mtime=None, block_size=DEFAULT_BLOCK_SIZE):
+        """
+        :param fileobj: Writable binary file object that receives gzip stream
+        :param jobs: Number of compression threads
+        :param compresslevel: Deflate compression level, 0-9
+        :param filename: Original file name stored in gzip header
+        :param mtime: Modification time stored in gzip header; current time if not provided
+        :param block_size: Size of the input blocks compressed independently
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        self.fileobj = fileobj
+        self.jobs = jobs
+        self.compresslevel = compresslevel
+        self.block_size = block_size
+        self._executor = ThreadPoolExecutor(max_workers=jobs)
+        self._pending = collections.deque()
+        self._buffer = bytearray()
+        self._dictionary = b""
+        self._crc = 0
+        self._size = 0
+        self._closed = False
+        self._write_header(filename, time.time() if mtime is None else mtime)
+
+    def write(self, data):
+        if self._closed:
+            raise ValueError("write() on closed ParallelGzipFile")
+        self._crc = zlib.crc32(data, self._crc)
+        self._size += len(data)
+        self._buffer += data
+        while len(self._buffer) >= self.block_size:
+            block = bytes(self._buffer[:self.block_size])
+            del self._buffer[:self.block_size]
+            self._submit(block, False)
+        return len(data)
+
+    def close(self):
+        """ Compresses remaining data and writes gzip trailer. Does not close underlying file object. """
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._submit(bytes(self._buffer), True)
+            self._buffer = bytearray()
+            while self._pending:
+                self.fileobj.write(self._pending.popleft().result())
+            self.fileobj.write(struct.pack("<II", self._crc & 0xffffffff, self._size & 0xffffffff))
+        finally:
+            self._executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._closed = True
+            self._executor.shutdown()
+
+    def _submit(self, block, last):
+        self._pending.append(self._executor.submit(_compress_block, block, self._dictionary, self.compresslevel, last))
+        self._dictionary = block[-_WINDOW_SIZE:] if len(block) >= _WINDOW_SIZE else \
+            (self._dictionary + block)[-_WINDOW_SIZE:]
+        while len(self._pending) > self.jobs * 2:
+            self.fileobj.write(self._pending.popleft().result())
+
+    def _write_header(self, filename, mtime):
+        name = filename.encode("latin-1", "replace") if filename else b""
+        if self.compresslevel == 9:
+            extra_flags = b"\x02"
+        elif self.compresslevel == 1:
+            extra_flags = b"\x04"
+        else:
+            extra_flags = b"\x00"
+        self.fileobj.write(_GZIP_MAGIC + b"\x08" + struct.pack("<B", _GZIP_FNAME if name else 0) +
+                           struct.pack("<I", int(mtime) & 0xffffffff) + extra_flags +
+                           struct.pack("<B", _GZIP_OS_UNKNOWN))
+        if name:
+            self.fileobj.write(name + b"\x00")
+
+
+def _compress_block(block, dictionary, compresslevel, last):
+    """ Compresses block as raw deflate; runs on a worker thread, zlib releases GIL while compressing """
+    if dictionary:
+        compressor = zlib.compressobj(compresslevel, zlib.DEFLATED, -zlib.MAX_WBITS, zlib.DEF_MEM_LEVEL,
+                                      zlib.Z_DEFAULT_STRATEGY, dictionary)
+    else:
+        compressor = zlib.compressobj(compresslevel, zlib.DEFLATED, -zlib.MAX_WBITS)
+    return compressor.compress(block) + compressor.flush(zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH)
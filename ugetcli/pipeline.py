@@ -0,0 +1,88 @@
+import time
+import threading
+import collections
+
+"""
+Helper module that runs items through a sequence of stages, overlapping stages of different items
+"""
+
+Stage = collections.namedtuple("Stage", [
+    "name",           # Stage name, used in results
+    "method",         # Method that receives value returned by the previous stage (or the item) and returns a value
+    "workers",        # Number of items the stage processes concurrently
+])
+
+PipelineResult = collections.namedtuple("PipelineResult", [
+    "item",           # Item as passed to the pipeline
+    "value",          # Value returned by the last stage; None if a stage failed
+    "error",          # Exception raised by the failed stage, or None
+    "failed_stage",   # Name of the failed stage, or None
+    "seconds",        # Dictionary {stage name: time spent} of stages the item went through
+])
+
+
+class StagedPipeline:
+    """
+    Runs items through stages in order. Every stage has its own worker threads, and an item is handed to the next
+    stage as soon as it's done, so stages of different items overlap (i.e. package A uploads while package B
+    compresses). Item that fails in a stage does not reach later stages; other items are not affected.
+    """
+
+    def __init__(self, stages):
+        """
+        :param stages: List of Stage
+        """
+        self.stages = stages
+
+    def run(self, items, callback=None):
+        """
+        Runs items through every stage
+        :param items: Iterable of items; the first stage receives them in this order
+        :param callback: Optional method that receives PipelineResult of every item as soon as it's finished.
+               Called from worker threads.
+        :return: List of PipelineResult, in order of items
+        """
+        items = list(items)
+        if not items:
+            return []
+        from concurrent.futures import ThreadPoolExecutor
+        executors = [ThreadPoolExecutor(max_workers=stage.workers) for stage in self.stages]
+        results = [None] * len(items)
+        remaining = [len(items)]
+        lock = threading.Lock()
+        finished = threading.Event()
+
+        def finish(index, result):
+            results[index] = result
+            try:
+                if callback is not None:
+                    callback(result)
+            finally:
+                with lock:
+                    remaining[0] -= 1
+                    if remaining[0] == 0:
+                        finished.set()
+
+        def run_stage(index, stage_index, value, seconds):
+            stage = self.stages[stage_index]
+            start = time.time()
+            try:
+                value = stage.method(value)
+            except Exception as e:
+                seconds[stage.name] = time.time() - start
+                finish(index, PipelineResult(items[index], None, e, stage.name, seconds))
+                return
+            seconds[stage.name] = time.time() - start
+            if stage_index + 1 < len(self.stages):
+                executors[stage_index + 1].submit(run_stage, index, stage_index + 1, value, seconds)
+            else:
+                finish(index, PipelineResult(items[index], value, None, None, seconds))
+
+        try:
+            for index, item in enumerate(items):
+                executors[0].submit(run_stage, index, 0, item, collections.OrderedDict())
+            finished.wait()
+        finally:
+            for executor in executors:
+                executor.shutdown()
+        return results
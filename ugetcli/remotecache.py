@@ -0,0 +1,138 @@
+import os
+import threading
+from http.client import HTTPException
+import click
+from ugetcli import utils
+from ugetcli.feed import ConnectionPool
+
+"""
+Helper module that provides remote artifact cache backend, shared by multiple machines over HTTP
+"""
+
+_CHUNK_SIZE = 256 * 1024
+
+
+class RemoteCache:
+    """
+    HTTP artifact cache. Artifacts are addressed by content key:
+    GET <url>/<key> downloads artifact (404 if it's not cached), PUT <url>/<key> uploads it.
+    Transfers run on a thread pool, so callers can start them early and wait only when they need the result.
+    Remote cache is best effort - transfer errors are reported in debug mode and treated as cache misses.
+    """
+    URL_ENV = "UGET_REMOTE_CACHE_URL"
+    TOKEN_ENV = "UGET_REMOTE_CACHE_TOKEN"
+
+    def __init__(self, url, token=None, jobs=4, debug=False, connection_pool=None):
+        """
+        :param url: Base URL of the cache
+        :param token: Optional token sent as bearer Authorization header; UGET_REMOTE_CACHE_TOKEN if not provided
+        :param jobs: Maximum number of concurrent transfers
+        :param debug: Enables verbose output
+        :param connection_pool: Optional ConnectionPool shared with other clients
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        self.url = url.rstrip("/") + "/"
+        self.token = token or os.environ.get(self.TOKEN_ENV)
+        self.debug = debug
+        self.connection_pool = connection_pool or ConnectionPool()
+        self._executor = ThreadPoolExecutor(max_workers=jobs)
+        self._uploads = []
+        self._lock = threading.Lock()
+
+    def download(self, key, output_path):
+        """
+        Downloads artifact
+        :param key: Cache key
+        :param output_path: Path the artifact is written to; left untouched if artifact is not cached
+        :return: True if artifact was downloaded, otherwise False
+        """
+        tmp_path = "{0}.{1}.{2}.download".format(output_path, os.getpid(), threading.current_thread().ident)
+        try:
+            with open(tmp_path, "wb") as f:
+                status, reason, data = self.connection_pool.request("GET", self._get_url(key), self._get_headers(),
+                                                                    response_file=f)
+            if status == 200:
+                utils.replace_file(tmp_path, output_path)
+                return True
+            if status != 404:
+                self._report("GET", key, "{0} {1}".format(status, reason))
+        except (HTTPException, IOError, OSError) as e:
+            self._report("GET", key, e)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return False
+
+    def download_async(self, key, output_path):
+        """
+        Starts artifact download in background
+        :return: Future that resolves to the result of download()
+        """
+        return self._executor.submit(self.download, key, output_path)
+
+    def upload(self, key, fileobj):
+        """
+        Uploads artifact
+        :param key: Cache key
+        :param fileobj: Readable binary file object positioned at the start of the artifact; it's closed afterwards
+        :return: True if artifact was uploaded, otherwise False
+        """
+        try:
+            with fileobj:
+                size = os.fstat(fileobj.fileno()).st_size
+                status, reason, data = self.connection_pool.request(
+                    "PUT", self._get_url(key), self._get_headers({"Content-Type": "application/octet-stream"}),
+                    lambda: _iter_file(fileobj), size)
+            if 200 <= status < 300:
+                return True
+            self._report("PUT", key, "{0} {1}".format(status, reason))
+        except (HTTPException, IOError, OSError) as e:
+            self._report("PUT", key, e)
+        return False
+
+    def upload_async(self, key, path):
+        """
+        Starts artifact upload in background. File is opened right away, so it can be replaced or removed meanwhile.
+        :param key: Cache key
+        :param path: Path to the artifact
+        :return: Future that resolves to the result of upload()
+        """
+        future = self._executor.submit(self.upload, key, open(path, "rb"))
+        with self._lock:
+            self._uploads.append(future)
+        return future
+
+    def wait(self):
+        """
+        Waits for background uploads to finish
+        :return: Number of failed uploads
+        """
+        with self._lock:
+            uploads, self._uploads = self._uploads, []
+        return sum(1 for future in uploads if not future.result())
+
+    def close(self):
+        """ Waits for background transfers and closes connections """
+        self.wait()
+        self._executor.shutdown()
+        self.connection_pool.close()
+
+    def _get_url(self, key):
+        return self.url + key
+
+    def _get_headers(self, headers=None):
+        headers = dict(headers or {})
+        if self.token:
+            headers["Authorization"] = "Bearer " + self.token
+        return headers
+
+    def _report(self, method, key, error):
+        if self.debug:
+            click.secho("Remote cache {0} {1} failed: {2}".format(method, self._get_url(key), error), fg="yellow")
+
+
+def _iter_file(fileobj):
+    """ Yields file content in chunks from the start, so the body can be sent again if a connection is retried """
+    fileobj.seek(0)
+    for chunk in iter(lambda: fileobj.read(_CHUNK_SIZE), b""):
+        yield chunk
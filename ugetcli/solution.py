@@ -0,0 +1,232 @@
+import io
+import os
+import re
+import time
+import collections
+import xml.etree.ElementTree as ET
+from ugetcli.msbuildeval import local_name
+
+"""
+Helper module that reads Visual Studio solutions (.sln) into a project dependency graph and runs work for every
+project in dependency order
+"""
+
+OK = "ok"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+_PROJECT_REGEX = re.compile(r'^Project\("\{[^}]*\}"\)\s*=\s*"(?P<name>[^"]*)"\s*,\s*"(?P<path>[^"]*)"\s*,\s*'
+                            r'"\{(?P<guid>[^}]*)\}"')
+_DEPENDENCY_REGEX = re.compile(r'^\{(?P<guid>[^}]*)\}\s*=')
+
+SolutionProject = collections.namedtuple("SolutionProject", [
+    "name",           # Project name as shown in the solution
+    "path",           # Absolute path of the project file
+    "guid",           # Project guid, upper case
+    "dependencies",   # Guids of projects listed in ProjectDependencies section
+])
+
+ProjectResult = collections.namedtuple("ProjectResult", [
+    "path",           # Absolute path of the project file
+    "status",         # ok, failed or skipped
+    "seconds",        # Time spent
+    "message",        # Error message of failed project, or reason project was skipped
+])
+
+
+def parse_solution(path):
+    """
+    Reads C# projects of the solution
+    :param path: Path to .sln file
+    :return: List of SolutionProject, in solution order. Solution folders and non C# projects are not included.
+    """
+    solution_dir = os.path.dirname(os.path.abspath(path))
+    projects = []
+    project = None
+    in_dependencies = False
+    with io.open(path, encoding="utf-8-sig", errors="replace") as f:
+        for line in f:
+            line = line.strip()
+            match = _PROJECT_REGEX.match(line)
+            if match:
+                project_path = os.path.normpath(os.path.join(solution_dir, *re.split(r"[\\/]", match.group("path"))))
+                project = SolutionProject(match.group("name"), project_path, match.group("guid").upper(), [])
+                if project_path.lower().endswith(".csproj"):
+                    projects.append(project)
+            elif line == "EndProject":
+                project = None
+            elif project is not None and line.startswith("ProjectSection(ProjectDependencies)"):
+                in_dependencies = True
+            elif line == "EndProjectSection":
+                in_dependencies = False
+            elif in_dependencies and project is not None:
+                match = _DEPENDENCY_REGEX.match(line)
+                if match:
+                    project.dependencies.append(match.group("guid").upper())
+    return projects
+
+
+def get_project_references(path):
+    """
+    Reads ProjectReference items of the project. Conditions are not evaluated.
+    :param path: Path to .csproj file
+    :return: List of absolute paths of referenced projects
+    """
+    project_dir = os.path.dirname(os.path.abspath(path))
+    references = []
+    with open(path, "rb") as f:
+        for event, element in ET.iterparse(f):
+            if local_name(element.tag) == "ProjectReference" and element.attrib.get("Include"):
+                include = re.split(r"[\\/]", element.attrib["Include"])
+                references.append(os.path.normpath(os.path.join(project_dir, *include)))
+    return references
+
+
+def get_dependency_graph(solution_path):
+    """
+    Builds dependency graph of the solution projects from project references and solution build dependencies.
+    References to projects outside of the solution are ignored.
+    :param solution_path: Path to .sln file
+    :return: OrderedDict {project path: sorted list of paths of projects it depends on}
+    :raises ValueError: If projects depend on each other in a cycle
+    """
+    projects = parse_solution(solution_path)
+    paths_by_key = dict((os.path.normcase(project.path), project.path) for project in projects)
+    paths_by_guid = dict((project.guid, project.path) for project in projects)
+    graph = collections.OrderedDict()
+    for project in projects:
+        if not os.path.isfile(project.path):
+            raise IOError("Project not found: {0}".format(project.path))
+        dependencies = set(paths_by_guid[guid] for guid in project.dependencies if guid in paths_by_guid)
+        for reference in get_project_references(project.path):
+            if os.path.normcase(reference) in paths_by_key:
+                dependencies.add(paths_by_key[os.path.normcase(reference)])
+        dependencies.discard(project.path)
+        graph[project.path] = sorted(dependencies)
+    get_topological_order(graph)
+    return graph
+
+
+def get_topological_order(graph):
+    """
+    Orders projects so that every project comes after projects it depends on
+    :param graph: Dictionary {project: list of projects it depends on}
+    :return: List of projects
+    :raises ValueError: If projects depend on each other in a cycle
+    """
+    dependents = _get_dependents(graph)
+    remaining = dict((node, len(dependencies)) for node, dependencies in graph.items())
+    ready = [node for node in graph if remaining[node] == 0]
+    order = []
+    while ready:
+        node = ready.pop(0)
+        order.append(node)
+        for dependent in dependents[node]:
+            remaining[dependent] -= 1
+            if remaining[dependent] == 0:
+                ready.append(dependent)
+    if len(order) != len(graph):
+        cycle = [os.path.basename(node) for node in graph if remaining[node] > 0]
+        raise ValueError("Dependency cycle between projects: {0}".format(", ".join(cycle)))
+    return order
+
+
+def get_critical_path_priorities(graph, weights=None):
+    """
+    Returns scheduling priority of every project - estimated duration of the longest chain of work that starts with it
+    (the project itself and everything that transitively depends on it). Running projects with the highest priority
+    first keeps the longest chain moving, which bounds total time when there are more ready projects than workers.
+    :param graph: Dictionary {project: list of projects it depends on}
+    :param weights: Optional dictionary {project: estimated duration}; projects without an estimate weigh 1
+    :return: Dictionary {project: priority}
+    """
+    weights = weights or {}
+    dependents = _get_dependents(graph)
+    priorities = {}
+    for node in reversed(get_topological_order(graph)):
+        longest_dependent = max([priorities[dependent] for dependent in dependents[node]] or [0])
+        priorities[node] = weights.get(node, 1.0) + longest_dependent
+    return priorities
+
+
+def run_graph(graph, run_project, jobs=1, weights=None, callback=None):
+    """
+    Runs work for every project once projects it depends on succeeded, critical path first.
+    Projects that depend on a failed project, directly or transitively, are skipped; unrelated projects still run.
+    :param graph: Dictionary {project path: list of project paths it depends on}
+    :param run_project: Method that receives project path, and raises exception on failure. With more than one job,
+           it runs in worker processes and must be picklable (i.e. module level function or functools.partial of one).
+    :param jobs: Number of worker processes; with one job, projects run in the current process
+    :param weights: Optional dictionary {project path: estimated duration} used to prioritize projects
+    :param callback: Optional method that receives ProjectResult of every finished or skipped project
+    :return: List of ProjectResult, in order of completion
+    """
+    dependents = _get_dependents(graph)
+    priorities = get_critical_path_priorities(graph, weights)
+    remaining = dict((node, len(dependencies)) for node, dependencies in graph.items())
+    ready = [node for node in graph if remaining[node] == 0]
+    blocked = set()
+    results = []
+
+    def complete(result):
+        results.append(result)
+        if callback is not None:
+            callback(result)
+        if result.status == OK:
+            for dependent in dependents[result.path]:
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0 and dependent not in blocked:
+                    ready.append(dependent)
+            return
+        for dependent in dependents[result.path]:
+            if dependent in blocked:
+                continue
+            blocked.add(dependent)
+            # Skipped project skips its own dependents in turn
+            complete(ProjectResult(dependent, SKIPPED, 0.0, "{0} {1}".format(
+                os.path.basename(result.path), "failed" if result.status == FAILED else "skipped")))
+
+    def pop_ready():
+        ready.sort(key=lambda node: (-priorities[node], node))
+        return ready.pop(0)
+
+    if jobs <= 1:
+        while ready:
+            complete(_call_project(run_project, pop_ready()))
+        return results
+
+    from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        running = {}
+        while ready or running:
+            while ready and len(running) < jobs:
+                node = pop_ready()
+                running[executor.submit(_call_project, run_project, node)] = node
+            done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for future in done:
+                node = running.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # Worker process died or work could not be sent to it
+                    result = ProjectResult(node, FAILED, 0.0, str(e) or type(e).__name__)
+                complete(result)
+    return results
+
+
+def _call_project(run_project, path):
+    """ Runs work for the project, converting exceptions to failed result (runs in worker process) """
+    start = time.time()
+    try:
+        run_project(path)
+    except Exception as e:
+        return ProjectResult(path, FAILED, time.time() - start, str(e) or type(e).__name__)
+    return ProjectResult(path, OK, time.time() - start, "")
+
+
+def _get_dependents(graph):
+    dependents = dict((node, []) for node in graph)
+    for node, dependencies in graph.items():
+        for dependency in dependencies:
+            dependents[dependency].append(node)
+    return dependents
@@ -0,0 +1,225 @@
+import os
+import time
+import shutil
+import hashlib
+import collections
+import click
+from ugetcli import utils
+from ugetcli import fastcopy
+
+"""
+Helper module that synchronizes directory trees, copying only files that changed
+"""
+
+COPY = "copy"        # File is missing in destination
+UPDATE = "update"    # File differs from destination
+MKDIR = "mkdir"      # Directory is missing in destination
+DELETE = "delete"    # File or directory is not in source
+
+SyncAction = collections.namedtuple("SyncAction", [
+    "action",         # copy, update, mkdir or delete
+    "relative_path",  # Path relative to the synchronized directories, with "/" separators
+    "size",           # Number of bytes copied; 0 for mkdir and delete
+])
+
+SyncResult = collections.namedtuple("SyncResult", [
+    "actions",        # List of SyncAction, executed or planned (dry run)
+    "unchanged",      # Number of files that were already up to date
+    "seconds",        # Time spent
+])
+
+_Entry = collections.namedtuple("_Entry", ["is_dir", "size", "mtime_ns"])
+
+
+class DirectorySync:
+    """
+    One-way directory synchronization.
+    Files are considered unchanged if size and modification time match (modification time is copied along with
+    content), or, with checksum comparison, if their content hashes match. Only changed files are copied,
+    on a thread pool; kernel copies release GIL.
+    """
+
+    def __init__(self, jobs=4, checksum=False, delete=False, dry_run=False, digest_cache=None, debug=False):
+        """
+        :param jobs: Number of files copied concurrently
+        :param checksum: If set, files of the same size but different modification time are compared by content hash
+        :param delete: If set, files and directories that don't exist in source are removed from destination
+        :param dry_run: If set, nothing is changed, sync only returns planned actions
+        :param digest_cache: Optional FileDigestCache used for checksum comparison
+        :param debug: Enables verbose output
+        """
+        self.jobs = jobs
+        self.checksum = checksum
+        self.delete = delete
+        self.dry_run = dry_run
+        self.digest_cache = digest_cache
+        self.debug = debug
+
+    def sync(self, src_dir, dst_dir):
+        """
+        Synchronizes destination directory with source directory
+        :param src_dir: Source directory
+        :param dst_dir: Destination directory, created if it does not exist
+        :return: SyncResult
+        """
+        start = time.time()
+        actions, unchanged, touch = self.plan(src_dir, dst_dir)
+        if not self.dry_run:
+            self._execute(src_dir, dst_dir, actions, touch)
+        return SyncResult(actions, unchanged, time.time() - start)
+
+    def plan(self, src_dir, dst_dir):
+        """
+        Compares directories
+        :return: Tuple (list of SyncAction, number of unchanged files,
+                 list of relative paths of files with equal content but different modification time)
+        """
+        if not os.path.isdir(src_dir):
+            raise IOError("Source directory not found: {0}".format(src_dir))
+        src_entries = _scan(src_dir)
+        dst_entries = _scan(dst_dir) if os.path.isdir(dst_dir) else {}
+        actions = []
+        deletes = []
+        touch = []
+        unchanged = 0
+        for relative_path in sorted(src_entries):
+            src_entry = src_entries[relative_path]
+            dst_entry = dst_entries.get(relative_path)
+            if dst_entry is not None and dst_entry.is_dir != src_entry.is_dir:
+                # File replaced with directory or vice versa; destination must be removed regardless of delete flag
+                deletes.append(SyncAction(DELETE, relative_path, 0))
+                dst_entry = None
+            if src_entry.is_dir:
+                if dst_entry is None:
+                    actions.append(SyncAction(MKDIR, relative_path, 0))
+            elif dst_entry is None:
+                actions.append(SyncAction(COPY, relative_path, src_entry.size))
+            elif self._is_unchanged(src_dir, dst_dir, relative_path, src_entry, dst_entry):
+                unchanged += 1
+                if src_entry.mtime_ns != dst_entry.mtime_ns:
+                    touch.append(relative_path)
+            else:
+                actions.append(SyncAction(UPDATE, relative_path, src_entry.size))
+
+        if self.delete:
+            deletes += [SyncAction(DELETE, relative_path, 0) for relative_path in dst_entries
+                        if relative_path not in src_entries and _parent_kept(relative_path, src_entries)]
+        # Deletes run first, deepest paths first, so type conflicts are resolved before copies
+        deletes.sort(key=lambda action: action.relative_path, reverse=True)
+        return deletes + actions, unchanged, touch
+
+    def _is_unchanged(self, src_dir, dst_dir, relative_path, src_entry, dst_entry):
+        if src_entry.size != dst_entry.size:
+            return False
+        if src_entry.mtime_ns == dst_entry.mtime_ns:
+            return True
+        if not self.checksum:
+            return False
+        src_path = utils.join_relative_path(src_dir, relative_path)
+        dst_path = utils.join_relative_path(dst_dir, relative_path)
+        if self.digest_cache is not None:
+            return self.digest_cache.get_digest(src_path) == self.digest_cache.get_digest(dst_path)
+        return _get_digest(src_path) == _get_digest(dst_path)
+
+    def _execute(self, src_dir, dst_dir, actions, touch):
+        if not os.path.isdir(dst_dir):
+            os.makedirs(dst_dir)
+        copies = []
+        for action in actions:
+            if self.debug:
+                click.secho(format_action(action))
+            dst_path = utils.join_relative_path(dst_dir, action.relative_path)
+            if action.action == DELETE:
+                if os.path.isdir(dst_path) and not os.path.islink(dst_path):
+                    shutil.rmtree(dst_path)
+                elif os.path.lexists(dst_path):
+                    os.remove(dst_path)
+            elif action.action == MKDIR:
+                os.makedirs(dst_path)
+            else:
+                copies.append(action.relative_path)
+        for relative_path in touch:
+            _copy_mtime(utils.join_relative_path(src_dir, relative_path),
+                        utils.join_relative_path(dst_dir, relative_path))
+
+        def copy(relative_path):
+            src_path = utils.join_relative_path(src_dir, relative_path)
+            dst_path = utils.join_relative_path(dst_dir, relative_path)
+            fastcopy.copy_file(src_path, dst_path)
+            _copy_mtime(src_path, dst_path)
+
+        if self.jobs <= 1 or len(copies) <= 1:
+            for relative_path in copies:
+                copy(relative_path)
+            return
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            # Consuming results re-raises the first failed copy
+            list(executor.map(copy, copies))
+
+
+def format_action(action):
+    if action.action in (COPY, UPDATE):
+        return "{0:<7}{1} ({2} bytes)".format(action.action, action.relative_path, action.size)
+    return "{0:<7}{1}".format(action.action, action.relative_path)
+
+
+def format_result(result):
+    """
+    Formats sync result as text - one line per action, followed by a summary
+    :param result: SyncResult
+    :return: List of lines
+    """
+    counts = collections.Counter(action.action for action in result.actions)
+    lines = [format_action(action) for action in result.actions]
+    lines.append("{0} copied, {1} updated, {2} deleted, {3} directories created, {4} unchanged, "
+                 "{5} bytes in {6:.2f} s".format(counts[COPY], counts[UPDATE], counts[DELETE], counts[MKDIR],
+                                                 result.unchanged, sum(action.size for action in result.actions),
+                                                 result.seconds))
+    return lines
+
+
+def _scan(root_dir):
+    """
+    Lists directory tree with os.scandir, which gets file types from directory listing without extra stat calls.
+    Symbolic links to directories are followed, except links to a directory they are in.
+    :return: Dictionary {relative path: _Entry}
+    """
+    entries = {}
+    pending = [("", root_dir)]
+    while pending:
+        relative_dir, path = pending.pop()
+        files, subdirectories = utils.scan_directory(path)
+        for entry in subdirectories:
+            if entry.is_symlink() and _is_same_or_parent(os.path.realpath(entry.path), os.path.realpath(path)):
+                continue  # Following it would never end
+            entries[relative_dir + entry.name] = _Entry(True, 0, 0)
+            pending.append((relative_dir + entry.name + "/", entry.path))
+        for entry in files:
+            stat = entry.stat()
+            entries[relative_dir + entry.name] = _Entry(False, stat.st_size, stat.st_mtime_ns)
+    return entries
+
+
+def _is_same_or_parent(directory, path):
+    directory, path = os.path.normcase(directory), os.path.normcase(path)
+    return path == directory or path.startswith(directory.rstrip(os.sep) + os.sep)
+
+
+def _parent_kept(relative_path, src_entries):
+    """ True if the parent directory of an extraneous path is not deleted itself, so only the topmost path is listed """
+    parent = relative_path.rpartition("/")[0]
+    return not parent or (parent in src_entries and src_entries[parent].is_dir)
+
+
+def _copy_mtime(src_path, dst_path):
+    stat = os.stat(src_path)
+    os.utime(dst_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+
+def _get_digest(path):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
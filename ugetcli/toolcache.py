@@ -0,0 +1,111 @@
+import os
+import hashlib
+import json
+import shutil
+from ugetcli import utils
+
+"""
+Helper module that provides persistent cache of located tool executables (msbuild, NuGet)
+"""
+
+
+class ToolCache:
+    """
+    On-disk cache of tool discovery results.
+    Entries are keyed by tool name, PATH, candidate paths and modification times of the candidate executables,
+    so installing, removing or upgrading a tool invalidates the entry.
+    """
+    CACHE_FILENAME = "tools.json"
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir or utils.get_cache_dir()
+        self.path = os.path.join(self.cache_dir, self.CACHE_FILENAME)
+
+    def lookup(self, tool, candidates):
+        """
+        Returns cached discovery result
+        :param tool: Tool name (i.e. msbuild)
+        :param candidates: List of candidate executable paths
+        :return: Cached executable path, or None if there is no valid entry
+        """
+        entries = utils.load_json_file(self.path, {})
+        entry = entries.get(self._get_key(tool, candidates))
+        if entry is None:
+            return None
+        return entry.get("path")
+
+    def store(self, tool, candidates, path):
+        """
+        Stores discovery result
+        :param tool: Tool name (i.e. msbuild)
+        :param candidates: List of candidate executable paths
+        :param path: Located executable path
+        """
+        if not path or self._get_mtime(path) is None:
+            return  # Only tools that exist on disk can be fingerprinted
+        entries = utils.load_json_file(self.path, {})
+        entries[self._get_key(tool, candidates)] = {"tool": tool, "path": path}
+        utils.save_json_file(self.path, entries)
+
+    def locate(self, tool, candidates, probe):
+        """
+        Returns cached executable path or probes candidates and caches the result
+        :param tool: Tool name (i.e. msbuild)
+        :param candidates: List of candidate executable paths, in order of preference
+        :param probe: Method that receives list of candidates and returns located executable path or None
+        :return: Located executable path or None
+        """
+        path = self.lookup(tool, candidates)
+        if path:
+            return path
+        path = probe(candidates)
+        self.store(tool, candidates, path)
+        return path
+
+    def validate(self, tool, path, validator):
+        """
+        Returns True if path is a valid executable, using cached validation results where possible
+        :param tool: Tool name (i.e. msbuild)
+        :param path: Executable path
+        :param validator: Method that returns True if path is a valid executable
+        """
+        return self.locate(tool, [path], lambda candidates: path if validator(path) else None) == path
+
+    def clear(self):
+        """ Removes all cached entries """
+        if os.path.isfile(self.path):
+            os.remove(self.path)
+
+    @staticmethod
+    def _get_key(tool, candidates):
+        fingerprint = [tool, os.environ.get("PATH", "")]
+        fingerprint += [[candidate, ToolCache._get_mtime(candidate)] for candidate in candidates]
+        return hashlib.sha1(json.dumps(fingerprint).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _get_mtime(path):
+        """ Returns modification time of the executable at path or on PATH, None if it does not exist """
+        if not os.path.isfile(path):
+            path = shutil.which(path)
+            if not path:
+                return None
+        try:
+            return os.path.getmtime(path)
+        except OSError:
+            return None
+
+
+def probe_candidates(candidates, validator):
+    """
+    Validates candidate executables in parallel
+    :param candidates: List of candidate executable paths, in order of preference
+    :param validator: Method that returns True if path is a valid executable
+    :return: First valid candidate in order of preference, or None
+    """
+    if len(candidates) <= 1:
+        return next((candidate for candidate in candidates if validator(candidate)), None)
+
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=min(len(candidates), 8)) as executor:
+        results = list(executor.map(validator, candidates))
+    return next((candidate for candidate, valid in zip(candidates, results) if valid), None)
@@ -1,15 +1,19 @@
 import os
 import re
 import sys
-import tempfile
+import glob
+import json
+import time
 import shutil
+import hashlib
+import functools
+import threading
 import click
 from ugetcli import utils
-from ugetcli.msbuild import MsBuildRunner
-from ugetcli.nuget import NuGetRunner
-from ugetcli.unitypackage import UnityPackageRunner
-from ugetcli.nuspec import NuSpec
-from ugetcli.csproj import CsProj
+from ugetcli import fastcopy
+
+# Tool runners, project readers, native engines, caches and other subsystems are imported inside the methods that
+# need them, so every command only pays for the modules it uses
 
 
 class UGetCli:
@@ -18,10 +22,40 @@ class UGetCli:
     """
     UNITYPACKAGE_FORMAT = "{name}_{version}_{configuration}.unitypackage"
     UNITYPACKAGE_REGEX = "(.*)_(.*)_(.*).unitypackage"
+    RUN_STEPS = ("build", "create", "pack", "push")
+    RUN_DURATIONS_FILENAME = "run.json"
 
     def __init__(self, debug, quiet):
         self.debug = debug
         self.quiet = quiet
+        self._caches = {}
+        self._caches_lock = threading.Lock()
+        self._csprojs = {}
+        self._csprojs_lock = threading.Lock()
+
+    @property
+    def tool_cache(self):
+        """ ToolCache of msbuild and NuGet discovery results """
+        from ugetcli.toolcache import ToolCache
+        return self._get_cache("tool_cache", ToolCache)
+
+    @property
+    def metadata_index(self):
+        """ MetadataIndex of values read from projects and NuGet specifications """
+        from ugetcli.metadata import MetadataIndex
+        return self._get_cache("metadata_index", MetadataIndex)
+
+    @property
+    def digest_cache(self):
+        """ FileDigestCache of file content digests """
+        from ugetcli.metadata import FileDigestCache
+        return self._get_cache("digest_cache", FileDigestCache)
+
+    @property
+    def build_cache(self):
+        """ Local BuildCache """
+        from ugetcli.buildcache import BuildCache
+        return self._get_cache("build_cache", BuildCache)
 
     def build(self, csproj_path, configuration, msbuild_path, rebuild):
         """
@@ -34,11 +68,13 @@ class UGetCli:
         """
         csproj_path = self._locate_csproj_at_path(csproj_path)
         msbuild_path = self._locate_msbuild_path(msbuild_path)
+        from ugetcli.msbuild import MsBuildRunner
         msbuild = MsBuildRunner(msbuild_path, self.debug)
         return msbuild.build(csproj_path, configuration, rebuild)
 
     def create(self, csproj_path, output_dir, configuration, unity_project_path,
-               root_dir, assembly_relative_dir, clean):
+               root_dir, assembly_relative_dir, clean, engine="upackage", jobs=1, compression="default",
+               deterministic=False, cache=True, cache_url=None, overlay=False, incremental=False):
         """
         Creates .unitypackage that contains project assembly and assets
         :param path: Path to .csproj
@@ -48,8 +84,25 @@ class UGetCli:
         :param root_dir: Root path inside a unity_project_path used to export .unitypackage
         :param assembly_relative_dir: Relative path from $unity_project_path/$root_dir to export assemblies.
         :param clean: If set, other Unity Packages will be removed from the output folder if they match configuration
+        :param engine: "upackage" to export with upackage, "native" to stream assets into .unitypackage in-process
+        :param jobs: Number of threads used to compress .unitypackage (native engine)
+        :param compression: Compression profile - store, fast, default or max (native engine)
+        :param deterministic: If set, the same inputs produce byte-identical .unitypackage (native engine)
+        :param cache: If set, .unitypackage is restored from the build cache when assembly and assets did not change
+        :param cache_url: Optional URL of the remote cache shared with other machines
+        :param overlay: If set, assembly is exported straight from the project output directory and missing .meta files
+               are generated in memory, so nothing is written to the Unity project (native engine)
+        :param incremental: If set, every asset is written as a separate gzip member, and members of unchanged assets
+               are reused from the cache instead of being compressed again (native engine)
         """
-        csproj = CsProj(csproj_path)
+        if deterministic and engine != "native":
+            raise click.UsageError("Deterministic mode is only supported by native engine.")
+        if overlay and engine != "native":
+            raise click.UsageError("Overlay export is only supported by native engine.")
+        if incremental and engine != "native":
+            raise click.UsageError("Incremental export is only supported by native engine.")
+
+        csproj = self._get_csproj(csproj_path)
 
         # Read csproj properties - assembly name, version and output directory
         assembly_name = csproj.get_assembly_name()
@@ -90,14 +143,34 @@ class UGetCli:
         unitypackage_export_root = self._get_unity_package_export_root(unity_project_path, root_dir)
         assembly_export_root = os.path.join(unitypackage_export_root, assembly_relative_dir)
 
-        if not os.path.exists(unitypackage_export_root):
-            os.makedirs(unitypackage_export_root)
-        elif not os.path.isdir(unitypackage_export_root):
+        if os.path.exists(unitypackage_export_root) and not os.path.isdir(unitypackage_export_root):
             raise IOError("Can't copy assembly into Unity Project; path is not a valid directory: {0}"
                           .format(unitypackage_export_root))
 
-        shutil.copyfile(dll_path, os.path.abspath(os.path.join(assembly_export_root, dll_name)))
-        shutil.copyfile(pdb_path, os.path.abspath(os.path.join(assembly_export_root, pdb_name)))
+        # Assembly files as if they were copied into the Unity project; with overlay, they are exported from here
+        assembly_files = {}
+        for name, path in ((dll_name, dll_path), (pdb_name, pdb_path)):
+            relative_path = os.path.normpath(os.path.join(assembly_relative_dir, name)).replace(os.sep, "/")
+            assembly_files[relative_path] = os.path.abspath(path)
+        assembly_overlay = assembly_files if overlay else None
+
+        # Options that affect .unitypackage content; number of compression threads does not
+        cache_options = {"engine": engine, "compression": compression, "deterministic": deterministic,
+                         "root": os.path.basename(os.path.normpath(unitypackage_export_root)), "overlay": overlay,
+                         "incremental": incremental}
+        # Key is computed before the assembly is copied, from the files the copies will have the same content as,
+        # so download from the remote cache runs while the assembly is copied
+        cache_key = self._get_unitypackage_cache_key(unitypackage_export_root, cache_options, assembly_files) \
+            if cache else None
+        build_cache = self._get_build_cache(cache_url)
+        if cache_key:
+            build_cache.prefetch(cache_key)
+
+        if not overlay:
+            if not os.path.exists(unitypackage_export_root):
+                os.makedirs(unitypackage_export_root)
+            self._copy_file_if_changed(dll_path, os.path.abspath(os.path.join(assembly_export_root, dll_name)))
+            self._copy_file_if_changed(pdb_path, os.path.abspath(os.path.join(assembly_export_root, pdb_name)))
 
         # Copy unity project folder into a temporary build location
         unitypackage_name = self.UNITYPACKAGE_FORMAT.format(name=assembly_name, version=version,
@@ -109,9 +182,35 @@ class UGetCli:
         unitypackage_path = os.path.abspath(os.path.join(output_dir, unitypackage_name))
 
         # Create .unitypackage
-        unity_runner = UnityPackageRunner(self.debug)
-        click.secho("Exporting Unitypackage: {0}".format(unitypackage_name))
-        unity_runner.export_unitypackage(os.path.abspath(unitypackage_export_root), unitypackage_path)
+        if cache_key and build_cache.get(cache_key, unitypackage_path):
+            click.secho("Restored Unitypackage from cache: {0}".format(unitypackage_name))
+        else:
+            if engine == "native":
+                from ugetcli.unitypackagewriter import UnityPackageWriter
+                unity_runner = UnityPackageWriter(self.debug, jobs, compression, deterministic, not overlay)
+                if incremental:
+                    unity_runner.set_member_cache(self._get_member_cache(), self.digest_cache)
+            else:
+                from ugetcli.unitypackage import UnityPackageRunner
+                unity_runner = UnityPackageRunner(self.debug)
+            if os.path.isfile(unitypackage_path):
+                # Might be a hardlink to the cached file from an earlier cached build; never overwrite it in place
+                os.remove(unitypackage_path)
+            click.secho("Exporting Unitypackage: {0}".format(unitypackage_name))
+            if overlay:
+                unity_runner.export_unitypackage(os.path.abspath(unitypackage_export_root), unitypackage_path,
+                                                 assembly_overlay)
+            else:
+                unity_runner.export_unitypackage(os.path.abspath(unitypackage_export_root), unitypackage_path)
+
+            if cache_key and os.path.isfile(unitypackage_path):
+                build_cache.put(cache_key, unitypackage_path)
+                # Export generates missing .meta files; store under the key the next run computes as well
+                exported_cache_key = self._get_unitypackage_cache_key(unitypackage_export_root, cache_options,
+                                                                      assembly_overlay)
+                if exported_cache_key != cache_key:
+                    build_cache.put(exported_cache_key, unitypackage_path)
+        self.digest_cache.save()
 
         if not os.path.isfile(unitypackage_path):
             raise RuntimeError("UnityPackage not found at path: " + unitypackage_path)
@@ -121,7 +220,12 @@ class UGetCli:
         if clean:
             self._remove_old_unitypackages(output_dir, assembly_name, configuration, version)
 
-    def pack(self, path, output_dir, nuget_path, unitypackage_path, configuration, unity_project_path, unitypackage_root_path_relative):
+        # Uploads to remote cache overlap with cleaning; wait for them before exiting
+        build_cache.close()
+        self._print_transfer_stats()
+
+    def pack(self, path, output_dir, nuget_path, unitypackage_path, configuration, unity_project_path, unitypackage_root_path_relative,
+             engine="nuget", compression="default", deterministic=False, cache=True, cache_url=None, incremental=False):
         """
         Packs NuGet Package.
         :param path: Path to the .csproj or .nuspec, or a directory containing either
@@ -129,22 +233,47 @@ class UGetCli:
         :param nuget_path: Path to the NuGet executable
         :param unitypackage_path: Path to the .unitypackge
         :param configuration: Configuration - Debug/Release
+        :param engine: "nuget" to run NuGet executable, "native" to write .nupkg in-process
+        :param compression: Compression profile - store, fast, default or max (native engine)
+        :param deterministic: If set, the same inputs produce byte-identical .nupkg (native engine)
+        :param cache: If set, .nupkg is restored from the build cache when .nuspec and packed files did not change
+               (native engine)
+        :param cache_url: Optional URL of the remote cache shared with other machines (native engine)
+        :param incremental: If set, compressed data of unchanged files is copied from the previous package with the same
+               id in the output directory (native engine)
         :return: Exit code of the NuGet Pack command
         """
-        # Locate nuget executable
-        nuget_path = self._locate_nuget_path(nuget_path)
-        nuget_runner = NuGetRunner(nuget_path, self.debug)
+        if deterministic and engine != "native":
+            raise click.UsageError("Deterministic mode is only supported by native engine.")
+        if incremental and engine != "native":
+            raise click.UsageError("Incremental pack is only supported by native engine.")
+
+        build_cache = None
+        from ugetcli.nuget import NuGetRunner
+        from ugetcli.nuspec import NuSpec
+        from ugetcli.csproj import CsProj
+        if engine == "native":
+            from ugetcli.nupkg import NuPkgBuilder
+            pack_runner = NuPkgBuilder(self.debug, compression, deterministic, incremental)
+            if cache:
+                build_cache = self._get_build_cache(cache_url)
+                pack_runner.set_build_cache(build_cache, self.digest_cache)
+        else:
+            # Locate nuget executable
+            nuget_path = self._locate_nuget_path(nuget_path)
+            pack_runner = NuGetRunner(nuget_path, self.debug)
 
         # Locate project name and version
         csproj_file_path = CsProj.get_csproj_at_path(path)
         if csproj_file_path is not None:
-            csproj = CsProj(path, self.debug)
+            csproj = self._get_csproj(path)
             package_id = csproj.get_assembly_name()
             version = csproj.get_assembly_version()
         else:
             nuspec_file_path = NuSpec.get_nuspec_at_path(path)
             if nuspec_file_path is not None:
                 nuspec = NuSpec(path, self.debug)
+                nuspec.set_metadata_index(self.metadata_index)
                 package_id = nuspec.get_package_id()
                 version = nuspec.get_package_version()
             else:
@@ -164,22 +293,478 @@ class UGetCli:
 
         unitypackage_export_root = self._get_unity_package_export_root(unity_project_path, unitypackage_root_path_relative)
 
-        return nuget_runner.pack(path, output_dir, configuration, unitypackage_path, unitypackage_export_root, version)
+        if engine != "native":
+            # Package might be a hardlink to the cached file from an earlier native pack; NuGet overwrites it in place.
+            # Native engine replaces the package, and reads the previous one in incremental mode.
+            nupkg_path = os.path.join(output_dir, "{0}.{1}.nupkg".format(
+                package_id, NuGetRunner.get_normalized_nuget_pack_version(version)))
+            if os.path.isfile(nupkg_path):
+                os.remove(nupkg_path)
+
+        try:
+            return pack_runner.pack(path, output_dir, configuration, unitypackage_path, unitypackage_export_root,
+                                    version)
+        finally:
+            if build_cache is not None:
+                self.digest_cache.save()
+                build_cache.close()
+            self._print_transfer_stats()
 
-    def push(self, path, output_dir, feed, nuget_path, api_key):
+    def push(self, path, output_dir, feed, nuget_path, api_key, engine="nuget", jobs=4, retries=3,
+             skip_duplicate=False, check_existing=True):
         """
-        Pushes NuGet package on to the NuGet feed.
-        :param path: Path to the NuGet Package
+        Pushes NuGet packages on to the NuGet feed.
+        :param path: Path to the NuGet Package, a glob pattern or a directory containing NuGet packages
         :param output_dir: Output directory in which NuGet package will be searched, if it's not explicitly provided.
         :param feed: NuGet feed URI
         :param nuget_path: Path to the NuGet executable
         :param api_key: NuGet Api Key
+        :param engine: Push engine - 'nuget' runs NuGet executable, 'native' uploads package over HTTP in-process
+        :param jobs: Maximum number of concurrent uploads (native engine)
+        :param retries: Number of times a failed upload is retried (native engine)
+        :param skip_duplicate: If set, packages that already exist on the feed are not treated as failures
+               (native engine)
+        :param check_existing: If set, feed is queried before uploading, and packages it already has are not uploaded
+               (native engine)
         :return: Exit code of the NuGet push command
         """
-        nupkg_path = self._locate_nupkg_at_path(path, output_dir)
+        nupkg_paths = self._locate_nupkgs_at_path(path, output_dir)
+        if engine == "native":
+            return self._push_native(nupkg_paths, feed, api_key, jobs, retries, skip_duplicate, check_existing)
         nuget_path = self._locate_nuget_path(nuget_path)
+        from ugetcli.nuget import NuGetRunner
         nuget = NuGetRunner(nuget_path, self.debug)
-        return nuget.push(nupkg_path, feed, api_key)
+        exit_code = 0
+        for nupkg_path in nupkg_paths:
+            exit_code = nuget.push(nupkg_path, feed, api_key) or exit_code
+        return exit_code
+
+    def _push_native(self, nupkg_paths, feed, api_key, jobs, retries, skip_duplicate, check_existing):
+        """
+        Uploads NuGet packages to the feed using in-process HTTP client
+        :param nupkg_paths: List of paths to NuGet Packages
+        :param feed: NuGet feed URI
+        :param api_key: NuGet Api Key
+        :param jobs: Maximum number of concurrent uploads
+        :param retries: Number of times a failed upload is retried
+        :param skip_duplicate: If set, packages that already exist on the feed are not treated as failures
+        :param check_existing: If set, feed is queried before uploading, and packages it already has are not uploaded
+        :return: 0 if every package was accepted by the feed, otherwise 1
+        """
+        if not feed:
+            raise click.UsageError("NuGet feed must be provided to push with native engine.")
+        if not utils.validate_url(feed):
+            raise click.UsageError("Invalid NuGet feed URL: {0}".format(feed))
+        from ugetcli.feed import NuGetFeedClient, push_packages, push_result_ok, format_push_summary
+
+        client = NuGetFeedClient(feed, api_key, self.debug)
+        start = time.time()
+        try:
+            results = push_packages(client, nupkg_paths, jobs, retries, check_existing=check_existing)
+        finally:
+            client.close()
+        elapsed = time.time() - start
+
+        failed = [result for result in results if not push_result_ok(result, skip_duplicate)]
+        if not self.quiet or failed:
+            for line in format_push_summary(results, elapsed, skip_duplicate):
+                click.secho(line, fg="red" if failed else None)
+        return 1 if failed else 0
+
+    def tools(self, refresh):
+        """
+        Locates msbuild and NuGet executables and prints their paths.
+        :param refresh: If set, discards cached discovery results and probes tools again
+        :return: 0 if all tools were located, otherwise 1
+        """
+        if refresh:
+            self.tool_cache.clear()
+            if not self.quiet:
+                click.secho("Cleared tool discovery cache: " + self.tool_cache.path)
+
+        from ugetcli.msbuild import MsBuildRunner
+        from ugetcli.nuget import NuGetRunner
+        tools = [("msbuild", MsBuildRunner.locate_msbuild(self.tool_cache)),
+                 ("nuget", NuGetRunner.locate_nuget(self.tool_cache))]
+        for name, path in tools:
+            click.secho("{0}: {1}".format(name, path or "not found"))
+        return 0 if all(path for name, path in tools) else 1
+
+    def inspect(self, paths, jobs=4, as_json=False, use_index=True):
+        """
+        Lists assets of Unity Packages without extracting them
+        :param paths: Paths to .unitypackage files, directories containing them or glob patterns
+        :param jobs: Number of packages inspected concurrently
+        :param as_json: If set, prints result as json
+        :param use_index: If set, results are cached in an index keyed by package content hash
+        :return: Exit code
+        """
+        unitypackage_paths = []
+        for path in paths:
+            unitypackage_paths += self._locate_unitypackages_at_path(path)
+
+        from ugetcli.inspector import UnityPackageInspector, format_assets
+        inspector = UnityPackageInspector(use_index=use_index, digest_cache=self.digest_cache)
+        results = inspector.inspect_many(unitypackage_paths, jobs)
+        if as_json:
+            click.echo(json.dumps([{"path": path, "assets": [asset._asdict() for asset in assets]}
+                                   for path, assets in results], indent=2))
+        else:
+            for path, assets in results:
+                for line in format_assets(path, assets):
+                    click.secho(line)
+        return 0
+
+    def diff(self, old, new, csproj_path, output_dir, configuration, as_json=False, use_index=True):
+        """
+        Compares assets of two Unity Packages
+        :param old: Path to the old .unitypackage, or its version (package is then located in output_dir)
+        :param new: Path to the new .unitypackage, or its version
+        :param csproj_path: Path to the .csproj, used to name packages provided by version
+        :param output_dir: Directory packages provided by version are located in
+        :param configuration: Configuration of packages provided by version - Debug/Release
+        :param as_json: If set, prints result as json
+        :param use_index: If set, package listings are cached in an index keyed by package content hash
+        :return: Exit code
+        """
+        paths = [self._locate_unitypackage_version(value, csproj_path, output_dir, configuration)
+                 for value in (old, new)]
+        from ugetcli.inspector import UnityPackageInspector
+        from ugetcli.unitypackagediff import diff_assets, format_changes
+        # Both packages are streamed and hashed at the same time; zlib and hashlib release GIL
+        inspector = UnityPackageInspector(use_index=use_index, digest_cache=self.digest_cache)
+        (old_path, old_assets), (new_path, new_assets) = inspector.inspect_many(paths, 2)
+        changes = diff_assets(old_assets, new_assets)
+        if as_json:
+            click.echo(json.dumps({"old": old_path, "new": new_path,
+                                   "changes": [change._asdict() for change in changes]}, indent=2))
+        else:
+            click.secho("--- {0}".format(old_path))
+            click.secho("+++ {0}".format(new_path))
+            for line in format_changes(changes):
+                click.secho(line)
+        return 0
+
+    def sync(self, src_dir, dst_dir, jobs=4, checksum=False, delete=False, dry_run=False):
+        """
+        Synchronizes directory with another one, copying only files that changed
+        :param src_dir: Source directory
+        :param dst_dir: Destination directory
+        :param jobs: Number of files copied concurrently
+        :param checksum: If set, files with different modification time are compared by content hash
+        :param delete: If set, files that don't exist in source are removed from destination
+        :param dry_run: If set, only prints what would be done
+        :return: Exit code
+        """
+        if not os.path.isdir(src_dir):
+            raise click.UsageError("Source directory not found: {0}".format(src_dir))
+        from ugetcli.sync import DirectorySync, format_result
+        directory_sync = DirectorySync(jobs, checksum, delete, dry_run, self.digest_cache, self.debug)
+        result = directory_sync.sync(src_dir, dst_dir)
+        if checksum:
+            self.digest_cache.save()
+        lines = format_result(result)
+        if not dry_run and not self.debug:
+            lines = lines[-1:]  # Actions are printed as they run in debug mode
+        for line in lines:
+            click.secho(line)
+        self._print_transfer_stats()
+        return 0
+
+    def discover(self, root_dir, jobs=4, as_json=False, use_cache=True):
+        """
+        Lists Visual Studio projects, NuGet specifications and solutions in the directory tree
+        :param root_dir: Root directory
+        :param jobs: Number of top level directories walked concurrently
+        :param as_json: If set, prints result as json
+        :param use_cache: If set, directory listings are cached, so only changed directories are listed again
+        :return: Exit code
+        """
+        if not os.path.isdir(root_dir):
+            raise click.UsageError("Directory not found: {0}".format(root_dir))
+        from ugetcli.discovery import ProjectDiscovery
+        result = ProjectDiscovery(jobs, use_cache=use_cache).discover(root_dir)
+        if as_json:
+            click.echo(json.dumps({"projects": result.projects, "nuspecs": result.nuspecs,
+                                   "solutions": result.solutions}, indent=2))
+            return 0
+        for kind, paths in (("solution", result.solutions), ("project", result.projects),
+                            ("nuspec", result.nuspecs)):
+            for path in paths:
+                click.secho("{0:<9}{1}".format(kind, os.path.relpath(path)))
+        if self.debug:
+            click.secho("Visited {0} directories, listed {1}".format(result.directories, result.listed))
+        return 0
+
+    def run(self, solution_path, steps=RUN_STEPS, jobs=None, configuration="Release", output_dir="Output",
+            unity_project_path="UnityProject", msbuild_path=None, nuget_path=None, feed=None, api_key=None,
+            native=False):
+        """
+        Runs build, create, pack and push for every C# project of the solution, in dependency order.
+        Projects run concurrently in worker processes, longest chain of dependent projects first; projects that depend
+        on a failed project are skipped. Every project runs as if uget commands were run from its directory:
+        relative paths are resolved against it, and uget.config.json found there overrides these options.
+        :param solution_path: Path to .sln file
+        :param steps: Steps run for every project - any of build, create, pack and push, in this order
+        :param jobs: Number of projects run concurrently; number of CPUs if not provided
+        :param configuration: Build configuration - Debug/Release
+        :param output_dir: Directory .unitypackage and .nupkg files are written to
+        :param unity_project_path: Path to the Unity project used to build .unitypackage
+        :param msbuild_path: Path to the msbuild executable
+        :param nuget_path: Path to the NuGet executable
+        :param feed: NuGet feed URI; push is skipped for projects without a feed
+        :param api_key: NuGet Api Key
+        :param native: If set, packages are created, packed and pushed in-process, without upackage and NuGet
+        :return: Exit code - 0 if every project succeeded
+        """
+        unknown_steps = [step for step in steps if step not in self.RUN_STEPS]
+        if unknown_steps or not steps:
+            raise click.UsageError("Steps must be any of {0}, got: {1}".format(
+                ", ".join(self.RUN_STEPS), ", ".join(steps)))
+        if not os.path.isfile(solution_path):
+            raise click.UsageError("Solution not found: {0}".format(solution_path))
+        import multiprocessing
+        from ugetcli.solution import get_dependency_graph, run_graph, OK, FAILED, SKIPPED
+        try:
+            graph = get_dependency_graph(solution_path)
+        except (IOError, OSError, ValueError, SyntaxError) as e:
+            raise click.UsageError("Failed to read solution {0}: {1}".format(solution_path, e))
+        if not graph:
+            raise click.UsageError("No C# projects found in solution: {0}".format(solution_path))
+
+        options = {
+            "steps": [step for step in self.RUN_STEPS if step in steps],
+            "configuration": configuration,
+            "output_dir": output_dir,
+            "unity_project_path": unity_project_path,
+            "msbuild_path": msbuild_path,
+            "nuget_path": nuget_path,
+            "feed": feed,
+            "api_key": api_key,
+            "create_engine": "native" if native else "upackage",
+            "pack_engine": "native" if native else "nuget",
+            "push_engine": "native" if native else "nuget",
+            "debug": self.debug,
+        }
+        # Tools are located once, rather than by every project
+        if "build" in steps:
+            options["msbuild_path"] = self._locate_msbuild_path(msbuild_path)
+        if not native and ("pack" in steps or (feed and "push" in steps)):
+            options["nuget_path"] = self._locate_nuget_path(nuget_path)
+
+        jobs = min(jobs or multiprocessing.cpu_count(), len(graph))
+        durations_path = os.path.join(utils.get_cache_dir(), self.RUN_DURATIONS_FILENAME)
+        durations = utils.load_json_file(durations_path, {})
+        click.secho("Running {0} for {1} projects, {2} at a time".format(", ".join(options["steps"]), len(graph), jobs))
+
+        start = time.time()
+        with utils.temp_dir() as log_dir:
+            completed = []
+
+            def report(result):
+                completed.append(result)
+                name = os.path.splitext(os.path.basename(result.path))[0]
+                line = "[{0}/{1}] {2:<8}{3}".format(len(completed), len(graph), result.status, name)
+                if result.status == OK:
+                    click.secho(line + " ({0:.1f} s)".format(result.seconds))
+                else:
+                    click.secho(line + ": " + result.message, fg="red" if result.status == FAILED else "yellow")
+                log_path = _get_run_log_path(log_dir, result.path)
+                if (result.status == FAILED or self.debug) and os.path.isfile(log_path):
+                    with open(log_path) as f:
+                        for log_line in f:
+                            click.secho("    " + log_line.rstrip())
+
+            run_project = functools.partial(_run_project_steps, options, log_dir)
+            results = run_graph(graph, run_project, jobs, durations, report)
+
+        for result in results:
+            if result.status == OK:
+                durations[result.path] = result.seconds
+        utils.save_json_file(durations_path, durations)
+
+        statuses = [result.status for result in results]
+        click.secho("{0} succeeded, {1} failed, {2} skipped in {3:.1f} s".format(
+            statuses.count(OK), statuses.count(FAILED), statuses.count(SKIPPED), time.time() - start))
+        return 0 if statuses.count(OK) == len(graph) else 1
+
+    def publish(self, paths, output_dir, configuration, unity_project_path, root_dir, assembly_relative_dir, clean,
+                msbuild_path, nuget_path, feed, api_key, native=False, jobs=4, rebuild=False):
+        """
+        Builds, creates, packs and pushes packages of one or more projects in this process.
+        Project metadata is read once and shared by every step. Every step runs on its own worker threads, so steps of
+        different projects overlap - i.e. package of one project uploads while the next one is compressed.
+        :param paths: Paths to .csproj files or directories containing them
+        :param output_dir: Directory .unitypackage and .nupkg files are written to
+        :param configuration: Build configuration - Debug/Release
+        :param unity_project_path: Path to the unity project used to build .unitypackage
+        :param root_dir: Root path inside a unity_project_path used to export .unitypackage
+        :param assembly_relative_dir: Relative path from $unity_project_path/$root_dir to export assemblies
+        :param clean: If set, other Unity Packages will be removed from the output folder if they match configuration
+        :param msbuild_path: Path to the msbuild executable
+        :param nuget_path: Path to the NuGet executable
+        :param feed: NuGet feed URI; if not provided, packages are not pushed
+        :param api_key: NuGet Api Key
+        :param native: If set, packages are created, packed and pushed in-process, without upackage and NuGet
+        :param jobs: Maximum number of concurrent uploads
+        :param rebuild: If set, forces msbuild to rebuild projects
+        :return: Exit code - 0 if every project was published
+        """
+        csproj_paths = []
+        for path in paths:
+            csproj_path = self._locate_csproj_at_path(path)
+            if csproj_path not in csproj_paths:
+                csproj_paths.append(csproj_path)
+        # Tools are located once, rather than by every step
+        msbuild_path = self._locate_msbuild_path(msbuild_path)
+        if not native:
+            nuget_path = self._locate_nuget_path(nuget_path)
+        create_engine, pack_engine, push_engine = ("native", "native", "native") if native \
+            else ("upackage", "nuget", "nuget")
+
+        def check_exit_code(step, exit_code):
+            if exit_code:
+                raise RuntimeError("{0} failed with exit code {1}".format(step, exit_code))
+
+        def build(csproj_path):
+            check_exit_code("build", self.build(csproj_path, configuration, msbuild_path, rebuild))
+            return csproj_path
+
+        def create(csproj_path):
+            self.create(csproj_path, output_dir, configuration, unity_project_path, root_dir, assembly_relative_dir,
+                        clean, create_engine)
+            return csproj_path
+
+        def pack(csproj_path):
+            check_exit_code("pack", self.pack(csproj_path, output_dir, nuget_path, None, configuration,
+                                              unity_project_path, root_dir, pack_engine))
+            return csproj_path
+
+        def push(csproj_path):
+            check_exit_code("push", self.push(csproj_path, output_dir, feed, nuget_path, api_key, push_engine, 1))
+            return csproj_path
+
+        from ugetcli.pipeline import StagedPipeline, Stage
+        stages = [Stage("build", build, 1), Stage("create", create, 1), Stage("pack", pack, 1)]
+        if feed:
+            stages.append(Stage("push", push, jobs))
+
+        def report(result):
+            name = os.path.splitext(os.path.basename(result.item))[0]
+            timings = ", ".join("{0} {1:.1f} s".format(stage, seconds) for stage, seconds in result.seconds.items())
+            if result.error is None:
+                click.secho("{0} {1} ({2})".format("Published" if feed else "Packed", name, timings), fg="green")
+            else:
+                click.secho("Failed to publish {0}: {1} failed: {2} ({3})".format(
+                    name, result.failed_stage, result.error, timings), fg="red")
+
+        start = time.time()
+        results = StagedPipeline(stages).run(csproj_paths, report)
+        failed = len([result for result in results if result.error is not None])
+        click.secho("{0} published, {1} failed in {2:.1f} s".format(len(results) - failed, failed, time.time() - start))
+        return 1 if failed else 0
+
+    def cache_stats(self):
+        """
+        Prints build cache statistics
+        :return: Exit code
+        """
+        from ugetcli.buildcache import format_size
+        stats = self.build_cache.stats()
+        hits = stats["hits"] + stats["remote_hits"]
+        lookups = hits + stats["misses"]
+        click.secho("path: {0}".format(stats["path"]))
+        click.secho("entries: {0}".format(stats["entries"]))
+        click.secho("size: {0} (limit {1})".format(format_size(stats["size"]), format_size(stats["max_size"])))
+        click.secho("hits: {0}, remote hits: {1}, misses: {2} ({3:.0f}% hit rate)".format(
+            stats["hits"], stats["remote_hits"], stats["misses"], 100.0 * hits / lookups if lookups else 0))
+        member_stats = self._get_member_cache().stats()
+        click.secho("incremental members: {0} ({1}), hits: {2}, misses: {3}".format(
+            member_stats["entries"], format_size(member_stats["size"]), member_stats["hits"], member_stats["misses"]))
+        return 0
+
+    def cache_prune(self, max_size):
+        """
+        Evicts least recently used .unitypackage files from the build cache, and asset members of incremental export
+        :param max_size: Size limit in bytes, applied to both
+        :return: Exit code
+        """
+        from ugetcli.buildcache import format_size
+        removed_count, removed_size = self.build_cache.prune(max_size)
+        removed_members_count, removed_members_size = self._get_member_cache().prune(max_size)
+        removed_count += removed_members_count
+        removed_size += removed_members_size
+        click.secho("Removed {0} cache entries ({1})".format(removed_count, format_size(removed_size)))
+        return 0
+
+    def _get_build_cache(self, cache_url):
+        """
+        Returns build cache, backed by the remote cache if its URL is provided
+        """
+        if not cache_url:
+            return self.build_cache
+        from ugetcli.buildcache import BuildCache
+        from ugetcli.remotecache import RemoteCache
+        remote = RemoteCache(cache_url, debug=self.debug)
+        return BuildCache(self.build_cache.cache_dir, self.build_cache.max_size, remote)
+
+    def _get_cache(self, name, create):
+        """ Returns cache shared by every command this object runs; it's created on first use """
+        with self._caches_lock:
+            if name not in self._caches:
+                self._caches[name] = create()
+            return self._caches[name]
+
+    def _print_transfer_stats(self):
+        """ Prints throughput of file copies, per copy method, in debug mode """
+        if self.debug:
+            for line in fastcopy.stats.format():
+                click.secho("Copied with " + line)
+
+    def _get_csproj(self, path):
+        """
+        Returns CsProj of the project at path. Instances are shared by every command this object runs,
+        so project files are parsed once per process (i.e. by create and pack of uget publish).
+        """
+        key = os.path.abspath(path)
+        with self._csprojs_lock:
+            if key not in self._csprojs:
+                from ugetcli.csproj import CsProj
+                csproj = CsProj(path)
+                csproj.set_metadata_index(self.metadata_index)
+                self._csprojs[key] = csproj
+            return self._csprojs[key]
+
+    def _get_member_cache(self):
+        from ugetcli.buildcache import MemberCache
+        return MemberCache(self.build_cache.cache_dir, self.build_cache.max_size)
+
+    def _copy_file_if_changed(self, src, dst):
+        """
+        Copies file unless destination has the same content, so its modification time (and cached digest) is kept
+        """
+        if not os.path.isfile(dst) or self.digest_cache.get_digest(src) != self.digest_cache.get_digest(dst):
+            fastcopy.copy_file(src, dst)
+
+    def _get_unitypackage_cache_key(self, export_root, options, overlay=None):
+        """
+        Computes build cache key of the .unitypackage from content of every file and directory under the export root,
+        and every overlay file
+        """
+        inputs = {"./": ""}
+        for dirpath, dirnames, filenames in os.walk(export_root):
+            relative_dir = os.path.relpath(dirpath, export_root).replace(os.sep, "/")
+            inputs[relative_dir + "/"] = ""
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                inputs[relative_dir + "/" + filename] = self.digest_cache.get_digest(path)
+        for relative_path, path in (overlay or {}).items():
+            parts = relative_path.split("/")
+            for i in range(1, len(parts)):
+                inputs["./" + "/".join(parts[:i]) + "/"] = ""
+            inputs["./" + relative_path] = self.digest_cache.get_digest(path)
+        from ugetcli.buildcache import BuildCache
+        return BuildCache.compute_key(inputs.items(), options)
 
     def _get_unity_package_export_root(self, unity_project_path, unitypackage_root_path_relative):
         """
@@ -199,15 +784,16 @@ class UGetCli:
         Locates mbuild executable path from user input or MsBuild facade.
         @:raises click.UsageError
         """
+        from ugetcli.msbuild import MsBuildRunner
         # If Msbuild path is provided, check if it's valid
         if msbuild_path:
-            if not MsBuildRunner.valid_msbuild_executable(msbuild_path):
+            if not self.tool_cache.validate("msbuild", msbuild_path, MsBuildRunner.valid_msbuild_executable):
                 raise click.UsageError(msbuild_path + " is not a valid msbuild executable.")
             else:
                 return msbuild_path
 
         # Msbuild path was not provided, locate
-        msbuild_path = MsBuildRunner.locate_msbuild()
+        msbuild_path = MsBuildRunner.locate_msbuild(self.tool_cache)
         if msbuild_path:
             return msbuild_path
 
@@ -222,15 +808,16 @@ class UGetCli:
         Locates NuGet executable path from user input or NuGet facade.
         @:raises click.UsageError
         """
+        from ugetcli.nuget import NuGetRunner
         # If NuGet path is provided, check if it's valid
         if nuget_path:
-            if not NuGetRunner.valid_nuget_executable(nuget_path):
+            if not self.tool_cache.validate("nuget", nuget_path, NuGetRunner.valid_nuget_executable):
                 raise click.UsageError(nuget_path + " is not a valid NuGet executable.")
             else:
                 return nuget_path
 
         # NuGet is not provided, locate
-        nuget_path = NuGetRunner.locate_nuget()
+        nuget_path = NuGetRunner.locate_nuget(self.tool_cache)
         if nuget_path:
             return nuget_path
 
@@ -245,6 +832,64 @@ class UGetCli:
                 click.secho('You might need to add NuGet installation folder to your PATH variable.')
         raise click.UsageError('Failed to locate NuGet executable.')
 
+    @staticmethod
+    def _locate_unitypackages_at_path(path):
+        """
+        Finds .unitypackage files. Path can be a file, glob pattern or a directory containing Unity Packages.
+        """
+        if any(c in path for c in "*?["):
+            unitypackage_paths = sorted(p for p in glob.glob(path) if p.endswith(".unitypackage") and os.path.isfile(p))
+        elif os.path.isdir(path):
+            unitypackage_paths = sorted(os.path.join(path, filename) for filename in os.listdir(path)
+                                        if filename.endswith(".unitypackage"))
+        elif os.path.isfile(path):
+            unitypackage_paths = [path]
+        else:
+            raise click.FileError(path)
+        if not unitypackage_paths:
+            raise click.UsageError("Failed to find Unity Packages (.unitypackage) at " + path)
+        return unitypackage_paths
+
+    def _locate_unitypackage_version(self, value, csproj_path, output_dir, configuration):
+        """
+        Returns path to the .unitypackage. Value is either a path, or a version of the package built by uget create.
+        """
+        if os.path.isfile(value) or value.endswith(".unitypackage"):
+            if not os.path.isfile(value):
+                raise click.FileError(value)
+            return value
+        csproj = self._get_csproj(csproj_path)
+        assembly_name = csproj.get_assembly_name()
+        if not assembly_name:
+            raise click.UsageError("Failed to identify package id.")
+        path = os.path.join(output_dir, self.UNITYPACKAGE_FORMAT.format(name=assembly_name, version=value,
+                                                                        configuration=configuration))
+        if not os.path.isfile(path):
+            raise click.FileError(path, "Unity Package of version {0} not found".format(value))
+        return path
+
+    def _locate_nupkgs_at_path(self, path, output_dir):
+        """
+        Finds .nupkg files.
+        Path can be a glob pattern, or a directory that contains NuGet packages and no project files;
+        otherwise single package is located with _locate_nupkg_at_path.
+        """
+        if any(c in path for c in "*?["):
+            nupkg_paths = sorted(p for p in glob.glob(path) if p.endswith(".nupkg") and os.path.isfile(p))
+            if not nupkg_paths:
+                raise click.UsageError("Failed to find Nuget Packages (.nupkg) matching " + path)
+            return nupkg_paths
+
+        from ugetcli.nuspec import NuSpec
+        from ugetcli.csproj import CsProj
+        if os.path.isdir(path) and not CsProj.get_csproj_at_path(path) and not NuSpec.get_nuspec_at_path(path):
+            nupkg_paths = sorted(os.path.join(path, filename) for filename in os.listdir(path)
+                                 if filename.endswith(".nupkg") and os.path.isfile(os.path.join(path, filename)))
+            if nupkg_paths:
+                return nupkg_paths
+
+        return [self._locate_nupkg_at_path(path, output_dir)]
+
     def _locate_nupkg_at_path(self, path, output_dir):
         """
         Finds .nupkg file.
@@ -257,10 +902,13 @@ class UGetCli:
                 raise click.FileError(path)
             return path
 
+        from ugetcli.nuget import NuGetRunner
+        from ugetcli.nuspec import NuSpec
+        from ugetcli.csproj import CsProj
         csproj_path = CsProj.get_csproj_at_path(path)
 
         if csproj_path:
-            csproj = CsProj(csproj_path)
+            csproj = self._get_csproj(csproj_path)
 
             assembly_name = csproj.get_assembly_name()
             version = csproj.get_assembly_version()
@@ -276,6 +924,7 @@ class UGetCli:
             nuspec_file_path = NuSpec.get_nuspec_at_path(path)
             if nuspec_file_path is not None:
                 nuspec = NuSpec(path, self.debug)
+                nuspec.set_metadata_index(self.metadata_index)
                 package_id = nuspec.get_package_id()
                 version = nuspec.get_package_version()
                 normalized_version = NuGetRunner.get_normalized_nuget_pack_version(version)
@@ -298,6 +947,7 @@ class UGetCli:
                 raise click.FileError(path)
             return path
 
+        from ugetcli.csproj import CsProj
         csproj_path = CsProj.get_csproj_at_path(path)
 
         if not csproj_path:
@@ -331,3 +981,74 @@ class UGetCli:
                     unitypackage_path = os.path.join(directory, filename)
                     os.remove(unitypackage_path)
                     click.secho("Removed old .unitypackage at " + unitypackage_path)
+
+
+def _run_project_steps(options, log_dir, csproj_path):
+    """
+    Runs uget run steps for one project, from the project directory, writing output to the project log.
+    Runs in worker process.
+    :raises RuntimeError: If a step fails
+    """
+    project_dir = os.path.dirname(csproj_path)
+    options = dict(options)
+    options.update(utils.load_json_file(os.path.join(project_dir, "uget.config.json"), {}) or {})
+
+    working_dir = os.getcwd()
+    stdout, stderr = sys.stdout, sys.stderr
+    with open(_get_run_log_path(log_dir, csproj_path), "w") as log:
+        # Redirect file descriptors as well, so output of msbuild and NuGet goes to the log
+        stdout.flush()
+        stderr.flush()
+        saved_fds = [os.dup(1), os.dup(2)]
+        os.dup2(log.fileno(), 1)
+        os.dup2(log.fileno(), 2)
+        sys.stdout = sys.stderr = log
+        try:
+            os.chdir(project_dir)
+            uget = UGetCli(options["debug"], True)
+            for step in options["steps"]:
+                exit_code = _RUN_STEP_METHODS[step](uget, csproj_path, options)
+                if exit_code:
+                    raise RuntimeError("{0} failed with exit code {1}".format(step, exit_code))
+        finally:
+            log.flush()
+            os.dup2(saved_fds[0], 1)
+            os.dup2(saved_fds[1], 2)
+            for fd in saved_fds:
+                os.close(fd)
+            sys.stdout, sys.stderr = stdout, stderr
+            os.chdir(working_dir)
+
+
+def _run_build(uget, csproj_path, options):
+    return uget.build(csproj_path, options["configuration"], options["msbuild_path"], options.get("rebuild", False))
+
+
+def _run_create(uget, csproj_path, options):
+    return uget.create(csproj_path, options["output_dir"], options["configuration"], options["unity_project_path"],
+                       options.get("root_dir"), options.get("assembly_relative_dir", "."), options.get("clean", False),
+                       options["create_engine"])
+
+
+def _run_pack(uget, csproj_path, options):
+    return uget.pack(csproj_path, options["output_dir"], options["nuget_path"], None, options["configuration"],
+                     options["unity_project_path"], options.get("root_dir"), options["pack_engine"])
+
+
+def _run_push(uget, csproj_path, options):
+    if not options.get("feed"):
+        click.secho("No feed provided, push skipped")
+        return 0
+    return uget.push(csproj_path, options["output_dir"], options["feed"], options["nuget_path"], options["api_key"],
+                     options["push_engine"])
+
+
+_RUN_STEP_METHODS = {"build": _run_build, "create": _run_create, "pack": _run_pack, "push": _run_push}
+
+
+def _get_run_log_path(log_dir, csproj_path):
+    """
+    Returns path of the project log; projects with the same file name in different directories get different logs
+    """
+    digest = hashlib.sha1(os.path.abspath(csproj_path).encode("utf-8")).hexdigest()[:8]
+    return os.path.join(log_dir, "{0}-{1}.log".format(os.path.basename(csproj_path), digest))
@@ -1,7 +1,3 @@
-import os
-from upackage.upackage import UPackage
-
-
 """
 Helper module that provides access to UnityPackage methods
 """
@@ -15,6 +11,7 @@ class UnityPackageRunner:
         self.debug = debug
 
     def export_unitypackage(self, package_root, output_path):
+        from upackage.upackage import UPackage  # Imported lazily - upackage pulls in yaml
         UPackage.preprocess_assets(package_root)
         UPackage.generate_package(package_root, output_path)
 
@@ -0,0 +1,70 @@
+import collections
+
+"""
+Helper module that compares assets of two Unity Packages (.unitypackage)
+"""
+
+ADDED = "added"
+REMOVED = "removed"
+MOVED = "moved"
+MODIFIED = "modified"
+
+_STATUS_MARKS = {ADDED: "A", REMOVED: "D", MOVED: "R", MODIFIED: "M"}
+
+AssetChange = collections.namedtuple("AssetChange", [
+    "status",         # added, removed, moved or modified
+    "guid",
+    "old_pathname",   # None for added assets
+    "new_pathname",   # None for removed assets
+    "size_delta",     # Difference of asset content sizes, in bytes
+    "modified",       # True if asset content or .meta file changed (moved assets can be modified as well)
+])
+
+
+def diff_assets(old_assets, new_assets):
+    """
+    Compares assets of two packages. Assets are matched by guid, the same way Unity matches them on import.
+    :param old_assets: List of UnityPackageAsset of the old package
+    :param new_assets: List of UnityPackageAsset of the new package
+    :return: List of AssetChange, sorted by pathname
+    """
+    old_by_guid = dict((asset.guid, asset) for asset in old_assets)
+    new_by_guid = dict((asset.guid, asset) for asset in new_assets)
+    changes = []
+    for guid, new in new_by_guid.items():
+        old = old_by_guid.get(guid)
+        if old is None:
+            changes.append(AssetChange(ADDED, guid, None, new.pathname, new.size or 0, True))
+            continue
+        modified = old.digest != new.digest or old.meta_digest != new.meta_digest
+        size_delta = (new.size or 0) - (old.size or 0)
+        if old.pathname != new.pathname:
+            changes.append(AssetChange(MOVED, guid, old.pathname, new.pathname, size_delta, modified))
+        elif modified:
+            changes.append(AssetChange(MODIFIED, guid, old.pathname, new.pathname, size_delta, modified))
+    for guid, old in old_by_guid.items():
+        if guid not in new_by_guid:
+            changes.append(AssetChange(REMOVED, guid, old.pathname, None, -(old.size or 0), True))
+    return sorted(changes, key=lambda change: (change.new_pathname or change.old_pathname, change.status))
+
+
+def format_changes(changes):
+    """
+    Formats changes as text, one change per line, followed by a summary
+    :param changes: List of AssetChange
+    :return: List of lines
+    """
+    lines = []
+    for change in changes:
+        if change.status == MOVED:
+            pathname = "{0} -> {1}".format(change.old_pathname, change.new_pathname)
+        else:
+            pathname = change.new_pathname or change.old_pathname
+        mark = _STATUS_MARKS[change.status] + ("M" if change.status == MOVED and change.modified else " ")
+        lines.append("{0} {1:>+12} {2}".format(mark, change.size_delta, pathname))
+
+    counts = collections.Counter(change.status for change in changes)
+    lines.append("{0} added, {1} removed, {2} moved, {3} modified, size delta {4:+d} bytes".format(
+        counts[ADDED], counts[REMOVED], counts[MOVED], counts[MODIFIED],
+        sum(change.size_delta for change in changes)))
+    return lines
@@ -0,0 +1,332 @@
+import io
+import os
+import re
+import time
+import gzip
+import json
+import shutil
+import hashlib
+import tarfile
+import collections
+import click
+from ugetcli import utils
+from ugetcli import fastcopy
+from ugetcli.pgzip import ParallelGzipFile
+from ugetcli.compression import get_gzip_level
+
+"""
+Helper module that writes Unity Packages (.unitypackage) in-process
+"""
+
+# Same template and deterministic guid scheme as upackage, so both engines produce identical .meta files
+_META_TEMPLATE = """fileFormatVersion: 1
+guid: {guid}
+timeCreated: {timeCreated}
+licenseType: Pro
+DefaultImporter:
+  externalObjects: {{}}
+  userData:
+  assetBundleName:
+  assetBundleVariant:"""
+
+_GUID_REGEX = re.compile(r"^guid:\s*([0-9a-fA-F]+)\s*$", re.MULTILINE)
+
+# Bump when the layout of cached members or the way their keys are computed changes
+_MEMBER_KEY_VERSION = 2
+_BLOCK_SIZE = tarfile.BLOCKSIZE
+_CHUNK_SIZE = 256 * 1024
+
+UnityAsset = collections.namedtuple("UnityAsset", ["guid", "path", "pathname", "meta"])
+
+
+class UnityPackageWriter:
+    """
+    Writes .unitypackage by streaming every asset straight from the source tree into the archive
+    as <guid>/asset, <guid>/asset.meta and <guid>/pathname members. Asset content is never copied or held in memory.
+    """
+    ARCHIVE_FILENAME = "archtemp.tar"  # Name stored in gzip header, Unity on Windows expects it
+    UNITY_ROOT_PATH = "Assets"
+
+    def __init__(self, debug=False, jobs=1, compression="default", deterministic=False, write_meta=True):
+        """
+        :param debug: Enables verbose output
+        :param jobs: Number of threads used to compress the archive
+        :param compression: Compression profile - store, fast, default or max
+        :param deterministic: If set, timestamps in the archive, gzip header and generated .meta files are normalized,
+               so the same inputs produce byte-identical package
+        :param write_meta: If set, generated .meta files are written next to their assets, as Unity would do.
+               Otherwise they only exist inside the package, and the Unity project is left untouched.
+        """
+        self.debug = debug
+        self.jobs = jobs
+        self.compression = compression
+        self.deterministic = deterministic
+        self.write_meta = write_meta
+        self.member_cache = None
+        self.digest_cache = None
+
+    def set_member_cache(self, member_cache, digest_cache):
+        """
+        Enables incremental export: every asset is written as its own gzip member (concatenated gzip members
+        are still a valid gzip stream), and members of unchanged assets are copied from the cache without compression.
+        Timestamps in the archive are normalized, so members only depend on asset content, and survive fresh checkouts
+        and touched files.
+        :param member_cache: MemberCache compressed members are stored in
+        :param digest_cache: FileDigestCache used to hash asset content
+        """
+        self.member_cache = member_cache
+        self.digest_cache = digest_cache
+
+    def export_unitypackage(self, package_root, output_path, overlay=None):
+        """
+        Exports directory as .unitypackage. Generates .meta files for assets that don't have one.
+        :param package_root: Directory inside the Unity project (Assets/<root>) to export; might not exist with overlay
+        :param output_path: Path to the .unitypackage
+        :param overlay: Optional dictionary of files exported as if they were inside the package root:
+               {path relative to the package root: source path}. Overlay files replace files at the same path.
+        """
+        self.write_package(self.iter_assets(package_root, overlay), output_path)
+
+    def write_package(self, assets, output_path):
+        """
+        Writes .unitypackage
+        :param assets: Iterable of UnityAsset
+        :param output_path: Path to the .unitypackage
+        """
+        tmp_path = output_path + ".tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                if self.member_cache is not None:
+                    self._write_members(assets, f)
+                else:
+                    with self._open_gzip(f) as gz:
+                        with tarfile.open(fileobj=gz, mode="w|") as tar:
+                            for asset in assets:
+                                if self.debug:
+                                    click.secho("Adding asset {0}: {1}".format(asset.guid, asset.pathname))
+                                self._add_asset(tar, asset, self._get_mtime(asset))
+            utils.replace_file(tmp_path, output_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _open_gzip(self, fileobj):
+        level = get_gzip_level(self.compression)
+        mtime = utils.get_source_date_epoch() if self.deterministic else None
+        if self.jobs > 1:
+            return ParallelGzipFile(fileobj, self.jobs, level, filename=self.ARCHIVE_FILENAME, mtime=mtime)
+        return gzip.GzipFile(filename=self.ARCHIVE_FILENAME, mode="wb", compresslevel=level, fileobj=fileobj,
+                             mtime=mtime)
+
+    def _write_members(self, assets, fileobj):
+        """
+        Writes every asset as a separate gzip member, reusing cached members of unchanged assets.
+        Missing members are compressed on a thread pool; members are written in order, and the number of assets
+        in flight is bounded.
+        """
+        level = get_gzip_level(self.compression)
+        gzip_mtime = utils.get_source_date_epoch() if self.deterministic else 0
+        executor = None
+        if self.jobs > 1:
+            from concurrent.futures import ThreadPoolExecutor
+            executor = ThreadPoolExecutor(max_workers=self.jobs)
+        pending = collections.deque()
+        try:
+            for asset in assets:
+                if self.debug:
+                    click.secho("Adding asset {0}: {1}".format(asset.guid, asset.pathname))
+                members = self._get_tar_members(asset, utils.get_source_date_epoch())
+                if executor is None:
+                    self._copy_member(self._get_member(members, level, gzip_mtime), fileobj)
+                    continue
+                pending.append(executor.submit(self._get_member, members, level, gzip_mtime))
+                while len(pending) > self.jobs * 2:
+                    self._copy_member(pending.popleft().result(), fileobj)
+            while pending:
+                self._copy_member(pending.popleft().result(), fileobj)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        # End of archive marker
+        self._write_member([(b"\0" * (2 * _BLOCK_SIZE), None, None, 0)], level, gzip_mtime, fileobj)
+        self.member_cache.flush()
+
+    def _get_member(self, members, level, gzip_mtime):
+        """
+        Returns path to the cached gzip member of the asset, compressing it if it's not cached
+        :param members: List of tuples (tar header, content path, content bytes, content size)
+        """
+        key = hashlib.sha256(json.dumps([_MEMBER_KEY_VERSION, level, gzip_mtime]).encode("utf-8"))
+        for header, path, data, size in members:
+            key.update(header)
+            if path is not None:
+                key.update(self.digest_cache.get_digest(path).encode("utf-8"))
+            elif data is not None:
+                key.update(hashlib.sha1(data).hexdigest().encode("utf-8"))
+        key = key.hexdigest()
+        return self.member_cache.lookup(key) or self.member_cache.store(
+            key, lambda f: self._write_member(members, level, gzip_mtime, f))
+
+    def _write_member(self, members, level, gzip_mtime, fileobj):
+        with gzip.GzipFile(filename=self.ARCHIVE_FILENAME, mode="wb", compresslevel=level, fileobj=fileobj,
+                           mtime=gzip_mtime) as gz:
+            for header, path, data, size in members:
+                gz.write(header)
+                if path is not None:
+                    with open(path, "rb") as f:
+                        shutil.copyfileobj(f, gz, _CHUNK_SIZE)
+                elif data is not None:
+                    gz.write(data)
+                gz.write(b"\0" * (-size % _BLOCK_SIZE))
+
+    @staticmethod
+    def _copy_member(member_path, fileobj):
+        with open(member_path, "rb") as f:
+            fastcopy.copy_range(f, fileobj, os.fstat(f.fileno()).st_size)
+
+    def iter_assets(self, package_root, overlay=None):
+        """
+        Walks the directory in sorted order and yields its assets, starting with the directory itself
+        :param package_root: Directory inside the Unity project to export
+        :param overlay: Optional dictionary of files exported as if they were inside the package root
+        :return: Generator of UnityAsset
+        """
+        package_root = os.path.abspath(package_root)
+        pathname_root = "/".join([self.UNITY_ROOT_PATH, os.path.basename(package_root)])
+        for asset in self._iter_assets(package_root, "./", pathname_root, _get_overlay_tree(overlay)):
+            yield asset
+
+    def _iter_assets(self, path, relative_path, pathname, overlay_tree):
+        yield self._get_asset(path, relative_path, pathname)
+        names = set(os.listdir(path)) if os.path.isdir(path) else set()
+        for name in sorted(names.union(overlay_tree)):
+            child_path = os.path.join(path, name)
+            # Relative path is joined the same way as upackage, so deterministic guids match
+            child_relative_path = os.path.join(relative_path, name)
+            child_pathname = pathname + "/" + name
+            child_overlay = overlay_tree.get(name)
+            if isinstance(child_overlay, dict) or (child_overlay is None and os.path.isdir(child_path)):
+                for asset in self._iter_assets(child_path, child_relative_path, child_pathname, child_overlay or {}):
+                    yield asset
+            elif name.endswith(".meta"):
+                continue
+            elif child_overlay is not None:
+                yield self._get_asset(child_path, child_relative_path, child_pathname, child_overlay)
+            elif os.path.isfile(child_path):
+                yield self._get_asset(child_path, child_relative_path, child_pathname)
+
+    def _get_asset(self, path, relative_path, pathname, source_path=None):
+        """
+        :param path: Path of the asset inside the Unity project, its .meta file is next to it
+        :param source_path: Path content of the asset is read from, if it's not the same as path (overlay)
+        """
+        meta_path = path + ".meta"
+        if os.path.isfile(meta_path):
+            with open(meta_path, "rb") as f:
+                meta = f.read()
+        else:
+            # Asset modification time rather than current time, so exporting unchanged asset gives the same .meta
+            meta = self.generate_meta(relative_path, self._get_path_mtime(source_path or path)).encode("utf-8")
+            if self.write_meta:
+                with open(meta_path, "wb") as f:
+                    f.write(meta)
+        return UnityAsset(self.read_guid(meta, meta_path), source_path or path, pathname, meta)
+
+    @staticmethod
+    def generate_meta(relative_path, time_created=None):
+        """
+        Generates .meta file content with a deterministic guid
+        :param relative_path: Path of the asset relative to the exported directory, starting with "./"
+        :param time_created: Timestamp stored in .meta file; current time if not provided
+        :return: .meta file content
+        """
+        return _META_TEMPLATE.format(guid=UnityPackageWriter.get_deterministic_guid(relative_path),
+                                     timeCreated=int(time.time() if time_created is None else time_created))
+
+    @staticmethod
+    def get_deterministic_guid(relative_path):
+        return hashlib.md5(relative_path.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def read_guid(meta, meta_path):
+        match = _GUID_REGEX.search(meta.decode("utf-8", "replace"))
+        if not match:
+            raise click.UsageError("Failed to read asset guid from .meta file: " + meta_path)
+        return match.group(1)
+
+    def _get_mtime(self, asset):
+        return self._get_path_mtime(asset.path)
+
+    def _get_path_mtime(self, path):
+        if self.deterministic or not os.path.exists(path):
+            return utils.get_source_date_epoch()  # Overlay directories don't exist on disk
+        return int(os.path.getmtime(path))  # Whole seconds, fractional mtime would add a pax header
+
+    @staticmethod
+    def _add_asset(tar, asset, mtime):
+        for info, path, data in UnityPackageWriter._get_tar_infos(asset, mtime):
+            if path is not None:
+                with open(path, "rb") as f:
+                    tar.addfile(info, f)
+            elif data is not None:
+                tar.addfile(info, io.BytesIO(data))
+            else:
+                tar.addfile(info)
+
+    @staticmethod
+    def _get_tar_infos(asset, mtime):
+        """
+        Returns tar members of the asset - <guid>/, <guid>/asset, <guid>/asset.meta and <guid>/pathname
+        :return: List of tuples (TarInfo, content path, content bytes); both are None for the directory
+        """
+        directory_info = tarfile.TarInfo(asset.guid)
+        directory_info.type = tarfile.DIRTYPE
+        directory_info.mode = 0o755
+        directory_info.mtime = mtime
+        infos = [(directory_info, None, None)]
+
+        if os.path.isfile(asset.path):
+            asset_info = tarfile.TarInfo(asset.guid + "/asset")
+            asset_info.size = os.path.getsize(asset.path)
+            asset_info.mode = 0o644
+            asset_info.mtime = mtime
+            infos.append((asset_info, asset.path, None))
+
+        meta_info = UnityPackageWriter._get_bytes_info(asset.guid + "/asset.meta", asset.meta, mtime)
+        infos.append((meta_info, None, asset.meta))
+        pathname = asset.pathname.encode("utf-8")
+        infos.append((UnityPackageWriter._get_bytes_info(asset.guid + "/pathname", pathname, mtime), None, pathname))
+        return infos
+
+    @staticmethod
+    def _get_tar_members(asset, mtime):
+        """
+        Returns tar members of the asset with serialized headers, the same as tarfile writes them
+        :return: List of tuples (header, content path, content bytes, content size)
+        """
+        return [(info.tobuf(tarfile.DEFAULT_FORMAT, tarfile.ENCODING, "strict"), path, data, info.size)
+                for info, path, data in UnityPackageWriter._get_tar_infos(asset, mtime)]
+
+    @staticmethod
+    def _get_bytes_info(name, data, mtime):
+        info = tarfile.TarInfo(name)
+        info.size = len(data)
+        info.mode = 0o644
+        info.mtime = mtime
+        return info
+
+
+def _get_overlay_tree(overlay):
+    """
+    Converts overlay to a tree of nested dictionaries
+    :param overlay: Dictionary {path relative to the package root: source path}
+    :return: Dictionary {name: source path for files, or dictionary for directories}
+    """
+    tree = {}
+    for relative_path, source_path in (overlay or {}).items():
+        parts = [part for part in relative_path.replace("\\", "/").split("/") if part and part != "."]
+        node = tree
+        for part in parts[:-1]:
+            node = node.setdefault(part, {})
+        node[parts[-1]] = source_path
+    return tree
@@ -1,10 +1,15 @@
 import contextlib
 import os
 import sys
+import json
 import tempfile
 import shutil
 import ntpath
 
+CACHE_DIR_ENV = "UGET_CACHE_DIR"
+SOURCE_DATE_EPOCH_ENV = "SOURCE_DATE_EPOCH"
+DEFAULT_SOURCE_DATE_EPOCH = 315532800  # 1980-01-01 00:00:00 UTC, earliest timestamp zip can store
+
 
 def get_unitypackage_filename(project_name, version, configuration):
     """Generates .unitypackage file name using project name, version and configuration
@@ -91,24 +96,155 @@ def escape_exe_path(executable_path):
 
 def copy_replace_directory(src_dir, dst_dir):
     """
-    Walks over the directory tree and copies one directory
-    over to another, replacing existing files
+    Copies one directory over to another, replacing files that changed
     :param src_dir: Source directory path
     :param dst_dir: Destination directory path
-    :return:
+    :return: SyncResult
     """
-    for src_dir, dirs, files in os.walk(src_dir):
-        dst_dir = src_dir.replace(src_dir, dst_dir, 1)
-        if not os.path.exists(dst_dir):
-            os.makedirs(dst_dir)
-        for file_ in files:
-            src_file = os.path.join(src_dir, file_)
-            dst_file = os.path.join(dst_dir, file_)
-            if os.path.exists(dst_file):
-                os.remove(dst_file)
-            shutil.copy(src_file, dst_dir)
+    from ugetcli.sync import DirectorySync
+    return DirectorySync().sync(src_dir, dst_dir)
 
 
 def create_empty_file(path):
     with open(path, 'w'):
         pass
+
+
+def get_cache_dir():
+    """Returns uget cache directory. Can be overridden with UGET_CACHE_DIR environment variable
+    :return: Path to the cache directory (not guaranteed to exist)
+    """
+    return os.environ.get(CACHE_DIR_ENV) or os.path.join(os.path.expanduser("~"), ".uget", "cache")
+
+
+def get_source_date_epoch():
+    """Returns timestamp stored in archives built in deterministic mode.
+    Can be overridden with SOURCE_DATE_EPOCH environment variable; values before 1980 are clamped for zip.
+    :return: Unix timestamp
+    """
+    try:
+        epoch = int(os.environ.get(SOURCE_DATE_EPOCH_ENV, DEFAULT_SOURCE_DATE_EPOCH))
+    except ValueError:
+        epoch = DEFAULT_SOURCE_DATE_EPOCH
+    return max(epoch, DEFAULT_SOURCE_DATE_EPOCH)
+
+
+def load_json_file(path, default=None):
+    """Loads json from file, returning default if file is missing or corrupted
+    :param path: Path to the json file
+    :param default: Value returned when file can't be read
+    :return: Deserialized json
+    """
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (IOError, OSError, ValueError):
+        return default
+
+
+def save_json_file(path, data):
+    """Atomically writes json to file, so that concurrent uget processes never read a partial file
+    :param path: Path to the json file
+    :param data: Json serializable data
+    """
+    directory = _make_parent_dir(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f)
+        replace_file(tmp_path, path)
+    except (IOError, OSError):
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def update_json_file(path, update, default=None):
+    """Loads json from file, updates and saves it while holding file_lock, so changes of concurrent uget processes
+    are merged rather than overwritten
+    :param path: Path to the json file
+    :param update: Method that receives loaded data and changes it in place
+    :param default: Value updated when file can't be read
+    :return: Updated data
+    """
+    with file_lock(path):
+        data = load_json_file(path, default)
+        update(data)
+        save_json_file(path, data)
+    return data
+
+
+@contextlib.contextmanager
+def file_lock(path):
+    """Holds exclusive lock of the file at path, shared by processes. Lock is taken on a separate .lock file,
+    so the file itself can still be replaced.
+    :param path: Path to the locked file
+    """
+    _make_parent_dir(path)
+    with open(path + ".lock", "a+b") as f:
+        f.seek(0)
+        if sys.platform == "win32":
+            import msvcrt
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    pass  # Gave up after 10 attempts; keep waiting
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def _make_parent_dir(path):
+    directory = os.path.dirname(os.path.abspath(path))
+    if not os.path.isdir(directory):
+        try:
+            os.makedirs(directory)
+        except OSError:
+            if not os.path.isdir(directory):  # Created concurrently
+                raise
+    return directory
+
+
+def replace_file(src, dst):
+    """
+    Moves file over destination file, replacing it atomically
+    :param src: Source file path
+    :param dst: Destination file path
+    """
+    os.replace(src, dst)
+
+
+def scan_directory(path, follow_symlinks=True):
+    """
+    Lists directory with os.scandir, which gets entry types from directory listing without extra stat calls
+    :param path: Directory path
+    :param follow_symlinks: If not set, symbolic links to directories are listed as files
+    :return: Tuple (list of os.DirEntry of files, list of os.DirEntry of subdirectories), in listing order
+    """
+    files = []
+    subdirectories = []
+    for entry in os.scandir(path):
+        (subdirectories if entry.is_dir(follow_symlinks=follow_symlinks) else files).append(entry)
+    return files, subdirectories
+
+
+def join_relative_path(root_dir, relative_path):
+    """
+    Joins directory with a path relative to it
+    :param root_dir: Directory path
+    :param relative_path: Relative path with "/" separators; empty for the directory itself
+    :return: Path
+    """
+    if not relative_path:
+        return root_dir
+    return os.path.join(root_dir, *relative_path.split("/"))